@@ -0,0 +1,41 @@
+"""add content-addressed snapshot blocks
+
+Revision ID: a9b8c7d6e5f4
+Revises: d7e8f9a0b1c2
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "a9b8c7d6e5f4"
+down_revision = "d7e8f9a0b1c2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "snapshot_blocks",
+        sa.Column("hash", sa.Text(), nullable=False),
+        sa.Column("data", postgresql.JSONB(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint("hash"),
+    )
+    op.add_column("studysets", sa.Column("manifest", postgresql.JSONB(), nullable=True))
+    op.add_column(
+        "annotations", sa.Column("manifest", postgresql.JSONB(), nullable=True)
+    )
+
+
+def downgrade():
+    op.drop_column("annotations", "manifest")
+    op.drop_column("studysets", "manifest")
+    op.drop_table("snapshot_blocks")
@@ -17,6 +17,9 @@ from starlette.middleware.cors import CORSMiddleware
 from neurosynth_compose.admin import init_admin
 from neurosynth_compose.database import init_db
 from neurosynth_compose.resources.auth import asgi_oauth_problem_handler
+from neurosynth_compose.resources.data_views.meta_analysis_jobs_view import (
+    close_job_stores,
+)
 from neurosynth_compose.resources.errors import (
     general_exception_handler,
     http_exception_handler,
@@ -105,6 +108,7 @@ def _asgi_lifespan(settings: Mapping[str, object], database):
         finally:
             thread_limiter.total_tokens = previous_tokens
             database.dispose()
+            close_job_stores()
 
     return lifespan
 
@@ -146,6 +146,20 @@ def backfill_extraction_metadata():
     _run_with_runtime(_run)
 
 
+@main.command("prune-snapshot-blocks")
+def prune_snapshot_blocks_command():
+    """Delete snapshot blocks that no stored snapshot references."""
+
+    def _run(_app, db):
+        from neurosynth_compose.models.analysis import prune_snapshot_blocks
+
+        deleted = prune_snapshot_blocks(db.session.connection())
+        db.session.commit()
+        click.echo(f"Deleted {deleted} orphaned snapshot block(s).")
+
+    _run_with_runtime(_run)
+
+
 @main.command("transfer-user-ownership")
 @click.argument("source_user_id")
 @click.argument("destination_user_id")
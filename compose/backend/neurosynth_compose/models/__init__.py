@@ -9,6 +9,7 @@ from neurosynth_compose.models.analysis import (
     NeurovaultFile,
     Project,
     SnapshotAnnotation,
+    SnapshotBlock,
     SnapshotStudyset,
     Specification,
     Tag,
@@ -33,6 +34,7 @@ __all__ = [
     "NeurostoreStudyset",
     "SnapshotAnnotation",
     "NeurostoreAnnotation",
+    "SnapshotBlock",
     "MetaAnalysis",
     "MetaAnalysisResult",
     "NeurovaultCollection",
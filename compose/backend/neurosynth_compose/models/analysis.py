@@ -17,14 +17,22 @@ from sqlalchemy import (
     Table,
     Text,
     event,
+    inspect,
+    select,
+    text,
 )
 from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.associationproxy import association_proxy
-from sqlalchemy.orm import backref, relationship
+from sqlalchemy.orm import Session, backref, object_session, relationship
 from sqlalchemy.sql import func
 
 from neurosynth_compose.database import db
-from neurosynth_compose.utils.snapshots import md5_of_snapshot
+from neurosynth_compose.utils.snapshots import (
+    assemble_snapshot,
+    md5_of_snapshot,
+    split_snapshot,
+)
 
 
 def generate_id():
@@ -147,10 +155,142 @@ class NeurostoreStudyset(db.Model):
     )
 
 
-class SnapshotStudyset(BaseMixin, db.Model):
+class SnapshotBlock(db.Model):
+    """A content-addressed batch of snapshot list items, shared across snapshots."""
+
+    __tablename__ = "snapshot_blocks"
+
+    hash = Column(Text, primary_key=True)
+    data = Column(JSONB, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ChunkedSnapshotMixin(object):
+    """Stores ``snapshot`` as a manifest of ``SnapshotBlock`` keys.
+
+    The items of ``snapshot_block_field`` are written as blocks of
+    ``snapshot_block_size`` when the row is flushed, so snapshots that differ in
+    a few items share the rest of their blocks. Snapshots without that list
+    stay inline in the ``snapshot`` column. Reading ``snapshot`` reassembles
+    it transparently.
+    """
+
+    snapshot_block_field = None
+    snapshot_block_size = 1
+
+    _snapshot = Column("snapshot", JSONB)
+    manifest = Column(JSONB)
+
+    @property
+    def snapshot(self):
+        if self._snapshot is not None or self.manifest is None:
+            return self._snapshot
+        assembled = self.__dict__.get("_assembled_snapshot")
+        if assembled is None or assembled[0] is not self.manifest:
+            load_snapshots(object_session(self) or db.session, [self])
+            assembled = self.__dict__["_assembled_snapshot"]
+        return assembled[1]
+
+    @snapshot.setter
+    def snapshot(self, value):
+        self._snapshot = value
+        self.manifest = None
+        self.__dict__.pop("_assembled_snapshot", None)
+
+
+def store_snapshot_blocks(connection, model, snapshot):
+    """Write the blocks of ``snapshot`` for ``model``; returns its manifest.
+
+    Only blocks not stored yet are inserted. Returns ``None`` when the snapshot
+    is kept inline.
+    """
+    split = split_snapshot(
+        snapshot, model.snapshot_block_field, model.snapshot_block_size
+    )
+    if split is None:
+        return None
+
+    manifest, blocks = split
+    # Key-share locks keep prune_snapshot_blocks from sweeping the reused
+    # blocks before this snapshot's manifest is committed.
+    existing = set(
+        connection.execute(
+            select(SnapshotBlock.hash)
+            .where(SnapshotBlock.hash.in_(list(blocks)))
+            .with_for_update(key_share=True)
+        ).scalars()
+    )
+    missing = [
+        {"hash": key, "data": data}
+        for key, data in blocks.items()
+        if key not in existing
+    ]
+    if missing:
+        connection.execute(
+            pg_insert(SnapshotBlock.__table__).on_conflict_do_nothing(
+                index_elements=["hash"]
+            ),
+            missing,
+        )
+    return manifest
+
+
+def prune_snapshot_blocks(connection):
+    """Delete the blocks no snapshot manifest references; returns how many.
+
+    Blocks are shared between snapshots, so replacing or deleting a snapshot
+    leaves its blocks behind. The exclusive table lock waits for writers that
+    are still storing blocks and keeps new ones out until the sweep commits.
+    """
+    connection.execute(text("LOCK TABLE snapshot_blocks IN EXCLUSIVE MODE"))
+    result = connection.execute(text("""
+            WITH referenced AS (
+                SELECT jsonb_array_elements_text(manifest -> 'blocks') AS hash
+                FROM studysets
+                WHERE manifest IS NOT NULL
+                UNION
+                SELECT jsonb_array_elements_text(manifest -> 'blocks') AS hash
+                FROM annotations
+                WHERE manifest IS NOT NULL
+            )
+            DELETE FROM snapshot_blocks AS b
+            WHERE NOT EXISTS (SELECT 1 FROM referenced AS r WHERE r.hash = b.hash)
+            """))
+    return result.rowcount
+
+
+def load_snapshots(session, records):
+    """Reassemble the chunked snapshots of ``records`` with one block query."""
+    pending = []
+    for record in records:
+        if record is None or record._snapshot is not None or record.manifest is None:
+            continue
+        assembled = record.__dict__.get("_assembled_snapshot")
+        if assembled is None or assembled[0] is not record.manifest:
+            pending.append(record)
+    keys = {key for record in pending for key in record.manifest["blocks"]}
+    if not keys:
+        return
+
+    blocks = dict(
+        session.execute(
+            select(SnapshotBlock.hash, SnapshotBlock.data).where(
+                SnapshotBlock.hash.in_(keys)
+            )
+        ).all()
+    )
+    for record in pending:
+        record.__dict__["_assembled_snapshot"] = (
+            record.manifest,
+            assemble_snapshot(record.manifest, blocks),
+        )
+
+
+class SnapshotStudyset(ChunkedSnapshotMixin, BaseMixin, db.Model):
     __tablename__ = "studysets"
 
-    snapshot = Column(JSONB)
+    snapshot_block_field = "studies"
+
     md5 = Column(Text, unique=True, index=True)
     user_id = Column(Text, ForeignKey("users.external_id"))
     neurostore_id = Column(Text, ForeignKey("studyset_references.id"))
@@ -169,10 +309,12 @@ class NeurostoreAnnotation(db.Model):
     )
 
 
-class SnapshotAnnotation(BaseMixin, db.Model):
+class SnapshotAnnotation(ChunkedSnapshotMixin, BaseMixin, db.Model):
     __tablename__ = "annotations"
 
-    snapshot = Column(JSONB)
+    snapshot_block_field = "notes"
+    snapshot_block_size = 100
+
     md5 = Column(Text, unique=True, index=True)
     user_id = Column(Text, ForeignKey("users.external_id"))
     neurostore_id = Column(Text, ForeignKey("annotation_references.id"))
@@ -187,11 +329,39 @@ class SnapshotAnnotation(BaseMixin, db.Model):
     )
 
 
+_SNAPSHOT_DIGESTS_KEY = "snapshot_md5_digests"
+
+
+def snapshot_digests(session):
+    """Snapshot digests computed in ``session``'s current transaction."""
+    return session.info.setdefault(_SNAPSHOT_DIGESTS_KEY, {})
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _forget_snapshot_digests(session):
+    session.info.pop(_SNAPSHOT_DIGESTS_KEY, None)
+
+
 def _sync_snapshot_md5(mapper, connection, target):
-    if getattr(target, "snapshot", None) is None:
+    attrs = inspect(target).attrs
+    if not (
+        attrs._snapshot.history.has_changes() or attrs.manifest.history.has_changes()
+    ):
+        return
+    snapshot = target._snapshot
+    if snapshot is None:
         target.md5 = None
         return
-    target.md5 = md5_of_snapshot(target.snapshot)
+    session = object_session(target)
+    memo = snapshot_digests(session) if session is not None else None
+    target.md5 = md5_of_snapshot(snapshot, memo)
+
+    manifest = store_snapshot_blocks(connection, type(target), snapshot)
+    if manifest is not None:
+        target._snapshot = None
+        target.manifest = manifest
+        target.__dict__["_assembled_snapshot"] = (manifest, snapshot)
 
 
 event.listen(SnapshotStudyset, "before_insert", _sync_snapshot_md5)
@@ -10,7 +10,7 @@ import threading
 import tracemalloc
 from contextlib import contextmanager
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from io import StringIO
 from pathlib import Path
 from time import perf_counter
@@ -132,10 +132,33 @@ def _discover_project_provenance_target_bytes():
     return int(target or 0)
 
 
+class _InMemoryJobStorePipeline:
+    def __init__(self, store):
+        self._store = store
+        self._commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self):
+        return [
+            getattr(self._store, name)(*args, **kwargs)
+            for name, args, kwargs in self._commands
+        ]
+
+
 class _InMemoryJobStore:
     def __init__(self):
         self._store = {}
         self._sets = {}
+        self._zsets = {}
+
+    def pipeline(self, transaction=True):
+        return _InMemoryJobStorePipeline(self)
 
     def setex(self, key, ttl, value):
         if isinstance(value, str):
@@ -147,6 +170,8 @@ class _InMemoryJobStore:
 
     def delete(self, key):
         self._store.pop(key, None)
+        self._sets.pop(key, None)
+        self._zsets.pop(key, None)
 
     def sadd(self, key, *values):
         bucket = self._sets.setdefault(key, set())
@@ -165,6 +190,26 @@ class _InMemoryJobStore:
     def expire(self, key, ttl):
         return True
 
+    def mget(self, keys):
+        return [self._store.get(key) for key in keys]
+
+    def zadd(self, key, mapping):
+        self._zsets.setdefault(key, {}).update(mapping)
+
+    def zrem(self, key, *values):
+        for value in values:
+            self._zsets.get(key, {}).pop(value, None)
+
+    def zremrangebyscore(self, key, minimum, maximum):
+        bucket = self._zsets.get(key, {})
+        for value, score in list(bucket.items()):
+            if score <= maximum:
+                del bucket[value]
+
+    def zrevrange(self, key, start, end):
+        bucket = self._zsets.get(key, {})
+        return sorted(bucket, key=lambda value: (bucket[value], value), reverse=True)
+
 
 def _install_local_neurostore_stub():
     from neurosynth_compose.resources import resource_services
@@ -1104,8 +1149,11 @@ def _ensure_result_for_meta_analysis(meta_analysis_id: str):
 
 def _seed_jobs(job_store, *, meta_analysis_id: str, count: int, user_id="user1-id"):
     job_ids = []
+    # Recent submission times: the job index prunes jobs past their cache TTL.
+    started = datetime.now(timezone.utc) - timedelta(seconds=count)
     for index in range(count):
         job_id = f"arn:aws:states:local:execution:{meta_analysis_id}:{index}"
+        submitted = (started + timedelta(seconds=index)).isoformat()
         payload = {
             "job_id": job_id,
             "meta_analysis_id": meta_analysis_id,
@@ -1114,8 +1162,8 @@ def _seed_jobs(job_store, *, meta_analysis_id: str, count: int, user_id="user1-i
             "environment": "testing",
             "no_upload": False,
             "user_id": user_id,
-            "created_at": f"2026-01-01T00:00:{index:02d}+00:00",
-            "updated_at": f"2026-01-01T00:00:{index:02d}+00:00",
+            "created_at": submitted,
+            "updated_at": submitted,
             "logs": [],
         }
         meta_analysis_jobs_view._store_job(job_id, payload)
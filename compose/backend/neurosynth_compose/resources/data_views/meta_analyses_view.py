@@ -33,6 +33,7 @@ from neurosynth_compose.models.analysis import (
     Specification,
     SpecificationCondition,
     Tag,
+    load_snapshots,
 )
 from neurosynth_compose.models.auth import User
 from neurosynth_compose.resources.common import get_current_user, make_json_response
@@ -314,6 +315,11 @@ def _serialize_studyset(record):
     return payload
 
 
+def _serialize_studysets(records):
+    load_snapshots(db.session, records)
+    return [_serialize_studyset(record) for record in records]
+
+
 def _serialize_snapshot_studyset_summary(record):
     if record is None:
         return None
@@ -352,6 +358,11 @@ def _serialize_annotation(record):
     return payload
 
 
+def _serialize_annotations(records):
+    load_snapshots(db.session, records)
+    return [_serialize_annotation(record) for record in records]
+
+
 def _serialize_meta_analysis_result_summary(record):
     return getattr(record, "id", None)
 
@@ -1,5 +1,6 @@
 import json
 import logging
+import threading
 from datetime import datetime, timezone
 from typing import Optional
 
@@ -22,11 +23,18 @@ from neurosynth_compose.schemas import MetaAnalysisJobRequestSchema
 logger = logging.getLogger(__name__)
 
 JOB_CACHE_PREFIX = "compose:jobs"
-USER_JOB_INDEX_PREFIX = "compose:user-jobs"
-META_ANALYSIS_JOB_INDEX_PREFIX = "compose:meta-analysis-jobs"
+# Sorted sets scored by submission time (epoch milliseconds).
+USER_JOB_INDEX_PREFIX = "compose:user-job-index"
+META_ANALYSIS_JOB_INDEX_PREFIX = "compose:meta-analysis-job-index"
+# Plain sets written before the sorted-set indexes; read until they expire.
+LEGACY_USER_JOB_INDEX_PREFIX = "compose:user-jobs"
 JOB_CACHE_TTL_SECONDS = 60 * 60 * 24 * 3  # 3 days
+JOB_STORE_HEALTH_CHECK_SECONDS = 30
 LOG_TIME_PADDING_MS = 5 * 60 * 1000  # pad log queries by 5 minutes on each side
 
+_job_stores: dict[str, Redis] = {}
+_job_stores_lock = threading.Lock()
+
 
 class JobStoreError(RuntimeError):
     """Raised when the job cache cannot be accessed."""
@@ -37,20 +45,43 @@ class ComposeRunnerError(RuntimeError):
 
 
 def get_job_store() -> Redis:
-    """Return a Redis client configured from the Celery result backend."""
+    """Return the process-wide Redis client for the Celery result backend.
+
+    The client and its connection pool are shared by every request; idle
+    connections are health-checked by redis-py rather than with a ``PING``
+    per call.
+    """
     redis_url = request.state.settings.get("CELERY_RESULT_BACKEND")
     if not redis_url:
         raise JobStoreError("CELERY_RESULT_BACKEND is not configured.")
 
-    try:
-        client = Redis.from_url(redis_url)
-        client.ping()
-    except Exception as exc:  # noqa: BLE001
-        raise JobStoreError("unable to reach redis job store") from exc
+    client = _job_stores.get(redis_url)
+    if client is not None:
+        return client
 
+    with _job_stores_lock:
+        client = _job_stores.get(redis_url)
+        if client is None:
+            try:
+                client = Redis.from_url(
+                    redis_url, health_check_interval=JOB_STORE_HEALTH_CHECK_SECONDS
+                )
+            except Exception as exc:  # noqa: BLE001
+                raise JobStoreError("unable to reach redis job store") from exc
+            _job_stores[redis_url] = client
     return client
 
 
+def close_job_stores() -> None:
+    """Disconnect and forget the process-wide job store clients."""
+    with _job_stores_lock:
+        clients = list(_job_stores.values())
+        _job_stores.clear()
+    for client in clients:
+        client.close()
+        client.connection_pool.disconnect()
+
+
 def _job_cache_key(job_id: str) -> str:
     return f"{JOB_CACHE_PREFIX}:{job_id}"
 
@@ -59,10 +90,18 @@ def _user_job_index_key(user_id: str) -> str:
     return f"{USER_JOB_INDEX_PREFIX}:{user_id}"
 
 
+def _legacy_user_job_index_key(user_id: str) -> str:
+    return f"{LEGACY_USER_JOB_INDEX_PREFIX}:{user_id}"
+
+
 def _meta_analysis_job_index_key(meta_analysis_id: str) -> str:
     return f"{META_ANALYSIS_JOB_INDEX_PREFIX}:{meta_analysis_id}"
 
 
+def _decode(value):
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
 def _iso_to_epoch_millis(value: Optional[str]) -> Optional[int]:
     """Convert an ISO 8601 timestamp to epoch milliseconds."""
     if not value:
@@ -77,20 +116,33 @@ def _iso_to_epoch_millis(value: Optional[str]) -> Optional[int]:
         return None
 
 
+def _now_millis() -> int:
+    return int(datetime.now(timezone.utc).timestamp() * 1000)
+
+
+def _submitted_at_millis(payload: dict) -> int:
+    submitted = _iso_to_epoch_millis(payload.get("created_at"))
+    return _now_millis() if submitted is None else submitted
+
+
 def _store_job(job_id: str, payload: dict) -> None:
+    """Cache ``payload`` and index it, in a single round trip."""
+    submitted = _submitted_at_millis(payload)
+    expired_before = _now_millis() - JOB_CACHE_TTL_SECONDS * 1000
     try:
-        client = get_job_store()
-        client.setex(_job_cache_key(job_id), JOB_CACHE_TTL_SECONDS, json.dumps(payload))
-        user_id = payload.get("user_id")
-        if user_id:
-            client.sadd(_user_job_index_key(user_id), job_id)
-            client.expire(_user_job_index_key(user_id), JOB_CACHE_TTL_SECONDS)
-        meta_analysis_id = payload.get("meta_analysis_id")
-        if meta_analysis_id:
-            client.sadd(_meta_analysis_job_index_key(meta_analysis_id), job_id)
-            client.expire(
-                _meta_analysis_job_index_key(meta_analysis_id), JOB_CACHE_TTL_SECONDS
-            )
+        pipe = get_job_store().pipeline(transaction=False)
+        pipe.setex(_job_cache_key(job_id), JOB_CACHE_TTL_SECONDS, json.dumps(payload))
+        for index_key in (
+            payload.get("user_id") and _user_job_index_key(payload["user_id"]),
+            payload.get("meta_analysis_id")
+            and _meta_analysis_job_index_key(payload["meta_analysis_id"]),
+        ):
+            if not index_key:
+                continue
+            pipe.zadd(index_key, {job_id: submitted})
+            pipe.zremrangebyscore(index_key, "-inf", expired_before)
+            pipe.expire(index_key, JOB_CACHE_TTL_SECONDS)
+        pipe.execute()
     except JobStoreError:
         raise
     except Exception as exc:  # noqa: BLE001
@@ -108,9 +160,60 @@ def _load_job(job_id: str) -> Optional[dict]:
 
     if not cached:
         return None
-    if isinstance(cached, bytes):
-        cached = cached.decode("utf-8")
-    return json.loads(cached)
+    return json.loads(_decode(cached))
+
+
+def _load_user_jobs(user_id: str) -> list[dict]:
+    """Return the cached jobs of ``user_id``, newest submission first.
+
+    The index and the jobs are read with a constant number of round trips
+    however many jobs the user has; ids whose job expired are dropped from
+    the index.
+    """
+    index_key = _user_job_index_key(user_id)
+    legacy_key = _legacy_user_job_index_key(user_id)
+    try:
+        client = get_job_store()
+        pipe = client.pipeline(transaction=False)
+        pipe.zrevrange(index_key, 0, -1)
+        pipe.smembers(legacy_key)
+        indexed, legacy = pipe.execute()
+        job_ids = [_decode(job_id) for job_id in indexed]
+        legacy_ids = {_decode(job_id) for job_id in legacy} - set(job_ids)
+        job_ids.extend(sorted(legacy_ids))
+        if not job_ids:
+            return []
+
+        cached = client.mget([_job_cache_key(job_id) for job_id in job_ids])
+    except JobStoreError:
+        raise
+    except Exception as exc:  # noqa: BLE001
+        raise JobStoreError("failed to list indexed jobs") from exc
+
+    jobs = []
+    expired = []
+    for job_id, value in zip(job_ids, cached):
+        if value:
+            jobs.append(json.loads(_decode(value)))
+        else:
+            expired.append(job_id)
+
+    if legacy_ids:
+        jobs.sort(key=_submitted_at_millis, reverse=True)
+    if expired or legacy_ids:
+        try:
+            pipe = client.pipeline(transaction=False)
+            if expired:
+                pipe.zrem(index_key, *expired)
+            for job in jobs:
+                if job.get("job_id") in legacy_ids:
+                    pipe.zadd(index_key, {job["job_id"]: _submitted_at_millis(job)})
+            if legacy_ids:
+                pipe.delete(legacy_key)
+            pipe.execute()
+        except Exception:  # noqa: BLE001
+            logger.warning("Failed to prune the job index of %s", user_id)
+    return jobs
 
 
 def call_lambda(url: Optional[str], payload: dict) -> dict:
@@ -299,35 +402,10 @@ def get_job_status(job_id: str):
 def list_jobs():
     current_user = _ensure_authenticated_user()
     try:
-        client = get_job_store()
-        job_ids = client.smembers(_user_job_index_key(current_user.external_id))
+        jobs = _load_user_jobs(current_user.external_id)
     except JobStoreError as exc:
         _abort_with_job_store_error(exc)
-    except Exception as exc:  # noqa: BLE001
-        error = JobStoreError("failed to list indexed jobs")
-        error.__cause__ = exc
-        _abort_with_job_store_error(error)
 
-    jobs = []
-    for job_id in job_ids:
-        if isinstance(job_id, bytes):
-            job_id = job_id.decode("utf-8")
-        try:
-            job = _load_job(job_id)
-        except JobStoreError as exc:
-            _abort_with_job_store_error(exc)
-        if not job:
-            try:
-                client.srem(_user_job_index_key(current_user.external_id), job_id)
-            except Exception:
-                pass
-            continue
-        jobs.append(job)
-
-    jobs.sort(
-        key=lambda job: job.get("updated_at") or job.get("created_at") or "",
-        reverse=True,
-    )
     payload = {"results": jobs, "metadata": {"count": len(jobs)}}
     return make_json_response(payload)
 
@@ -49,10 +49,10 @@ class SnapshotAnnotationsView(ObjectView, ListView):
 
     def serialize_records(self, records, args):
         from neurosynth_compose.resources.data_views.meta_analyses_view import (
-            _serialize_annotation,
+            _serialize_annotations,
         )
 
-        return [_serialize_annotation(record) for record in records]
+        return _serialize_annotations(records)
 
     @classmethod
     def update_or_create(
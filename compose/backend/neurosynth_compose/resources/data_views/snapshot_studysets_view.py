@@ -45,10 +45,10 @@ class SnapshotStudysetsView(ObjectView, ListView):
 
     def serialize_records(self, records, args):
         from neurosynth_compose.resources.data_views.meta_analyses_view import (
-            _serialize_studyset,
+            _serialize_studysets,
         )
 
-        return [_serialize_studyset(record) for record in records]
+        return _serialize_studysets(records)
 
     @classmethod
     def update_or_create(
@@ -17,6 +17,8 @@ from neurosynth_compose.models.analysis import (
     SnapshotAnnotation,
     SnapshotStudyset,
     generate_id,
+    snapshot_digests,
+    store_snapshot_blocks,
 )
 from neurosynth_compose.utils.snapshots import md5_of_snapshot
 
@@ -384,6 +386,14 @@ def parse_upload_files(
     return records, stat_map_fnames, cluster_table_fnames, diagnostic_table_fnames
 
 
+def _snapshot_columns(session, model, snapshot):
+    # Inserts below bypass the ORM listener that writes snapshot blocks.
+    manifest = store_snapshot_blocks(session.connection(), model, snapshot)
+    if manifest is None:
+        return {"snapshot": snapshot, "manifest": None}
+    return {"snapshot": None, "manifest": manifest}
+
+
 def ensure_canonical_studyset(
     session, snapshot, user_id=None, neurostore_id=None, version=None
 ):
@@ -395,7 +405,7 @@ def ensure_canonical_studyset(
     if not snapshot:
         return None
 
-    ss_md5 = md5_of_snapshot(snapshot)
+    ss_md5 = md5_of_snapshot(snapshot, snapshot_digests(session))
 
     canonical = session.execute(
         select(SnapshotStudyset).where(SnapshotStudyset.md5 == ss_md5)
@@ -410,7 +420,7 @@ def ensure_canonical_studyset(
             pg_insert(SnapshotStudyset.__table__)
             .values(
                 id=generate_id(),
-                snapshot=snapshot,
+                **_snapshot_columns(session, SnapshotStudyset, snapshot),
                 md5=ss_md5,
                 user_id=user_id,
                 neurostore_id=neurostore_id,
@@ -451,7 +461,7 @@ def ensure_canonical_annotation(
     if not snapshot:
         return None
 
-    ann_md5 = md5_of_snapshot(snapshot)
+    ann_md5 = md5_of_snapshot(snapshot, snapshot_digests(session))
 
     canonical = session.execute(
         select(SnapshotAnnotation).where(SnapshotAnnotation.md5 == ann_md5)
@@ -466,7 +476,7 @@ def ensure_canonical_annotation(
             pg_insert(SnapshotAnnotation.__table__)
             .values(
                 id=generate_id(),
-                snapshot=snapshot,
+                **_snapshot_columns(session, SnapshotAnnotation, snapshot),
                 md5=ann_md5,
                 user_id=user_id,
                 neurostore_id=neurostore_id,
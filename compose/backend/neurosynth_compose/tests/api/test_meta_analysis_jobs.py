@@ -1,6 +1,6 @@
 import json
 from copy import deepcopy
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 import pytest
 from sqlalchemy import select
@@ -11,6 +11,26 @@ from neurosynth_compose.resources.data_views import (
 )
 
 
+class FakePipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self):
+        self._redis.round_trips += 1
+        return [
+            getattr(self._redis, name)(*args, **kwargs)
+            for name, args, kwargs in self._commands
+        ]
+
+
 class FakeRedis:
     """Minimal Redis-like store for testing."""
 
@@ -18,6 +38,11 @@ class FakeRedis:
         self._store = {}
         self._ttl = {}
         self._sets = {}
+        self._zsets = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
 
     def setex(self, key, ttl, value):
         if isinstance(value, str):
@@ -31,11 +56,14 @@ class FakeRedis:
     def delete(self, key):
         self._store.pop(key, None)
         self._ttl.pop(key, None)
+        self._sets.pop(key, None)
+        self._zsets.pop(key, None)
 
     def flushall(self):
         self._store.clear()
         self._ttl.clear()
         self._sets.clear()
+        self._zsets.clear()
 
     def sadd(self, key, *values):
         bucket = self._sets.setdefault(key, set())
@@ -54,6 +82,28 @@ class FakeRedis:
     def expire(self, key, ttl):
         self._ttl[key] = ttl
 
+    def mget(self, keys):
+        self.round_trips += 1
+        return [self._store.get(key) for key in keys]
+
+    def zadd(self, key, mapping):
+        self._zsets.setdefault(key, {}).update(mapping)
+
+    def zrem(self, key, *values):
+        for value in values:
+            self._zsets.get(key, {}).pop(value, None)
+
+    def zremrangebyscore(self, key, minimum, maximum):
+        bucket = self._zsets.get(key, {})
+        for value, score in list(bucket.items()):
+            if score <= maximum:
+                del bucket[value]
+
+    def zrevrange(self, key, start, end):
+        bucket = self._zsets.get(key, {})
+        ordered = sorted(bucket, key=lambda value: (bucket[value], value), reverse=True)
+        return [value.encode("utf-8") for value in ordered]
+
     def scan_iter(self, match=None):
         match = match or "*"
         if match.endswith("*"):
@@ -371,3 +421,34 @@ def test_list_jobs_returns_only_current_user_jobs(
         "arn:aws:states:us-east-1:execution:job2",
     }
     assert meta_ids == {"meta1", "meta2"}
+
+
+def test_list_jobs_reads_index_and_jobs_in_constant_round_trips(
+    app, auth_client, fake_job_store, user_data
+):
+    started = datetime.now(timezone.utc) - timedelta(hours=1)
+    for index in range(50):
+        _store_job(
+            {
+                "job_id": f"arn:aws:states:us-east-1:execution:bulk{index}",
+                "meta_analysis_id": "meta-bulk",
+                "user_id": auth_client.username,
+                "status": "SUBMITTED",
+                "created_at": (started + timedelta(minutes=index)).isoformat(),
+            }
+        )
+    fake_job_store.delete("compose:jobs:arn:aws:states:us-east-1:execution:bulk0")
+    fake_job_store.round_trips = 0
+
+    response = auth_client.get("/api/meta-analysis-jobs")
+
+    assert response.status_code == 200
+    job_ids = [job["job_id"] for job in response.json["results"]]
+    assert job_ids == [
+        f"arn:aws:states:us-east-1:execution:bulk{index}" for index in range(49, 0, -1)
+    ]
+    # Index and jobs, then pruning the expired job from the index.
+    assert fake_job_store.round_trips == 3
+    assert fake_job_store.zrevrange(
+        f"compose:user-job-index:{auth_client.username}", 0, -1
+    )[-1].endswith(b"bulk1")
@@ -127,3 +127,47 @@ def test_duplicate_studyset_reused_via_api(session, db, auth_client):
     assert (
         len(rows) == 1
     ), f"Expected one canonical Studyset row for md5, found {len(rows)}"
+
+
+def test_studyset_snapshots_share_study_blocks(session):
+    from neurosynth_compose.models import SnapshotBlock
+
+    studies = [{"id": f"study-{i}", "name": f"Study {i}"} for i in range(3)]
+    first = {"id": "shared-blocks", "studies": studies}
+    second = {"id": "shared-blocks", "studies": studies[:2] + [{"id": "study-x"}]}
+
+    session.add(SnapshotStudyset(snapshot=first))
+    session.flush()
+    block_count = session.query(SnapshotBlock).count()
+
+    ss = SnapshotStudyset(snapshot=second)
+    session.add(ss)
+    session.flush()
+
+    assert session.query(SnapshotBlock).count() == block_count + 1
+    assert ss.manifest is not None
+    assert ss.md5 == md5_of_snapshot(second)
+
+    session.expire_all()
+    loaded = session.get(SnapshotStudyset, ss.id)
+    assert loaded.snapshot == second
+
+
+def test_prune_snapshot_blocks_keeps_referenced_blocks(session):
+    from neurosynth_compose.models import SnapshotBlock
+    from neurosynth_compose.models.analysis import prune_snapshot_blocks
+
+    studies = [{"id": f"prune-{i}", "name": f"Study {i}"} for i in range(3)]
+    kept = SnapshotStudyset(snapshot={"id": "kept", "studies": studies[:2]})
+    replaced = SnapshotStudyset(snapshot={"id": "replaced", "studies": studies})
+    session.add_all([kept, replaced])
+    session.flush()
+    assert session.query(SnapshotBlock).count() == 3
+
+    replaced.snapshot = {"id": "replaced", "studies": []}
+    session.flush()
+
+    assert prune_snapshot_blocks(session.connection()) == 1
+    assert session.query(SnapshotBlock).count() == 2
+    session.expire_all()
+    assert session.get(SnapshotStudyset, kept.id).snapshot["studies"] == studies[:2]
@@ -1,5 +1,8 @@
 import hashlib
 import json
+import math
+import random
+import struct
 
 from neurosynth_compose.utils.snapshots import canonicalize_json, md5_of_snapshot
 
@@ -25,3 +28,77 @@ def test_md5_matches_canonical_serialization():
     got = md5_of_snapshot(obj)
     assert isinstance(got, str)
     assert got == expected
+
+
+def test_split_snapshot_round_trips():
+    from neurosynth_compose.utils.snapshots import (
+        assemble_snapshot,
+        block_hash,
+        split_snapshot,
+    )
+
+    payload = {"id": "ann", "notes": [{"study": str(i)} for i in range(5)]}
+    manifest, blocks = split_snapshot(payload, "notes", batch_size=2)
+
+    assert len(manifest["blocks"]) == 3
+    assert all(block_hash(items) == key for key, items in blocks.items())
+    assert assemble_snapshot(manifest, blocks) == payload
+    assert split_snapshot({"notes": []}, "notes") is None
+
+
+def _random_float(rng):
+    if rng.random() < 0.5:
+        return rng.uniform(-1, 1) * 10 ** rng.randint(-30, 30)
+    while True:
+        bits = rng.getrandbits(64).to_bytes(8, "little")
+        value = struct.unpack("<d", bits)[0]
+        if math.isfinite(value):
+            return value
+
+
+def _random_text(rng):
+    alphabet = '"\\e.-0123456789 \x00\x1f\x7fé\u2028😀'
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 8)))
+
+
+def _random_json(rng, depth=0):
+    kinds = 7 if depth < 4 else 5
+    kind = rng.randrange(kinds)
+    if kind == 0:
+        return rng.choice([None, True, False])
+    if kind == 1:
+        return rng.randint(-(2**70), 2**70)
+    if kind == 2:
+        return _random_float(rng)
+    if kind == 3:
+        return _random_text(rng)
+    if kind == 4:
+        return rng.randint(-10, 10)
+    if kind == 5:
+        return [_random_json(rng, depth + 1) for _ in range(rng.randint(0, 5))]
+    return {
+        _random_text(rng): _random_json(rng, depth + 1)
+        for _ in range(rng.randint(0, 5))
+    }
+
+
+def test_canonicalize_matches_stdlib_for_random_documents():
+    rng = random.Random(20260718)
+    for _ in range(5000):
+        obj = _random_json(rng)
+        expected = json.dumps(
+            obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        )
+        assert canonicalize_json(obj) == expected
+        assert md5_of_snapshot(obj) == hashlib.md5(expected.encode()).hexdigest()
+
+
+def test_md5_of_snapshot_memoizes_by_identity():
+    memo = {}
+    payload = {"studies": [{"id": "a"}]}
+    digest = md5_of_snapshot(payload, memo)
+
+    assert memo[id(payload)] == (payload, digest)
+    assert md5_of_snapshot(payload, memo) == digest
+    assert md5_of_snapshot(dict(payload), memo) == digest
+    assert len(memo) == 2
@@ -2,11 +2,97 @@
 
 These helpers are created as stubs for TDD-first development. Implementations
 should canonicalize JSON for stable MD5 calculation.
+
+The canonical form is the output of ``json.dumps`` with sorted keys, compact
+separators and ``ensure_ascii=False``. It is produced with orjson, whose output
+only differs in how floats are written; those are rewritten with ``repr`` to
+match. Values orjson refuses (integers beyond 64 bits, non-string keys) fall
+back to ``json.dumps``. Non-finite floats, which ``jsonb`` cannot store, are
+written as ``null`` rather than ``NaN``/``Infinity``.
+
+Large snapshots are also split into content-addressed blocks: the items of one
+list field (a studyset's studies, an annotation's notes) are grouped into
+batches keyed by the SHA-256 of their canonical JSON, and a manifest records
+the rest of the snapshot along with the ordered block keys.
 """
 
 import hashlib
 import json
-from typing import Any
+import re
+from typing import Any, Optional
+
+import orjson
+
+_ORJSON_OPTIONS = (
+    orjson.OPT_SORT_KEYS
+    | orjson.OPT_PASSTHROUGH_DATACLASS
+    | orjson.OPT_PASSTHROUGH_DATETIME
+)
+
+# orjson writes 1e16 and 0.00001 where repr writes 1e+16 and 1e-05.
+_ORJSON_FLOAT = re.compile(
+    rb"(?<![0-9.])-?(?:[0-9]+(?:\.[0-9]+)?e-?[0-9]+|0\.0000[0-9]+)"
+)
+# Literal prefixes keep the scan for candidates fast on large snapshots.
+_ORJSON_FLOAT_ANCHORS = (re.compile(rb"e-?[0-9]"), re.compile(rb"0\.0000[0-9]"))
+_NUMBER_BYTES = frozenset(b"-.0123456789")
+_QUOTE = re.compile(rb'\\.|(")')
+
+
+def _orjson_floats(data: bytes):
+    anchors = sorted(
+        match.start()
+        for pattern in _ORJSON_FLOAT_ANCHORS
+        for match in pattern.finditer(data)
+    )
+    resume = 0
+    for anchor in anchors:
+        if anchor < resume:
+            continue
+        begin = anchor
+        while begin > resume and data[begin - 1] in _NUMBER_BYTES:
+            begin -= 1
+        match = _ORJSON_FLOAT.match(data, begin)
+        if match is not None and match.end() > anchor:
+            resume = match.end()
+            yield match
+
+
+def _rewrite_floats(data: bytes) -> bytes:
+    # Matches inside strings sit after an odd number of unescaped quotes.
+    escaped_backslashes = b"\\\\" in data
+    pieces = []
+    copied = scanned = quotes = 0
+    for match in _orjson_floats(data):
+        begin, end = match.span()
+        if escaped_backslashes:
+            # A backslash escaping a backslash does not escape the next quote.
+            quotes += _QUOTE.findall(data, scanned, begin).count(b'"')
+        else:
+            quotes += data.count(b'"', scanned, begin)
+            quotes -= data.count(b'\\"', scanned, begin)
+        scanned = begin
+        if quotes % 2 == 0:
+            pieces.append(data[copied:begin])
+            pieces.append(repr(float(match.group())).encode("ascii"))
+            copied = end
+    if not pieces:
+        return data
+    pieces.append(data[copied:])
+    return b"".join(pieces)
+
+
+def _stdlib_canonical(obj: Any) -> str:
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def canonical_bytes(obj: Any) -> bytes:
+    """Return the UTF-8 bytes of ``canonicalize_json(obj)``."""
+    try:
+        data = orjson.dumps(obj, option=_ORJSON_OPTIONS)
+    except orjson.JSONEncodeError:
+        return _stdlib_canonical(obj).encode("utf-8")
+    return _rewrite_floats(data)
 
 
 def canonicalize_json(obj: Any) -> str:
@@ -15,14 +101,62 @@ def canonicalize_json(obj: Any) -> str:
     Uses deterministic key ordering and compact separators. This should be
     stable across runs for JSON-serializable Python objects.
     """
-    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    try:
+        return canonical_bytes(obj).decode("utf-8")
+    except UnicodeEncodeError:
+        # Lone surrogates survive json.dumps but have no UTF-8 encoding.
+        return _stdlib_canonical(obj)
 
 
-def md5_of_snapshot(obj: Any) -> str:
+def md5_of_snapshot(obj: Any, memo: Optional[dict] = None) -> str:
     """Return hex MD5 fingerprint for the given JSON-serializable object.
 
     The digest is computed over the UTF-8 bytes of the canonical JSON
-    representation.
+    representation. Digests are remembered in ``memo`` by object identity, so
+    the object must not be mutated while ``memo`` is in use.
+    """
+    if memo is not None:
+        entry = memo.get(id(obj))
+        if entry is not None and entry[0] is obj:
+            return entry[1]
+    digest = hashlib.md5(canonical_bytes(obj)).hexdigest()
+    if memo is not None:
+        # Holding the object keeps its id from being reused by another one.
+        memo[id(obj)] = (obj, digest)
+    return digest
+
+
+def block_hash(items: Any) -> str:
+    """Return the content address of a snapshot block."""
+    return hashlib.sha256(canonical_bytes(items)).hexdigest()
+
+
+def split_snapshot(obj: Any, field: str, batch_size: int = 1):
+    """Split ``obj[field]`` into blocks of ``batch_size`` items.
+
+    Returns ``(manifest, blocks)`` with ``blocks`` mapping each block hash to
+    its list of items, or ``None`` when ``obj`` has no non-empty list there.
     """
-    s = canonicalize_json(obj)
-    return hashlib.md5(s.encode("utf-8")).hexdigest()
+    items = obj.get(field) if isinstance(obj, dict) else None
+    if not isinstance(items, list) or not items:
+        return None
+
+    blocks = {}
+    hashes = []
+    for start in range(0, len(items), batch_size):
+        end = start + batch_size
+        batch = items[start:end]
+        key = block_hash(batch)
+        blocks.setdefault(key, batch)
+        hashes.append(key)
+
+    manifest = {"field": field, "blocks": hashes, "skeleton": {**obj, field: []}}
+    return manifest, blocks
+
+
+def assemble_snapshot(manifest: dict, blocks: dict) -> dict:
+    """Rebuild the snapshot described by ``manifest`` from its blocks."""
+    items = []
+    for key in manifest["blocks"]:
+        items.extend(blocks[key])
+    return {**manifest["skeleton"], manifest["field"]: items}
@@ -1,5 +1,9 @@
 #!/usr/bin/env python3
-"""Compare benchmark timings and fail only on material slowdowns."""
+"""Compare benchmark timings and fail only on material slowdowns.
+
+Load results (``production_benchmark --concurrency``) compare the same way on
+``throughput_rps``, where a drop is the regression, or on ``error_rate``.
+"""
 
 from __future__ import annotations
 
@@ -9,6 +13,9 @@ import re
 from collections import Counter, defaultdict
 from pathlib import Path
 
+# Metrics where a lower candidate value is the regression.
+HIGHER_IS_BETTER = {"throughput_rps"}
+
 
 def load_results(path: Path) -> dict:
     with path.open() as handle:
@@ -63,9 +70,10 @@ def _percentile(values: list[float], percentile: float) -> float:
     lower_index = int(rank)
     upper_index = min(lower_index + 1, len(sorted_values) - 1)
     fraction = rank - lower_index
-    return sorted_values[lower_index] + (
-        sorted_values[upper_index] - sorted_values[lower_index]
-    ) * fraction
+    return (
+        sorted_values[lower_index]
+        + (sorted_values[upper_index] - sorted_values[lower_index]) * fraction
+    )
 
 
 def _with_iteration_metrics(case: dict, *, drop_first_iteration: bool) -> dict:
@@ -87,11 +95,10 @@ def _with_iteration_metrics(case: dict, *, drop_first_iteration: bool) -> dict:
 def extract_cases(results: dict, *, drop_first_iteration: bool = False) -> list[dict]:
     cases = results.get("cases") or []
     if cases:
+        drop_first = drop_first_iteration
         return _deduplicate_case_names(
             [
-                _with_iteration_metrics(
-                    case, drop_first_iteration=drop_first_iteration
-                )
+                _with_iteration_metrics(case, drop_first_iteration=drop_first)
                 for case in cases
             ]
         )
@@ -117,6 +124,14 @@ def format_seconds(value: float) -> str:
     return f"{value:.4f}s"
 
 
+def format_value(value: float, metric: str) -> str:
+    if metric == "throughput_rps":
+        return f"{value:.2f} req/s"
+    if metric == "error_rate":
+        return format_pct(value)
+    return format_seconds(value)
+
+
 def case_metric(case: dict, metric: str) -> float:
     if metric in case and case[metric] is not None:
         return float(case[metric])
@@ -149,6 +164,8 @@ def build_rows(
         cand_value = case_metric(candidate, metric)
         delta = cand_value - base_value
         ratio = 0.0 if base_value == 0 else delta / base_value
+        regression = -delta if metric in HIGHER_IS_BETTER else delta
+        regression_ratio = 0.0 if base_value == 0 else regression / base_value
         row = {
             "name": name,
             "baseline": base_value,
@@ -157,7 +174,7 @@ def build_rows(
             "ratio": ratio,
             "status": "ok",
         }
-        if ratio > threshold and delta > min_delta_seconds:
+        if regression_ratio > threshold and regression > min_delta_seconds:
             row["status"] = "slow"
             slowdowns.append(row)
         rows.append(row)
@@ -185,27 +202,27 @@ def render_report(
     metric: str = "p95_seconds",
     min_delta_seconds: float = 0.0,
 ) -> str:
+    direction = "lower" if metric in HIGHER_IS_BETTER else "slower"
     lines = [
         f"**Service:** `{service}`",
         f"**Metric:** `{metric}`",
-        f"**Threshold:** `{format_pct(threshold)} slower`",
-        f"**Minimum absolute slowdown:** `{format_seconds(min_delta_seconds)}`",
+        f"**Threshold:** `{format_pct(threshold)} {direction}`",
+        "**Minimum absolute slowdown:** "
+        f"`{format_value(min_delta_seconds, metric)}`",
         "",
         "| Case | Baseline | Candidate | Delta | Status |",
         "| --- | ---: | ---: | ---: | --- |",
     ]
 
     for row in rows:
-        delta_label = (
-            f"{format_seconds(row['delta'])} ({format_pct(row['ratio'])})"
-            if row["baseline"] != 0
-            else format_seconds(row["delta"])
-        )
+        delta_label = format_value(row["delta"], metric)
+        if row["baseline"] != 0:
+            delta_label = f"{delta_label} ({format_pct(row['ratio'])})"
         lines.append(
             "| {name} | {baseline} | {candidate} | {delta} | {status} |".format(
                 name=row["name"],
-                baseline=format_seconds(row["baseline"]),
-                candidate=format_seconds(row["candidate"]),
+                baseline=format_value(row["baseline"], metric),
+                candidate=format_value(row["candidate"], metric),
                 delta=delta_label,
                 status=row["status"],
             )
@@ -221,8 +238,8 @@ def render_report(
                 "- {name}: candidate {metric} {candidate} vs baseline {baseline} ({ratio})".format(
                     name=slowdown["name"],
                     metric=metric,
-                    candidate=format_seconds(slowdown["candidate"]),
-                    baseline=format_seconds(slowdown["baseline"]),
+                    candidate=format_value(slowdown["candidate"], metric),
+                    baseline=format_value(slowdown["baseline"], metric),
                     ratio=format_pct(slowdown["ratio"]),
                 )
             )
@@ -258,7 +275,8 @@ def main() -> int:
         default=0.0,
         help=(
             "Only fail a slowdown when the relative threshold is exceeded and "
-            "the absolute delta is larger than this many seconds."
+            "the absolute delta is larger than this, in the metric's unit "
+            "(seconds, or requests per second for throughput_rps)."
         ),
     )
     parser.add_argument("--summary-file")
@@ -5,7 +5,10 @@ FAILED_COMMAND=""
 
 usage() {
   cat <<'EOF'
-Usage: run_service_suite.sh --service <store|compose> --label <name> [--dump-path <path>] [--iterations <n>] [--project-name <name>] [--target-repo-root <path>] [--skip-build] [--keep-running] [--fresh-db] [--drop-db] [--scales <csv>]
+Usage: run_service_suite.sh --service <store|compose> --label <name> [--dump-path <path>] [--iterations <n>] [--project-name <name>] [--target-repo-root <path>] [--skip-build] [--keep-running] [--fresh-db] [--drop-db] [--scales <csv>] [--synthetic-scale <n>]
+
+--synthetic-scale loads `neurostore generate-synthetic-corpus --scale <n>` into a
+recreated database instead of restoring a backup (store only).
 EOF
 }
 
@@ -21,6 +24,7 @@ KEEP_RUNNING="${PRODUCTION_BENCHMARK_KEEP_RUNNING:-0}"
 FRESH_DB="${PRODUCTION_BENCHMARK_FRESH_DB:-0}"
 PERSIST_DB_VOLUME="${PRODUCTION_BENCHMARK_PERSIST_DB_VOLUME:-1}"
 SCALES="${PRODUCTION_BENCHMARK_SCALES:-10,50,100,200}"
+SYNTHETIC_SCALE="${PRODUCTION_BENCHMARK_SYNTHETIC_SCALE:-}"
 REDIS_SERVICE=""
 BENCHMARK_COMPOSE_OVERRIDE=""
 
@@ -70,6 +74,10 @@ while [ "$#" -gt 0 ]; do
       SCALES="$2"
       shift 2
       ;;
+    --synthetic-scale)
+      SYNTHETIC_SCALE="$2"
+      shift 2
+      ;;
     *)
       usage
       exit 1
@@ -132,6 +140,11 @@ case "$SERVICE" in
     ;;
 esac
 
+if [ -n "${SYNTHETIC_SCALE}" ] && [ "${SERVICE}" != "store" ]; then
+  echo "--synthetic-scale is only supported for --service store" >&2
+  exit 1
+fi
+
 if [ -z "$PROJECT_NAME" ]; then
   PROJECT_NAME="production-benchmark-${SERVICE}-${LABEL}"
 fi
@@ -243,6 +256,17 @@ benchmark_db_is_populated() {
     2>/dev/null | tr -d '[:space:]' | grep -q '^1$'
 }
 
+recreate_benchmark_database() {
+  local sql=""
+  for sql in \
+    "DROP DATABASE IF EXISTS ${TEST_DATABASE} WITH (FORCE);" \
+    "CREATE DATABASE ${TEST_DATABASE};"; do
+    docker compose exec -T "${DB_CONTAINER}" psql -U postgres -d postgres -c "${sql}"
+  done
+  docker compose exec -T "${DB_CONTAINER}" \
+    psql -U postgres -d "${TEST_DATABASE}" -c "CREATE EXTENSION IF NOT EXISTS vector;"
+}
+
 wait_for_services() {
   local deadline=$((SECONDS + 180))
   local service=""
@@ -307,7 +331,16 @@ fi
 
 RESTORE_CMD+=("${RESTORE_EXTRA_ARGS[@]}")
 
-if [ "${FRESH_DB}" = "1" ]; then
+GENERATE_SYNTHETIC_CORPUS="0"
+if [ -n "${SYNTHETIC_SCALE}" ]; then
+  if [ "${FRESH_DB}" = "1" ] || ! benchmark_db_is_populated; then
+    run_step "Recreate benchmark database" recreate_benchmark_database
+    GENERATE_SYNTHETIC_CORPUS="1"
+  else
+    echo "==> Reuse existing benchmark database"
+    echo "Found populated ${TEST_DATABASE} in project ${COMPOSE_PROJECT_NAME}; skipping synthetic corpus generation."
+  fi
+elif [ "${FRESH_DB}" = "1" ]; then
   run_step "Restore latest backup" "${RESTORE_CMD[@]}"
 elif benchmark_db_is_populated; then
   echo "==> Reuse existing benchmark database"
@@ -322,6 +355,14 @@ run_step "Apply database migrations" \
   "${BENCH_SERVICE}" \
   bash -lc "${SERVICE_CLI} db upgrade --revision heads"
 
+if [ "${GENERATE_SYNTHETIC_CORPUS}" = "1" ]; then
+  run_step "Generate synthetic corpus" \
+    docker compose run --rm -T \
+    "${RUN_ENV_ARGS[@]}" \
+    "${BENCH_SERVICE}" \
+    bash -lc "${SERVICE_CLI} generate-synthetic-corpus --scale ${SYNTHETIC_SCALE}"
+fi
+
 run_step "Run benchmark module" \
   docker compose run --rm -T \
   "${RUN_ENV_ARGS[@]}" \
@@ -180,3 +180,29 @@ def test_render_report_labels_selected_metric_for_slowdowns():
     )
 
     assert "candidate p95_seconds 1.5000s vs baseline 1.0000s" in report
+
+
+def test_build_rows_treats_throughput_drops_as_slowdowns():
+    rows, slowdowns, mismatches = build_rows(
+        {
+            "load_concurrency_8": {"throughput_rps": 100.0},
+            "load_concurrency_32": {"throughput_rps": 150.0},
+        },
+        {
+            "load_concurrency_8": {"throughput_rps": 70.0},
+            "load_concurrency_32": {"throughput_rps": 200.0},
+        },
+        threshold=0.2,
+        metric="throughput_rps",
+    )
+
+    assert [row["status"] for row in rows] == ["ok", "slow"]
+    assert [row["name"] for row in slowdowns] == ["load_concurrency_8"]
+    assert mismatches == []
+
+    report = render_report(
+        "store", rows, slowdowns, mismatches, 0.2, metric="throughput_rps"
+    )
+    assert "**Threshold:** `20.0% lower`" in report
+    expected = "candidate throughput_rps 70.00 req/s vs baseline 100.00 req/s"
+    assert expected in report
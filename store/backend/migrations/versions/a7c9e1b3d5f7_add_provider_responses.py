@@ -0,0 +1,46 @@
+"""add provider response cache for base-study metadata enrichment
+
+Revision ID: a7c9e1b3d5f7
+Revises: e5f7a9b1c3d5
+Create Date: 2026-10-18 16:02:41.208516
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "a7c9e1b3d5f7"
+down_revision = "e5f7a9b1c3d5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "provider_responses",
+        sa.Column("provider", sa.Text(), nullable=False),
+        sa.Column("lookup_key", sa.Text(), nullable=False),
+        sa.Column("response", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column(
+            "fetched_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("provider", "lookup_key"),
+    )
+    op.create_index(
+        op.f("ix_provider_responses_expires_at"),
+        "provider_responses",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index(
+        op.f("ix_provider_responses_expires_at"), table_name="provider_responses"
+    )
+    op.drop_table("provider_responses")
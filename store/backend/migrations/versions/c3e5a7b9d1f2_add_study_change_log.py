@@ -0,0 +1,35 @@
+"""add study change log drained by the studyset release builder
+
+Revision ID: c3e5a7b9d1f2
+Revises: a7c9e1b3d5f7
+Create Date: 2026-10-18 19:37:12.604158
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "c3e5a7b9d1f2"
+down_revision = "a7c9e1b3d5f7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "study_change_log",
+        sa.Column("id", sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column("study_id", sa.Text(), nullable=True),
+        sa.Column("base_study_id", sa.Text(), nullable=True),
+        sa.Column(
+            "changed_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade():
+    op.drop_table("study_change_log")
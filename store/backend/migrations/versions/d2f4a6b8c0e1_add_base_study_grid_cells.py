@@ -0,0 +1,57 @@
+"""add base study grid cells for coordinate radius search
+
+Revision ID: d2f4a6b8c0e1
+Revises: c9e1a3f5b7d9
+Create Date: 2026-10-18 09:12:44.318205
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "d2f4a6b8c0e1"
+down_revision = "c9e1a3f5b7d9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "base_study_grid_cells",
+        sa.Column("cell_x", sa.Integer(), nullable=False),
+        sa.Column("cell_y", sa.Integer(), nullable=False),
+        sa.Column("cell_z", sa.Integer(), nullable=False),
+        sa.Column("base_study_id", sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint("cell_x", "cell_y", "cell_z", "base_study_id"),
+    )
+    op.create_index(
+        op.f("ix_base_study_grid_cells_base_study_id"),
+        "base_study_grid_cells",
+        ["base_study_id"],
+        unique=False,
+    )
+
+    # Backfill with 4mm cells (neurostore.models.spatial_index.CELL_SIZE).
+    op.execute("""
+        INSERT INTO base_study_grid_cells (cell_x, cell_y, cell_z, base_study_id)
+        SELECT DISTINCT
+            floor(p.x / 4.0)::integer,
+            floor(p.y / 4.0)::integer,
+            floor(p.z / 4.0)::integer,
+            s.base_study_id
+        FROM points AS p
+        JOIN analyses AS a ON a.id = p.analysis_id
+        JOIN studies AS s ON s.id = a.study_id
+        WHERE s.base_study_id IS NOT NULL
+          AND p.x IS NOT NULL
+          AND p.y IS NOT NULL
+          AND p.z IS NOT NULL
+        """)
+
+
+def downgrade():
+    op.drop_index(
+        op.f("ix_base_study_grid_cells_base_study_id"),
+        table_name="base_study_grid_cells",
+    )
+    op.drop_table("base_study_grid_cells")
@@ -0,0 +1,112 @@
+"""add pipeline latest results projection for feature filters
+
+Revision ID: e5f7a9b1c3d5
+Revises: d2f4a6b8c0e1
+Create Date: 2026-10-18 14:26:05.417392
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "e5f7a9b1c3d5"
+down_revision = "d2f4a6b8c0e1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "pipeline_latest_results",
+        sa.Column("result_id", sa.Text(), nullable=False),
+        sa.Column("base_study_id", sa.Text(), nullable=False),
+        sa.Column("pipeline_id", sa.Text(), nullable=False),
+        sa.Column("config_id", sa.Text(), nullable=False),
+        sa.Column("version", sa.String(), nullable=True),
+        sa.Column("date_executed", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "result_data", postgresql.JSONB(astext_type=sa.Text()), nullable=True
+        ),
+        sa.Column("is_latest", sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["result_id"], ["pipeline_study_results.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("result_id"),
+    )
+    op.create_index(
+        op.f("ix_pipeline_latest_results_base_study_id"),
+        "pipeline_latest_results",
+        ["base_study_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_pipeline_latest_results_pipeline_id_base_study_id",
+        "pipeline_latest_results",
+        ["pipeline_id", "base_study_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_pipeline_latest_results__result_data",
+        "pipeline_latest_results",
+        ["result_data"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"result_data": "jsonb_path_ops"},
+    )
+
+    # Backfill (neurostore.models.pipeline_latest_results.refresh_latest_results).
+    op.execute("""
+        INSERT INTO pipeline_latest_results (
+            result_id, base_study_id, pipeline_id, config_id, version,
+            date_executed, result_data, is_latest
+        )
+        SELECT
+            latest.id,
+            latest.base_study_id,
+            latest.pipeline_id,
+            latest.config_id,
+            latest.version,
+            latest.date_executed,
+            latest.result_data,
+            latest.date_executed = max(latest.date_executed) OVER (
+                PARTITION BY latest.base_study_id, latest.pipeline_id
+            )
+        FROM (
+            SELECT DISTINCT ON (r.base_study_id, c.pipeline_id, c.version)
+                r.id,
+                r.base_study_id,
+                c.pipeline_id,
+                r.config_id,
+                c.version,
+                r.date_executed,
+                r.result_data
+            FROM pipeline_study_results AS r
+            JOIN pipeline_configs AS c ON c.id = r.config_id
+            WHERE r.base_study_id IS NOT NULL
+              AND c.pipeline_id IS NOT NULL
+              AND r.date_executed IS NOT NULL
+            ORDER BY
+                r.base_study_id,
+                c.pipeline_id,
+                c.version,
+                r.date_executed DESC,
+                r.id DESC
+        ) AS latest
+        """)
+
+
+def downgrade():
+    op.drop_index(
+        "ix_pipeline_latest_results__result_data",
+        table_name="pipeline_latest_results",
+    )
+    op.drop_index(
+        "ix_pipeline_latest_results_pipeline_id_base_study_id",
+        table_name="pipeline_latest_results",
+    )
+    op.drop_index(
+        op.f("ix_pipeline_latest_results_base_study_id"),
+        table_name="pipeline_latest_results",
+    )
+    op.drop_table("pipeline_latest_results")
@@ -15,7 +15,10 @@ from connexion.validators.json import JSONRequestBodyValidator
 from starlette.applications import Starlette
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
 
+from neurostore import query_stats
 from neurostore.admin import init_admin
 from neurostore.exceptions.base import NeuroStoreException
 from neurostore.exceptions.handlers import (
@@ -131,6 +134,88 @@ class _DatabaseSessionMiddleware:
             await self.app(scope, receive, send)
 
 
+class _QueryStatsMiddleware:
+    """Account the SQL statements of each request and report them.
+
+    The totals go out in a ``Server-Timing`` response header and are added to
+    the per-route metrics. Repeated statement fingerprints are logged as
+    likely N+1 patterns and requests over their route's statement budget are
+    logged. With ``SQL_STATEMENT_BUDGET_ENFORCE`` (as in the tests) the budget
+    is checked before the response starts, and a request over it gets a 500
+    response instead.
+    """
+
+    def __init__(self, app, settings):
+        self.app = app
+        self.settings = settings
+
+    def _budget_violation(self, route, stats):
+        budget = query_stats.statement_budget(self.settings, route)
+        if budget is None or stats.statements <= budget:
+            return None
+        return (
+            f"{route} issued {stats.statements} SQL statements; "
+            f"its budget is {budget}"
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.settings.get(
+            "SQL_INSTRUMENTATION_ENABLED", True
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        threshold = int(
+            self.settings.get(
+                "SQL_N_PLUS_ONE_THRESHOLD", query_stats.DEFAULT_N_PLUS_ONE_THRESHOLD
+            )
+        )
+        enforce = self.settings.get("SQL_STATEMENT_BUDGET_ENFORCE", False)
+        stats, token = query_stats.start_request()
+        replaced = False
+
+        async def send_with_timing(message):
+            nonlocal replaced
+            if replaced:
+                return
+            if message["type"] == "http.response.start":
+                violation = enforce and self._budget_violation(
+                    query_stats.route_label(scope), stats
+                )
+                if violation:
+                    replaced = True
+                    response = PlainTextResponse(violation, status_code=500)
+                    await response(scope, receive, send)
+                    return
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", []),
+                        (b"server-timing", stats.server_timing(threshold).encode()),
+                    ],
+                }
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            query_stats.finish_request(token)
+
+        route = query_stats.route_label(scope)
+        budget = query_stats.statement_budget(self.settings, route)
+        query_stats.observe_request(route, stats, threshold=threshold, budget=budget)
+        violation = self._budget_violation(route, stats)
+        if violation:
+            logging.getLogger("neurostore").warning(violation)
+
+
+async def _metrics_endpoint(request):
+    return PlainTextResponse(
+        query_stats.render_metrics(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 class _SettingsMiddleware:
     """Expose immutable process settings through the standard ASGI request state."""
 
@@ -239,11 +324,19 @@ def create_asgi_app(settings: Mapping[str, object] | None = None):
         validate_responses=validate_responses,
         validator_map=validator_map,
     )
-    app = Starlette(lifespan=_asgi_lifespan(settings, db))
+    routes = []
+    if settings.get("SQL_INSTRUMENTATION_ENABLED", True) and settings.get(
+        "SQL_METRICS_ENABLED", False
+    ):
+        routes.append(Route("/metrics", _metrics_endpoint))
+    app = Starlette(routes=routes, lifespan=_asgi_lifespan(settings, db))
     init_admin(app, db, settings)
     app.mount("/", connexion_app)
     app = _SettingsMiddleware(
-        _DatabaseSessionMiddleware(CORSMiddleware(app, **cors_kwargs)),
+        _QueryStatsMiddleware(
+            _DatabaseSessionMiddleware(CORSMiddleware(app, **cors_kwargs)),
+            settings,
+        ),
         settings,
         _logger,
     )
@@ -5,7 +5,7 @@ This avoids expensive Redis key scans by embedding version tokens in cache keys.
 
 import re
 
-from neurostore.extensions import cache
+from neurostore.extensions import VERSION_CHANNEL, cache
 
 _API_PATH_RE = re.compile(r"^/api/(?P<resource>[^/]+)(?:/(?P<object_id>[^/]+))?/?$")
 
@@ -22,20 +22,28 @@ def _version_key(resource, object_id=None):
 
 
 def get_cache_version(resource, object_id=None):
+    version_key = _version_key(resource, object_id)
+    version = cache.get_version(version_key)
+    if version is not None:
+        return version
+
     client = _cache_client()
     if client is None:
         return "0"
 
     try:
-        raw = client.get(_version_key(resource, object_id))
+        raw = client.get(version_key)
     except Exception:
         return "0"
 
     if raw is None:
-        return "0"
-    if isinstance(raw, bytes):
-        return raw.decode("utf8")
-    return str(raw)
+        version = "0"
+    elif isinstance(raw, bytes):
+        version = raw.decode("utf8")
+    else:
+        version = str(raw)
+    cache.remember_version(version_key, version)
+    return version
 
 
 def get_cache_version_for_path(path):
@@ -56,6 +64,7 @@ def bump_cache_versions(unique_ids):
     if client is None:
         return
 
+    version_keys = []
     try:
         pipeline = client.pipeline()
         for resource, ids in unique_ids.items():
@@ -68,11 +77,19 @@ def bump_cache_versions(unique_ids):
             if not normalized_ids:
                 continue
 
-            pipeline.incr(_version_key(resource, None))
-            for id_ in normalized_ids:
-                pipeline.incr(_version_key(resource, id_))
+            version_keys.append(_version_key(resource, None))
+            version_keys.extend(_version_key(resource, id_) for id_ in normalized_ids)
+
+        if not version_keys:
+            return
 
+        for version_key in version_keys:
+            pipeline.incr(version_key)
+        # Let other workers drop their remembered tokens for these keys.
+        pipeline.publish(VERSION_CHANNEL, "\n".join(version_keys))
         pipeline.execute()
     except Exception:
         # Cache invalidation failures should not fail writes.
         return
+    finally:
+        cache.forget_versions(version_keys)
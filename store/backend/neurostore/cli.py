@@ -1,5 +1,6 @@
 """Service CLI for NeuroStore."""
 
+import functools
 import time
 from types import SimpleNamespace
 
@@ -104,12 +105,18 @@ def shell():
 
 @main.command("ingest-neurosynth")
 @click.option("--max-rows", default=None, help="ingest neurosynth")
-def ingest_neurosynth(max_rows):
+@click.option(
+    "--bulk/--orm",
+    default=True,
+    help="load new rows with COPY (default) or through the ORM",
+)
+def ingest_neurosynth(max_rows, bulk):
     def _run(_app, _db):
         from neurostore import ingest
 
         ingest.ingest_neurosynth(
-            max_rows=int(max_rows) if max_rows is not None else None
+            max_rows=int(max_rows) if max_rows is not None else None,
+            bulk=bulk,
         )
 
     _run_with_runtime(_run)
@@ -136,12 +143,18 @@ def ingest_neurovault(verbose, limit):
 
 @main.command("ingest-neuroquery")
 @click.option("--max-rows", default=None, help="ingest neuroquery")
-def ingest_neuroquery(max_rows):
+@click.option(
+    "--bulk/--orm",
+    default=True,
+    help="load new rows with COPY (default) or through the ORM",
+)
+def ingest_neuroquery(max_rows, bulk):
     def _run(_app, _db):
         from neurostore import ingest
 
         ingest.ingest_neuroquery(
-            max_rows=int(max_rows) if max_rows is not None else None
+            max_rows=int(max_rows) if max_rows is not None else None,
+            bulk=bulk,
         )
 
     _run_with_runtime(_run)
@@ -204,8 +217,15 @@ def process_base_study_flag_outbox(batch_size, loop, sleep_seconds):
             process_base_study_flag_outbox_batch,
         )
 
-        processed_total = _run_outbox_processor(
+        process_batch = functools.update_wrapper(
+            functools.partial(
+                process_base_study_flag_outbox_batch,
+                engine=app.config.get("BASE_STUDY_FLAGS_ENGINE"),
+            ),
             process_base_study_flag_outbox_batch,
+        )
+        processed_total = _run_outbox_processor(
+            process_batch,
             batch_size,
             loop,
             sleep_seconds,
@@ -274,12 +294,26 @@ def check_base_study_metadata_outbox(max_pending, max_oldest_seconds):
 @click.option("--force-monthly/--no-force-monthly", default=False, show_default=True)
 @click.option("--version", "monthly_version", default=None)
 @click.option("--clear-cache/--no-clear-cache", default=False, show_default=True)
+@click.option(
+    "--workers",
+    default=None,
+    type=int,
+    help="Processes serializing study shards (NEUROSTORE_STUDYSET_RELEASE_WORKERS).",
+)
+@click.option(
+    "--full/--incremental",
+    default=False,
+    show_default=True,
+    help="Compare every study instead of only those in the study change log.",
+)
 def build_neurostore_studyset_release(
     nightly,
     monthly_if_due,
     force_monthly,
     monthly_version,
     clear_cache,
+    workers,
+    full,
 ):
     def _run(app, _db):
         from neurostore.services.neurostore_studyset_releases import (
@@ -293,6 +327,8 @@ def build_neurostore_studyset_release(
             force_monthly=force_monthly,
             version=monthly_version,
             clear_cache=clear_cache,
+            workers=workers,
+            full=full,
         )
         if clear_cache:
             click.echo("Cleared shard cache.")
@@ -300,10 +336,13 @@ def build_neurostore_studyset_release(
         if written:
             for manifest in written:
                 click.echo(
-                    "Wrote {release_type} release {version} to {root}".format(
+                    "Wrote {release_type} release {version} to {root} "
+                    "({build_mode} build, {changed} changed)".format(
                         release_type=manifest["release_type"],
                         version=manifest["version"],
                         root=result["root"],
+                        build_mode=manifest["build_mode"],
+                        changed=len(manifest["changed_base_study_ids"]),
                     )
                 )
         else:
@@ -312,6 +351,94 @@ def build_neurostore_studyset_release(
     _run_with_runtime(_run)
 
 
+@main.command("warm-query-embeddings")
+@click.argument("queries_file", type=click.File("r"))
+@click.option("--top", default=None, type=int, help="Only warm the first N queries.")
+@click.option("--dimensions", default=None, type=int)
+def warm_query_embeddings(queries_file, top, dimensions):
+    """Pre-populate the query-embedding cache from a file of one query per line."""
+
+    def _run(_app, _db):
+        from neurostore.embeddings import get_embeddings
+
+        queries = [line.strip() for line in queries_file if line.strip()]
+        if top is not None:
+            queries = queries[:top]
+        get_embeddings(queries, dimensions=dimensions)
+        click.echo(f"Warmed {len(queries)} query embedding(s).")
+
+    _run_with_runtime(_run)
+
+
+@main.command("rebuild-spatial-index")
+def rebuild_spatial_index():
+    """Recompute every base study's coordinate grid cells."""
+
+    def _run(_app, db):
+        from neurostore.models.spatial_index import rebuild_grid_cells
+
+        rebuild_grid_cells(db.session.connection())
+        db.session.commit()
+        click.echo("Rebuilt base study grid cells.")
+
+    _run_with_runtime(_run)
+
+
+@main.command("rebuild-pipeline-latest-results")
+def rebuild_pipeline_latest_results():
+    """Recompute the latest pipeline result of every base study and version."""
+
+    def _run(_app, db):
+        from neurostore.models.pipeline_latest_results import refresh_latest_results
+
+        refresh_latest_results(db.session.connection())
+        db.session.commit()
+        click.echo("Rebuilt pipeline latest results.")
+
+    _run_with_runtime(_run)
+
+
+@main.command("generate-synthetic-corpus")
+@click.option(
+    "--scale",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Load this many times 1000 base studies.",
+)
+@click.option("--seed", default=0, show_default=True, type=int)
+@click.option(
+    "--embedding-dimensions",
+    default=None,
+    type=click.IntRange(min=1),
+    help="Size of the synthetic abstract embeddings (default 1536).",
+)
+def generate_synthetic_corpus(scale, seed, embedding_dimensions):
+    """Bulk-load a seeded synthetic corpus for local benchmarking."""
+
+    def _run(_app, _db):
+        from neurostore.ingest.synthetic import generate_synthetic_corpus as generate
+
+        options = {}
+        if embedding_dimensions is not None:
+            options["embedding_dimensions"] = embedding_dimensions
+        try:
+            counts = generate(
+                scale,
+                seed,
+                progress=lambda loaded, total: click.echo(
+                    f"Loaded {loaded}/{total} base studies."
+                ),
+                **options,
+            )
+        except ValueError as exc:
+            raise click.ClickException(str(exc)) from exc
+        for table_name, count in sorted(counts.items()):
+            click.echo(f"{table_name}: {count}")
+
+    _run_with_runtime(_run)
+
+
 @main.command("transfer-user-ownership")
 @click.argument("source_user_id")
 @click.argument("destination_user_id")
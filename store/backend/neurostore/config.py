@@ -2,6 +2,7 @@
 Rename this file to config.py and set variables
 """
 
+import json
 import os
 from pathlib import Path
 
@@ -67,9 +68,28 @@ class Config(object):
 
     FILE_DIR = Path("/file-data")
     NEUROSTORE_STUDYSET_RELEASE_DIR = os.environ.get("NEUROSTORE_STUDYSET_RELEASE_DIR")
+    NEUROSTORE_STUDYSET_RELEASE_WORKERS = int(
+        os.environ.get("NEUROSTORE_STUDYSET_RELEASE_WORKERS", "1")
+    )
+    # Comma-separated archive formats ("gz", "zst"); the first is the default
+    # download. 0 compression threads uses every CPU.
+    NEUROSTORE_STUDYSET_RELEASE_FORMATS = os.environ.get(
+        "NEUROSTORE_STUDYSET_RELEASE_FORMATS", "gz"
+    )
+    NEUROSTORE_STUDYSET_RELEASE_COMPRESSION_THREADS = int(
+        os.environ.get("NEUROSTORE_STUDYSET_RELEASE_COMPRESSION_THREADS", "0")
+    )
     CACHE_TYPE = "RedisCache"
     CACHE_REDIS_URL = require_env_var("CACHE_REDIS_URL")
     CACHE_KEY_PREFIX = None
+    CACHE_LOCAL_MAX_ENTRIES = int(os.environ.get("CACHE_LOCAL_MAX_ENTRIES", "1024"))
+    CACHE_LOCAL_MAX_BYTES = int(
+        os.environ.get("CACHE_LOCAL_MAX_BYTES", str(64 * 1024 * 1024))
+    )
+    CACHE_VERSION_TTL = float(os.environ.get("CACHE_VERSION_TTL", "5"))
+    CACHE_VERSION_LOCAL_MAX_ENTRIES = int(
+        os.environ.get("CACHE_VERSION_LOCAL_MAX_ENTRIES", "65536")
+    )
     ASGI_THREAD_TOKENS = int(os.environ.get("ASGI_THREAD_TOKENS", "16"))
     POSTGRES_HOST = os.environ.get("POSTGRES_HOST")
     POSTGRES_PASSWORD = os.environ.get("POSTGRES_PASSWORD", "")
@@ -85,6 +105,8 @@ class Config(object):
         "yes",
         "on",
     )
+    # "correlated" (per-flag EXISTS subqueries) or "aggregate" (grouped pass).
+    BASE_STUDY_FLAGS_ENGINE = os.environ.get("BASE_STUDY_FLAGS_ENGINE", "correlated")
     BASE_STUDY_METADATA_ASYNC = os.environ.get(
         "BASE_STUDY_METADATA_ASYNC", "true"
     ).lower() in (
@@ -99,6 +121,26 @@ class Config(object):
     BASE_STUDY_METADATA_RETRY_DELAY_SECONDS = os.environ.get(
         "BASE_STUDY_METADATA_RETRY_DELAY_SECONDS", "30"
     )
+    # Base studies gathered at once per outbox batch; their provider lookups
+    # are coalesced into batch requests collected over the batch window.
+    BASE_STUDY_METADATA_GATHER_CONCURRENCY = os.environ.get(
+        "BASE_STUDY_METADATA_GATHER_CONCURRENCY", "50"
+    )
+    BASE_STUDY_METADATA_BATCH_WINDOW_SECONDS = os.environ.get(
+        "BASE_STUDY_METADATA_BATCH_WINDOW_SECONDS", "0.05"
+    )
+    # Parsed provider responses are kept per identifier in provider_responses
+    # (found for the TTL, not found for the negative TTL; 0 disables either),
+    # with the most recently used held in memory by every worker.
+    BASE_STUDY_METADATA_CACHE_TTL_SECONDS = os.environ.get(
+        "BASE_STUDY_METADATA_CACHE_TTL_SECONDS", str(30 * 24 * 60 * 60)
+    )
+    BASE_STUDY_METADATA_CACHE_NEGATIVE_TTL_SECONDS = os.environ.get(
+        "BASE_STUDY_METADATA_CACHE_NEGATIVE_TTL_SECONDS", str(24 * 60 * 60)
+    )
+    BASE_STUDY_METADATA_CACHE_LOCAL_MAX_ENTRIES = os.environ.get(
+        "BASE_STUDY_METADATA_CACHE_LOCAL_MAX_ENTRIES", "10000"
+    )
     EMAIL = os.environ.get("EMAIL")
     SEMANTIC_SCHOLAR_API_KEY = os.environ.get("SEMANTIC_SCHOLAR_API_KEY")
     PUBMED_TOOL_API_KEY = os.environ.get("PUBMED_TOOL_API_KEY")
@@ -108,6 +150,38 @@ class Config(object):
     BEARERINFO_FUNC = os.environ.get(
         "BEARERINFO_FUNC", "neurostore.resources.auth.decode_token"
     )
+    # Defaults to AUTH0_BASE_URL's /.well-known/jwks.json; a file:// URL points
+    # token verification at a local key set.
+    AUTH0_JWKS_URL = os.environ.get("AUTH0_JWKS_URL")
+    AUTH0_JWKS_TTL_SECONDS = float(os.environ.get("AUTH0_JWKS_TTL_SECONDS", "600"))
+    AUTH0_JWKS_MAX_STALE_SECONDS = float(
+        os.environ.get("AUTH0_JWKS_MAX_STALE_SECONDS", "86400")
+    )
+    AUTH0_TOKEN_CACHE_MAX_ENTRIES = int(
+        os.environ.get("AUTH0_TOKEN_CACHE_MAX_ENTRIES", "4096")
+    )
+    # Per-request SQL accounting: Server-Timing headers and /metrics.
+    SQL_INSTRUMENTATION_ENABLED = os.environ.get(
+        "SQL_INSTRUMENTATION_ENABLED", "true"
+    ).lower() in ("1", "true", "yes", "on")
+    # /metrics is unauthenticated, so it is only served when enabled for a
+    # deployment that keeps it off the public network.
+    SQL_METRICS_ENABLED = os.environ.get("SQL_METRICS_ENABLED", "false").lower() in (
+        "1",
+        "true",
+        "yes",
+        "on",
+    )
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.environ.get("SQL_N_PLUS_ONE_THRESHOLD", "10"))
+    # Statement budgets: a default and overrides keyed by Connexion operation id
+    # (a JSON object). Requests over budget are logged, or raise when enforced.
+    SQL_STATEMENT_BUDGET = (
+        int(os.environ["SQL_STATEMENT_BUDGET"])
+        if os.environ.get("SQL_STATEMENT_BUDGET")
+        else None
+    )
+    SQL_STATEMENT_BUDGETS = json.loads(os.environ.get("SQL_STATEMENT_BUDGETS", "{}"))
+    SQL_STATEMENT_BUDGET_ENFORCE = False
     PROPAGATE_EXCEPTIONS = True
 
     GITHUB_CLIENT_ID = "github-id"
@@ -192,6 +266,12 @@ class TestingConfig(Config):
     )
     BASE_STUDY_FLAGS_ASYNC = False
     BASE_STUDY_METADATA_ASYNC = False
+    # Tests seed the Redis tier directly, so serve every hit from Redis.
+    CACHE_LOCAL_MAX_ENTRIES = 0
+    # Tests truncate provider_responses between cases; keep no copies in memory.
+    BASE_STUDY_METADATA_CACHE_LOCAL_MAX_ENTRIES = 0
+    SQL_STATEMENT_BUDGET_ENFORCE = True
+    SQL_METRICS_ENABLED = True
 
 
 class DockerTestConfig(TestingConfig):
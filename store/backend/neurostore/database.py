@@ -7,6 +7,7 @@ from typing import Mapping
 
 import orjson
 import sqlalchemy as sa
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import (
     Query,
     backref,
@@ -15,6 +16,10 @@ from sqlalchemy.orm import (
     scoped_session,
     sessionmaker,
 )
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlalchemy.sql.visitors import InternalTraversal
+
+COUNT_MODES = ("exact", "estimate", "none")
 
 
 def orjson_serializer(obj):
@@ -27,17 +32,40 @@ def orjson_serializer(obj):
     ).decode()
 
 
+class Explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON)`` wrapper used to read planner row estimates.
+
+    The cache key is the wrapped statement's, so estimates of one search shape
+    share a compiled form.
+    """
+
+    _traverse_internals = [("statement", InternalTraversal.dp_clauseelement)]
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
 @dataclass(frozen=True)
 class Pagination:
-    """Pagination result returned by the service query helpers."""
+    """Pagination result returned by the service query helpers.
+
+    ``total`` is ``None`` when the count was skipped.
+    """
 
     items: list
     page: int
     per_page: int
-    total: int
+    total: int | None
 
     @property
     def pages(self):
+        if self.total is None:
+            return None
         return ceil(self.total / self.per_page) if self.per_page else 0
 
     @property
@@ -50,17 +78,80 @@ class Pagination:
 
     @property
     def has_next(self):
-        return self.page < self.pages
+        return self.pages is not None and self.page < self.pages
 
     @property
     def next_num(self):
         return self.page + 1 if self.has_next else None
 
 
+@dataclass(frozen=True)
+class KeysetPage:
+    """One page of a keyset (seek) walk.
+
+    ``next_key`` is the ``(sort value, id)`` of the last item when more rows
+    follow, and ``None`` on the final page.
+    """
+
+    items: list
+    per_page: int
+    next_key: tuple | None
+
+
+def _seek_predicate(sort_key, id_column, descending, value, last_id):
+    # Rows are ordered by (sort_key, id DESC); PostgreSQL sorts NULLs first
+    # for descending keys and last for ascending ones.
+    if value is None:
+        after_nulls = sa.and_(sort_key.is_(None), id_column < last_id)
+        return sa.or_(after_nulls, sort_key.is_not(None)) if descending else after_nulls
+
+    beyond = sort_key < value if descending else sort_key > value
+    predicate = sa.or_(beyond, sa.and_(sort_key == value, id_column < last_id))
+    if not descending:
+        predicate = sa.or_(predicate, sort_key.is_(None))
+    return predicate
+
+
 class NeurostoreQuery(Query):
     """Legacy query helpers used by the resource layer."""
 
-    def paginate(self, page=1, per_page=20, error_out=True, max_per_page=None):
+    def count_rows(self, mode="exact"):
+        """Count matching rows exactly, from planner estimates, or not at all."""
+        if mode == "none":
+            return None
+        if mode == "estimate":
+            return self.estimate_count()
+        return self.order_by(None).count()
+
+    def estimate_count(self):
+        """Planner row estimate for this query; the query itself is not run."""
+        plan = self.session.execute(Explain(self.order_by(None).statement)).scalar()
+        if isinstance(plan, (str, bytes)):
+            plan = orjson.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def page_ids(self, id_column, page=1, per_page=20):
+        """Return the ids on ``page`` and the exact match count.
+
+        Both come from one statement: the count is ``count(*) OVER ()``
+        carried on every row of the page. A page past the end has no rows to
+        carry it, so the matches are counted separately.
+        """
+        if page < 1 or per_page < 1:
+            return [], 0
+        rows = (
+            self.with_entities(id_column, sa.func.count().over())
+            .limit(per_page)
+            .offset((page - 1) * per_page)
+            .all()
+        )
+        if rows:
+            return [row[0] for row in rows], rows[0][1]
+        return [], self.count_rows("exact") if page > 1 else 0
+
+    def paginate(
+        self, page=1, per_page=20, error_out=True, max_per_page=None, count="exact"
+    ):
         if max_per_page is not None:
             per_page = min(per_page, max_per_page)
         if page < 1 or per_page < 1:
@@ -68,14 +159,37 @@ class NeurostoreQuery(Query):
                 raise ValueError("page and per_page must be positive integers")
             return Pagination([], page, per_page, 0)
 
-        total = self.order_by(None).count()
-        pages = ceil(total / per_page) if total else 0
-        if error_out and page != 1 and page > pages:
-            raise LookupError("page is out of range")
+        total = self.count_rows(count)
+        if error_out and count == "exact" and page != 1:
+            pages = ceil(total / per_page) if total else 0
+            if page > pages:
+                raise LookupError("page is out of range")
 
         items = self.limit(per_page).offset((page - 1) * per_page).all()
         return Pagination(items, page, per_page, total)
 
+    def keyset_page(self, sort_key, id_column, per_page, *, descending, after=None):
+        """Return the page following ``after`` by seeking instead of offsetting.
+
+        The query must already be ordered by ``sort_key`` (in the given
+        direction) and then by ``id_column`` descending.
+        """
+        query = self
+        if after is not None:
+            query = query.filter(
+                _seek_predicate(sort_key, id_column, descending, *after)
+            )
+
+        rows = (
+            query.add_columns(sort_key.label("_keyset_value")).limit(per_page + 1).all()
+        )
+        items = [row[0] for row in rows[:per_page]]
+        next_key = None
+        if len(rows) > per_page:
+            last_row = rows[per_page - 1]
+            next_key = (last_row[-1], getattr(last_row[0], id_column.key))
+        return KeysetPage(items, per_page, next_key)
+
 
 class Database:
     relationship = staticmethod(relationship)
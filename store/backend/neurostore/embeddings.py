@@ -1,6 +1,9 @@
+import hashlib
 import os
-from typing import Any, List, Optional
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
 import openai
 from tenacity import (
     retry,
@@ -9,6 +12,40 @@ from tenacity import (
     wait_exponential,
 )
 
+from neurostore.extensions import LocalCache, cache
+
+DEFAULT_EMBEDDING_DIMENSIONS = 1536
+# Inputs sent per embeddings request by the batched entry point.
+EMBEDDING_BATCH_SIZE = 256
+
+_clients: Dict[Tuple[Optional[str], Optional[str]], Any] = {}
+_clients_lock = threading.Lock()
+_provider_override = None
+_local_cache = None
+_local_cache_lock = threading.Lock()
+
+
+def _get_openai_client(api_key: Optional[str], api_gateway: Optional[str]):
+    """Return the process-wide client (and its connection pool) for a key/gateway."""
+    key = (api_key, api_gateway)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client_kwargs = {}
+            if api_key:
+                client_kwargs["api_key"] = api_key
+            if api_gateway:
+                client_kwargs["base_url"] = api_gateway
+            if api_gateway and "portkey.ai" in api_gateway:
+                client_kwargs["default_headers"] = {"x-portkey-api-key": api_key}
+            client = openai.OpenAI(**client_kwargs)
+            _clients[key] = client
+    return client
+
 
 # Retry up to 3 attempts with small backoff: 0.5s then up to 1.0s
 @retry(
@@ -19,20 +56,12 @@ from tenacity import (
 )
 def _call_openai_create(
     model: str,
-    input_text: str,
+    input_text: str | List[str],
     dimensions: Optional[int] = None,
     api_key: Optional[str] = None,
     api_gateway: Optional[str] = None,
 ) -> Any:
-    client_kwargs = {}
-    if api_key:
-        client_kwargs["api_key"] = api_key
-    if api_gateway:
-        client_kwargs["base_url"] = api_gateway
-    if api_gateway and "portkey.ai" in api_gateway:
-        client_kwargs["default_headers"] = {"x-portkey-api-key": api_key}
-
-    client = openai.OpenAI(**client_kwargs)
+    client = _get_openai_client(api_key, api_gateway)
     if dimensions is None:
         return client.embeddings.create(model=model, input=input_text)
     return client.embeddings.create(
@@ -40,20 +69,157 @@ def _call_openai_create(
     )
 
 
+def _parse_embedding_response(resp: Any) -> List[List[float]]:
+    # Handle both legacy dict responses and modern OpenAI response objects.
+    data = None
+    if isinstance(resp, dict):
+        data = resp.get("data")
+    elif hasattr(resp, "data"):
+        data = resp.data
+    else:
+        raise RuntimeError(f"Unexpected response type from OpenAI: {type(resp)}")
+
+    if not isinstance(data, list) or not data:
+        raise RuntimeError(f"Invalid response shape from OpenAI: {resp}")
+
+    vectors = []
+    for item in data:
+        # extract embedding whether item is a dict or an object with .embedding
+        if isinstance(item, dict):
+            embedding = item.get("embedding")
+        elif hasattr(item, "embedding"):
+            embedding = item.embedding
+        else:
+            raise RuntimeError(f"Invalid embedding in OpenAI response: {resp}")
+
+        if not hasattr(embedding, "__iter__"):
+            raise RuntimeError("Embedding returned by OpenAI is not iterable")
+
+        # normalize to plain list of floats
+        vectors.append([float(x) for x in list(embedding)])
+    return vectors
+
+
+class OpenAIEmbeddingProvider:
+    """Embeds text through the OpenAI (or an OpenAI-compatible gateway) API."""
+
+    name = "openai"
+
+    @property
+    def model(self) -> str:
+        return os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+
+    def embed(
+        self, texts: Sequence[str], dimensions: Optional[int] = None
+    ) -> List[List[float]]:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError("OPENAI_API_KEY not set")
+        api_gateway = os.getenv("OPENAI_API_GATEWAY")
+
+        # configure key for the openai client
+        openai.api_key = api_key
+
+        try:
+            resp = _call_openai_create(
+                model=self.model,
+                # Single inputs keep the plain-string request shape.
+                input_text=texts[0] if len(texts) == 1 else list(texts),
+                dimensions=dimensions,
+                api_key=api_key,
+                api_gateway=api_gateway,
+            )
+            vectors = _parse_embedding_response(resp)
+            if len(vectors) != len(texts):
+                raise RuntimeError(
+                    f"Expected {len(texts)} embeddings from OpenAI, got {len(vectors)}"
+                )
+            return vectors
+        except Exception as exc:
+            # Surface a clear runtime error for callers/tests
+            raise RuntimeError(f"Failed to get embedding: {exc}") from exc
+
+
+class StubEmbeddingProvider:
+    """Offline provider returning deterministic unit vectors derived from the text."""
+
+    name = "stub"
+    model = "stub"
+
+    def embed(
+        self, texts: Sequence[str], dimensions: Optional[int] = None
+    ) -> List[List[float]]:
+        length = dimensions or DEFAULT_EMBEDDING_DIMENSIONS
+        vectors = []
+        for text in texts:
+            seed = int.from_bytes(
+                hashlib.sha256(text.encode("utf8")).digest()[:8], "big"
+            )
+            vector = np.random.default_rng(seed).standard_normal(length)
+            vectors.append((vector / np.linalg.norm(vector)).tolist())
+        return vectors
+
+
+EMBEDDING_PROVIDERS = {
+    OpenAIEmbeddingProvider.name: OpenAIEmbeddingProvider,
+    StubEmbeddingProvider.name: StubEmbeddingProvider,
+}
+
+
+def set_embedding_provider(provider) -> None:
+    """Override the provider selected by ``EMBEDDING_PROVIDER`` (``None`` resets)."""
+    global _provider_override
+    _provider_override = provider
+
+
+def get_embedding_provider():
+    if _provider_override is not None:
+        return _provider_override
+
+    name = os.getenv("EMBEDDING_PROVIDER", OpenAIEmbeddingProvider.name)
+    provider_cls = EMBEDDING_PROVIDERS.get(name.strip().lower())
+    if provider_cls is None:
+        raise RuntimeError(
+            f"Unknown EMBEDDING_PROVIDER={name!r}. "
+            f"Expected one of: {', '.join(sorted(EMBEDDING_PROVIDERS))}"
+        )
+    return provider_cls()
+
+
+def reset_embedding_state() -> None:
+    """Drop pooled clients, the in-process vector cache and any provider override."""
+    global _local_cache
+    set_embedding_provider(None)
+    with _clients_lock:
+        _clients.clear()
+    with _local_cache_lock:
+        _local_cache = None
+
+
+def _validate_dimensions(dimensions: Optional[int]) -> None:
+    if dimensions is not None and not isinstance(dimensions, int):
+        raise ValueError("dimensions must be an int when provided")
+
+
 def get_embedding(text: str, dimensions: Optional[int] = None) -> List[float]:
     """
-    Obtain an embedding vector for the provided text using the OpenAI embeddings API.
+    Obtain an embedding vector for the provided text from the configured provider.
 
     Behavior:
+    - ``EMBEDDING_PROVIDER`` selects the provider: ``openai`` (default) or the
+      offline ``stub``; ``set_embedding_provider`` overrides it in-process.
     - Reads OPENAI_API_KEY from environment (raises RuntimeError if missing).
     - Reads OPENAI_API_GATEWAY from environment as an optional OpenAI-compatible
       base URL.
     - Reads OPENAI_EMBEDDING_MODEL from environment as an optional embedding model.
-    - Uses the openai Python package to request embeddings. If `dimension` is provided
+    - Uses one pooled openai client per key and gateway. If `dimension` is provided
       it will be passed through to the OpenAI API via the `dimensions` parameter.
     - Retries up to 3 attempts with small backoff via tenacity on transient/network errors.
     - Validates the response shape and returns a plain list[float].
 
+    The result is not cached; use ``get_query_embedding`` or ``get_embeddings``
+    for cached lookups.
+
     Args:
         text: Input text to embed.
         dimension: Optional requested embedding dimension (passed to OpenAI as `dimensions`).
@@ -68,60 +234,135 @@ def get_embedding(text: str, dimensions: Optional[int] = None) -> List[float]:
     """
     # Validate dimensions first so tests expecting a ValueError for invalid
     # dimension values get that error even when OPENAI_API_KEY is not set.
-    if dimensions is not None and not isinstance(dimensions, int):
-        raise ValueError("dimensions must be an int when provided")
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY not set")
-    api_gateway = os.getenv("OPENAI_API_GATEWAY")
+    _validate_dimensions(dimensions)
+    return get_embedding_provider().embed([text], dimensions)[0]
 
-    # configure key for the openai client
-    openai.api_key = api_key
 
-    model_name = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+def normalize_query_text(text: str) -> str:
+    return " ".join(str(text).split())
 
-    if dimensions is not None and not isinstance(dimensions, int):
-        raise ValueError("dimensions must be an int when provided")
 
+def _cache_ttl_seconds() -> int:
+    return int(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", str(7 * 24 * 60 * 60)))
+
+
+def _vector_cache():
+    global _local_cache
+    if _local_cache is None:
+        with _local_cache_lock:
+            if _local_cache is None:
+                _local_cache = LocalCache(
+                    int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "4096"))
+                )
+    return _local_cache
+
+
+def _redis_client():
+    return getattr(getattr(cache, "cache", None), "_write_client", None)
+
+
+def _vector_cache_key(provider, text: str, dimensions: Optional[int]) -> str:
+    digest = hashlib.sha256(text.encode("utf8")).hexdigest()
+    return f"embedding:{provider.name}:{provider.model}:{dimensions or 0}:{digest}"
+
+
+def _encode_vector(vector: Sequence[float]) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def _decode_vector(payload: bytes) -> List[float]:
+    return np.frombuffer(payload, dtype=np.float32).astype(float).tolist()
+
+
+def _read_cached_vectors(keys: List[str]) -> Dict[str, bytes]:
+    local = _vector_cache()
+    found = {}
+    for key in keys:
+        payload = local.get(key)
+        if payload is not None:
+            found[key] = payload
+
+    missing = [key for key in keys if key not in found]
+    client = _redis_client()
+    if missing and client is not None:
+        try:
+            payloads = client.mget(missing)
+        except Exception:
+            payloads = []
+        for key, payload in zip(missing, payloads):
+            if payload is not None:
+                found[key] = payload
+                local.set(key, payload, timeout=_cache_ttl_seconds())
+    return found
+
+
+def _write_cached_vectors(payloads: Dict[str, bytes]) -> None:
+    ttl = _cache_ttl_seconds()
+    local = _vector_cache()
+    for key, payload in payloads.items():
+        local.set(key, payload, timeout=ttl)
+
+    client = _redis_client()
+    if not payloads or client is None or ttl <= 0:
+        return
     try:
-        # Use unified caller that handles both modern and legacy SDKs.
-        resp = _call_openai_create(
-            model=model_name,
-            input_text=text,
-            dimensions=dimensions,
-            api_key=api_key,
-            api_gateway=api_gateway,
-        )
+        pipeline = client.pipeline()
+        for key, payload in payloads.items():
+            pipeline.set(key, payload, ex=ttl)
+        pipeline.execute()
+    except Exception:
+        # A cache write failure must not fail the search.
+        return
 
-        # Handle both legacy dict responses and modern OpenAI response objects.
-        data = None
-        if isinstance(resp, dict):
-            data = resp.get("data")
-        elif hasattr(resp, "data"):
-            data = resp.data
-        else:
-            raise RuntimeError(f"Unexpected response type from OpenAI: {type(resp)}")
-
-        if not isinstance(data, list) or not data:
-            raise RuntimeError(f"Invalid response shape from OpenAI: {resp}")
-
-        first = data[0]
-        # extract embedding whether first is a dict or an object with .embedding
-        embedding = None
-        if isinstance(first, dict):
-            embedding = first.get("embedding")
-        elif hasattr(first, "embedding"):
-            embedding = first.embedding
-        else:
-            raise RuntimeError(f"Invalid embedding in OpenAI response: {resp}")
 
-        if not hasattr(embedding, "__iter__"):
-            raise RuntimeError("Embedding returned by OpenAI is not iterable")
+def get_query_embedding(text: str, dimensions: Optional[int] = None) -> List[float]:
+    """Cached ``get_embedding`` for search queries.
 
-        # normalize to plain list of floats
-        embedding_list = list(embedding)
-        return [float(x) for x in embedding_list]
+    Vectors are keyed by provider, model, dimensions and the whitespace-normalized
+    text, and stored as float32 bytes in an in-process LRU in front of Redis.
+    """
+    _validate_dimensions(dimensions)
+    text = normalize_query_text(text)
+    key = _vector_cache_key(get_embedding_provider(), text, dimensions)
+    payload = _read_cached_vectors([key]).get(key)
+    if payload is not None:
+        return _decode_vector(payload)
+
+    payload = _encode_vector(get_embedding(text, dimensions=dimensions))
+    _write_cached_vectors({key: payload})
+    return _decode_vector(payload)
+
+
+def get_embeddings(
+    texts: Sequence[str],
+    dimensions: Optional[int] = None,
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+) -> List[List[float]]:
+    """Cached, batched embeddings for many texts, in input order.
+
+    Only texts missing from the cache reach the provider, ``batch_size`` inputs
+    per request. Used to pre-populate vectors for popular search queries.
+    """
+    _validate_dimensions(dimensions)
+    provider = get_embedding_provider()
+    normalized = [normalize_query_text(text) for text in texts]
+    keys = [_vector_cache_key(provider, text, dimensions) for text in normalized]
+    found = _read_cached_vectors(sorted(set(keys)))
+
+    pending = {}
+    for key, text in zip(keys, normalized):
+        if key not in found:
+            pending.setdefault(key, text)
+
+    pending_items = list(pending.items())
+    for start in range(0, len(pending_items), batch_size):
+        end = start + batch_size
+        chunk = pending_items[start:end]
+        vectors = provider.embed([text for _key, text in chunk], dimensions)
+        payloads = {
+            key: _encode_vector(vector) for (key, _text), vector in zip(chunk, vectors)
+        }
+        _write_cached_vectors(payloads)
+        found.update(payloads)
 
-    except Exception as exc:
-        # Surface a clear runtime error for callers/tests
-        raise RuntimeError(f"Failed to get embedding: {exc}") from exc
+    return [_decode_vector(found[key]) for key in keys]
@@ -2,27 +2,132 @@
 
 from __future__ import annotations
 
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
-from typing import Callable, Mapping
+from typing import Callable, Iterable, Mapping
 
 from cachelib.redis import RedisCache
 from redis import from_url
 
+logger = logging.getLogger(__name__)
+
+# Pub/sub channel announcing bumped cache-version keys to every worker.
+VERSION_CHANNEL = "cache-version:invalidate"
+
+
+class LocalCache:
+    """Thread-safe in-process LRU bounded by entry count and total size.
+
+    Entries expire after their timeout. A ``max_entries`` of zero disables the
+    tier entirely so every lookup misses.
+    """
+
+    def __init__(self, max_entries: int = 0, max_bytes: int = 0):
+        self.max_entries = max(int(max_entries or 0), 0)
+        self.max_bytes = max(int(max_bytes or 0), 0)
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, _size, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._pop(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout: float | None = None, size: int | None = None):
+        if not self.enabled:
+            return
+
+        size = len(value) if size is None else size
+        if self.max_bytes and size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + timeout if timeout else None
+
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (expires_at, size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes and self._bytes > self.max_bytes
+            ):
+                _key, (_expires_at, evicted_size, _value) = self._entries.popitem(
+                    last=False
+                )
+                self._bytes -= evicted_size
+
+    def delete(self, key):
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _pop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
 
 class Cache:
-    """Cachelib-backed response cache preserving the deployed Redis key format."""
+    """Cachelib-backed response cache preserving the deployed Redis key format.
+
+    An optional per-worker tier keeps pickled responses in memory in front of
+    Redis, and cache-version tokens are remembered for ``CACHE_VERSION_TTL``
+    seconds. Version bumps are broadcast on ``VERSION_CHANNEL`` so every worker
+    forgets its stale tokens immediately.
+    """
 
     def __init__(self):
         self.cache: RedisCache | None = None
+        self.local = LocalCache()
+        self.versions = LocalCache()
+        self.version_ttl = 0.0
+        self._listener = None
+        self._listener_pid = None
+        self._listener_retry_at = 0.0
+        self._listener_lock = threading.Lock()
 
     def configure(self, config: Mapping[str, object]):
         redis_url = str(config["CACHE_REDIS_URL"])
         key_prefix = config.get("CACHE_KEY_PREFIX")
+        self._stop_version_listener()
         self.cache = RedisCache(
             host=from_url(redis_url),
             default_timeout=300,
             key_prefix=str(key_prefix) if key_prefix else None,
         )
+        self.local = LocalCache(
+            config.get("CACHE_LOCAL_MAX_ENTRIES", 0),
+            config.get("CACHE_LOCAL_MAX_BYTES", 0),
+        )
+        self.version_ttl = float(config.get("CACHE_VERSION_TTL", 0) or 0)
+        self.versions = LocalCache(
+            config.get("CACHE_VERSION_LOCAL_MAX_ENTRIES", 0) if self.version_ttl else 0
+        )
         return self
 
     def _backend(self) -> RedisCache:
@@ -31,8 +136,95 @@ class Cache:
         return self.cache
 
     def clear(self):
+        self.local.clear()
+        self.versions.clear()
         return self._backend().clear()
 
+    def _store_local(self, cache_key, value, timeout):
+        if not self.local.enabled:
+            return
+        try:
+            encoded = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return
+        self.local.set(cache_key, encoded, timeout=timeout)
+
+    def get_version(self, version_key):
+        """Return a remembered version token, or ``None`` to consult Redis."""
+        if not self.versions.enabled or not self._ensure_version_listener():
+            return None
+        return self.versions.get(version_key)
+
+    def remember_version(self, version_key, version):
+        if self.versions.enabled:
+            self.versions.set(version_key, version, timeout=self.version_ttl, size=1)
+
+    def forget_versions(self, version_keys: Iterable[str]):
+        for version_key in version_keys:
+            self.versions.delete(version_key)
+
+    def _ensure_version_listener(self) -> bool:
+        """Subscribe this process to version bumps; remembered tokens need it."""
+        if self._listener_pid == os.getpid():
+            return True
+
+        with self._listener_lock:
+            if self._listener_pid == os.getpid():
+                return True
+            if time.monotonic() < self._listener_retry_at:
+                return False
+
+            client = getattr(self.cache, "_write_client", None)
+            if client is None:
+                return False
+
+            try:
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{VERSION_CHANNEL: self._on_version_message})
+                self._listener = pubsub.run_in_thread(
+                    sleep_time=1.0,
+                    daemon=True,
+                    exception_handler=self._on_listener_error,
+                )
+            except Exception:
+                logger.warning(
+                    "Cache version listener unavailable; reading versions from Redis.",
+                    exc_info=True,
+                )
+                self._listener_retry_at = time.monotonic() + 30
+                return False
+
+            # Tokens remembered before subscribing may have missed a bump.
+            self.versions.clear()
+            self._listener_pid = os.getpid()
+            return True
+
+    def _on_version_message(self, message):
+        data = message.get("data")
+        if isinstance(data, bytes):
+            data = data.decode("utf8")
+        if not isinstance(data, str):
+            return
+        self.forget_versions(key for key in data.split("\n") if key)
+
+    def _on_listener_error(self, exc, pubsub, thread):
+        # Bumps published while disconnected are lost, so drop every token.
+        del pubsub, thread
+        logger.warning("Cache version listener error: %s", exc)
+        self.versions.clear()
+        time.sleep(1.0)
+
+    def _stop_version_listener(self):
+        listener, self._listener = self._listener, None
+        self._listener_pid = None
+        self._listener_retry_at = 0.0
+        if listener is None:
+            return
+        try:
+            listener.stop()
+        except Exception:
+            pass
+
     def cached(
         self,
         timeout: int | None = None,
@@ -53,13 +245,19 @@ class Cache:
                 else:
                     cache_key = function.__name__
 
+                encoded = self.local.get(cache_key)
+                if encoded is not None:
+                    return pickle.loads(encoded)
+
                 backend = self._backend()
                 value = backend.get(cache_key)
                 if value is not None:
+                    self._store_local(cache_key, value, timeout)
                     return value
 
                 value = function(*args, **kwargs)
                 backend.set(cache_key, value, timeout=timeout)
+                self._store_local(cache_key, value, timeout)
                 return value
 
             return decorated
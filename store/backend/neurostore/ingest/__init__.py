@@ -14,6 +14,7 @@ from scipy import sparse
 from sqlalchemy import or_
 
 from neurostore.database import db
+from neurostore.ingest.bulk import BaseStudyResolver, BulkLoader
 from neurostore.map_types import canonicalize_map_type
 from neurostore.models import (
     Analysis,
@@ -31,7 +32,9 @@ from neurostore.models import (
     Studyset,
     Table,
 )
-from neurostore.models.data import StudysetStudy, _check_type
+from neurostore.models.data import PointEntityMap, StudysetStudy, _check_type
+from neurostore.models.spatial_index import rebuild_grid_cells
+from neurostore.models.study_change_log import log_study_changes
 from neurostore.note_keys import resolve_note_key_default
 from neurostore.services.has_media_flags import recompute_media_flags
 
@@ -54,10 +57,17 @@ def _coerce_optional_int(value):
 
 
 def _recompute_base_study_flags(base_studies):
-    base_study_ids = [getattr(base_study, "id", None) for base_study in base_studies]
-    base_study_ids = [
-        base_study_id for base_study_id in base_study_ids if base_study_id
-    ]
+    _recompute_base_study_flag_ids(
+        [getattr(base_study, "id", None) for base_study in base_studies]
+    )
+
+
+def _recompute_base_study_flag_ids(base_study_ids):
+    base_study_ids = list(
+        dict.fromkeys(
+            base_study_id for base_study_id in base_study_ids if base_study_id
+        )
+    )
     if not base_study_ids:
         return
     db.session.remove()
@@ -211,9 +221,189 @@ def ingest_neurovault(verbose=False, limit=20, overwrite=False, max_images=None)
             break
 
 
-def ingest_neurosynth(max_rows=None):
+def _update_missing_attrs(record, values):
+    for col, value in values.items():
+        setattr(record, col, getattr(record, col) or value)
+
+
+def _queue_coordinate_tables(loader, study_id, study_coord_data, space, notes=None):
+    """Queue a study's tables, analyses, points and entities; returns analysis ids.
+
+    ``notes`` maps an annotation's ``(annotation_id, studyset_id)`` to the note
+    recorded for every analysis of the study.
+    """
+    analysis_ids = []
+    if study_coord_data is None:
+        return analysis_ids
+
+    for order, (t_id, df) in enumerate(study_coord_data.groupby("table_id")):
+        name = str(t_id)
+        table_id = loader.add(Table, t_id=name, name=name, study_id=study_id)
+        analysis_id = loader.add(
+            Analysis,
+            name=name,
+            study_id=study_id,
+            order=order,
+            table_id=table_id,
+            # COPY bypasses the point-count listeners.
+            point_count=len(df),
+        )
+        analysis_ids.append(analysis_id)
+        for (annotation_id, studyset_id), note in (notes or {}).items():
+            loader.add(
+                AnnotationAnalysis,
+                annotation_id=annotation_id,
+                analysis_id=analysis_id,
+                study_id=study_id,
+                studyset_id=studyset_id,
+                note=note,
+            )
+        for point_idx, (x, y, z) in enumerate(
+            df[["x", "y", "z"]].itertuples(index=False, name=None)
+        ):
+            point_id = loader.add(
+                Point,
+                x=x,
+                y=y,
+                z=z,
+                space=space,
+                kind="unknown",
+                analysis_id=analysis_id,
+                order=point_idx,
+            )
+            entity_id = loader.add(
+                Entity, label=name, level="group", analysis_id=analysis_id
+            )
+            loader.add(PointEntityMap, point=point_id, entity=entity_id)
+    return analysis_ids
+
+
+def _copy_bulk_ingest(loader, base_study_ids):
+    """COPY the queued rows, then refresh what the ORM listeners would have."""
+    db.session.flush()
+    connection = db.session.connection()
+    loader.copy(connection)
+    rebuild_grid_cells(connection, base_study_ids)
+    log_study_changes(connection, base_study_ids=base_study_ids)
+    db.session.commit()
+    _recompute_base_study_flag_ids(base_study_ids)
+
+
+def _ingest_neurosynth_bulk(studyset, metadata, coord_data, annotations):
+    resolver = BaseStudyResolver(
+        dois=[_coerce_optional(doi) for doi in metadata["doi"]],
+        pmids=metadata.index,
+    )
+    coords_by_id = dict(tuple(coord_data.groupby(level=0, sort=False)))
+    # Studies from an earlier ingestion are not copied again, but they still
+    # join the new studyset and annotation.
+    existing_study_ids = {}
+    for study_id, source_id in db.session.execute(
+        sa.select(Study.id, Study.source_id).where(Study.source == "neurosynth")
+    ):
+        existing_study_ids.setdefault(source_id, []).append(study_id)
+    existing_analysis_ids = {}
+    for analysis_id, study_id in db.session.execute(
+        sa.select(Analysis.id, Analysis.study_id)
+        .join(Study, Study.id == Analysis.study_id)
+        .where(Study.source == "neurosynth")
+        .order_by(Analysis.study_id, Analysis.order, Analysis.id)
+    ):
+        existing_analysis_ids.setdefault(study_id, []).append(analysis_id)
+
+    annot = Annotation(
+        name="neurosynth",
+        source="neurostore",
+        source_id=None,
+        description="TODO",
+        studyset=studyset,
+    )
+    db.session.add_all([studyset, annot])
+    db.session.flush()
+
+    loader = BulkLoader()
+    created_base_study_ids = {}
+    base_study_ids = []
+    note = None
+    with db.session.no_autoflush:
+        for metadata_row, annotation_row in zip(
+            metadata.itertuples(), annotations.itertuples(index=False)
+        ):
+            doi = _coerce_optional(metadata_row.doi)
+            id_ = pmid = metadata_row.Index
+            year = _coerce_optional_int(metadata_row.year)
+            study_info = {
+                "name": metadata_row.title,
+                "doi": doi,
+                "pmid": pmid,
+                "authors": metadata_row.authors,
+                "publication": metadata_row.journal,
+                "year": year,
+                "level": "group",
+            }
+
+            base_study = resolver.resolve(doi, pmid)
+            if base_study is not None:
+                _update_missing_attrs(base_study, study_info)
+                base_study_id = base_study.id
+            else:
+                base_study_id = created_base_study_ids.get(pmid)
+                if base_study_id is None:
+                    base_study_id = loader.add(BaseStudy, **study_info)
+                    created_base_study_ids[pmid] = base_study_id
+            base_study_ids.append(base_study_id)
+
+            note = annotation_row._asdict()
+            if id_ in existing_study_ids:
+                for study_id in existing_study_ids[id_]:
+                    loader.add(
+                        StudysetStudy, study_id=study_id, studyset_id=studyset.id
+                    )
+                    for analysis_id in existing_analysis_ids.get(study_id, ()):
+                        loader.add(
+                            AnnotationAnalysis,
+                            annotation_id=annot.id,
+                            analysis_id=analysis_id,
+                            study_id=study_id,
+                            studyset_id=studyset.id,
+                            note=note,
+                        )
+                continue
+
+            study_id = loader.add(
+                Study,
+                **study_info,
+                source="neurosynth",
+                source_id=id_,
+                base_study_id=base_study_id,
+            )
+            loader.add(StudysetStudy, study_id=study_id, studyset_id=studyset.id)
+            _queue_coordinate_tables(
+                loader,
+                study_id,
+                coords_by_id.get(id_),
+                metadata_row.space,
+                notes={(annot.id, studyset.id): note},
+            )
+
+    annot.note_keys = {}
+    for idx, (k, v) in enumerate((note or {}).items()):
+        note_type = _check_type(v) or "string"
+        annot.note_keys[k] = {
+            "type": note_type,
+            "order": idx,
+            "default": resolve_note_key_default(k, note_type),
+        }
+    _copy_bulk_ingest(loader, base_study_ids)
+
+
+def ingest_neurosynth(max_rows=None, bulk=False):
     """Ingest the bundled Neurosynth coordinate dataset.
 
+    With ``bulk``, base studies are resolved in one query and new rows are
+    written with ``COPY`` (see ``neurostore.ingest.bulk``) rather than built
+    as ORM objects one by one.
+
     Deprecated:
         This still creates the legacy public ``neurosynth`` Studyset and
         Annotation for backwards compatibility with tests and older local
@@ -269,6 +459,8 @@ def ingest_neurosynth(max_rows=None):
         authors="Yarkoni T, Poldrack RA, Nichols TE, Van Essen DC, Wager TD",
         public=True,
     )
+    if bulk:
+        return _ingest_neurosynth_bulk(d, metadata, coord_data, annotations)
 
     studies = []
     to_commit = []
@@ -450,9 +642,79 @@ def ingest_neurosynth(max_rows=None):
         _recompute_base_study_flags(base_study_records)
 
 
-def ingest_neuroquery(max_rows=None):
+def _neuroquery_studyset(**kwargs):
+    # DEPRECATED: retained only for backwards compatibility with tests and older
+    # bootstrap flows. New platform-wide studyset creation happens outside these
+    # source-specific ingest routines.
+    return Studyset(
+        name="neuroquery",
+        description="TODO",
+        publication="eLife",
+        pmid="32129761",
+        doi="10.7554/eLife.53385",
+        public=True,
+        **kwargs,
+    )
+
+
+def _ingest_neuroquery_bulk(metadata, coord_data):
+    resolver = BaseStudyResolver(pmids=metadata.index)
+    coords_by_id = dict(tuple(coord_data.groupby(level=0, sort=False)))
+    studyset = _neuroquery_studyset()
+    db.session.add(studyset)
+    db.session.flush()
+
+    loader = BulkLoader()
+    created_base_study_ids = {}
+    base_study_ids = []
+    study_ids = list(
+        db.session.scalars(sa.select(Study.id).where(Study.source == "neuroquery"))
+    )
+    with db.session.no_autoflush:
+        for id_, title in metadata["title"].items():
+            title = _coerce_optional(title)
+            base_study = resolver.resolve(None, id_)
+            if base_study is not None:
+                base_study_id = base_study.id
+                study_info = {
+                    "name": title or base_study.name,
+                    "doi": base_study.doi,
+                    "year": base_study.year,
+                    "publication": base_study.publication,
+                    "authors": base_study.authors,
+                }
+            else:
+                base_study_id = created_base_study_ids.get(id_)
+                if base_study_id is None:
+                    base_study_id = loader.add(
+                        BaseStudy, name=title, level="group", pmid=id_
+                    )
+                    created_base_study_ids[id_] = base_study_id
+                study_info = {"name": title}
+            base_study_ids.append(base_study_id)
+
+            study_id = loader.add(
+                Study,
+                **study_info,
+                source="neuroquery",
+                pmid=id_,
+                source_id=id_,
+                level="group",
+                base_study_id=base_study_id,
+            )
+            study_ids.append(study_id)
+            _queue_coordinate_tables(loader, study_id, coords_by_id.get(id_), "MNI")
+
+    for study_id in study_ids:
+        loader.add(StudysetStudy, study_id=study_id, studyset_id=studyset.id)
+    _copy_bulk_ingest(loader, base_study_ids)
+
+
+def ingest_neuroquery(max_rows=None, bulk=False):
     """Ingest the bundled NeuroQuery coordinate dataset.
 
+    ``bulk`` selects the ``COPY`` based loader, as for ``ingest_neurosynth``.
+
     Deprecated:
         This still creates the legacy public ``neuroquery`` Studyset for
         backwards compatibility with tests and older local bootstrap flows. New
@@ -478,6 +740,8 @@ def ingest_neuroquery(max_rows=None):
     base_studies = []
     if max_rows is not None:
         metadata = metadata.iloc[:max_rows]
+    if bulk:
+        return _ingest_neuroquery_bulk(metadata, coord_data)
 
     # all_studies = {s.pmid: s for s in Study.query.filter(source="neuroquery").all()}
     for id_, metadata_row in metadata.iterrows():
@@ -530,16 +794,7 @@ def ingest_neuroquery(max_rows=None):
         )
         # db.session.commit()
 
-    # DEPRECATED: retained only for backwards compatibility with tests and older
-    # bootstrap flows. New platform-wide studyset creation happens outside these
-    # source-specific ingest routines.
-    d = Studyset(
-        name="neuroquery",
-        description="TODO",
-        publication="eLife",
-        pmid="32129761",
-        doi="10.7554/eLife.53385",
-        public=True,
+    d = _neuroquery_studyset(
         studies=Study.query.filter_by(source="neuroquery").all(),
     )
     db.session.add(d)
@@ -0,0 +1,196 @@
+"""Bulk loading for the coordinate dataset ingesters.
+
+New rows are collected per table with pre-generated ids and written with
+PostgreSQL ``COPY`` instead of the ORM unit of work. ``COPY`` skips the ORM
+listeners, so callers compute analysis point counts while building rows,
+and they refresh the spatial grid cells and media flags once at the end.
+"""
+
+import io
+import math
+from collections import defaultdict
+
+import sqlalchemy as sa
+
+from neurostore.database import db, orjson_serializer
+from neurostore.models import BaseStudy, BaseStudyFlagOutbox, BaseStudyMetadataOutbox
+from neurostore.models.data import generate_id
+
+_UNMERGED_ATTRIBUTES = {"id", "_ts_vector", "created_at", "updated_at", "superseded_by"}
+
+
+def _csv_field(value):
+    # Every value is quoted so that only an unquoted empty field reads as NULL.
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        value = "true" if value else "false"
+    elif isinstance(value, (dict, list)):
+        value = orjson_serializer(value)
+    elif isinstance(value, float) and math.isnan(value):
+        return ""
+    else:
+        value = str(value)
+    return '"' + value.replace('"', '""') + '"'
+
+
+def copy_rows(connection, table, columns, rows):
+    """Write ``rows`` (tuples in ``columns`` order) into ``table`` with ``COPY``."""
+    if not rows:
+        return 0
+
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(",".join(_csv_field(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+
+    preparer = connection.dialect.identifier_preparer
+    statement = "COPY {} ({}) FROM STDIN WITH (FORMAT csv)".format(
+        preparer.format_table(table),
+        ", ".join(preparer.quote(column) for column in columns),
+    )
+    cursor = connection.connection.driver_connection.cursor()
+    try:
+        cursor.copy_expert(statement, buffer)
+    finally:
+        cursor.close()
+    return len(rows)
+
+
+class BulkLoader:
+    """Rows for new records, keyed by table and copied in dependency order."""
+
+    def __init__(self):
+        self._rows = defaultdict(list)
+
+    def add(self, model, **values):
+        """Queue a row; returns its id, generating one when the table has one."""
+        table = getattr(model, "__table__", model)
+        if "id" in table.c and values.get("id") is None:
+            values["id"] = generate_id()
+        self._rows[table].append(values)
+        return values.get("id")
+
+    def count(self, model):
+        return len(self._rows.get(getattr(model, "__table__", model), ()))
+
+    def copy(self, connection):
+        """``COPY`` every queued row, filling in scalar column defaults."""
+        copied = {}
+        for table in db.metadata.sorted_tables:
+            rows = self._rows.get(table)
+            if not rows:
+                continue
+
+            provided = set().union(*(row.keys() for row in rows))
+            defaults = {
+                column.name: column.default.arg
+                for column in table.c
+                if column.name not in provided
+                and column.default is not None
+                and column.default.is_scalar
+            }
+            columns = [
+                column.name
+                for column in table.c
+                if column.name in provided or column.name in defaults
+            ]
+            copied[table.name] = copy_rows(
+                connection,
+                table,
+                columns,
+                [
+                    tuple(row.get(column, defaults.get(column)) for column in columns)
+                    for row in rows
+                ],
+            )
+        self._rows.clear()
+        return copied
+
+
+class BaseStudyResolver:
+    """Matches ingested records to base studies looked up in one query.
+
+    A record matches the base studies sharing its DOI or PMID (only its PMID
+    when it has no DOI). Several matches are merged into the one carrying both
+    identifiers, as the row-by-row ingesters do. Base studies created during
+    the ingestion are tracked by the caller.
+    """
+
+    def __init__(self, dois=(), pmids=()):
+        dois = sorted({doi for doi in dois if doi})
+        pmids = sorted({pmid for pmid in pmids if pmid})
+        self._by_doi = defaultdict(list)
+        self._by_pmid = defaultdict(list)
+        if not dois and not pmids:
+            return
+
+        conditions = []
+        if dois:
+            conditions.append(BaseStudy.doi.in_(dois))
+        if pmids:
+            conditions.append(BaseStudy.pmid.in_(pmids))
+        for base_study in db.session.scalars(
+            sa.select(BaseStudy).where(sa.or_(*conditions)).order_by(BaseStudy.id)
+        ):
+            self._index(base_study)
+
+    def _index(self, base_study):
+        if base_study.doi:
+            self._by_doi[base_study.doi].append(base_study)
+        if base_study.pmid:
+            self._by_pmid[base_study.pmid].append(base_study)
+
+    def _forget(self, base_study):
+        for index, key in (
+            (self._by_doi, base_study.doi),
+            (self._by_pmid, base_study.pmid),
+        ):
+            if key and base_study in index.get(key, ()):
+                index[key].remove(base_study)
+
+    def resolve(self, doi, pmid):
+        """Return the matching base study, or ``None`` when there is none."""
+        matches = list(self._by_pmid.get(pmid, ())) if pmid else []
+        if doi:
+            matches.extend(
+                base_study
+                for base_study in self._by_doi.get(doi, ())
+                if base_study not in matches
+            )
+        if not matches:
+            return None
+        if len(matches) == 1:
+            return matches[0]
+
+        source = next(
+            (bs for bs in matches if bs.pmid == pmid and bs.doi == doi), matches[0]
+        )
+        for duplicate in matches:
+            if duplicate is not source:
+                self._merge(source, duplicate)
+        return source
+
+    def _merge(self, source, duplicate):
+        self._forget(duplicate)
+        for attribute in BaseStudy.__mapper__.column_attrs.keys():
+            if attribute in _UNMERGED_ATTRIBUTES:
+                continue
+            setattr(
+                source,
+                attribute,
+                getattr(source, attribute) or getattr(duplicate, attribute),
+            )
+        source.versions.extend(duplicate.versions)
+        db.session.execute(
+            sa.delete(BaseStudyFlagOutbox).where(
+                BaseStudyFlagOutbox.base_study_id == duplicate.id
+            )
+        )
+        db.session.execute(
+            sa.delete(BaseStudyMetadataOutbox).where(
+                BaseStudyMetadataOutbox.base_study_id == duplicate.id
+            )
+        )
+        db.session.delete(duplicate)
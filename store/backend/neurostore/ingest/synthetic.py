@@ -0,0 +1,570 @@
+"""Seeded synthetic corpus for benchmarking without a production dump.
+
+``generate_synthetic_corpus(scale, seed)`` loads ``scale`` times
+``BASE_STUDIES_PER_SCALE`` base studies with ``COPY`` (see
+``neurostore.ingest.bulk``), shaped like the production data the benchmarks
+exercise:
+
+- base studies with one to four study versions from the ingest sources;
+- analyses whose point counts follow a Zipf distribution, with coordinates
+  inside the MNI bounding box;
+- NeuroVault-style images of mixed map types on part of the studies;
+- ``TaskExtractor`` and ``ParticipantDemographicsExtractor`` results (two
+  ``TaskExtractor`` versions, so latest-result selection has work to do);
+- abstract embeddings in their own ``pipeline_embeddings`` partition, picked
+  up by the semantic search;
+- one studyset holding the newest version of every base study, with an
+  annotation noting every analysis.
+
+Every value and id is drawn from generators seeded with ``seed``, so the same
+arguments load the same corpus. Identifiers use the DOI test prefix, and a
+corpus is loaded at most once per database.
+"""
+
+import bisect
+import datetime as dt
+import itertools
+import random
+
+import shortuuid
+import sqlalchemy as sa
+
+from neurostore.database import db
+from neurostore.embeddings import DEFAULT_EMBEDDING_DIMENSIONS
+from neurostore.ingest.bulk import BulkLoader
+from neurostore.ingest.extracted_features import ensure_partition_for_config_local
+from neurostore.models import (
+    Analysis,
+    Annotation,
+    AnnotationAnalysis,
+    BaseStudy,
+    Entity,
+    Image,
+    Pipeline,
+    PipelineConfig,
+    PipelineEmbedding,
+    PipelineStudyResult,
+    Point,
+    Study,
+    Studyset,
+    Table,
+)
+from neurostore.models.data import StudysetStudy
+from neurostore.models.pipeline_latest_results import refresh_latest_results
+from neurostore.models.spatial_index import rebuild_grid_cells
+from neurostore.models.study_change_log import log_study_changes
+from neurostore.note_keys import resolve_note_key_default
+from neurostore.services.has_media_flags import recompute_media_flags
+
+BASE_STUDIES_PER_SCALE = 1000
+BATCH_SIZE = 1000
+DOI_PREFIX = "10.5555/neurostore-synthetic"
+PMID_OFFSET = 90000000
+STUDYSET_NAME = "synthetic-corpus"
+
+POINT_COUNT_EXPONENT = 1.5
+MAX_POINTS_PER_ANALYSIS = 500
+ANALYSES_PER_STUDY = (1, 2, 3, 4, 6, 8, 12)
+ANALYSES_PER_STUDY_WEIGHTS = (30, 25, 18, 12, 8, 5, 2)
+VERSIONS_PER_BASE_STUDY = (1, 2, 3, 4)
+VERSIONS_PER_BASE_STUDY_WEIGHTS = (60, 28, 9, 3)
+SOURCES = ("neurosynth", "neuroquery", "neurovault", "neurostore")
+IMAGE_STUDY_FRACTION = 0.15
+MAP_TYPES = ("T", "Z", "U", "V", "F", "P", "M", "R", "Other")
+MAP_TYPE_WEIGHTS = (35, 30, 10, 8, 5, 4, 3, 3, 2)
+TASK_RESULT_FRACTION = 0.9
+PREVIOUS_TASK_RESULT_FRACTION = 0.5
+DEMOGRAPHICS_RESULT_FRACTION = 0.85
+EMBEDDING_FRACTION = 0.95
+EXECUTED_FROM = dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)
+
+# (pipeline, version, config_hash, config_args); the embedding config matches
+# the one the semantic search resolves by default.
+TASK_PIPELINE = "TaskExtractor"
+DEMOGRAPHICS_PIPELINE = "ParticipantDemographicsExtractor"
+EMBEDDING_PIPELINE = "TextEmbeddingExtractor"
+PIPELINE_CONFIGS = (
+    (TASK_PIPELINE, "1.0.0", "synthetic-task-1.0.0", {}),
+    (TASK_PIPELINE, "1.1.0", "synthetic-task-1.1.0", {}),
+    (DEMOGRAPHICS_PIPELINE, "1.0.0", "synthetic-demographics-1.0.0", {}),
+    (
+        EMBEDDING_PIPELINE,
+        "1.0.0",
+        "synthetic-embedding-1.0.0",
+        {
+            "extractor_kwargs": {
+                "extraction_model": "text-embedding-3-small",
+                "text_source": "abstract",
+            }
+        },
+    ),
+)
+
+TOPICS = (
+    "working memory",
+    "emotion regulation",
+    "reward anticipation",
+    "language comprehension",
+    "visual attention",
+    "motor learning",
+    "episodic memory",
+    "pain perception",
+    "social cognition",
+    "decision making",
+    "inhibitory control",
+    "face processing",
+    "fear conditioning",
+    "semantic memory",
+    "auditory perception",
+    "resting state connectivity",
+)
+POPULATIONS = (
+    "healthy adults",
+    "older adults",
+    "adolescents",
+    "patients with schizophrenia",
+    "patients with major depression",
+    "children with ADHD",
+    "individuals with autism",
+    "patients with Parkinson's disease",
+)
+METHODS = (
+    "an fMRI study",
+    "a meta-analysis",
+    "a PET study",
+    "a longitudinal fMRI study",
+    "an event-related fMRI study",
+)
+REGIONS = (
+    "dorsolateral prefrontal cortex",
+    "anterior cingulate cortex",
+    "amygdala",
+    "hippocampus",
+    "ventral striatum",
+    "insula",
+    "posterior parietal cortex",
+    "fusiform gyrus",
+    "superior temporal sulcus",
+    "cerebellum",
+)
+JOURNALS = (
+    "NeuroImage",
+    "Human Brain Mapping",
+    "Cerebral Cortex",
+    "Journal of Neuroscience",
+    "Brain",
+    "Biological Psychiatry",
+    "Cortex",
+    "Neuropsychologia",
+)
+SURNAMES = (
+    "Smith",
+    "Garcia",
+    "Chen",
+    "Müller",
+    "Kim",
+    "Rossi",
+    "Nguyen",
+    "Okafor",
+    "Johansson",
+    "Patel",
+    "Dubois",
+    "Tanaka",
+)
+TASKS = (
+    ("N-back task", "Participants monitored letters for repeats.", "Memory"),
+    ("Stroop task", "Participants named the ink colour of words.", "Executive"),
+    ("Go/No-Go task", "Participants withheld responses to rare cues.", "Executive"),
+    ("Monetary incentive delay", "Participants responded for cash.", "Reward"),
+    ("Face matching task", "Participants matched emotional faces.", "Emotion"),
+    ("Resting-state fMRI", "Participants rested with eyes closed.", "Attention"),
+    ("Finger tapping", "Participants tapped in time with a cue.", "Motor"),
+    ("Story comprehension", "Participants listened to short stories.", "Language"),
+)
+DIAGNOSES = ("healthy", "schizophrenia", "MDD", "ADHD", "autism", "Parkinson's")
+CONTRASTS = ("task > baseline", "condition A > condition B", "patients > controls")
+
+MNI_BOUNDS = ((-90, 90), (-126, 90), (-72, 108))
+_ID_ALPHABET = shortuuid.get_alphabet()
+
+
+class _Generator:
+    """Draws the corpus rows from generators seeded with ``seed``."""
+
+    def __init__(self, seed, embedding_dimensions):
+        # Ids and embeddings come from generators of their own, so changing
+        # the embedding size leaves every other value as it was.
+        self.rng = random.Random(f"corpus-{seed}")
+        self.id_rng = random.Random(f"ids-{seed}")
+        self.embedding_rng = random.Random(f"embeddings-{seed}")
+        self.embedding_dimensions = embedding_dimensions
+        self.point_counts = list(range(1, MAX_POINTS_PER_ANALYSIS + 1))
+        self.point_count_weights = list(
+            itertools.accumulate(
+                count**-POINT_COUNT_EXPONENT for count in self.point_counts
+            )
+        )
+
+    def new_id(self):
+        return "".join(self.id_rng.choices(_ID_ALPHABET, k=12))
+
+    def point_count(self):
+        draw = self.rng.random() * self.point_count_weights[-1]
+        return self.point_counts[bisect.bisect(self.point_count_weights, draw)]
+
+    def weighted(self, values, weights):
+        return self.rng.choices(values, weights)[0]
+
+    def executed_at(self):
+        return EXECUTED_FROM + dt.timedelta(seconds=self.rng.randrange(365 * 86400))
+
+    def base_study(self, number):
+        rng = self.rng
+        topic = rng.choice(TOPICS)
+        population = rng.choice(POPULATIONS)
+        region = rng.choice(REGIONS)
+        name = f"Neural correlates of {topic} in {population}: {rng.choice(METHODS)}"
+        description = (
+            f"We examined {topic} in {population}. "
+            f"Activation in the {region} scaled with task demands, and "
+            f"connectivity between the {region} and the {rng.choice(REGIONS)} "
+            f"differed across conditions. These findings inform models of {topic}."
+        )
+        authors = ", ".join(
+            f"{surname} {rng.choice('ABCDEFGHJKLMNPRST')}"
+            for surname in rng.sample(SURNAMES, rng.randint(2, 6))
+        )
+        return {
+            "id": self.new_id(),
+            "name": name,
+            "description": description,
+            "publication": rng.choice(JOURNALS),
+            "doi": f"{DOI_PREFIX}.{number}",
+            "pmid": str(PMID_OFFSET + number) if rng.random() < 0.9 else None,
+            "pmcid": f"PMC{PMID_OFFSET + number}" if rng.random() < 0.4 else None,
+            "authors": authors,
+            "year": rng.randint(1995, 2025),
+            "level": "group",
+            "is_oa": rng.random() < 0.5,
+        }
+
+    def coordinates(self):
+        return tuple(round(self.rng.uniform(low, high), 1) for low, high in MNI_BOUNDS)
+
+    def task_result(self):
+        rng = self.rng
+        tasks = []
+        for task_name, description, domain in rng.sample(TASKS, rng.randint(1, 2)):
+            resting = task_name == "Resting-state fMRI"
+            tasks.append(
+                {
+                    "TaskName": task_name,
+                    "TaskDescription": description,
+                    "DesignDetails": rng.choice(("Block design", "Event-related")),
+                    "Conditions": None if resting else ["task", "control"],
+                    "TaskMetrics": ["Reaction time", "Accuracy"],
+                    "Concepts": [rng.choice(TOPICS)],
+                    "Domain": [domain],
+                    "RestingState": resting,
+                    "RestingStateMetadata": (
+                        {"EyesOpenClosed": "Eyes closed"} if resting else None
+                    ),
+                    "TaskDesign": [rng.choice(("Blocked", "EventRelated", "Other"))],
+                    "TaskDuration": f"{rng.randint(5, 60)} minutes",
+                }
+            )
+        return {
+            "Modality": ["fMRI-BOLD"],
+            "StudyObjective": f"To examine {rng.choice(TOPICS)}.",
+            "Exclude": None,
+            "fMRITasks": tasks,
+            "BehavioralTasks": None,
+        }
+
+    def demographics_result(self):
+        rng = self.rng
+        groups = []
+        for group_number in range(rng.choice((1, 1, 2, 3))):
+            count = max(int(rng.lognormvariate(3.2, 0.6)), 5)
+            female = rng.randint(0, count)
+            groups.append(
+                {
+                    "count": count,
+                    "diagnosis": rng.choice(DIAGNOSES),
+                    "group_name": "healthy" if group_number == 0 else "patients",
+                    "subgroup_name": None,
+                    "male_count": count - female,
+                    "female_count": female,
+                    "age_mean": round(rng.uniform(8, 75), 1),
+                    "age_minimum": None,
+                    "age_maximum": None,
+                    "age_median": None,
+                    "imaging_sample": "yes",
+                }
+            )
+        return {"groups": groups}
+
+    def embedding(self):
+        gauss = self.embedding_rng.gauss
+        vector = [gauss(0.0, 1.0) for _ in range(self.embedding_dimensions)]
+        norm = sum(value * value for value in vector) ** 0.5 or 1.0
+        return [round(value / norm, 6) for value in vector]
+
+
+def _ensure_pipeline_configs(generator, embedding_dimensions):
+    """Return ``{(pipeline, version): config_id}``, creating missing rows."""
+    config_ids = {}
+    for name, version, config_hash, config_args in PIPELINE_CONFIGS:
+        pipeline = db.session.scalar(sa.select(Pipeline).where(Pipeline.name == name))
+        if pipeline is None:
+            pipeline = Pipeline(id=generator.new_id(), name=name)
+            db.session.add(pipeline)
+            db.session.flush()
+        is_embedding = name == EMBEDDING_PIPELINE
+        config = db.session.scalar(
+            sa.select(PipelineConfig).where(
+                PipelineConfig.pipeline_id == pipeline.id,
+                PipelineConfig.version == version,
+                PipelineConfig.config_hash == config_hash,
+            )
+        )
+        if config is None:
+            config = PipelineConfig(
+                id=generator.new_id(),
+                pipeline_id=pipeline.id,
+                version=version,
+                config_hash=config_hash,
+                config_args=config_args,
+                has_embeddings=is_embedding,
+                embedding_dimensions=embedding_dimensions if is_embedding else 0,
+            )
+            db.session.add(config)
+            db.session.flush()
+        config_ids[(name, version)] = config.id
+    return config_ids
+
+
+def _queue_base_study(loader, generator, number, config_ids, studyset, annotation):
+    """Queue a base study with its versions and pipeline results; returns its id.
+
+    The newest version joins the studyset, and its analyses the annotation.
+    """
+    rng = generator.rng
+    base_study = generator.base_study(number)
+    base_study_id = loader.add(BaseStudy, **base_study)
+
+    version_count = generator.weighted(
+        VERSIONS_PER_BASE_STUDY, VERSIONS_PER_BASE_STUDY_WEIGHTS
+    )
+    sources = rng.sample(SOURCES, version_count)
+    has_images = rng.random() < IMAGE_STUDY_FRACTION
+    study_info = {
+        key: value for key, value in base_study.items() if key not in ("id", "is_oa")
+    }
+    newest = None
+    for version, source in enumerate(sources):
+        study_id = loader.add(
+            Study,
+            id=generator.new_id(),
+            **study_info,
+            source=source,
+            source_id=f"{source}-{number}",
+            source_updated_at=EXECUTED_FROM
+            - dt.timedelta(days=version_count - version),
+            base_study_id=base_study_id,
+        )
+        analyses = []
+        for order in range(
+            generator.weighted(ANALYSES_PER_STUDY, ANALYSES_PER_STUDY_WEIGHTS)
+        ):
+            name = f"{rng.choice(CONTRASTS)} ({order + 1})"
+            table_id = loader.add(
+                Table,
+                id=generator.new_id(),
+                t_id=str(order),
+                name=name,
+                study_id=study_id,
+            )
+            point_count = generator.point_count()
+            analysis_id = loader.add(
+                Analysis,
+                id=generator.new_id(),
+                name=name,
+                study_id=study_id,
+                order=order,
+                table_id=table_id,
+                # COPY bypasses the point-count listeners.
+                point_count=point_count,
+            )
+            analyses.append(analysis_id)
+            loader.add(
+                Entity,
+                id=generator.new_id(),
+                label=name,
+                level="group",
+                analysis_id=analysis_id,
+            )
+            for point_order in range(point_count):
+                x, y, z = generator.coordinates()
+                loader.add(
+                    Point,
+                    id=generator.new_id(),
+                    x=x,
+                    y=y,
+                    z=z,
+                    space="MNI",
+                    kind="unknown",
+                    analysis_id=analysis_id,
+                    order=point_order,
+                )
+            if has_images and source == "neurovault":
+                for _ in range(rng.randint(1, 3)):
+                    image_id = generator.new_id()
+                    loader.add(
+                        Image,
+                        id=image_id,
+                        url=f"https://neurovault.org/media/images/{image_id}.nii.gz",
+                        filename=f"{image_id}.nii.gz",
+                        space="MNI",
+                        value_type=generator.weighted(MAP_TYPES, MAP_TYPE_WEIGHTS),
+                        analysis_id=analysis_id,
+                        study_id=study_id,
+                        add_date=generator.executed_at(),
+                    )
+        newest = (study_id, analyses)
+
+    study_id, analyses = newest
+    loader.add(StudysetStudy, study_id=study_id, studyset_id=studyset.id)
+    for analysis_id in analyses:
+        loader.add(
+            AnnotationAnalysis,
+            annotation_id=annotation.id,
+            analysis_id=analysis_id,
+            study_id=study_id,
+            studyset_id=studyset.id,
+            note={
+                "included": rng.random() < 0.8,
+                "contrast_type": rng.choice(("activation", "deactivation")),
+                "sample_size": max(int(rng.lognormvariate(3.2, 0.6)), 5),
+            },
+        )
+
+    results = []
+    if rng.random() < TASK_RESULT_FRACTION:
+        if rng.random() < PREVIOUS_TASK_RESULT_FRACTION:
+            results.append(((TASK_PIPELINE, "1.0.0"), generator.task_result()))
+        results.append(((TASK_PIPELINE, "1.1.0"), generator.task_result()))
+    if rng.random() < DEMOGRAPHICS_RESULT_FRACTION:
+        results.append(
+            ((DEMOGRAPHICS_PIPELINE, "1.0.0"), generator.demographics_result())
+        )
+    for config_key, result_data in results:
+        loader.add(
+            PipelineStudyResult,
+            id=generator.new_id(),
+            config_id=config_ids[config_key],
+            base_study_id=base_study_id,
+            date_executed=generator.executed_at(),
+            result_data=result_data,
+            status="SUCCESS",
+        )
+    if rng.random() < EMBEDDING_FRACTION:
+        loader.add(
+            PipelineEmbedding,
+            id=generator.new_id(),
+            config_id=config_ids[(EMBEDDING_PIPELINE, "1.0.0")],
+            base_study_id=base_study_id,
+            date_executed=generator.executed_at(),
+            status="SUCCESS",
+            embedding=generator.embedding(),
+        )
+    return base_study_id
+
+
+def generate_synthetic_corpus(
+    scale=1,
+    seed=0,
+    *,
+    embedding_dimensions=DEFAULT_EMBEDDING_DIMENSIONS,
+    batch_size=BATCH_SIZE,
+    progress=None,
+):
+    """Load the synthetic corpus of ``scale`` and ``seed``; returns row counts.
+
+    Rows are copied ``batch_size`` base studies at a time in one transaction.
+    ``progress(loaded, total)`` is called after every batch.
+    """
+    scale = int(scale)
+    if scale < 1:
+        raise ValueError("scale must be a positive integer")
+    if db.session.scalar(
+        sa.select(sa.exists().where(BaseStudy.doi.startswith(DOI_PREFIX)))
+    ):
+        raise ValueError(
+            "A synthetic corpus is already loaded; restore or recreate the "
+            "database before generating another one."
+        )
+
+    generator = _Generator(seed, embedding_dimensions)
+    total = scale * BASE_STUDIES_PER_SCALE
+    config_ids = _ensure_pipeline_configs(generator, embedding_dimensions)
+    ensure_partition_for_config_local(
+        db.session,
+        config_ids[(EMBEDDING_PIPELINE, "1.0.0")],
+        embedding_dimensions,
+    )
+
+    studyset = Studyset(
+        id=generator.new_id(),
+        name=STUDYSET_NAME,
+        description=f"Synthetic corpus at scale {scale} (seed {seed}).",
+    )
+    note_types = {
+        "included": "boolean",
+        "contrast_type": "string",
+        "sample_size": "number",
+    }
+    annotation = Annotation(
+        id=generator.new_id(),
+        name=STUDYSET_NAME,
+        source="neurostore",
+        studyset=studyset,
+        note_keys={
+            key: {
+                "type": note_type,
+                "order": order,
+                "default": resolve_note_key_default(key, note_type),
+            }
+            for order, (key, note_type) in enumerate(note_types.items())
+        },
+    )
+    db.session.add_all([studyset, annotation])
+    db.session.flush()
+
+    connection = db.session.connection()
+    counts = {}
+    base_study_ids = []
+    loader = BulkLoader()
+    for number in range(1, total + 1):
+        base_study_ids.append(
+            _queue_base_study(
+                loader, generator, number, config_ids, studyset, annotation
+            )
+        )
+        if number % batch_size == 0 or number == total:
+            for table, count in loader.copy(connection).items():
+                counts[table] = counts.get(table, 0) + count
+            if progress is not None:
+                progress(number, total)
+
+    rebuild_grid_cells(connection, base_study_ids)
+    refresh_latest_results(connection)
+    log_study_changes(connection, base_study_ids=base_study_ids)
+    db.session.commit()
+    db.session.remove()
+    for start in range(0, total, batch_size):
+        end = start + batch_size
+        recompute_media_flags(base_study_ids[start:end])
+        db.session.commit()
+    db.session.remove()
+    return counts
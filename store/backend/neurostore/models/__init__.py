@@ -6,6 +6,7 @@ from neurostore.models.data import (
     AnnotationAnalysis,
     BaseStudy,
     BaseStudyFlagOutbox,
+    BaseStudyGridCell,
     BaseStudyMetadataOutbox,
     Condition,
     Entity,
@@ -13,10 +14,13 @@ from neurostore.models.data import (
     Pipeline,
     PipelineConfig,
     PipelineEmbedding,
+    PipelineLatestResult,
     PipelineStudyResult,
     Point,
     PointValue,
+    ProviderResponse,
     Study,
+    StudyChangeLog,
     Studyset,
     StudysetStudy,
     Table,
@@ -28,6 +32,7 @@ __all__ = [
     "Annotation",
     "BaseStudy",
     "BaseStudyFlagOutbox",
+    "BaseStudyGridCell",
     "BaseStudyMetadataOutbox",
     "Study",
     "Analysis",
@@ -45,4 +50,7 @@ __all__ = [
     "PipelineConfig",
     "PipelineStudyResult",
     "PipelineEmbedding",
+    "PipelineLatestResult",
+    "ProviderResponse",
+    "StudyChangeLog",
 ]
@@ -341,135 +341,147 @@ class BaseStudy(BaseMixin, db.Model):
                                            "PipelineName:version:field_path(operator)value"
                                            Only show results matching these configs.
         """
-        if not pipelines:
-            return {}
-
-        # Parse pipeline names and versions
-        pipeline_specs = {}
-        for pipeline in pipelines:
-            parts = pipeline.split(":", 1)
-            if len(parts) == 2:
-                name, version = parts
-                pipeline_specs[name] = version
-            else:
-                pipeline_specs[parts[0]] = None
-
-        # Parse pipeline configs and match with pipeline specs
-        config_filters = []
-        if pipeline_configs:
-            for pipeline_config in pipeline_configs:
-                try:
-                    pipeline_name, version, field_path, operator, value = (
-                        parse_json_filter(pipeline_config)
+        return load_display_features([self.id], pipelines, pipeline_configs).get(
+            self.id, {}
+        )
+
+
+def load_display_features(base_study_ids, pipelines=None, pipeline_configs=None):
+    """
+    Pipeline features of many base studies, keyed by base study id.
+
+    Runs one query for all ids; see ``BaseStudy.display_features`` for the
+    meaning of ``pipelines`` and ``pipeline_configs``. Base studies without
+    matching results are left out.
+    """
+    base_study_ids = sorted({id_ for id_ in base_study_ids if id_})
+    if not pipelines or not base_study_ids:
+        return {}
+
+    # Parse pipeline names and versions
+    pipeline_specs = {}
+    for pipeline in pipelines:
+        parts = pipeline.split(":", 1)
+        if len(parts) == 2:
+            name, version = parts
+            pipeline_specs[name] = version
+        else:
+            pipeline_specs[parts[0]] = None
+
+    # Parse pipeline configs and match with pipeline specs
+    config_filters = []
+    if pipeline_configs:
+        for pipeline_config in pipeline_configs:
+            try:
+                pipeline_name, version, field_path, operator, value = parse_json_filter(
+                    pipeline_config
+                )
+
+                # Only process if pipeline is in pipelines list
+                if pipeline_name in pipeline_specs:
+                    pipeline_version = pipeline_specs[pipeline_name]
+
+                    # Skip if pipeline specifies version but config doesn't match
+                    if pipeline_version and version and pipeline_version != version:
+                        continue
+
+                    # Use pipeline version if config doesn't specify one
+                    version_to_use = version or pipeline_version
+
+                    config_filters.append(
+                        {
+                            "pipeline_name": pipeline_name,
+                            "version": version_to_use,
+                            "field_path": field_path,
+                            "operator": operator,
+                            "value": value,
+                        }
                     )
+            except ValueError:
+                continue
+
+    # Create aliases for the tables
+    PipelineAlias = aliased(Pipeline)
+    PipelineConfigAlias = aliased(PipelineConfig)
+    PipelineStudyResultAlias = aliased(PipelineStudyResult)
+
+    # Base query
+    query = (
+        db.session.query(
+            PipelineStudyResultAlias.base_study_id,
+            PipelineStudyResultAlias.result_data,
+            PipelineAlias.name.label("pipeline_name"),
+        )
+        .join(
+            PipelineConfigAlias,
+            PipelineStudyResultAlias.config_id == PipelineConfigAlias.id,
+        )
+        .join(PipelineAlias, PipelineConfigAlias.pipeline_id == PipelineAlias.id)
+        .filter(PipelineStudyResultAlias.base_study_id.in_(base_study_ids))
+        .filter(PipelineAlias.name.in_(pipeline_specs.keys()))
+    )
+
+    # Apply config filters if any exist
+    if config_filters:
+        for config in config_filters:
+            conditions = [PipelineAlias.name == config["pipeline_name"]]
+
+            if config["version"]:
+                conditions.append(PipelineConfigAlias.version == config["version"])
+
+            jsonpath = build_jsonpath(
+                config["field_path"], config["operator"], config["value"]
+            )
+            conditions.append(
+                text("jsonb_path_exists(config_args, :jsonpath)").params(
+                    jsonpath=jsonpath
+                )
+            )
 
-                    # Only process if pipeline is in pipelines list
-                    if pipeline_name in pipeline_specs:
-                        pipeline_version = pipeline_specs[pipeline_name]
-
-                        # Skip if pipeline specifies version but config doesn't match
-                        if pipeline_version and version and pipeline_version != version:
-                            continue
-
-                        # Use pipeline version if config doesn't specify one
-                        version_to_use = version or pipeline_version
-
-                        config_filters.append(
-                            {
-                                "pipeline_name": pipeline_name,
-                                "version": version_to_use,
-                                "field_path": field_path,
-                                "operator": operator,
-                                "value": value,
-                            }
-                        )
-                except ValueError:
-                    continue
-
-        # Create aliases for the tables
-        PipelineAlias = aliased(Pipeline)
-        PipelineConfigAlias = aliased(PipelineConfig)
-        PipelineStudyResultAlias = aliased(PipelineStudyResult)
-
-        # Base query
-        query = (
+            query = query.filter(*conditions)
+    else:
+        # If no config filters, just use latest version for each pipeline
+        latest_results = (
             db.session.query(
-                PipelineStudyResultAlias.result_data,
+                PipelineStudyResultAlias.base_study_id,
                 PipelineAlias.name.label("pipeline_name"),
+                func.max(PipelineStudyResultAlias.date_executed).label("max_date"),
             )
             .join(
                 PipelineConfigAlias,
                 PipelineStudyResultAlias.config_id == PipelineConfigAlias.id,
             )
             .join(PipelineAlias, PipelineConfigAlias.pipeline_id == PipelineAlias.id)
-            .filter(PipelineStudyResultAlias.base_study_id == self.id)
+            .filter(PipelineStudyResultAlias.base_study_id.in_(base_study_ids))
             .filter(PipelineAlias.name.in_(pipeline_specs.keys()))
+            .group_by(PipelineStudyResultAlias.base_study_id, PipelineAlias.name)
+            .subquery()
         )
 
-        # Apply config filters if any exist
-        if config_filters:
-            for config in config_filters:
-                conditions = [PipelineAlias.name == config["pipeline_name"]]
-
-                if config["version"]:
-                    conditions.append(PipelineConfigAlias.version == config["version"])
-
-                jsonpath = build_jsonpath(
-                    config["field_path"], config["operator"], config["value"]
-                )
-                conditions.append(
-                    text("jsonb_path_exists(config_args, :jsonpath)").params(
-                        jsonpath=jsonpath
-                    )
-                )
-
-                query = query.filter(*conditions)
-        else:
-            # If no config filters, just use latest version for each pipeline
-            latest_results = (
-                db.session.query(
-                    PipelineStudyResultAlias.base_study_id,
-                    PipelineAlias.name.label("pipeline_name"),
-                    func.max(PipelineStudyResultAlias.date_executed).label("max_date"),
-                )
-                .join(
-                    PipelineConfigAlias,
-                    PipelineStudyResultAlias.config_id == PipelineConfigAlias.id,
+        # Add version filters from pipeline specs
+        for name, version in pipeline_specs.items():
+            if version:
+                query = query.filter(
+                    (PipelineAlias.name != name)
+                    | (PipelineConfigAlias.version == version)
                 )
-                .join(
-                    PipelineAlias, PipelineConfigAlias.pipeline_id == PipelineAlias.id
-                )
-                .filter(PipelineStudyResultAlias.base_study_id == self.id)
-                .filter(PipelineAlias.name.in_(pipeline_specs.keys()))
-                .group_by(PipelineStudyResultAlias.base_study_id, PipelineAlias.name)
-                .subquery()
-            )
-
-            # Add version filters from pipeline specs
-            for name, version in pipeline_specs.items():
-                if version:
-                    query = query.filter(
-                        (PipelineAlias.name != name)
-                        | (PipelineConfigAlias.version == version)
-                    )
 
-            query = query.join(
-                latest_results,
-                (
-                    PipelineStudyResultAlias.base_study_id
-                    == latest_results.c.base_study_id
-                )
-                & (PipelineAlias.name == latest_results.c.pipeline_name)
-                & (PipelineStudyResultAlias.date_executed == latest_results.c.max_date),
-            )
+        query = query.join(
+            latest_results,
+            (PipelineStudyResultAlias.base_study_id == latest_results.c.base_study_id)
+            & (PipelineAlias.name == latest_results.c.pipeline_name)
+            & (PipelineStudyResultAlias.date_executed == latest_results.c.max_date),
+        )
 
-        # Execute query and build response
-        results = query.all()
-        features = {}
-        for result in results:
-            features[result.pipeline_name] = result.result_data
+    # Execute query and build response
+    results = query.all()
+    features = {}
+    for result in results:
+        features.setdefault(result.base_study_id, {})[
+            result.pipeline_name
+        ] = result.result_data
 
-        return features
+    return features
 
 
 class BaseStudyFlagOutbox(db.Model):
@@ -519,6 +531,61 @@ class BaseStudyMetadataOutbox(db.Model):
     )
 
 
+class ProviderResponse(db.Model):
+    """Parsed metadata-provider response for one normalized identifier.
+
+    Maintained by ``neurostore.services.provider_response_cache``; a ``NULL``
+    ``response`` records that the provider had nothing for the identifier.
+    """
+
+    __tablename__ = "provider_responses"
+
+    provider = db.Column(db.Text, primary_key=True)
+    lookup_key = db.Column(db.Text, primary_key=True)
+    response = db.Column(JSONB(none_as_null=True), nullable=True)
+    fetched_at = db.Column(
+        db.DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    expires_at = db.Column(db.DateTime(timezone=True), nullable=False, index=True)
+
+
+class StudyChangeLog(db.Model):
+    """A study or base study whose release-visible data changed.
+
+    Written by ``neurostore.models.study_change_log`` and drained by the
+    studyset release builder; ``id`` increases with every change recorded.
+    """
+
+    __tablename__ = "study_change_log"
+
+    id = db.Column(db.BigInteger, db.Identity(), primary_key=True)
+    # See BaseStudyFlagOutbox for why there's deliberately no FK here; changes
+    # to deleted studies have to stay in the log.
+    study_id = db.Column(db.Text, nullable=True)
+    base_study_id = db.Column(db.Text, nullable=True)
+    changed_at = db.Column(
+        db.DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+class BaseStudyGridCell(db.Model):
+    """Coarse voxel cells containing at least one coordinate of a base study.
+
+    Maintained by ``neurostore.models.spatial_index``; radius searches resolve
+    candidate base studies from this table before checking exact distances.
+    """
+
+    __tablename__ = "base_study_grid_cells"
+
+    # The cell columns lead the primary key so sphere lookups are index-only.
+    cell_x = db.Column(db.Integer, primary_key=True)
+    cell_y = db.Column(db.Integer, primary_key=True)
+    cell_z = db.Column(db.Integer, primary_key=True)
+    # See BaseStudyFlagOutbox for why there's deliberately no FK here; rows of
+    # deleted base studies are removed by the spatial index listeners.
+    base_study_id = db.Column(db.Text, primary_key=True, index=True)
+
+
 class Study(BaseMixin, db.Model):
     __tablename__ = "studies"
 
@@ -973,6 +1040,43 @@ class PipelineStudyResult(BaseMixin, db.Model):
     )
 
 
+class PipelineLatestResult(db.Model):
+    """Newest result of each base study for every pipeline version.
+
+    Maintained by ``neurostore.models.pipeline_latest_results``; feature filters
+    match against this table instead of every historical result.
+    """
+
+    __tablename__ = "pipeline_latest_results"
+    __table_args__ = (
+        sa.Index(
+            "ix_pipeline_latest_results_pipeline_id_base_study_id",
+            "pipeline_id",
+            "base_study_id",
+        ),
+        sa.Index(
+            "ix_pipeline_latest_results__result_data",
+            "result_data",
+            postgresql_using="gin",
+            postgresql_ops={"result_data": "jsonb_path_ops"},
+        ),
+    )
+
+    result_id = db.Column(
+        db.Text,
+        db.ForeignKey("pipeline_study_results.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    base_study_id = db.Column(db.Text, nullable=False, index=True)
+    pipeline_id = db.Column(db.Text, nullable=False)
+    config_id = db.Column(db.Text, nullable=False)
+    version = db.Column(db.String)
+    date_executed = db.Column(db.DateTime(timezone=True), nullable=False)
+    result_data = db.Column(JSONB)
+    # Whether no other version of the pipeline ran later for this base study.
+    is_latest = db.Column(db.Boolean, nullable=False)
+
+
 class PipelineEmbedding(db.Model):
     __tablename__ = "pipeline_embeddings"
     # Partition by LIST on config_id (parent table)
@@ -1000,6 +1104,12 @@ class PipelineEmbedding(db.Model):
     embedding = db.Column(VectorType(), nullable=False)
 
 
+from neurostore.models import pipeline_latest_results  # noqa E402
 from neurostore.models import point_count_listeners  # noqa E402
+from neurostore.models import spatial_index  # noqa E402
+from neurostore.models import study_change_log  # noqa E402
 
+del pipeline_latest_results
 del point_count_listeners
+del spatial_index
+del study_change_log
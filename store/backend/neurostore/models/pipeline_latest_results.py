@@ -0,0 +1,196 @@
+"""Projection of the newest pipeline result per base study and version.
+
+``pipeline_latest_results`` holds, for every base study, pipeline and config
+version, the result with the latest ``date_executed`` (ties go to the highest
+id) along with a copy of its ``result_data``. ``is_latest`` marks the rows no
+other version of the same pipeline ran after. Feature filters match these rows
+through a GIN ``jsonb_path_ops`` index instead of grouping every historical
+result.
+
+Result and config changes only mark the affected base studies and pipelines;
+their projection rows are recomputed once per flush.
+"""
+
+import sqlalchemy as sa
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from neurostore.models.data import PipelineConfig, PipelineStudyResult
+
+_DIRTY_KEY = "pipeline_latest_results_dirty"
+
+
+def refresh_latest_results(connection, keys=None, pipeline_ids=None):
+    """Recompute the rows of ``(base_study_id, pipeline_id)`` keys and pipelines.
+
+    Every row is rebuilt when neither ``keys`` nor ``pipeline_ids`` is given.
+    """
+    params = {}
+    scopes = []
+    if keys is not None or pipeline_ids is not None:
+        keys = sorted({key for key in keys or () if all(key)})
+        pipeline_ids = sorted({id_ for id_ in pipeline_ids or () if id_})
+        if keys:
+            params["scope_base_study_ids"] = [key[0] for key in keys]
+            params["scope_pipeline_ids"] = [key[1] for key in keys]
+            scopes.append(
+                "({base_study_id}, {pipeline_id}) IN ("
+                "SELECT * FROM unnest("
+                "CAST(:scope_base_study_ids AS text[]), "
+                "CAST(:scope_pipeline_ids AS text[])))"
+            )
+        if pipeline_ids:
+            params["pipeline_ids"] = pipeline_ids
+            scopes.append("{pipeline_id} = ANY(:pipeline_ids)")
+        if not scopes:
+            return
+
+    def scope(base_study_id, pipeline_id, keyword):
+        if not scopes:
+            return ""
+        condition = " OR ".join(
+            fragment.format(base_study_id=base_study_id, pipeline_id=pipeline_id)
+            for fragment in scopes
+        )
+        return f"{keyword} ({condition})"
+
+    connection.execute(
+        sa.text(
+            "DELETE FROM pipeline_latest_results "
+            + scope("base_study_id", "pipeline_id", "WHERE")
+        ),
+        params,
+    )
+    connection.execute(
+        sa.text(
+            f"""
+            INSERT INTO pipeline_latest_results (
+                result_id, base_study_id, pipeline_id, config_id, version,
+                date_executed, result_data, is_latest
+            )
+            SELECT
+                latest.id,
+                latest.base_study_id,
+                latest.pipeline_id,
+                latest.config_id,
+                latest.version,
+                latest.date_executed,
+                latest.result_data,
+                latest.date_executed = max(latest.date_executed) OVER (
+                    PARTITION BY latest.base_study_id, latest.pipeline_id
+                )
+            FROM (
+                SELECT DISTINCT ON (r.base_study_id, c.pipeline_id, c.version)
+                    r.id,
+                    r.base_study_id,
+                    c.pipeline_id,
+                    r.config_id,
+                    c.version,
+                    r.date_executed,
+                    r.result_data
+                FROM pipeline_study_results AS r
+                JOIN pipeline_configs AS c ON c.id = r.config_id
+                WHERE r.base_study_id IS NOT NULL
+                  AND c.pipeline_id IS NOT NULL
+                  AND r.date_executed IS NOT NULL
+                  {scope("r.base_study_id", "c.pipeline_id", "AND")}
+                ORDER BY
+                    r.base_study_id,
+                    c.pipeline_id,
+                    c.version,
+                    r.date_executed DESC,
+                    r.id DESC
+            ) AS latest
+            """
+        ),
+        params,
+    )
+
+
+def _dirty(target):
+    session = object_session(target)
+    if session is None:
+        return None
+    return session.info.setdefault(
+        _DIRTY_KEY, {"result_keys": set(), "pipeline_ids": set()}
+    )
+
+
+def _changed_values(target, attribute):
+    history = getattr(inspect(target).attrs, attribute).history
+    return {getattr(target, attribute), *history.deleted}
+
+
+@event.listens_for(PipelineStudyResult, "after_insert")
+@event.listens_for(PipelineStudyResult, "after_delete")
+def _mark_result(_mapper, _connection, target):
+    dirty = _dirty(target)
+    if dirty is not None:
+        dirty["result_keys"].add((target.base_study_id, target.config_id))
+
+
+@event.listens_for(PipelineStudyResult, "after_update")
+def _mark_updated_result(_mapper, _connection, target):
+    state = inspect(target)
+    if not any(
+        getattr(state.attrs, name).history.has_changes()
+        for name in ("base_study_id", "config_id", "date_executed", "result_data")
+    ):
+        return
+    dirty = _dirty(target)
+    if dirty is None:
+        return
+    for base_study_id in _changed_values(target, "base_study_id"):
+        for config_id in _changed_values(target, "config_id"):
+            dirty["result_keys"].add((base_study_id, config_id))
+
+
+@event.listens_for(PipelineConfig, "after_update")
+def _mark_updated_config(_mapper, _connection, target):
+    state = inspect(target)
+    if not any(
+        getattr(state.attrs, name).history.has_changes()
+        for name in ("pipeline_id", "version")
+    ):
+        return
+    dirty = _dirty(target)
+    if dirty is not None:
+        dirty["pipeline_ids"].update(_changed_values(target, "pipeline_id"))
+
+
+@event.listens_for(PipelineConfig, "after_delete")
+def _mark_deleted_config(_mapper, _connection, target):
+    # Its results go with it through the database cascade, unseen by the ORM.
+    dirty = _dirty(target)
+    if dirty is not None:
+        dirty["pipeline_ids"].add(target.pipeline_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_dirty_results(session, _flush_context):
+    dirty = session.info.pop(_DIRTY_KEY, None)
+    if not dirty:
+        return
+
+    connection = session.connection()
+    result_keys = {key for key in dirty["result_keys"] if all(key)}
+    keys = set()
+    if result_keys:
+        pipeline_by_config = dict(
+            connection.execute(
+                sa.select(PipelineConfig.id, PipelineConfig.pipeline_id).where(
+                    PipelineConfig.id.in_({config_id for _, config_id in result_keys})
+                )
+            ).all()
+        )
+        keys = {
+            (base_study_id, pipeline_by_config[config_id])
+            for base_study_id, config_id in result_keys
+            if pipeline_by_config.get(config_id)
+        }
+    refresh_latest_results(connection, keys, dirty["pipeline_ids"])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dirty_results(session):
+    session.info.pop(_DIRTY_KEY, None)
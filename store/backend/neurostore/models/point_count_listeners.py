@@ -1,45 +1,91 @@
+"""Keep ``analyses.point_count`` in step with ``points``.
+
+Point changes only mark their analyses on the session; every marked analysis
+is recounted with one grouped ``UPDATE`` per flush.
+"""
+
+import threading
+
 import sqlalchemy as sa
 from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
 
 from neurostore.models.data import Point
 
+_DIRTY_KEY = "point_count_dirty"
+
+_stats_lock = threading.Lock()
+_stats = {"statements": 0, "analyses": 0}
+
+
+def point_count_stats():
+    """Recount statements issued by this process and the analyses they covered."""
+    with _stats_lock:
+        return dict(_stats)
+
 
-def _sync_analysis_point_count(connection, analysis_id):
-    if not analysis_id:
+def sync_analysis_point_counts(connection, analysis_ids):
+    analysis_ids = sorted({analysis_id for analysis_id in analysis_ids if analysis_id})
+    if not analysis_ids:
         return
 
     connection.execute(
         sa.text(
             """
-            UPDATE analyses
-            SET point_count = (
-                SELECT COUNT(*)::integer
-                FROM points
-                WHERE analysis_id = :analysis_id
-            )
-            WHERE id = :analysis_id
+            UPDATE analyses AS a
+            SET point_count = counts.point_count
+            FROM (
+                SELECT ids.id, COUNT(p.id)::integer AS point_count
+                FROM unnest(CAST(:analysis_ids AS text[])) AS ids(id)
+                LEFT JOIN points AS p ON p.analysis_id = ids.id
+                GROUP BY ids.id
+            ) AS counts
+            WHERE a.id = counts.id
+              AND a.point_count IS DISTINCT FROM counts.point_count
             """
         ),
-        {"analysis_id": analysis_id},
+        {"analysis_ids": analysis_ids},
     )
+    with _stats_lock:
+        _stats["statements"] += 1
+        _stats["analyses"] += len(analysis_ids)
+
+
+def _mark(target, *analysis_ids):
+    session = object_session(target)
+    if session is None:
+        return
+    dirty = session.info.setdefault(_DIRTY_KEY, set())
+    dirty.update(analysis_id for analysis_id in analysis_ids if analysis_id)
 
 
 @event.listens_for(Point, "after_insert")
-def _after_insert_point(_mapper, connection, target):
-    _sync_analysis_point_count(connection, target.analysis_id)
+def _after_insert_point(_mapper, _connection, target):
+    _mark(target, target.analysis_id)
 
 
 @event.listens_for(Point, "after_delete")
-def _after_delete_point(_mapper, connection, target):
-    _sync_analysis_point_count(connection, target.analysis_id)
+def _after_delete_point(_mapper, _connection, target):
+    _mark(target, target.analysis_id)
 
 
 @event.listens_for(Point, "after_update")
-def _after_update_point(_mapper, connection, target):
+def _after_update_point(_mapper, _connection, target):
     history = inspect(target).attrs.analysis_id.history
 
     if not history.has_changes():
         return
 
-    for analysis_id in set([*history.deleted, *history.added]):
-        _sync_analysis_point_count(connection, analysis_id)
+    _mark(target, *history.deleted, *history.added)
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_dirty_point_counts(session, _flush_context):
+    analysis_ids = session.info.pop(_DIRTY_KEY, None)
+    if analysis_ids:
+        sync_analysis_point_counts(session.connection(), analysis_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dirty_point_counts(session):
+    session.info.pop(_DIRTY_KEY, None)
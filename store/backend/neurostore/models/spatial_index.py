@@ -0,0 +1,227 @@
+"""Grid-cell index over coordinates, used to prefilter radius searches.
+
+Every coordinate falls in the ``CELL_SIZE`` mm cube ``floor(c / CELL_SIZE)``
+along each axis. ``base_study_grid_cells`` records which cells hold at least
+one coordinate of each base study, so the base studies near a sphere can be
+read from the primary key without touching ``points``.
+
+Point, analysis and study changes only mark the affected rows; the cells of
+each affected base study are rebuilt once per flush.
+"""
+
+import math
+
+import sqlalchemy as sa
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from neurostore.models.data import Analysis, BaseStudy, Point, Study
+
+CELL_SIZE = 4.0
+
+# Spheres overlapping more cells than this are matched with per-axis ranges
+# instead of an explicit list of cells.
+MAX_ENUMERATED_CELLS = 4096
+
+_DIRTY_KEY = "spatial_index_dirty"
+
+
+def cell_index(value):
+    return math.floor(value / CELL_SIZE)
+
+
+def _axis_gap(center, cell):
+    low = cell * CELL_SIZE
+    high = low + CELL_SIZE
+    if center < low:
+        return low - center
+    if center > high:
+        return center - high
+    return 0.0
+
+
+def cell_ranges(x, y, z, radius):
+    """Inclusive ``(low, high)`` cell bounds of the sphere's bounding box."""
+    return tuple(
+        (cell_index(center - radius), cell_index(center + radius))
+        for center in (x, y, z)
+    )
+
+
+def cells_within_radius(x, y, z, radius, limit=MAX_ENUMERATED_CELLS):
+    """Cells intersecting the sphere, or ``None`` when there are over ``limit``."""
+    if radius < 0:
+        return []
+
+    (x_low, x_high), (y_low, y_high), (z_low, z_high) = cell_ranges(x, y, z, radius)
+    total = (x_high - x_low + 1) * (y_high - y_low + 1) * (z_high - z_low + 1)
+    if total > limit:
+        return None
+
+    # Tolerate rounding so a cell holding a point exactly on the sphere stays in.
+    bound = radius * radius * (1 + 1e-9) + 1e-9
+    cells = []
+    for cell_x in range(x_low, x_high + 1):
+        gap_x = _axis_gap(x, cell_x) ** 2
+        for cell_y in range(y_low, y_high + 1):
+            gap_xy = gap_x + _axis_gap(y, cell_y) ** 2
+            if gap_xy > bound:
+                continue
+            for cell_z in range(z_low, z_high + 1):
+                if gap_xy + _axis_gap(z, cell_z) ** 2 <= bound:
+                    cells.append((cell_x, cell_y, cell_z))
+    return cells
+
+
+def rebuild_grid_cells(connection, base_study_ids=None):
+    """Recompute the cells of the given base studies (all of them when ``None``).
+
+    Concurrent rebuilds of the same base study are serialized by a transaction
+    advisory lock per base study, taken in id order; a full rebuild racing a
+    scoped one skips the cells the other transaction already wrote.
+    """
+    params = {"cell_size": CELL_SIZE}
+    if base_study_ids is None:
+        delete_where = ""
+        select_where = ""
+    else:
+        base_study_ids = sorted({id_ for id_ in base_study_ids if id_})
+        if not base_study_ids:
+            return
+        params["base_study_ids"] = base_study_ids
+        delete_where = "WHERE base_study_id = ANY(:base_study_ids)"
+        select_where = "AND s.base_study_id = ANY(:base_study_ids)"
+        connection.execute(
+            sa.text(
+                """
+                SELECT pg_advisory_xact_lock(hashtext('base_study_grid_cells:' || id))
+                FROM (
+                    SELECT id
+                    FROM unnest(CAST(:base_study_ids AS text[])) AS id
+                    ORDER BY id
+                ) AS ids
+                """
+            ),
+            params,
+        )
+
+    connection.execute(
+        sa.text(f"DELETE FROM base_study_grid_cells {delete_where}"), params
+    )
+    connection.execute(
+        sa.text(
+            f"""
+            INSERT INTO base_study_grid_cells (cell_x, cell_y, cell_z, base_study_id)
+            SELECT DISTINCT
+                floor(p.x / :cell_size)::integer,
+                floor(p.y / :cell_size)::integer,
+                floor(p.z / :cell_size)::integer,
+                s.base_study_id
+            FROM points AS p
+            JOIN analyses AS a ON a.id = p.analysis_id
+            JOIN studies AS s ON s.id = a.study_id
+            WHERE s.base_study_id IS NOT NULL
+              AND p.x IS NOT NULL
+              AND p.y IS NOT NULL
+              AND p.z IS NOT NULL
+              {select_where}
+            ON CONFLICT DO NOTHING
+            """
+        ),
+        params,
+    )
+
+
+def _dirty(target):
+    session = object_session(target)
+    if session is None:
+        return None
+    return session.info.setdefault(
+        _DIRTY_KEY,
+        {"analysis_ids": set(), "study_ids": set(), "base_study_ids": set()},
+    )
+
+
+def _mark(target, kind, *ids):
+    dirty = _dirty(target)
+    if dirty is not None:
+        dirty[kind].update(id_ for id_ in ids if id_)
+
+
+def _changed_ids(target, attribute):
+    history = getattr(inspect(target).attrs, attribute).history
+    return [*history.deleted, *history.added]
+
+
+@event.listens_for(Point, "after_insert")
+@event.listens_for(Point, "after_delete")
+def _mark_point(_mapper, _connection, target):
+    _mark(target, "analysis_ids", target.analysis_id)
+
+
+@event.listens_for(Point, "after_update")
+def _mark_updated_point(_mapper, _connection, target):
+    state = inspect(target)
+    if not any(
+        getattr(state.attrs, name).history.has_changes()
+        for name in ("x", "y", "z", "analysis_id")
+    ):
+        return
+    _mark(target, "analysis_ids", target.analysis_id)
+    _mark(target, "analysis_ids", *_changed_ids(target, "analysis_id"))
+
+
+@event.listens_for(Analysis, "after_delete")
+def _mark_deleted_analysis(_mapper, _connection, target):
+    # Its points go with it through the database cascade, unseen by the ORM.
+    _mark(target, "study_ids", target.study_id)
+
+
+@event.listens_for(Analysis, "after_update")
+def _mark_moved_analysis(_mapper, _connection, target):
+    _mark(target, "study_ids", *_changed_ids(target, "study_id"))
+
+
+@event.listens_for(Study, "after_delete")
+def _mark_deleted_study(_mapper, _connection, target):
+    _mark(target, "base_study_ids", target.base_study_id)
+
+
+@event.listens_for(Study, "after_update")
+def _mark_moved_study(_mapper, _connection, target):
+    _mark(target, "base_study_ids", *_changed_ids(target, "base_study_id"))
+
+
+@event.listens_for(BaseStudy, "after_delete")
+def _mark_deleted_base_study(_mapper, _connection, target):
+    _mark(target, "base_study_ids", target.id)
+
+
+@event.listens_for(Session, "after_flush")
+def _rebuild_dirty_cells(session, _flush_context):
+    dirty = session.info.pop(_DIRTY_KEY, None)
+    if not dirty:
+        return
+
+    connection = session.connection()
+    base_study_ids = set(dirty["base_study_ids"])
+    if dirty["analysis_ids"]:
+        base_study_ids.update(
+            connection.execute(
+                sa.select(Study.base_study_id)
+                .join(Analysis, Analysis.study_id == Study.id)
+                .where(Analysis.id.in_(dirty["analysis_ids"]))
+            ).scalars()
+        )
+    if dirty["study_ids"]:
+        base_study_ids.update(
+            connection.execute(
+                sa.select(Study.base_study_id).where(Study.id.in_(dirty["study_ids"]))
+            ).scalars()
+        )
+    rebuild_grid_cells(connection, base_study_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dirty_cells(session):
+    session.info.pop(_DIRTY_KEY, None)
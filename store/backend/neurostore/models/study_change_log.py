@@ -0,0 +1,265 @@
+"""Change feed of the studies the studyset release is built from.
+
+Writes to studies, analyses, points, point values, images, conditions,
+pipeline results and configs, and the selection flags of base studies only
+mark the affected rows; once per flush they are resolved to their study and
+base study and appended to ``study_change_log``. The release builder drains the log, so a
+nightly build revisits only the base studies that changed since the last one.
+
+Writes that bypass the ORM (COPY ingestion, bulk ``UPDATE`` statements) call
+``log_study_changes`` themselves.
+"""
+
+import sqlalchemy as sa
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from neurostore.models.data import (
+    Analysis,
+    AnalysisConditions,
+    BaseStudy,
+    Condition,
+    Image,
+    PipelineConfig,
+    PipelineStudyResult,
+    Point,
+    PointValue,
+    Study,
+    StudyChangeLog,
+)
+
+_DIRTY_KEY = "study_change_log_dirty"
+
+# Base-study columns that decide whether one of its studies is released.
+_BASE_STUDY_SELECTION_COLUMNS = ("is_active", "has_coordinates")
+
+
+def log_study_changes(connection, study_ids=(), base_study_ids=()):
+    """Record changes to ``study_ids`` and ``base_study_ids``.
+
+    Each study is logged with its current base study.
+    """
+    study_ids = sorted({id_ for id_ in study_ids if id_})
+    base_study_ids = sorted({id_ for id_ in base_study_ids if id_})
+    if study_ids:
+        connection.execute(
+            sa.insert(StudyChangeLog).from_select(
+                ["study_id", "base_study_id"],
+                sa.select(Study.id, Study.base_study_id).where(Study.id.in_(study_ids)),
+            )
+        )
+    if base_study_ids:
+        connection.execute(
+            sa.insert(StudyChangeLog),
+            [{"base_study_id": base_study_id} for base_study_id in base_study_ids],
+        )
+
+
+def _dirty(target):
+    session = object_session(target)
+    if session is None:
+        return None
+    return session.info.setdefault(
+        _DIRTY_KEY,
+        {
+            "studies": set(),
+            "base_study_ids": set(),
+            "study_ids": set(),
+            "analysis_ids": set(),
+            "point_ids": set(),
+            "condition_ids": set(),
+            "config_ids": set(),
+        },
+    )
+
+
+def _mark(target, kind, *ids):
+    dirty = _dirty(target)
+    if dirty is not None:
+        dirty[kind].update(id_ for id_ in ids if id_)
+
+
+def _values(target, attribute):
+    history = getattr(inspect(target).attrs, attribute).history
+    return [getattr(target, attribute), *history.deleted]
+
+
+def _columns_changed(target, names=None):
+    state = inspect(target)
+    names = names or [attr.key for attr in state.mapper.column_attrs]
+    return any(getattr(state.attrs, name).history.has_changes() for name in names)
+
+
+def _on_write(model, mark, columns=None):
+    """Call ``mark(target)`` when a ``model`` row is written.
+
+    Updates count only when one of ``columns`` (any column by default) changed.
+    """
+
+    @event.listens_for(model, "after_insert")
+    @event.listens_for(model, "after_delete")
+    def _written(_mapper, _connection, target):
+        mark(target)
+
+    @event.listens_for(model, "after_update")
+    def _updated(_mapper, _connection, target):
+        if _columns_changed(target, columns):
+            mark(target)
+
+
+def _mark_study(target):
+    dirty = _dirty(target)
+    if dirty is not None:
+        # Keep the base study now, while a deleted study still knows it.
+        dirty["studies"].update(
+            (target.id, base_study_id)
+            for base_study_id in _values(target, "base_study_id")
+        )
+
+
+def _mark_analysis(target):
+    _mark(target, "study_ids", *_values(target, "study_id"))
+
+
+def _mark_analysis_child(target):
+    _mark(target, "analysis_ids", *_values(target, "analysis_id"))
+
+
+def _mark_point_value(target):
+    _mark(target, "point_ids", *_values(target, "point_id"))
+
+
+def _mark_image(target):
+    _mark(target, "study_ids", *_values(target, "study_id"))
+    _mark(target, "analysis_ids", *_values(target, "analysis_id"))
+
+
+def _mark_pipeline_result(target):
+    _mark(target, "base_study_ids", *_values(target, "base_study_id"))
+
+
+_on_write(Study, _mark_study)
+_on_write(Analysis, _mark_analysis)
+_on_write(Point, _mark_analysis_child)
+_on_write(PointValue, _mark_point_value)
+_on_write(Image, _mark_image)
+_on_write(AnalysisConditions, _mark_analysis_child)
+_on_write(PipelineStudyResult, _mark_pipeline_result)
+
+
+@event.listens_for(BaseStudy, "after_update")
+def _mark_updated_base_study(_mapper, _connection, target):
+    if _columns_changed(target, _BASE_STUDY_SELECTION_COLUMNS):
+        _mark(target, "base_study_ids", target.id)
+
+
+@event.listens_for(BaseStudy, "after_delete")
+def _mark_deleted_base_study(_mapper, _connection, target):
+    _mark(target, "base_study_ids", target.id)
+
+
+@event.listens_for(Condition, "after_update")
+def _mark_updated_condition(_mapper, _connection, target):
+    if _columns_changed(target, ("name", "description")):
+        _mark(target, "condition_ids", target.id)
+
+
+@event.listens_for(Condition, "before_delete")
+def _mark_deleted_condition(_mapper, connection, target):
+    # Its analysis links go with it through the database cascade, so look them
+    # up while they still exist.
+    _mark(
+        target,
+        "analysis_ids",
+        *connection.execute(
+            sa.select(AnalysisConditions.analysis_id).where(
+                AnalysisConditions.condition_id == target.id
+            )
+        ).scalars(),
+    )
+
+
+@event.listens_for(PipelineConfig, "after_update")
+def _mark_updated_config(_mapper, _connection, target):
+    # A new version or pipeline changes which results count as the latest.
+    if _columns_changed(target, ("pipeline_id", "version")):
+        _mark(target, "config_ids", target.id)
+
+
+@event.listens_for(PipelineConfig, "before_delete")
+def _mark_deleted_config(_mapper, connection, target):
+    # Its results go with it through the database cascade, so look them up
+    # while they still exist.
+    _mark(
+        target,
+        "base_study_ids",
+        *connection.execute(
+            sa.select(PipelineStudyResult.base_study_id)
+            .where(PipelineStudyResult.config_id == target.id)
+            .distinct()
+        ).scalars(),
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _log_dirty_studies(session, _flush_context):
+    dirty = session.info.pop(_DIRTY_KEY, None)
+    if not dirty:
+        return
+
+    connection = session.connection()
+    analysis_ids = set(dirty["analysis_ids"])
+    if dirty["point_ids"]:
+        analysis_ids.update(
+            connection.execute(
+                sa.select(Point.analysis_id).where(Point.id.in_(dirty["point_ids"]))
+            ).scalars()
+        )
+    if dirty["condition_ids"]:
+        analysis_ids.update(
+            connection.execute(
+                sa.select(AnalysisConditions.analysis_id).where(
+                    AnalysisConditions.condition_id.in_(dirty["condition_ids"])
+                )
+            ).scalars()
+        )
+    base_study_ids = set(dirty["base_study_ids"])
+    if dirty["config_ids"]:
+        base_study_ids.update(
+            connection.execute(
+                sa.select(PipelineStudyResult.base_study_id)
+                .where(PipelineStudyResult.config_id.in_(dirty["config_ids"]))
+                .distinct()
+            ).scalars()
+        )
+    study_ids = set(dirty["study_ids"])
+    analysis_ids.discard(None)
+    if analysis_ids:
+        study_ids.update(
+            connection.execute(
+                sa.select(Analysis.study_id).where(Analysis.id.in_(analysis_ids))
+            ).scalars()
+        )
+
+    rows = set(dirty["studies"])
+    logged_study_ids = {study_id for study_id, _base_study_id in rows}
+    log_study_changes(
+        connection,
+        study_ids=study_ids - logged_study_ids,
+        base_study_ids=base_study_ids,
+    )
+    if rows:
+        connection.execute(
+            sa.insert(StudyChangeLog),
+            [
+                {"study_id": study_id, "base_study_id": base_study_id}
+                for study_id, base_study_id in sorted(
+                    rows, key=lambda row: (row[0], row[1] or "")
+                )
+            ],
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dirty_studies(session):
+    session.info.pop(_DIRTY_KEY, None)
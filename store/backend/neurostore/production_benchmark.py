@@ -1,4 +1,8 @@
-"""Benchmark high-impact Neurostore endpoints against a restored production dump."""
+"""Benchmark high-impact Neurostore endpoints against a restored production dump.
+
+Without a dump, `neurostore generate-synthetic-corpus --scale N` loads a seeded
+corpus of the same shape to benchmark against.
+"""
 
 from __future__ import annotations
 
@@ -7,6 +11,7 @@ import asyncio
 import inspect
 import json
 import os
+import random
 import re
 import statistics
 import threading
@@ -14,20 +19,51 @@ from dataclasses import dataclass
 from datetime import datetime, timezone
 from io import StringIO
 from pathlib import Path
-from time import perf_counter
+from time import perf_counter, process_time
 from types import SimpleNamespace
 from urllib.parse import urlencode
 from uuid import uuid4
 
+import anyio
 import httpx
 from jose.jwt import encode
 from sqlalchemy import delete, event, func, select
+from sqlalchemy.engine.default import CACHE_HIT
 
 from neurostore.database import db
-from neurostore.models import Analysis, Annotation, BaseStudy, Study, Studyset, User
+from neurostore.models import (
+    Analysis,
+    Annotation,
+    BaseStudy,
+    Pipeline,
+    PipelineConfig,
+    PipelineStudyResult,
+    Study,
+    Studyset,
+    User,
+)
+from neurostore.models.point_count_listeners import point_count_stats
 
 TOKEN = encode({"sub": "user1-id"}, "abc", algorithm="HS256")
 DEFAULT_SCALES = [10, 50, 100, 200]
+MEDIA_FLAG_BATCH_SIZE = 50000
+FEATURE_DISPLAY_PAGE_SIZE = 500
+DEFAULT_LOAD_DURATION_SECONDS = 30.0
+# Relative throughput gain below which one more concurrency step is saturated.
+SATURATION_THROUGHPUT_GAIN = 0.1
+# Read cases driven by the load mode's virtual users, and their weights.
+LOAD_MIX = (
+    ("browse_base_studies_frontend", 4),
+    ("search_base_studies_frontend", 3),
+    ("get_base_study_detail_frontend", 3),
+    ("search_base_studies_text", 2),
+    ("get_study_nested_frontend", 2),
+    ("search_base_studies_info", 1),
+    ("get_analysis_nested_frontend", 1),
+    ("get_nested_studyset_seed", 1),
+    ("list_annotations_for_studyset_frontend", 1),
+    ("get_annotation_large", 1),
+)
 
 
 def _env_flag(name, default=False):
@@ -37,11 +73,11 @@ def _env_flag(name, default=False):
     return value.strip().lower() in {"1", "true", "yes", "on"}
 
 
-def _load_app():
+def _load_app(settings=None):
     os.environ.setdefault("APP_ENV", "testing")
     from neurostore import create_asgi_app
 
-    return create_asgi_app()
+    return create_asgi_app(settings)
 
 
 def _response_json(response):
@@ -52,14 +88,32 @@ def _response_json(response):
 
 
 class BenchmarkClient:
-    """Small native-ASGI client for in-process production benchmark runs."""
+    """Small native-ASGI client for in-process production benchmark runs.
 
-    def __init__(self, app, token: str):
-        self._client = httpx.AsyncClient(
-            transport=httpx.ASGITransport(app=app),
-            base_url="http://testserver",
-            follow_redirects=True,
-        )
+    Given a ``base_url`` it sends the same requests to a running server.
+    """
+
+    def __init__(
+        self,
+        app,
+        token: str,
+        *,
+        base_url: str | None = None,
+        max_connections: int | None = None,
+    ):
+        if base_url is None:
+            self._client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app),
+                base_url="http://testserver",
+                follow_redirects=True,
+            )
+        else:
+            self._client = httpx.AsyncClient(
+                base_url=base_url,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=max_connections),
+                timeout=None,
+            )
         self._token = token
 
     async def aclose(self):
@@ -805,6 +859,12 @@ class _SqlTimingCollector:
         self._engine = engine
         self.statement_count = 0
         self.total_seconds = 0.0
+        # Grouped point-count recounts issued while collecting.
+        self.point_count_statement_count = 0
+        self._point_count_statements_at_start = 0
+        # Compiled statements reused from, or compiled into, the engine's cache.
+        self.compiled_cache_hits = 0
+        self.compiled_cache_misses = 0
 
     def _before_cursor_execute(
         self,
@@ -833,8 +893,14 @@ class _SqlTimingCollector:
             return
         self.statement_count += 1
         self.total_seconds += perf_counter() - started
+        if context is not None and context.compiled is not None:
+            if context.cache_hit is CACHE_HIT:
+                self.compiled_cache_hits += 1
+            else:
+                self.compiled_cache_misses += 1
 
     def __enter__(self):
+        self._point_count_statements_at_start = point_count_stats()["statements"]
         event.listen(self._engine, "before_cursor_execute", self._before_cursor_execute)
         event.listen(self._engine, "after_cursor_execute", self._after_cursor_execute)
         return self
@@ -842,6 +908,9 @@ class _SqlTimingCollector:
     def __exit__(self, exc_type, exc, tb):
         event.remove(self._engine, "before_cursor_execute", self._before_cursor_execute)
         event.remove(self._engine, "after_cursor_execute", self._after_cursor_execute)
+        self.point_count_statement_count = (
+            point_count_stats()["statements"] - self._point_count_statements_at_start
+        )
 
 
 def _write_profile_artifacts(
@@ -882,6 +951,9 @@ def _write_profile_artifacts(
         "thread_count": profile_data["thread_count"],
         "sql_statement_count": sql_collector.statement_count,
         "sql_seconds": sql_collector.total_seconds,
+        "point_count_statement_count": sql_collector.point_count_statement_count,
+        "compiled_cache_hits": sql_collector.compiled_cache_hits,
+        "compiled_cache_misses": sql_collector.compiled_cache_misses,
     }
 
 
@@ -903,6 +975,7 @@ async def _benchmark_case(
     cleanup_tracker: _BenchmarkWriteTracker | None = None,
 ) -> dict:
     durations = []
+    cpu_durations = []
     last_metadata = {}
     profiling = None
 
@@ -914,8 +987,10 @@ async def _benchmark_case(
         )
         if profile_dir is None:
             started = perf_counter()
+            cpu_started = process_time()
             last_metadata = await _resolve_case_result(fn(index)) or {}
             durations.append(perf_counter() - started)
+            cpu_durations.append(process_time() - cpu_started)
             if cleanup_checkpoint is not None and client_ref is not None:
                 await cleanup_tracker.cleanup_since(
                     cleanup_checkpoint, client_ref.current
@@ -933,6 +1008,7 @@ async def _benchmark_case(
 
         with sql_collector:
             started = perf_counter()
+            cpu_started = process_time()
             try:
                 if client_ref is not None and profiled_client is not None:
                     client_ref.current = profiled_client
@@ -949,6 +1025,7 @@ async def _benchmark_case(
                 if profiled_client is not None:
                     await profiled_client.aclose()
             durations.append(perf_counter() - started)
+            cpu_durations.append(process_time() - cpu_started)
 
         if cleanup_checkpoint is not None and client_ref is not None:
             await cleanup_tracker.cleanup_since(cleanup_checkpoint, client_ref.current)
@@ -963,6 +1040,8 @@ async def _benchmark_case(
         "iterations": durations,
         "median_seconds": statistics.median(durations),
         "p95_seconds": _percentile(durations, 0.95),
+        # Process CPU time, which covers the request handled in the threadpool.
+        "median_cpu_seconds": statistics.median(cpu_durations),
         "metadata": last_metadata,
     }
     if profiling is not None:
@@ -970,6 +1049,141 @@ async def _benchmark_case(
     return case
 
 
+def run_media_flag_benchmark(
+    iterations: int, *, batch_size: int = MEDIA_FLAG_BATCH_SIZE
+) -> dict:
+    """Time each media-flag engine on one batch of base studies.
+
+    Every run is rolled back, so both engines start from the same flags.
+    """
+    from neurostore.services.has_media_flags import (
+        MEDIA_FLAG_ENGINES,
+        recompute_media_flags,
+    )
+
+    _load_app()
+    base_study_ids = list(
+        db.session.scalars(
+            select(BaseStudy.id).order_by(BaseStudy.id).limit(batch_size)
+        )
+    )
+    db.session.rollback()
+
+    cases = []
+    for engine in MEDIA_FLAG_ENGINES:
+        durations = []
+        metadata = {}
+        for _index in range(iterations):
+            with _SqlTimingCollector(db.engine) as sql_collector:
+                started = perf_counter()
+                try:
+                    changed = recompute_media_flags(base_study_ids, engine=engine)
+                    durations.append(perf_counter() - started)
+                finally:
+                    db.session.rollback()
+            metadata = {
+                "engine": engine,
+                "statement_count": sql_collector.statement_count,
+                "sql_seconds": sql_collector.total_seconds,
+                "changed": {level: len(ids) for level, ids in changed.items()},
+            }
+        cases.append(
+            {
+                "name": _case_name(
+                    f"recompute_media_flags_{engine}", len(base_study_ids)
+                ),
+                "iterations": durations,
+                "median_seconds": statistics.median(durations),
+                "p95_seconds": _percentile(durations, 0.95),
+                "metadata": metadata,
+            }
+        )
+
+    db.session.remove()
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "base_study_count": len(base_study_ids),
+        "iterations_per_case": iterations,
+        "cases": cases,
+    }
+
+
+def run_compiled_cache_benchmark(iterations: int) -> dict:
+    """Time the search endpoints with a cold and a warm compiled statement cache.
+
+    The cold runs clear the engine's compiled cache before every request, so
+    each statement is compiled again; the difference in CPU time per request
+    is the compilation work the cache saves.
+    """
+    return asyncio.run(_run_compiled_cache_async(iterations))
+
+
+async def _run_compiled_cache_async(iterations: int) -> dict:
+    app = _load_app()
+    client = BenchmarkClient(app, TOKEN)
+    try:
+        _ensure_user()
+        _base_study_ids, _study_ids, search_term, _available = (
+            _pick_seed_studies_from_base_studies(1)
+        )
+        db.session.remove()
+
+        requests = {
+            "search_base_studies_text": lambda: _search_base_studies_text_case(
+                client, search_term
+            ),
+            "search_base_studies_info": lambda: _search_base_studies_info_case(
+                client, search_term
+            ),
+            "search_studysets": lambda: _request(
+                client, "get", "/api/studysets/", params={"search": search_term}
+            ),
+        }
+        cases = []
+        for name, request in requests.items():
+            # Prime the cache and any lazily built state before timing.
+            await request()
+            for cache_state in ("cold", "warm"):
+                durations = []
+                cpu_durations = []
+                for _index in range(iterations):
+                    if cache_state == "cold":
+                        db.engine._compiled_cache.clear()
+                    with _SqlTimingCollector(db.engine) as sql_collector:
+                        started = perf_counter()
+                        cpu_started = process_time()
+                        await request()
+                        durations.append(perf_counter() - started)
+                        cpu_durations.append(process_time() - cpu_started)
+                cases.append(
+                    {
+                        "name": f"{name}_{cache_state}_compiled_cache",
+                        "iterations": durations,
+                        "median_seconds": statistics.median(durations),
+                        "p95_seconds": _percentile(durations, 0.95),
+                        "median_cpu_seconds": statistics.median(cpu_durations),
+                        "metadata": {
+                            "query": search_term,
+                            "statement_count": sql_collector.statement_count,
+                            "sql_seconds": sql_collector.total_seconds,
+                            "compiled_cache_hits": sql_collector.compiled_cache_hits,
+                            "compiled_cache_misses": (
+                                sql_collector.compiled_cache_misses
+                            ),
+                        },
+                    }
+                )
+    finally:
+        await client.aclose()
+        db.session.remove()
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "iterations_per_case": iterations,
+        "cases": cases,
+    }
+
+
 def _pick_seed_analysis_id(study_id: str) -> str:
     analysis_id = (
         db.session.execute(
@@ -985,6 +1199,21 @@ def _pick_seed_analysis_id(study_id: str) -> str:
     return analysis_id
 
 
+def _pick_feature_display_pipelines(limit: int = 3) -> list[str]:
+    return list(
+        db.session.execute(
+            select(Pipeline.name)
+            .join(PipelineConfig, PipelineConfig.pipeline_id == Pipeline.id)
+            .join(
+                PipelineStudyResult, PipelineStudyResult.config_id == PipelineConfig.id
+            )
+            .group_by(Pipeline.name)
+            .order_by(Pipeline.name)
+            .limit(limit)
+        ).scalars()
+    )
+
+
 async def _load_base_study_detail(client: BenchmarkClient, base_study_id: str) -> dict:
     response = await _request(
         client,
@@ -1139,6 +1368,27 @@ async def _search_base_studies_info_case(client, search_term):
     return {"query": search_term, "total_count": payload["metadata"]["total_count"]}
 
 
+async def _list_base_studies_feature_display_case(client, pipelines):
+    payload = _response_json(
+        await _request(
+            client,
+            "get",
+            "/api/base-studies/",
+            params={
+                "page_size": str(FEATURE_DISPLAY_PAGE_SIZE),
+                "flat": "true",
+                "feature_display": pipelines,
+            },
+        )
+    )
+    results = payload.get("results", [])
+    return {
+        "pipelines": pipelines,
+        "result_count": len(results),
+        "featured_count": sum(1 for result in results if result.get("features")),
+    }
+
+
 async def _get_base_study_detail_case(client, base_study_id):
     payload = await _load_base_study_detail(client, base_study_id)
     return {"version_count": len(payload.get("versions", []))}
@@ -1213,6 +1463,7 @@ async def _run_async(
             )
             source_study_id = study_ids[0]
             source_analysis_id = _pick_seed_analysis_id(source_study_id)
+            feature_display_pipelines = _pick_feature_display_pipelines()
             study_scale = len(study_ids)
             bulk_post_scale = len(bulk_post_payload)
             db.session.rollback()
@@ -1402,6 +1653,21 @@ async def _run_async(
                     cleanup_tracker=write_tracker,
                 ),
             ]
+            if feature_display_pipelines:
+                # Features of the whole page load together, so the statement
+                # count should not grow with the page size.
+                cases.append(
+                    await _benchmark_case(
+                        "list_base_studies_feature_display",
+                        iterations,
+                        lambda _index: _list_base_studies_feature_display_case(
+                            client_ref.current, feature_display_pipelines
+                        ),
+                        profile_dir=profile_dir,
+                        client_ref=client_ref,
+                        app=app,
+                    )
+                )
 
             return {
                 "service": "store",
@@ -1457,15 +1723,376 @@ async def _update_annotation_case(
     return {"note_count": len(body.get("notes", []))}
 
 
+def _load_case_functions(seeds: dict) -> dict:
+    """Map each ``LOAD_MIX`` case to a call taking the client to send it with."""
+    return {
+        "browse_base_studies_frontend": _browse_base_studies_case,
+        "search_base_studies_frontend": lambda client: (
+            _search_base_studies_frontend_case(client, seeds["search_term"])
+        ),
+        "get_base_study_detail_frontend": lambda client: _get_base_study_detail_case(
+            client, seeds["base_study_id"]
+        ),
+        "search_base_studies_text": lambda client: _search_base_studies_text_case(
+            client, seeds["search_term"]
+        ),
+        "get_study_nested_frontend": lambda client: _get_study_nested_case(
+            client, seeds["study_id"]
+        ),
+        "search_base_studies_info": lambda client: _search_base_studies_info_case(
+            client, seeds["search_term"]
+        ),
+        "get_analysis_nested_frontend": lambda client: _get_analysis_nested_case(
+            client, seeds["analysis_id"]
+        ),
+        "get_nested_studyset_seed": lambda client: _get_nested_studyset_case(
+            client, seeds["studyset_id"]
+        ),
+        "list_annotations_for_studyset_frontend": lambda client: (
+            _list_annotations_case(client, seeds["studyset_id"])
+        ),
+        "get_annotation_large": lambda client: _get_annotation_case(
+            client, seeds["annotation_id"]
+        ),
+    }
+
+
+async def _virtual_user(
+    client: BenchmarkClient,
+    case_functions: dict,
+    *,
+    deadline: float,
+    rng: random.Random,
+    samples: list,
+):
+    names = [name for name, _weight in LOAD_MIX]
+    weights = [weight for _name, weight in LOAD_MIX]
+    while perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        started = perf_counter()
+        try:
+            await case_functions[name](client)
+            error = None
+        except Exception as exc:  # noqa: BLE001
+            error = f"{type(exc).__name__}: {exc}"[:200]
+        samples.append((name, perf_counter() - started, error))
+
+
+def _summarize_load(samples: list, elapsed: float) -> dict:
+    durations = [duration for _name, duration, _error in samples]
+    errors = [error for _name, _duration, error in samples if error is not None]
+    return {
+        "requests": len(samples),
+        "errors": len(errors),
+        "error_rate": len(errors) / len(samples) if samples else 0.0,
+        "throughput_rps": len(samples) / elapsed if elapsed else 0.0,
+        "median_seconds": _percentile(durations, 0.5),
+        "p95_seconds": _percentile(durations, 0.95),
+        "p99_seconds": _percentile(durations, 0.99),
+    }
+
+
+async def _run_load_level(
+    client: BenchmarkClient,
+    case_functions: dict,
+    *,
+    concurrency: int,
+    duration: float,
+    seed: int,
+) -> dict:
+    samples = []
+    started = perf_counter()
+    deadline = started + duration
+    await asyncio.gather(
+        *(
+            _virtual_user(
+                client,
+                case_functions,
+                deadline=deadline,
+                rng=random.Random(seed + index),
+                samples=samples,
+            )
+            for index in range(concurrency)
+        )
+    )
+    elapsed = perf_counter() - started
+
+    by_case = {}
+    for sample in samples:
+        by_case.setdefault(sample[0], []).append(sample)
+    level = {"concurrency": concurrency, "elapsed_seconds": elapsed}
+    level.update(_summarize_load(samples, elapsed))
+    level["cases"] = {
+        name: _summarize_load(case_samples, elapsed)
+        for name, case_samples in sorted(by_case.items())
+    }
+    level["sample_errors"] = sorted(
+        {error for _name, _duration, error in samples if error is not None}
+    )[:5]
+    return level
+
+
+def _saturation_concurrency(levels: list[dict]) -> int | None:
+    """Return the concurrency past which throughput stops growing.
+
+    ``None`` means every step still gained more than
+    ``SATURATION_THROUGHPUT_GAIN`` in throughput.
+    """
+    levels = sorted(levels, key=lambda level: level["concurrency"])
+    for previous, level in zip(levels, levels[1:]):
+        gain_floor = previous["throughput_rps"] * (1 + SATURATION_THROUGHPUT_GAIN)
+        if level["throughput_rps"] < gain_floor:
+            return previous["concurrency"]
+    return None
+
+
+def _load_case_name(
+    concurrency: int, thread_tokens: int | None, pool_size: int | None
+) -> str:
+    name = f"load_concurrency_{concurrency}"
+    if thread_tokens is not None:
+        name += f"_tokens_{thread_tokens}"
+    if pool_size is not None:
+        name += f"_pool_{pool_size}"
+    return name
+
+
+def run_load(
+    concurrency_levels: list[int],
+    duration: float,
+    *,
+    base_url: str | None = None,
+    thread_tokens: list[int] | None = None,
+    pool_sizes: list[int] | None = None,
+    seed_study_limit: int | None = 1,
+) -> dict:
+    """Drive ``LOAD_MIX`` from concurrent virtual users for ``duration`` seconds.
+
+    Every concurrency level runs for every combination of ``thread_tokens``
+    (``ASGI_THREAD_TOKENS``) and ``pool_sizes`` (the SQLAlchemy pool size).
+    Those only apply in process; with ``base_url`` the requests go to a
+    running server, which must serve the database the seeds are read from.
+    """
+    return asyncio.run(
+        _run_load_async(
+            concurrency_levels,
+            duration,
+            base_url=base_url,
+            thread_tokens=thread_tokens,
+            pool_sizes=pool_sizes,
+            seed_study_limit=seed_study_limit,
+        )
+    )
+
+
+async def _run_load_async(
+    concurrency_levels: list[int],
+    duration: float,
+    *,
+    base_url: str | None = None,
+    thread_tokens: list[int] | None = None,
+    pool_sizes: list[int] | None = None,
+    seed_study_limit: int | None = 1,
+) -> dict:
+    from neurostore.settings import load_settings
+
+    os.environ.setdefault("APP_ENV", "testing")
+    settings = dict(load_settings())
+    app = _load_app(settings)
+    if base_url is not None:
+        thread_tokens = pool_sizes = None
+    client = BenchmarkClient(
+        app, TOKEN, base_url=base_url, max_connections=max(concurrency_levels)
+    )
+    write_tracker = _BenchmarkWriteTracker()
+    thread_limiter = anyio.to_thread.current_default_thread_limiter()
+    default_tokens = thread_limiter.total_tokens
+
+    try:
+        _ensure_user()
+        base_study_ids, study_ids, search_term, _available = (
+            _pick_seed_studies_from_base_studies(seed_study_limit)
+        )
+        seeds = {
+            "search_term": search_term,
+            "base_study_id": base_study_ids[0],
+            "study_id": study_ids[0],
+            "analysis_id": _pick_seed_analysis_id(study_ids[0]),
+        }
+        db.session.rollback()
+        db.session.remove()
+        seeds["studyset_id"] = await _create_large_studyset(
+            client, study_ids, suffix="load", tracker=write_tracker
+        )
+        seeds["annotation_id"] = await _create_large_annotation(
+            client, seeds["studyset_id"], suffix="load", tracker=write_tracker
+        )
+        case_functions = _load_case_functions(seeds)
+
+        configurations = []
+        cases = []
+        for tokens in thread_tokens or [None]:
+            for pool_size in pool_sizes or [None]:
+                if pool_size is not None:
+                    db.configure(
+                        {
+                            **settings,
+                            "SQLALCHEMY_ENGINE_OPTIONS": {
+                                **(settings.get("SQLALCHEMY_ENGINE_OPTIONS") or {}),
+                                "pool_size": pool_size,
+                                "max_overflow": 0,
+                            },
+                        }
+                    )
+                thread_limiter.total_tokens = (
+                    tokens
+                    if tokens is not None
+                    else int(settings.get("ASGI_THREAD_TOKENS") or default_tokens)
+                )
+                # One warm-up request per case, so lazily built state is
+                # not charged to the first level.
+                for case_function in case_functions.values():
+                    await case_function(client)
+
+                levels = []
+                for concurrency in concurrency_levels:
+                    level = await _run_load_level(
+                        client,
+                        case_functions,
+                        concurrency=concurrency,
+                        duration=duration,
+                        seed=concurrency,
+                    )
+                    levels.append(level)
+                    cases.append(
+                        {
+                            "name": _load_case_name(concurrency, tokens, pool_size),
+                            **{
+                                key: value
+                                for key, value in level.items()
+                                if key not in {"cases", "sample_errors"}
+                            },
+                            "metadata": {
+                                "asgi_thread_tokens": tokens,
+                                "pool_size": pool_size,
+                            },
+                        }
+                    )
+                throughputs = [level["throughput_rps"] for level in levels]
+                configurations.append(
+                    {
+                        "asgi_thread_tokens": tokens,
+                        "pool_size": pool_size,
+                        "levels": levels,
+                        "peak_throughput_rps": max(throughputs),
+                        "saturation_concurrency": _saturation_concurrency(levels),
+                    }
+                )
+
+        return {
+            "service": "store",
+            "mode": "load",
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "target": base_url or "in-process",
+            "duration_seconds": duration,
+            "concurrency_levels": concurrency_levels,
+            "mix": dict(LOAD_MIX),
+            "configurations": configurations,
+            "cases": cases,
+        }
+    finally:
+        thread_limiter.total_tokens = default_tokens
+        try:
+            await write_tracker.cleanup_all(client)
+        finally:
+            await client.aclose()
+            if pool_sizes:
+                db.configure(settings)
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument("--iterations", type=int, default=5)
     parser.add_argument("--output", required=True)
     parser.add_argument("--profile-dir")
     parser.add_argument("--scales")
+    parser.add_argument(
+        "--media-flags",
+        action="store_true",
+        help="Compare the media-flag recompute engines instead of endpoints.",
+    )
+    parser.add_argument(
+        "--media-flags-batch-size", type=int, default=MEDIA_FLAG_BATCH_SIZE
+    )
+    parser.add_argument(
+        "--compiled-cache",
+        action="store_true",
+        help="Compare search requests with a cold and a warm compiled cache.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        help=(
+            "Comma-separated virtual-user counts; drives the weighted read mix "
+            "concurrently instead of timing cases one by one."
+        ),
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=DEFAULT_LOAD_DURATION_SECONDS,
+        help="Seconds each concurrency level runs for.",
+    )
+    parser.add_argument(
+        "--base-url",
+        help="Send the load to a running server instead of the in-process app.",
+    )
+    parser.add_argument(
+        "--thread-tokens",
+        help="Comma-separated ASGI_THREAD_TOKENS values to sweep (in process).",
+    )
+    parser.add_argument(
+        "--pool-sizes",
+        help="Comma-separated database pool sizes to sweep (in process).",
+    )
     args = parser.parse_args()
 
     output_path = Path(args.output)
+    if args.concurrency is not None:
+        results = run_load(
+            _parse_scales(args.concurrency, label="concurrency"),
+            args.duration,
+            base_url=args.base_url,
+            thread_tokens=(
+                _parse_scales(args.thread_tokens, label="thread tokens")
+                if args.thread_tokens
+                else None
+            ),
+            pool_sizes=(
+                _parse_scales(args.pool_sizes, label="pool sizes")
+                if args.pool_sizes
+                else None
+            ),
+        )
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with output_path.open("w") as handle:
+            json.dump(results, handle, indent=2)
+            handle.write("\n")
+        return 0
+
+    if args.media_flags or args.compiled_cache:
+        results = (
+            run_media_flag_benchmark(
+                args.iterations, batch_size=args.media_flags_batch_size
+            )
+            if args.media_flags
+            else run_compiled_cache_benchmark(args.iterations)
+        )
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with output_path.open("w") as handle:
+            json.dump(results, handle, indent=2)
+            handle.write("\n")
+        return 0
+
     profile_dir = args.profile_dir or os.environ.get("PRODUCTION_BENCHMARK_PROFILE_DIR")
     scales = _parse_scales(
         (
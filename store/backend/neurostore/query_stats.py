@@ -0,0 +1,239 @@
+"""Per-request SQL statement accounting.
+
+Every statement run while a request is being served is counted against that
+request: how many were issued, the time spent in the database and the rows
+they returned. Statements are grouped by fingerprint (the statement with its
+literals and bound parameters replaced by ``?``), and a fingerprint repeated
+``SQL_N_PLUS_ONE_THRESHOLD`` times in one request is reported as a likely N+1
+pattern.
+
+Totals are kept per route (the Connexion operation id) for the lifetime of
+the process and rendered in the Prometheus text format.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+STATEMENT_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500)
+DEFAULT_N_PLUS_ONE_THRESHOLD = 10
+OTHER_ROUTE = "other"
+
+_current = ContextVar("neurostore_request_query_stats", default=None)
+_STARTED_ATTRIBUTE = "_request_query_stats_started"
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_PARAMETER = re.compile(r"%\([^)]+\)s|%s|\$\d+|(?<!:):\w+|(?<![\w.])\d+(?:\.\d+)?\b")
+_PARAMETER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_ROW_LIST = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement):
+    """Return ``statement`` with literals and parameters replaced by ``?``.
+
+    Lists of parameters collapse to one, so ``IN`` clauses of any length and
+    multi-row ``VALUES`` share a fingerprint.
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _PARAMETER.sub("?", normalized)
+    normalized = _PARAMETER_LIST.sub("?", normalized)
+    normalized = _ROW_LIST.sub("(?)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def fingerprint_id(normalized):
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+
+
+class RequestQueryStats:
+    """Statements issued on behalf of one request."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.statements = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.fingerprints = Counter()
+
+    def record(self, statement, seconds, rows):
+        normalized = fingerprint(statement)
+        with self._lock:
+            self.statements += 1
+            self.seconds += seconds
+            self.rows += max(rows or 0, 0)
+            self.fingerprints[normalized] += 1
+
+    def repeated(self, threshold):
+        """Fingerprints issued at least ``threshold`` times, most repeated first."""
+        with self._lock:
+            return [
+                (normalized, count)
+                for normalized, count in self.fingerprints.most_common()
+                if count >= threshold
+            ]
+
+    def server_timing(self, threshold):
+        """Return the value of a ``Server-Timing`` header for these statements."""
+        metrics = [
+            f'db;dur={self.seconds * 1000:.1f};desc="{self.statements} statements"',
+            f'db-rows;desc="{self.rows}"',
+        ]
+        repeated = self.repeated(threshold)
+        if repeated:
+            normalized, count = repeated[0]
+            metrics.append(f'db-repeated;desc="{count}x {fingerprint_id(normalized)}"')
+        return ", ".join(metrics)
+
+
+def current_query_stats():
+    """Return the statements recorded for the request being served, if any."""
+    return _current.get()
+
+
+def start_request():
+    stats = RequestQueryStats()
+    return stats, _current.set(stats)
+
+
+def finish_request(token):
+    _current.reset(token)
+
+
+# The start time lives on the execution context, so a statement that raises
+# leaves nothing behind on the connection.
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None and context is not None:
+        setattr(context, _STARTED_ATTRIBUTE, perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, _STARTED_ATTRIBUTE, None)
+    if stats is None or started is None:
+        return
+    stats.record(statement, perf_counter() - started, cursor.rowcount)
+
+
+def route_label(scope):
+    """Return the Connexion operation id that served ``scope``."""
+    routing = scope.get("extensions", {}).get("connexion_routing", {})
+    return routing.get("operation_id") or OTHER_ROUTE
+
+
+def statement_budget(settings, route):
+    """Return the statement budget of ``route``, or ``None`` when unbounded."""
+    budgets = settings.get("SQL_STATEMENT_BUDGETS") or {}
+    budget = budgets.get(route, settings.get("SQL_STATEMENT_BUDGET"))
+    return None if budget is None else int(budget)
+
+
+_metrics_lock = threading.Lock()
+_route_totals = defaultdict(
+    lambda: {
+        "requests": 0,
+        "statements": 0,
+        "seconds": 0.0,
+        "rows": 0,
+        "n_plus_one": 0,
+        "over_budget": 0,
+        "buckets": [0] * (len(STATEMENT_BUCKETS) + 1),
+    }
+)
+
+
+def observe_request(route, stats, *, threshold, budget=None):
+    """Add a finished request to the totals of ``route``.
+
+    Returns the repeated fingerprints and whether the budget was exceeded.
+    """
+    repeated = stats.repeated(threshold)
+    over_budget = budget is not None and stats.statements > budget
+    with _metrics_lock:
+        totals = _route_totals[route]
+        totals["requests"] += 1
+        totals["statements"] += stats.statements
+        totals["seconds"] += stats.seconds
+        totals["rows"] += stats.rows
+        totals["n_plus_one"] += bool(repeated)
+        totals["over_budget"] += over_budget
+        totals["buckets"][bisect_left(STATEMENT_BUCKETS, stats.statements)] += 1
+
+    for normalized, count in repeated:
+        logger.warning(
+            "Possible N+1 in %s: statement %s ran %d times: %s",
+            route,
+            fingerprint_id(normalized),
+            count,
+            normalized,
+        )
+    return repeated, over_budget
+
+
+def _label(value):
+    value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'route="{value}"'
+
+
+def render_metrics():
+    """Return the per-route totals in the Prometheus text exposition format."""
+    with _metrics_lock:
+        totals = {
+            route: {**values, "buckets": list(values["buckets"])}
+            for route, values in _route_totals.items()
+        }
+
+    counters = (
+        ("requests", "neurostore_sql_requests_total", "Requests served."),
+        ("statements", "neurostore_sql_statements_total", "SQL statements issued."),
+        ("seconds", "neurostore_sql_seconds_total", "Time spent in SQL statements."),
+        ("rows", "neurostore_sql_rows_total", "Rows returned by SQL statements."),
+        (
+            "n_plus_one",
+            "neurostore_sql_n_plus_one_requests_total",
+            "Requests repeating one statement past the N+1 threshold.",
+        ),
+        (
+            "over_budget",
+            "neurostore_sql_statement_budget_exceeded_total",
+            "Requests issuing more statements than their route's budget.",
+        ),
+    )
+    lines = []
+    for key, name, description in counters:
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} counter")
+        for route in sorted(totals):
+            lines.append(f"{name}{{{_label(route)}}} {totals[route][key]}")
+
+    name = "neurostore_sql_statements_per_request"
+    lines.append(f"# HELP {name} SQL statements issued per request.")
+    lines.append(f"# TYPE {name} histogram")
+    for route in sorted(totals):
+        values = totals[route]
+        cumulative = 0
+        bounds = [str(bound) for bound in STATEMENT_BUCKETS] + ["+Inf"]
+        for bound, count in zip(bounds, values["buckets"]):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{_label(route)},le="{bound}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{_label(route)}}} {values['statements']}")
+        lines.append(f"{name}_count{{{_label(route)}}} {values['requests']}")
+    return "\n".join(lines) + "\n"
+
+
+def reset_query_stats_state():
+    """Forget the per-route totals (used by tests)."""
+    with _metrics_lock:
+        _route_totals.clear()
@@ -1,4 +1,7 @@
+import hashlib
 import json
+import threading
+import time
 from collections.abc import Mapping
 from urllib.request import urlopen
 
@@ -7,6 +10,18 @@ from connexion.exceptions import OAuthProblem
 from connexion.lifecycle import ConnexionResponse
 from jose import jwt
 
+from neurostore.extensions import LocalCache
+
+# Unknown key ids refetch the key set at most this often, so tokens carrying
+# made-up ``kid`` headers cannot turn every request into a JWKS download.
+JWKS_MIN_REFETCH_SECONDS = 30.0
+JWKS_FETCH_TIMEOUT_SECONDS = 10.0
+
+_jwks_caches = {}
+_jwks_caches_lock = threading.Lock()
+_token_cache = None
+_token_cache_lock = threading.Lock()
+
 
 def _oauth_problem(detail):
     return OAuthProblem(detail=detail)
@@ -28,25 +43,169 @@ async def asgi_oauth_problem_handler(request, exc):
     )
 
 
+def fetch_jwks(url):
+    """Download a JSON web key set; ``file://`` URLs serve a local stand-in."""
+    with urlopen(url, timeout=JWKS_FETCH_TIMEOUT_SECONDS) as response:
+        return json.loads(response.read())
+
+
+class JWKSCache:
+    """Signing keys of one JWKS URL, by ``kid``.
+
+    Keys are fresh for ``ttl`` seconds. Past that they are still served for up
+    to ``max_stale`` seconds while a background thread refreshes them. A
+    ``kid`` missing from the cached set triggers one refetch shared by every
+    waiting thread.
+    """
+
+    def __init__(self, url, ttl=600.0, max_stale=86400.0, fetch=fetch_jwks):
+        self.url = url
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.fetch = fetch
+        self.fetch_count = 0
+        self._keys = {}
+        self._fetched_at = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+
+    def get_key(self, kid):
+        with self._lock:
+            keys, fetched_at = self._keys, self._fetched_at
+        age = None if fetched_at is None else time.monotonic() - fetched_at
+
+        if age is None or age > self.ttl + self.max_stale:
+            keys = self._refetch(fetched_at)
+        elif kid not in keys:
+            if age >= JWKS_MIN_REFETCH_SECONDS:
+                keys = self._refetch(fetched_at)
+        elif age > self.ttl:
+            self._refresh_in_background()
+        return keys.get(kid)
+
+    def _refetch(self, seen_fetched_at):
+        with self._fetch_lock:
+            # Another thread may have refetched while this one waited.
+            if self._fetched_at == seen_fetched_at:
+                self._load()
+            return self._keys
+
+    def _load(self):
+        keys = {key["kid"]: key for key in self.fetch(self.url).get("keys", [])}
+        with self._lock:
+            self._keys = keys
+            self._fetched_at = time.monotonic()
+            self.fetch_count += 1
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def refresh():
+            try:
+                with self._fetch_lock:
+                    self._load()
+            except Exception:
+                # Keep serving the stale keys; the next request retries.
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=refresh, name="jwks-refresh", daemon=True).start()
+
+
+def _jwks_url(settings):
+    return str(
+        settings.get("AUTH0_JWKS_URL")
+        or str(settings["AUTH0_BASE_URL"]) + "/.well-known/jwks.json"
+    )
+
+
+def get_jwks_cache(settings: Mapping[str, object]):
+    """Return the process-wide key set cache for the configured JWKS URL."""
+    url = _jwks_url(settings)
+    jwks_cache = _jwks_caches.get(url)
+    if jwks_cache is not None:
+        return jwks_cache
+
+    with _jwks_caches_lock:
+        jwks_cache = _jwks_caches.get(url)
+        if jwks_cache is None:
+            jwks_cache = JWKSCache(
+                url,
+                ttl=float(settings.get("AUTH0_JWKS_TTL_SECONDS", 600)),
+                max_stale=float(settings.get("AUTH0_JWKS_MAX_STALE_SECONDS", 86400)),
+            )
+            _jwks_caches[url] = jwks_cache
+    return jwks_cache
+
+
+def _verified_tokens(settings):
+    global _token_cache
+    if _token_cache is None:
+        with _token_cache_lock:
+            if _token_cache is None:
+                _token_cache = LocalCache(
+                    settings.get("AUTH0_TOKEN_CACHE_MAX_ENTRIES", 4096)
+                )
+    return _token_cache
+
+
+def _token_cache_key(token, settings):
+    digest = hashlib.sha256(token.encode("utf8")).hexdigest()
+    return (
+        str(settings["AUTH0_BASE_URL"]),
+        str(settings["AUTH0_API_AUDIENCE"]),
+        digest,
+    )
+
+
+def _remember_token(token, payload, settings):
+    expires_at = payload.get("exp")
+    if not isinstance(expires_at, (int, float)):
+        return
+    timeout = expires_at - time.time()
+    if timeout > 0:
+        _verified_tokens(settings).set(
+            _token_cache_key(token, settings), payload, timeout=timeout, size=1
+        )
+
+
+def reset_auth_state():
+    """Drop the cached key sets and verified tokens."""
+    global _token_cache
+    with _jwks_caches_lock:
+        _jwks_caches.clear()
+    with _token_cache_lock:
+        _token_cache = None
+
+
 def _decode_token(token, settings: Mapping[str, object]):
+    if isinstance(token, str):
+        payload = _verified_tokens(settings).get(_token_cache_key(token, settings))
+        if payload is not None:
+            return dict(payload)
+
     try:
         unverified_header = jwt.get_unverified_header(token)
     except jwt.JWTError:
         raise _oauth_problem("Unable to parse authentication token.")
 
-    jsonurl = urlopen(str(settings["AUTH0_BASE_URL"]) + "/.well-known/jwks.json")
-    jwks = json.loads(jsonurl.read())
+    key = get_jwks_cache(settings).get_key(unverified_header.get("kid"))
 
     rsa_key = {}
-    for key in jwks["keys"]:
-        if key["kid"] == unverified_header["kid"]:
-            rsa_key = {
-                "kty": key["kty"],
-                "kid": key["kid"],
-                "use": key["use"],
-                "n": key["n"],
-                "e": key["e"],
-            }
+    if key is not None:
+        rsa_key = {
+            "kty": key["kty"],
+            "kid": key["kid"],
+            "use": key["use"],
+            "n": key["n"],
+            "e": key["e"],
+        }
     if rsa_key:
         try:
             payload = jwt.decode(
@@ -65,7 +224,8 @@ def _decode_token(token, settings: Mapping[str, object]):
         except Exception:
             raise _oauth_problem("Unable to parse authentication token.")
 
-        return payload
+        _remember_token(token, payload, settings)
+        return dict(payload)
 
     raise _oauth_problem("Unable to find appropriate key")
 
@@ -2,10 +2,14 @@
 Base Classes/functions for constructing views
 """
 
+import base64
+import binascii
 import json
 import re
 from copy import deepcopy
+from datetime import datetime
 
+import orjson
 import sqlalchemy as sa
 import sqlalchemy.sql.expression as sae
 from connexion import request
@@ -14,11 +18,11 @@ from psycopg2 import errors
 from sqlalchemy import func
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import raiseload, selectinload
-from webargs import fields
+from webargs import fields, validate
 
 from neurostore.asgi_requests import parse_query_parameters
 from neurostore.cache_versioning import bump_cache_versions, get_cache_version_for_path
-from neurostore.database import db
+from neurostore.database import COUNT_MODES, db
 from neurostore.exceptions.utils.error_helpers import (
     abort_not_found,
     abort_permission,
@@ -47,6 +51,7 @@ from neurostore.resources.utils import (
     pubmed_to_tsquery,
     validate_search_query,
 )
+from neurostore.schemas.compiler import dump as compiled_dump
 from neurostore.services.base_study_metadata_enrichment import (
     enqueue_base_study_metadata_updates,
 )
@@ -260,7 +265,9 @@ class BaseView:
             reason = f"{self.__class__.__name__}.update_base_studies"
             enqueue_base_study_flag_updates(base_studies, reason=reason)
         else:
-            recompute_media_flags(base_studies)
+            recompute_media_flags(
+                base_studies, engine=config.get("BASE_STUDY_FLAGS_ENGINE")
+            )
 
         if config.get("BASE_STUDY_METADATA_ASYNC", True):
             reason = f"{self.__class__.__name__}.update_base_studies"
@@ -397,9 +404,7 @@ class ObjectView(BaseView):
             abort_not_found(self._model.__name__, id)
 
         return (
-            self._schema(
-                context=dict(args),
-            ).dump(record),
+            compiled_dump(self._schema, record, context=dict(args)),
             200,
             {"Content-Type": "application/json"},
         )
@@ -503,9 +508,35 @@ LIST_USER_ARGS = {
     "page_size": fields.Int(load_default=20, validate=lambda val: val < 30000),
     "user_id": fields.String(load_default=None),
     "paginate": fields.Boolean(load_default=True),
+    "cursor": fields.String(load_default=None),
+    "count": fields.String(load_default="exact", validate=validate.OneOf(COUNT_MODES)),
 }
 
 
+def encode_cursor(sort, desc, key):
+    """Encode the ``(sort value, id)`` of a page's last row as an opaque token."""
+    value, last_id = key
+    payload = orjson.dumps({"sort": sort, "desc": desc, "key": [value, last_id]})
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token, sort, desc, sort_key):
+    """Decode a cursor token, rejecting ones issued for a different ordering."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = orjson.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        value, last_id = payload["key"]
+        cursor_sort, cursor_desc = payload["sort"], payload["desc"]
+        if value is not None and isinstance(sort_key.type, sa.DateTime):
+            value = datetime.fromisoformat(value)
+    except (binascii.Error, orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+        abort_validation("cursor is not a valid pagination token")
+
+    if cursor_sort != sort or cursor_desc != desc:
+        abort_validation("cursor was issued for a different sort order")
+    return value, last_id
+
+
 class ListView(BaseView):
     _search_fields = []
     _multi_search = None
@@ -535,12 +566,28 @@ class ListView(BaseView):
     def should_hydrate_records(self, args):
         return True
 
-    def serialize_records(self, records, args, exclude=None):
-        schema_many = self._schema(exclude=exclude, many=True, context=args)
+    def load_records(self, record_ids, args):
+        """Load ``record_ids`` with ``eager_load`` applied, in the given order."""
+        hydrated_query = self._model.query.filter(self._model.id.in_(record_ids))
+        hydrated_query = self.eager_load(hydrated_query, args)
+        records_by_id = {record.id: record for record in hydrated_query.all()}
+        return [
+            records_by_id[record_id]
+            for record_id in record_ids
+            if record_id in records_by_id
+        ]
+
+    def serialize_page(self, record_ids, args):
+        """Serialize the records of a listing page given their ordered ids."""
+        records = self.load_records(record_ids, args) if record_ids else []
+        return self.serialize_records(records, args)
 
+    def serialize_records(self, records, args, exclude=None):
         try:
             # Fast path
-            return schema_many.dump(records)
+            return compiled_dump(
+                self._schema, records, context=args, exclude=exclude, many=True
+            )
         except Exception as e:
             # Fall back to manual loop to isolate the problem
             schema = self._schema(exclude=exclude, many=False, context=args)
@@ -558,6 +605,10 @@ class ListView(BaseView):
     def create_metadata(self, q, total):
         return {"total_count": total}
 
+    def supports_cursor_pagination(self, args):
+        """Whether results are ordered only by the sort column and id."""
+        return True
+
     @cache.cached(60 * 60, query_string=True, make_cache_key=cache_key_creator)
     def search(self, extra_args=None):
         args = parse_query_parameters(self._user_args, request)
@@ -616,9 +667,14 @@ class ListView(BaseView):
             if rank_col is not None:
                 rank_sort = rank_col.desc() if desc == "desc" else rank_col.asc()
                 q = q.order_by(rank_sort, m.id.desc())
+                # ts_rank returns real; compare as double so cursors round-trip.
+                sort_key = sa.cast(rank_col.element, sa.Float)
+                sort_desc = desc == "desc"
             else:
                 # Default to created_at when no search
                 q = q.order_by(m.created_at.desc(), m.id.desc())
+                sort_key = m.created_at
+                sort_desc = True
         else:
             # Use user-specified sort column
             attr = getattr(m, sort_col)
@@ -626,33 +682,66 @@ class ListView(BaseView):
             if sort_col not in ("created_at", "updated_at"):
                 attr = func.lower(attr)
             q = q.order_by(getattr(attr, desc)(), m.id.desc())
-
-        if args["paginate"]:
+            sort_key = attr
+            sort_desc = desc == "desc"
+
+        count_mode = args["count"]
+        hydrate = self.should_hydrate_records(args)
+        record_ids = None
+        metadata_extra = {}
+        if args["cursor"] is not None:
+            if not self.supports_cursor_pagination(args):
+                abort_validation("cursor pagination is not supported for this search")
+            if args["page_size"] < 1:
+                abort_validation("page_size must be a positive integer")
+            after = None
+            if args["cursor"]:
+                after = decode_cursor(args["cursor"], sort_col, sort_desc, sort_key)
+            keyset_page = q.keyset_page(
+                sort_key,
+                m.id,
+                args["page_size"],
+                descending=sort_desc,
+                after=after,
+            )
+            records = keyset_page.items
+            total = q.count_rows(count_mode)
+            metadata_extra["next_cursor"] = (
+                encode_cursor(sort_col, sort_desc, keyset_page.next_key)
+                if keyset_page.next_key is not None
+                else None
+            )
+        elif args["paginate"] and count_mode == "exact" and hydrate:
+            # The page ids and the total come from one statement; the records
+            # themselves are loaded (or serialized) from the ids.
+            record_ids, total = q.page_ids(
+                m.id, page=args["page"], per_page=args["page_size"]
+            )
+        elif args["paginate"]:
             pagination_query = q.paginate(
                 page=args["page"],
                 per_page=args["page_size"],
                 error_out=False,
+                count=count_mode,
             )
             records = pagination_query.items
             total = pagination_query.total
         else:
             records = q.all()
             total = len(records)
+            count_mode = "exact"
+        if count_mode == "estimate":
+            metadata_extra["total_count_estimated"] = True
 
-        if records and self.should_hydrate_records(args):
+        if record_ids is None and hydrate:
             record_ids = [record.id for record in records]
-            hydrated_query = self._model.query.filter(self._model.id.in_(record_ids))
-            hydrated_query = self.eager_load(hydrated_query, args)
-            hydrated_records = hydrated_query.all()
-            records_by_id = {record.id: record for record in hydrated_records}
-            records = [
-                records_by_id[record_id]
-                for record_id in record_ids
-                if record_id in records_by_id
-            ]
-
-        content = self.serialize_records(records, args)
+
+        if record_ids is not None:
+            content = self.serialize_page(record_ids, args)
+        else:
+            content = self.serialize_records(records, args)
         metadata = self.create_metadata(q, total)
+        metadata.update(metadata_extra)
         response = {
             "metadata": metadata,
             "results": content,
@@ -6,7 +6,8 @@ import numpy as np
 import sqlalchemy as sa
 import sqlalchemy.sql.expression as sae
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import func, select, text
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import JSONB, JSONPATH
 from sqlalchemy.orm import aliased
 
 from neurostore import embeddings
@@ -16,16 +17,23 @@ from neurostore.exceptions.utils.error_helpers import abort_validation
 from neurostore.models import (
     Analysis,
     BaseStudy,
+    BaseStudyGridCell,
     Pipeline,
     PipelineConfig,
     PipelineEmbedding,
+    PipelineLatestResult,
     PipelineStudyResult,
     Point,
     Study,
 )
+from neurostore.models import spatial_index
 from neurostore.utils import build_jsonpath, parse_json_filter
 
 
+def _jsonpath(path):
+    return sa.cast(sa.bindparam(None, path), JSONPATH)
+
+
 @dataclass
 class PipelineFilterGroup:
     version: str | None = None
@@ -57,7 +65,9 @@ class BaseStudySearchService:
         pipeline_config_id, dimensions = self._resolve_embedding_config(
             args.get("pipeline_config_id")
         )
-        user_vector = embeddings.get_embedding(semantic_search, dimensions=dimensions)
+        user_vector = embeddings.get_query_embedding(
+            semantic_search, dimensions=dimensions
+        )
         return self._apply_ann_query(
             query,
             user_vector,
@@ -177,12 +187,37 @@ class BaseStudySearchService:
                 .correlate(BaseStudy)
                 .exists()
             )
-            return query.filter(spatial_filter)
+            return query.filter(
+                BaseStudy.id.in_(self._grid_cell_candidates(x, y, z, radius)),
+                spatial_filter,
+            )
 
         if any(value is not None for value in [x, y, z, radius]):
             abort_validation("Spatial query requires x, y, z, and radius together.")
         return query
 
+    def _grid_cell_candidates(self, x, y, z, radius):
+        """Base studies with a coordinate in a grid cell the sphere touches."""
+        candidates = sa.select(BaseStudyGridCell.base_study_id).distinct()
+        cells = spatial_index.cells_within_radius(x, y, z, radius)
+        if cells is not None:
+            return candidates.where(
+                sa.tuple_(
+                    BaseStudyGridCell.cell_x,
+                    BaseStudyGridCell.cell_y,
+                    BaseStudyGridCell.cell_z,
+                ).in_(cells)
+            )
+
+        (x_low, x_high), (y_low, y_high), (z_low, z_high) = spatial_index.cell_ranges(
+            x, y, z, radius
+        )
+        return candidates.where(
+            BaseStudyGridCell.cell_x.between(x_low, x_high),
+            BaseStudyGridCell.cell_y.between(y_low, y_high),
+            BaseStudyGridCell.cell_z.between(z_low, z_high),
+        )
+
     def _apply_neurovault_filter(self, query, args):
         neurovault_id = args.get("neurovault_id")
         if not neurovault_id:
@@ -329,7 +364,16 @@ class BaseStudySearchService:
     def _build_pipeline_subqueries(self, pipeline_filters):
         subqueries = []
         for pipeline_name, filter_group in pipeline_filters.items():
-            result_alias = aliased(PipelineStudyResult)
+            if not (filter_group.result_filters or filter_group.config_filters):
+                continue
+
+            # Result filters only consider each base study's latest result,
+            # kept in the pipeline_latest_results projection.
+            result_alias = aliased(
+                PipelineLatestResult
+                if filter_group.result_filters
+                else PipelineStudyResult
+            )
             config_alias = aliased(PipelineConfig)
             pipeline_alias = aliased(Pipeline)
             pipeline_query = (
@@ -343,22 +387,8 @@ class BaseStudySearchService:
                 pipeline_query = pipeline_query.filter(
                     config_alias.version == filter_group.version
                 )
-
-            if filter_group.result_filters:
-                latest_results = self._latest_results_subquery(
-                    pipeline_name,
-                    result_alias,
-                    config_alias,
-                    pipeline_alias,
-                    version=filter_group.version,
-                )
-                pipeline_query = pipeline_query.join(
-                    latest_results,
-                    (result_alias.base_study_id == latest_results.c.base_study_id)
-                    & (
-                        result_alias.date_executed >= latest_results.c.max_date_executed
-                    ),
-                )
+            elif filter_group.result_filters:
+                pipeline_query = pipeline_query.filter(result_alias.is_latest.is_(True))
 
             pipeline_query = self._apply_result_filters(
                 pipeline_query,
@@ -368,38 +398,13 @@ class BaseStudySearchService:
             )
             pipeline_query = self._apply_config_filters(
                 pipeline_query,
-                pipeline_name,
                 filter_group.config_filters,
+                config_alias,
             )
-
-            if filter_group.result_filters or filter_group.config_filters:
-                subqueries.append(pipeline_query.subquery())
+            subqueries.append(pipeline_query.subquery())
 
         return subqueries
 
-    def _latest_results_subquery(
-        self,
-        pipeline_name,
-        result_alias,
-        config_alias,
-        pipeline_alias,
-        *,
-        version=None,
-    ):
-        query = (
-            db.session.query(
-                result_alias.base_study_id,
-                func.max(result_alias.date_executed).label("max_date_executed"),
-            )
-            .join(config_alias, result_alias.config_id == config_alias.id)
-            .join(pipeline_alias, config_alias.pipeline_id == pipeline_alias.id)
-            .filter(pipeline_alias.name == pipeline_name)
-            .group_by(result_alias.base_study_id)
-        )
-        if version is not None:
-            query = query.filter(config_alias.version == version)
-        return query.subquery()
-
     def _find_missing_pipelines(self, pipeline_filters):
         pipeline_names = sorted(pipeline_filters)
         if not pipeline_names:
@@ -416,7 +421,9 @@ class BaseStudySearchService:
     def _apply_result_filters(
         self, pipeline_query, pipeline_name, result_filters, result_alias
     ):
-        for filter_index, (field_path, operator, value) in enumerate(result_filters):
+        # Filter values are anonymous binds, so the compiled statement is
+        # cached by the shape of the filters alone.
+        for field_path, operator, value in result_filters:
             normalized_field = field_path.replace("[]", "")
             if (
                 pipeline_name == "TaskExtractor"
@@ -429,39 +436,38 @@ class BaseStudySearchService:
                     if modality_value.strip()
                 ]
                 if modality_values:
-                    modality_field = result_alias.result_data.op("->")(
-                        sa.literal_column("'Modality'")
-                    )
-                    modality_clauses = []
-                    for value_index, modality_value in enumerate(modality_values):
-                        param_name = f"modality_filter_{pipeline_name}_{filter_index}_{value_index}"  # noqa: E501
-                        modality_clauses.append(
-                            modality_field.op("@>")(
-                                sa.func.jsonb_build_array(
-                                    sa.bindparam(param_name, modality_value)
+                    # Top-level containment can use the result_data index.
+                    pipeline_query = pipeline_query.filter(
+                        sae.or_(
+                            *(
+                                result_alias.result_data.op("@>")(
+                                    sa.bindparam(
+                                        None,
+                                        {"Modality": [modality_value]},
+                                        type_=JSONB,
+                                    )
                                 )
+                                for modality_value in modality_values
                             )
                         )
-                    pipeline_query = pipeline_query.filter(sae.or_(*modality_clauses))
+                    )
                 continue
 
-            jsonpath = build_jsonpath(field_path, operator, value)
-            param_name = f"jsonpath_result_{pipeline_name}_{filter_index}"
+            # The @? operator (unlike jsonb_path_exists) can use the GIN index.
             pipeline_query = pipeline_query.filter(
-                text(f"jsonb_path_exists(result_data, :{param_name})").params(
-                    **{param_name: jsonpath}
+                result_alias.result_data.op("@?", is_comparison=True)(
+                    _jsonpath(build_jsonpath(field_path, operator, value))
                 )
             )
 
         return pipeline_query
 
-    def _apply_config_filters(self, pipeline_query, pipeline_name, config_filters):
-        for filter_index, (field_path, operator, value) in enumerate(config_filters):
-            jsonpath = build_jsonpath(field_path, operator, value)
-            param_name = f"jsonpath_config_{pipeline_name}_{filter_index}"
+    def _apply_config_filters(self, pipeline_query, config_filters, config_alias):
+        for field_path, operator, value in config_filters:
             pipeline_query = pipeline_query.filter(
-                text(f"jsonb_path_exists(config_args, :{param_name})").params(
-                    **{param_name: jsonpath}
+                sa.func.jsonb_path_exists(
+                    config_alias.config_args,
+                    _jsonpath(build_jsonpath(field_path, operator, value)),
                 )
             )
 
@@ -16,7 +16,7 @@ from neurostore.models import (
     Table,
     User,
 )
-from neurostore.models.data import BaseStudy
+from neurostore.models.data import BaseStudy, load_display_features
 from neurostore.resources.base import (
     ListView,
     ObjectView,
@@ -34,6 +34,9 @@ from neurostore.resources.data_views.common import (
     LIST_NESTED_ARGS,
     apply_map_type_filter,
 )
+from neurostore.resources.data_views.serialization import (
+    serialize_base_study_listing,
+)
 from neurostore.resources.utils import view_maker
 from neurostore.schemas.data import BaseDataSchema, StringOrNested, StudySchema
 
@@ -188,6 +191,35 @@ class BaseStudiesView(ObjectView, ListView):
     def should_hydrate_records(self, args):
         return True
 
+    def serialize_page(self, record_ids, args):
+        # Flat and info listings are built by PostgreSQL; features and nested
+        # versions still go through the schema.
+        if (
+            (args.get("flat") or args.get("info"))
+            and not args.get("nested")
+            and not args.get("feature_display")
+        ):
+            return serialize_base_study_listing(
+                record_ids, info=bool(args.get("info") and not args.get("flat"))
+            )
+        return super().serialize_page(record_ids, args)
+
+    def serialize_records(self, records, args, exclude=None):
+        if args.get("feature_display") and records:
+            args = {
+                **args,
+                "display_features": load_display_features(
+                    [record.id for record in records],
+                    args["feature_display"],
+                    args.get("pipeline_config"),
+                ),
+            }
+        return super().serialize_records(records, args, exclude=exclude)
+
+    def supports_cursor_pagination(self, args):
+        # Semantic search orders by embedding distance ahead of the sort column.
+        return not args.get("semantic_search")
+
     def join_tables(self, q, args):
         if not args.get("flat"):
             q = q.options(selectinload(self._model.versions))
@@ -3,12 +3,15 @@ from __future__ import annotations
 from collections import defaultdict
 
 import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
+from sqlalchemy.orm import aliased
 
 from neurostore.database import db
 from neurostore.map_types import map_type_label
 from neurostore.models import (
     Analysis,
     AnalysisConditions,
+    BaseStudy,
     Condition,
     Image,
     Point,
@@ -16,6 +19,7 @@ from neurostore.models import (
     Study,
     Studyset,
     StudysetStudy,
+    User,
 )
 
 
@@ -190,7 +194,10 @@ def serialize_study_detail(study):
     return serialize_study_record(study)
 
 
-def serialize_nested_studyset(studyset_id):
+NESTED_STUDYSET_STREAM_BATCH_SIZE = 200
+
+
+def _nested_studyset_header(studyset_id):
     studyset_row = db.session.execute(
         sa.select(
             Studyset.id,
@@ -207,7 +214,21 @@ def serialize_nested_studyset(studyset_id):
     if studyset_row is None:
         return None
 
-    study_rows = db.session.execute(
+    return {
+        "id": studyset_row.id,
+        "name": studyset_row.name,
+        "user": studyset_row.user_id,
+        "description": studyset_row.description,
+        "publication": studyset_row.publication,
+        "doi": studyset_row.doi,
+        "pmid": studyset_row.pmid,
+        "created_at": _serialize_dt(studyset_row.created_at),
+        "updated_at": _serialize_dt(studyset_row.updated_at),
+    }
+
+
+def _nested_study_rows_query(studyset_id):
+    return (
         sa.select(
             StudysetStudy.study_id,
             StudysetStudy.curation_stub_uuid,
@@ -231,15 +252,17 @@ def serialize_nested_studyset(studyset_id):
         .join(Study, Study.id == StudysetStudy.study_id)
         .where(StudysetStudy.studyset_id == studyset_id)
         .order_by(StudysetStudy.study_id)
-    ).all()
+    )
 
+
+def _load_nested_analyses(study_ids):
+    """Serialize the analyses (with points, images and conditions) of studies."""
     analyses_by_study = defaultdict(list)
     points_by_analysis = defaultdict(list)
     images_by_analysis = defaultdict(list)
     conditions_by_analysis = defaultdict(list)
     weights_by_analysis = defaultdict(list)
     values_by_point = defaultdict(list)
-    study_ids = [row.study_id for row in study_rows]
 
     if study_ids:
         analysis_rows = db.session.execute(
@@ -420,66 +443,93 @@ def serialize_nested_studyset(studyset_id):
             }
         )
 
-    studyset_studies = []
-    studies_payload = []
-    for (
-        study_id,
-        curation_stub_uuid,
-        record_id,
-        created_at,
-        updated_at,
-        user_id,
-        name,
-        description,
-        publication,
-        doi,
-        pmid,
-        authors,
-        year,
-        metadata,
-        source,
-        source_id,
-        source_updated_at,
-    ) in study_rows:
-        studyset_studies.append(
-            {"id": study_id, "curation_stub_uuid": curation_stub_uuid}
-        )
-        studies_payload.append(
-            {
-                "id": record_id,
-                "created_at": _serialize_dt(created_at),
-                "updated_at": _serialize_dt(updated_at),
-                "user": user_id,
-                "name": name,
-                "description": description,
-                "publication": publication,
-                "doi": doi,
-                "pmid": pmid,
-                "authors": authors,
-                "year": year,
-                "metadata": metadata,
-                "source": source,
-                "source_id": source_id,
-                "source_updated_at": _serialize_dt(source_updated_at),
-                "analyses": analyses_by_study.get(study_id, []),
-            }
-        )
+    return analyses_by_study
+
 
+def _nested_study_payload(row, analyses_by_study):
     return {
-        "id": studyset_row.id,
-        "name": studyset_row.name,
-        "user": studyset_row.user_id,
-        "description": studyset_row.description,
-        "publication": studyset_row.publication,
-        "doi": studyset_row.doi,
-        "pmid": studyset_row.pmid,
-        "created_at": _serialize_dt(studyset_row.created_at),
-        "updated_at": _serialize_dt(studyset_row.updated_at),
-        "studies": studies_payload,
-        "studyset_studies": studyset_studies,
+        "id": row.id,
+        "created_at": _serialize_dt(row.created_at),
+        "updated_at": _serialize_dt(row.updated_at),
+        "user": row.user_id,
+        "name": row.name,
+        "description": row.description,
+        "publication": row.publication,
+        "doi": row.doi,
+        "pmid": row.pmid,
+        "authors": row.authors,
+        "year": row.year,
+        "metadata": row.metadata_,
+        "source": row.source,
+        "source_id": row.source_id,
+        "source_updated_at": _serialize_dt(row.source_updated_at),
+        "analyses": analyses_by_study.get(row.study_id, []),
+    }
+
+
+def serialize_nested_studyset(studyset_id):
+    header = _nested_studyset_header(studyset_id)
+    if header is None:
+        return None
+
+    study_rows = db.session.execute(_nested_study_rows_query(studyset_id)).all()
+    analyses_by_study = _load_nested_analyses([row.study_id for row in study_rows])
+
+    return {
+        **header,
+        "studies": [
+            _nested_study_payload(row, analyses_by_study) for row in study_rows
+        ],
+        "studyset_studies": [
+            {"id": row.study_id, "curation_stub_uuid": row.curation_stub_uuid}
+            for row in study_rows
+        ],
     }
 
 
+def iter_nested_studyset(studyset_id, batch_size=NESTED_STUDYSET_STREAM_BATCH_SIZE):
+    """Yield a nested studyset as a header document followed by one per study.
+
+    The header carries the studyset fields and ``studyset_studies``; every
+    following document is one entry of the ``studies`` list produced by
+    ``serialize_nested_studyset``. Studies are read through a server-side
+    cursor and their analyses are loaded ``batch_size`` studies at a time, so
+    memory stays bounded regardless of the studyset size. Returns ``None``
+    when the studyset does not exist.
+    """
+    header = _nested_studyset_header(studyset_id)
+    if header is None:
+        return None
+
+    header["studyset_studies"] = [
+        {"id": study_id, "curation_stub_uuid": curation_stub_uuid}
+        for study_id, curation_stub_uuid in db.session.execute(
+            sa.select(StudysetStudy.study_id, StudysetStudy.curation_stub_uuid)
+            .where(StudysetStudy.studyset_id == studyset_id)
+            .order_by(StudysetStudy.study_id)
+        ).all()
+    ]
+
+    def documents():
+        yield header
+        result = db.session.execute(
+            _nested_study_rows_query(studyset_id).execution_options(
+                yield_per=batch_size
+            )
+        )
+        try:
+            for study_rows in result.partitions():
+                analyses_by_study = _load_nested_analyses(
+                    [row.study_id for row in study_rows]
+                )
+                for row in study_rows:
+                    yield _nested_study_payload(row, analyses_by_study)
+        finally:
+            result.close()
+
+    return documents()
+
+
 def serialize_studyset_summary(record):
     study_rows = db.session.execute(
         sa.select(
@@ -558,3 +608,111 @@ def serialize_studyset_summary(record):
         "studies": studies_payload,
         "studyset_studies": studyset_studies,
     }
+
+
+def _json_timestamp(column):
+    # ``datetime.isoformat()`` of the UTC value: microseconds only when set.
+    utc = sa.func.timezone("UTC", column)
+    return sa.case(
+        (
+            sa.func.date_trunc("second", column) == column,
+            sa.func.to_char(utc, 'YYYY-MM-DD"T"HH24:MI:SS"+00:00"'),
+        ),
+        else_=sa.func.to_char(utc, 'YYYY-MM-DD"T"HH24:MI:SS.US"+00:00"'),
+    )
+
+
+def _json_object(*pairs):
+    # Keys are constants, so they are rendered inline rather than bound.
+    return sa.func.json_build_object(
+        *(
+            value
+            for key, column in pairs
+            for value in (sa.literal_column(f"'{key}'"), column)
+        )
+    )
+
+
+def _base_study_versions_json():
+    version_user = aliased(User)
+    version = _json_object(
+        ("id", Study.id),
+        ("user", Study.user_id),
+        ("username", version_user.name),
+        ("created_at", _json_timestamp(Study.created_at)),
+        ("updated_at", _json_timestamp(Study.updated_at)),
+        ("source", Study.source),
+    )
+    return (
+        sa.select(
+            sa.func.coalesce(
+                sa.func.json_agg(
+                    aggregate_order_by(version, Study.created_at, Study.id)
+                ),
+                sa.literal_column("'[]'::json"),
+            )
+        )
+        .select_from(Study)
+        .outerjoin(version_user, version_user.external_id == Study.user_id)
+        .where(Study.base_study_id == BaseStudy.id)
+        .correlate(BaseStudy)
+        .scalar_subquery()
+    )
+
+
+def serialize_base_study_listing(base_study_ids, *, info=False):
+    """Serialize a page of base studies for the ``flat`` and ``info`` listings.
+
+    The documents match ``BaseStudySchema`` with the same context, but they
+    are built by PostgreSQL in one statement, so no ORM objects are loaded.
+    ``info`` adds the versions' info fields; ``flat`` omits versions.
+    """
+    if not base_study_ids:
+        return []
+
+    page = (
+        sa.func.unnest(
+            sa.cast(sa.bindparam(None, list(base_study_ids)), ARRAY(sa.Text))
+        )
+        .table_valued("id", with_ordinality="position")
+        .render_derived()
+    )
+    pairs = [
+        ("id", BaseStudy.id),
+        ("user", BaseStudy.user_id),
+        ("username", User.name),
+        ("created_at", _json_timestamp(BaseStudy.created_at)),
+        ("updated_at", _json_timestamp(BaseStudy.updated_at)),
+        ("metadata", BaseStudy.metadata_),
+        ("name", BaseStudy.name),
+        ("description", BaseStudy.description),
+        ("publication", BaseStudy.publication),
+        ("doi", BaseStudy.doi),
+        ("pmid", BaseStudy.pmid),
+        ("pmcid", BaseStudy.pmcid),
+        ("authors", BaseStudy.authors),
+        ("year", BaseStudy.year),
+        ("level", BaseStudy.level),
+        ("is_oa", BaseStudy.is_oa),
+        ("has_coordinates", BaseStudy.has_coordinates),
+        ("has_images", BaseStudy.has_images),
+        ("has_z_maps", BaseStudy.has_z_maps),
+        ("has_t_maps", BaseStudy.has_t_maps),
+        ("has_beta_and_variance_maps", BaseStudy.has_beta_and_variance_maps),
+    ]
+    if info:
+        pairs.append(("versions", _base_study_versions_json()))
+    pairs.append(("features", sa.literal_column("'{}'::json")))
+
+    document = _json_object(*pairs)
+    statement = (
+        sa.select(
+            sa.func.json_agg(
+                aggregate_order_by(document, page.c.position), type_=sa.JSON
+            )
+        )
+        .select_from(page)
+        .join(BaseStudy, BaseStudy.id == page.c.id)
+        .outerjoin(User, User.external_id == BaseStudy.user_id)
+    )
+    return db.session.execute(statement).scalar() or []
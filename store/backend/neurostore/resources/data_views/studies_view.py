@@ -22,6 +22,7 @@ from neurostore.models import (
     User,
 )
 from neurostore.models.data import StudysetStudy
+from neurostore.models.study_change_log import log_study_changes
 from neurostore.resources.base import DefaultObjectViewPolicy, ListView, ObjectView
 from neurostore.resources.data_views.cloning import (
     build_study_clone_payload,
@@ -104,11 +105,22 @@ class StudyMutationPolicy(DefaultMutationPolicy):
             for image in analysis.images or []:
                 image.study = record
         if analysis_ids and getattr(record, "id", None):
-            db.session.execute(
-                update(Image)
-                .where(Image.analysis_id.in_(analysis_ids))
-                .values(study_id=record.id)
+            moved = (
+                Image.analysis_id.in_(analysis_ids),
+                Image.study_id.is_distinct_from(record.id),
             )
+            previous_study_ids = set(
+                db.session.scalars(select(Image.study_id).where(*moved).distinct())
+            )
+            if previous_study_ids:
+                db.session.execute(
+                    update(Image).where(*moved).values(study_id=record.id)
+                )
+                # The bulk update bypasses the change-log listeners.
+                log_study_changes(
+                    db.session.connection(),
+                    study_ids=previous_study_ids | {record.id},
+                )
         return record
 
 
@@ -1,8 +1,10 @@
+import orjson
 import sqlalchemy as sa
 from connexion import request
 from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import load_only, raiseload, selectinload
+from starlette.responses import StreamingResponse
 from webargs import fields
 
 from neurostore.asgi_requests import parse_query_parameters
@@ -42,6 +44,7 @@ from neurostore.resources.data_views.common import (
     LIST_SUMMARY_ARGS,
 )
 from neurostore.resources.data_views.serialization import (
+    iter_nested_studyset,
     serialize_nested_studyset,
     serialize_studyset_summary,
 )
@@ -49,6 +52,8 @@ from neurostore.resources.mutation_core import DefaultMutationPolicy
 from neurostore.resources.utils import view_maker
 from neurostore.schemas.data import StudysetSnapshot
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
 
 class StudysetMutationPolicy(DefaultMutationPolicy):
     def __init__(self, context):
@@ -333,6 +338,34 @@ class StudysetsView(ObjectView, ListView):
     _multi_search = ("name", "description")
     _search_fields = ("name", "description", "publication", "doi", "pmid")
 
+    def get(self, id):
+        # Streamed payloads are produced lazily and bypass the response cache.
+        if self.wants_nested_stream():
+            return self.stream_nested_studyset(id)
+        return super().get(id)
+
+    @staticmethod
+    def wants_nested_stream():
+        params = request.query_params
+        if params.get("nested", "false") != "true":
+            return False
+        if params.get("stream", "false") == "true":
+            return True
+        return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+    def stream_nested_studyset(self, studyset_id):
+        if request.query_params.get("summary", "false") == "true":
+            abort_validation("query parameters 'nested' and 'summary' are incompatible")
+
+        documents = iter_nested_studyset(studyset_id)
+        if documents is None:
+            abort_not_found(self._model.__name__, studyset_id)
+
+        return StreamingResponse(
+            (orjson.dumps(document) + b"\n" for document in documents),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+
     def get_affected_ids(self, ids):
         query = (
             select(Annotation.id)
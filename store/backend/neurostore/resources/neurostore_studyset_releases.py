@@ -9,6 +9,10 @@ from neurostore.services.neurostore_studyset_releases import (
     release_archive_path,
     release_root,
 )
+from neurostore.services.release_archives import (
+    ARCHIVE_FORMATS,
+    DEFAULT_ARCHIVE_FORMAT,
+)
 
 INTERNAL_RELEASE_URI_PREFIX = "/_protected/neurostore-studyset-releases"
 
@@ -24,6 +28,41 @@ def x_accel_release_uri(archive_path, *, settings):
     return INTERNAL_RELEASE_URI_PREFIX + "/" + quote(relative_path.as_posix(), safe="/")
 
 
+def accepted_media_types(accept):
+    """Media types of an ``Accept`` header, dropping those with ``q=0``."""
+    media_types = []
+    for part in (accept or "").split(","):
+        media_type, *params = (item.strip() for item in part.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type and quality > 0:
+            media_types.append(media_type.lower())
+    return media_types
+
+
+def negotiate_archive_format(manifest, *, requested=None, accept=None):
+    """Pick the archive format to serve, or ``None`` if ``requested`` is missing.
+
+    An explicit ``format`` query parameter wins; otherwise the first archive
+    whose media type the client accepts, falling back to the release's
+    default archive.
+    """
+    available = list((manifest or {}).get("archives") or {}) or [DEFAULT_ARCHIVE_FORMAT]
+    if requested:
+        return requested if requested in available else None
+    media_types = accepted_media_types(accept)
+    for archive_format in available:
+        if ARCHIVE_FORMATS[archive_format]["media_type"] in media_types:
+            return archive_format
+    return available[0]
+
+
 class NeurostoreStudysetReleasesView:
     def search(self):
         manifests = list_release_manifests(settings=request.state.settings)
@@ -42,14 +81,24 @@ class NeurostoreStudysetReleasesView:
 class DownloadView:
     def search(self, version):
         settings = request.state.settings
-        archive_path = release_archive_path(version, settings=settings)
+        archive_format = negotiate_archive_format(
+            load_release_manifest(version, settings=settings),
+            requested=request.query_params.get("format"),
+            accept=request.headers.get("accept"),
+        )
+        archive_path = None
+        if archive_format is not None:
+            archive_path = release_archive_path(
+                version, settings=settings, archive_format=archive_format
+            )
         if archive_path is None:
             abort_not_found("NeurostoreStudysetRelease", version)
 
         headers = {
             "X-Accel-Redirect": x_accel_release_uri(archive_path, settings=settings),
-            "Content-Type": "application/gzip",
+            "Content-Type": ARCHIVE_FORMATS[archive_format]["media_type"],
             "Content-Disposition": f'attachment; filename="{archive_path.name}"',
+            "Vary": "Accept",
         }
         if version in {"nightly", "latest"}:
             headers["Cache-Control"] = "no-cache"
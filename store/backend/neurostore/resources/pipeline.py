@@ -1,6 +1,7 @@
 """Pipeline related resources"""
 
-from sqlalchemy import and_, or_, text
+from sqlalchemy import and_, bindparam, cast, func, or_
+from sqlalchemy.dialects.postgresql import JSONPATH
 from sqlalchemy.orm import aliased, selectinload
 from webargs import fields
 
@@ -236,14 +237,12 @@ class PipelineStudyResultsView(ObjectView, ListView):
         ):
             jsonpath = build_jsonpath(field_path, operator, value)
 
-            # Create unique parameter name for this filter
-            param_name = f"jsonpath_feature_{i}"
-
-            # Build filter conditions for this specific pipeline
+            # Anonymous parameters keep the statement shape independent of the
+            # filter values, so it is compiled once and reused.
             pipeline_conditions = [
                 PipelineAlias.name == pipeline_name,
-                text(f"jsonb_path_exists(result_data, :{param_name})").params(
-                    **{param_name: jsonpath}
+                func.jsonb_path_exists(
+                    self.model.result_data, cast(bindparam(None, jsonpath), JSONPATH)
                 ),
             ]
             if version is not None:
@@ -258,14 +257,11 @@ class PipelineStudyResultsView(ObjectView, ListView):
         ):
             jsonpath = build_jsonpath(field_path, operator, value)
 
-            # Create unique parameter name for this filter
-            param_name = f"jsonpathb_config_{i}"
-
             # Build filter conditions for this specific pipeline
             pipeline_conditions = [
                 PipelineAlias.name == pipeline_name,
-                text(f"jsonb_path_exists(config_args, :{param_name})").params(
-                    **{param_name: jsonpath}
+                func.jsonb_path_exists(
+                    ConfigAlias.config_args, cast(bindparam(None, jsonpath), JSONPATH)
                 ),
             ]
             if version is not None:
@@ -0,0 +1,216 @@
+"""Generated dump functions for the marshmallow schemas on read paths.
+
+``dump(schema_class, obj, context=..., exclude=..., many=...)`` returns what
+``schema_class(context=context, exclude=exclude).dump(obj, many=many)`` does,
+but through a plain Python function generated once per schema, structural
+context and ``exclude``. The structural context flags (``nested``, ``flat``,
+``info`` and ``clone``) decide which fields a schema and its nested schemas
+emit; they are resolved when the function is generated, the same way
+``BaseSchema.__init__`` and ``StringOrNested._modify_schema`` resolve them.
+
+Strings, numbers, booleans, datetimes and plain dicts are converted inline
+and nested schemas get generated functions of their own. Other fields
+(methods, functions, plucks, lists) are delegated to the configured
+marshmallow field, and dump hooks run through the schema, so the output is
+the schema's own. Objects may be ORM instances or SQLAlchemy ``Row``s
+carrying the attributes the schema reads.
+
+Generated functions hold configured schema instances whose ``context`` is
+set on every dump, so they are cached per thread.
+"""
+
+import threading
+
+from marshmallow import fields
+from marshmallow.decorators import POST_DUMP, PRE_DUMP
+from marshmallow.schema import Schema
+from marshmallow.utils import get_value, missing
+
+from neurostore.schemas.data import StringOrNested
+
+STRUCTURAL_CONTEXT = ("nested", "flat", "info", "clone")
+
+_ISO_FORMATS = (None, "iso", "iso8601")
+_local = threading.local()
+
+
+def _text(value):
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return str(value)
+
+
+def _inline_expression(field):
+    """Source converting a non-``None`` ``value`` like ``field``, if it is simple."""
+    field_type = type(field)
+    if field_type in (fields.String, fields.Str):
+        return "value if type(value) is str else _text(value)"
+    if field_type in (fields.Integer, fields.Int) and not field.as_string:
+        return "int(value)"
+    if field_type is fields.Float and not field.as_string:
+        return "float(value)"
+    if field_type in (fields.Boolean, fields.Bool, fields.Raw):
+        return "value"
+    if field_type is fields.DateTime and field.format in _ISO_FORMATS:
+        return "value.isoformat()"
+    if field_type is fields.Dict and not field.key_field and not field.value_field:
+        return "dict(value)"
+    return None
+
+
+class _CompiledSchema:
+    """A configured schema instance and its generated row function."""
+
+    def __init__(self, schema, inherits_context):
+        self.schema = schema
+        # Schemas reached through StringOrNested share the caller's context;
+        # those built by a plain Nested field have their own (empty) one.
+        self.inherits_context = inherits_context
+        self.children = []
+        self.pre_dump = bool(schema._hooks[PRE_DUMP])
+        self.post_dump = bool(schema._hooks[POST_DUMP])
+        self.dump_row = self._generate()
+
+    def _generate(self):
+        schema = self.schema
+        namespace = {
+            "_missing": missing,
+            "_get_value": get_value,
+            "_text": _text,
+            "_accessor": schema.get_attribute,
+        }
+        custom_accessor = type(schema).get_attribute is not Schema.get_attribute
+        lines = [
+            "def dump_row(obj):",
+            "    _get = _get_value if hasattr(obj, '__getitem__') else getattr",
+            "    ret = {}",
+        ]
+        for index, (attr_name, field) in enumerate(schema.dump_fields.items()):
+            key = field.data_key if field.data_key is not None else attr_name
+            field_name = f"_field_{index}"
+            namespace[field_name] = field
+            expression = None if custom_accessor else _inline_expression(field)
+            if isinstance(field, StringOrNested):
+                converter = f"_nested_{index}"
+                namespace[converter] = self._string_or_nested(field)
+                lines.append(
+                    f"    value = {field_name}.get_value(obj, {attr_name!r}, "
+                    "accessor=_accessor)"
+                )
+                convert = f"{converter}(value, obj)"
+            elif type(field) is fields.Nested and not custom_accessor:
+                converter = f"_nested_{index}"
+                namespace[converter] = self._nested(field)
+                lines.append(
+                    f"    value = {field_name}.get_value(obj, {attr_name!r}, "
+                    "accessor=_accessor)"
+                )
+                convert = f"None if value is None else {converter}(value)"
+            elif expression is not None:
+                check_key = (
+                    field.attribute if field.attribute is not None else attr_name
+                )
+                getter = "_get_value" if "." in check_key else "_get"
+                lines.append(f"    value = {getter}(obj, {check_key!r}, _missing)")
+                convert = f"None if value is None else {expression}"
+            else:
+                lines.append(
+                    f"    value = {field_name}.serialize({attr_name!r}, obj, "
+                    "accessor=_accessor)"
+                )
+                lines.append("    if value is not _missing:")
+                lines.append(f"        ret[{key!r}] = value")
+                continue
+
+            if field.dump_default is not missing:
+                default = f"_default_{index}"
+                namespace[default] = field.dump_default
+                call = "()" if callable(field.dump_default) else ""
+                lines.append("    if value is _missing:")
+                lines.append(f"        value = {default}{call}")
+            lines.append("    if value is not _missing:")
+            lines.append(f"        ret[{key!r}] = {convert}")
+        lines.append("    return ret")
+
+        exec(
+            compile("\n".join(lines), f"<dump {type(schema).__name__}>", "exec"),
+            namespace,
+        )
+        return namespace["dump_row"]
+
+    def _string_or_nested(self, field):
+        context = field.context
+        if not context.get("nested") and not context.get("info"):
+            string_field = field.string_field
+            child = None
+        else:
+            child = _CompiledSchema(field._modify_schema(), self.inherits_context)
+            self.children.append(child)
+
+        def convert(value, obj):
+            first = (value[0] if len(value) > 0 else None) if field.many else value
+            if not first:
+                return value
+            if child is None:
+                return string_field._serialize(value, field.name, obj)
+            return child.dump(value, many=field.many)
+
+        return convert
+
+    def _nested(self, field):
+        child = _CompiledSchema(field.schema, inherits_context=False)
+        self.children.append(child)
+        many = child.schema.many or field.many
+
+        def convert(value):
+            return child.dump(value, many=many)
+
+        return convert
+
+    def set_context(self, context):
+        if self.inherits_context:
+            self.schema.context = context
+        for child in self.children:
+            child.set_context(context)
+
+    def dump(self, obj, many=False):
+        schema = self.schema
+        processed = obj
+        if self.pre_dump:
+            processed = schema._invoke_dump_processors(
+                PRE_DUMP, obj, many=many, original_data=obj
+            )
+        if many and processed is not None:
+            result = [self.dump_row(item) for item in processed]
+        else:
+            result = self.dump_row(processed)
+        if self.post_dump:
+            result = schema._invoke_dump_processors(
+                POST_DUMP, result, many=many, original_data=obj
+            )
+        return result
+
+
+def compiled_schema(schema_class, context=None, exclude=()):
+    """Return the generated dumper of ``schema_class`` for this thread."""
+    context = context or {}
+    flags = tuple(bool(context.get(flag)) for flag in STRUCTURAL_CONTEXT)
+    key = (schema_class, flags, tuple(exclude or ()))
+    cache = getattr(_local, "schemas", None)
+    if cache is None:
+        cache = _local.schemas = {}
+    compiled = cache.get(key)
+    if compiled is None:
+        structural = {
+            flag: True for flag, value in zip(STRUCTURAL_CONTEXT, flags) if value
+        }
+        schema = schema_class(context=structural, exclude=tuple(exclude or ()))
+        compiled = cache[key] = _CompiledSchema(schema, inherits_context=True)
+    return compiled
+
+
+def dump(schema_class, obj, *, context=None, exclude=(), many=False):
+    """Dump ``obj`` as ``schema_class(context=..., exclude=...)`` would."""
+    compiled = compiled_schema(schema_class, context, exclude)
+    compiled.set_context(context or {})
+    return compiled.dump(obj, many=many)
@@ -577,7 +577,12 @@ class BaseStudySchema(BaseDataSchema):
         if pipelines is None:
             return {}
 
-        features = obj.display_features(pipelines, pipeline_configs)
+        # Listings load the features of the whole page up front.
+        features_by_id = self.context.get("display_features")
+        if features_by_id is not None:
+            features = features_by_id.get(obj.id, {})
+        else:
+            features = obj.display_features(pipelines, pipeline_configs)
         # Flatten each pipeline's predictions
         if features and self.context.get("feature_flatten", False):
             flattened_features = {}
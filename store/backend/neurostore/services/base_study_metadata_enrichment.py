@@ -1,7 +1,9 @@
 import datetime as dt
+import functools
 import re
 import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from xml.etree import ElementTree
 
 import requests
@@ -16,13 +18,18 @@ from neurostore.models import (
     BaseStudy,
     BaseStudyFlagOutbox,
     BaseStudyMetadataOutbox,
+    PipelineConfig,
     PipelineEmbedding,
     PipelineStudyResult,
     Study,
     StudysetStudy,
 )
+from neurostore.models.pipeline_latest_results import refresh_latest_results
+from neurostore.models.spatial_index import rebuild_grid_cells
+from neurostore.models.study_change_log import log_study_changes
 from neurostore.resources.common import merge_unique_ids, normalize_ids
 from neurostore.services.has_media_flags import enqueue_base_study_flag_updates
+from neurostore.services.provider_response_cache import ProviderResponseCache
 
 ID_FIELDS = ("pmid", "doi", "pmcid")
 METADATA_FIELDS = ("name", "description", "publication", "authors", "year", "is_oa")
@@ -33,6 +40,11 @@ SEMANTIC_SCHOLAR_DEFAULT_RPS = 1.0
 PUBMED_DEFAULT_RPS_WITH_KEY = 10.0
 PUBMED_DEFAULT_RPS_WITHOUT_KEY = 3.0
 RATE_LIMIT_SAFETY_MARGIN_SECONDS = 0.01
+# Most ids each provider accepts in one batch request.
+SEMANTIC_SCHOLAR_BATCH_SIZE = 500
+PUBMED_IDCONV_BATCH_SIZE = 200
+PUBMED_EFETCH_BATCH_SIZE = 200
+OPENALEX_FILTER_BATCH_SIZE = 50
 
 
 def _has_value(value):
@@ -283,43 +295,196 @@ def _apply_provider_rate_limit(settings, url, kwargs):
     _provider_rate_limiter.wait(provider_name, requests_per_second)
 
 
-def lookup_ids_semantic_scholar(identifiers, *, settings, logger, api_key=None):
+class _BatchLoader:
+    """Collects keys from concurrent callers and fetches them in one request.
+
+    Keys are dispatched once ``max_size`` are pending, or ``window_seconds``
+    after the first pending key. Batches run on the thread that fills them or
+    on the window timer, so several can be in flight at once. When a batch
+    request fails its keys are fetched one by one, so only the keys that fail
+    on their own raise.
+    """
+
+    def __init__(self, fetch_many, max_size, window_seconds):
+        self.fetch_many = fetch_many
+        self.max_size = max(1, int(max_size))
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._timer = None
+
+    def load_many(self, keys):
+        futures = []
+        ready = []
+        with self._lock:
+            for key in keys:
+                future = self._pending.get(key)
+                if future is None:
+                    future = self._pending[key] = Future()
+                    if len(self._pending) >= self.max_size:
+                        ready.append(self._take())
+                futures.append(future)
+            if self._pending and self._timer is None:
+                self._timer = threading.Timer(self.window_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        for batch in ready:
+            self._dispatch(batch)
+        return {key: future.result() for key, future in zip(keys, futures)}
+
+    def flush(self):
+        with self._lock:
+            batch = self._take()
+        self._dispatch(batch)
+
+    def _take(self):
+        batch, self._pending = self._pending, {}
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+    def _dispatch(self, batch):
+        if not batch:
+            return
+        try:
+            found = self.fetch_many(list(batch))
+        except BaseException as exc:  # noqa: BLE001
+            if len(batch) > 1 and isinstance(exc, Exception):
+                for key, future in batch.items():
+                    self._dispatch({key: future})
+                return
+            for future in batch.values():
+                future.set_exception(exc)
+            return
+        for key, future in batch.items():
+            future.set_result(found.get(key))
+
+
+class _ProviderBatcher:
+    """Shares provider batch requests between the gathers of one outbox batch."""
+
+    def __init__(self, window_seconds):
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._loaders = {}
+
+    def load_many(self, loader_key, keys, fetch_many, max_size):
+        with self._lock:
+            loader = self._loaders.get(loader_key)
+            if loader is None:
+                loader = _BatchLoader(fetch_many, max_size, self.window_seconds)
+                self._loaders[loader_key] = loader
+        return loader.load_many(keys)
+
+
+def _load_provider_records(
+    batcher, loader_key, keys, fetch_many, max_size, *, cache=None
+):
+    """Fetch ``keys`` directly, or through the batcher shared with other gathers.
+
+    Keys answered by ``cache`` are not fetched, and fetched batches are stored
+    in it, misses included.
+    """
+    keys = list(dict.fromkeys(keys))
+    found = {}
+    if cache is not None:
+        cached = cache.get_many(keys)
+        found = {key: record for key, record in cached.items() if record is not None}
+        keys = [key for key in keys if key not in cached]
+        if not keys:
+            return found
+        fetch_many = cache.fetching(fetch_many)
+    if batcher is None:
+        found.update(fetch_many(keys))
+        return found
+    fetched = batcher.load_many(loader_key, keys, fetch_many, max_size)
+    found.update({key: record for key, record in fetched.items() if record is not None})
+    return found
+
+
+def _id_match_key(value):
+    if not _has_value(value):
+        return None
+    return str(value).strip().lower()
+
+
+def _semantic_scholar_request_ids(identifiers):
     request_ids = []
     doi = _normalize_doi(identifiers.get("doi"))
     pmid = _normalize_pmid(identifiers.get("pmid"))
-
     if doi:
         request_ids.append(f"DOI:{doi}")
     if pmid:
         request_ids.append(f"PMID:{pmid}")
-    if not request_ids:
-        return {}
+    return request_ids
+
 
+def _fetch_semantic_scholar_papers(request_ids, *, settings, fields, api_key=None):
+    """POST ``/paper/batch``; the response lists one record (or null) per id."""
     headers = {"Content-Type": "application/json"}
     if api_key:
         headers["x-api-key"] = api_key
 
+    response = _request_with_retry(
+        settings,
+        "POST",
+        "https://api.semanticscholar.org/graph/v1/paper/batch",
+        params={"fields": fields},
+        json={"ids": list(request_ids)},
+        headers=headers,
+        timeout=_request_timeout(settings),
+    )
+    payload = response.json()
+    if not isinstance(payload, list):
+        return {}
+    return {
+        request_id: record
+        for request_id, record in zip(request_ids, payload)
+        if isinstance(record, dict)
+    }
+
+
+def _semantic_scholar_records(identifiers, *, settings, fields, api_key, batcher):
+    request_ids = _semantic_scholar_request_ids(identifiers)
+    if not request_ids:
+        return []
+    found = _load_provider_records(
+        batcher,
+        ("semantic_scholar", fields, api_key),
+        request_ids,
+        functools.partial(
+            _fetch_semantic_scholar_papers,
+            settings=settings,
+            fields=fields,
+            api_key=api_key,
+        ),
+        SEMANTIC_SCHOLAR_BATCH_SIZE,
+        cache=ProviderResponseCache(f"semantic_scholar:{fields}", settings),
+    )
+    return [found[request_id] for request_id in request_ids if request_id in found]
+
+
+def lookup_ids_semantic_scholar(
+    identifiers, *, settings, logger, api_key=None, batcher=None
+):
+    if not _semantic_scholar_request_ids(identifiers):
+        return {}
+
     try:
-        response = _request_with_retry(
-            settings,
-            "POST",
-            "https://api.semanticscholar.org/graph/v1/paper/batch",
-            params={"fields": "externalIds"},
-            json={"ids": request_ids},
-            headers=headers,
-            timeout=_request_timeout(settings),
+        records = _semantic_scholar_records(
+            identifiers,
+            settings=settings,
+            fields="externalIds",
+            api_key=api_key,
+            batcher=batcher,
         )
-        payload = response.json()
     except Exception as exc:  # noqa: BLE001
         _provider_error(logger, "semantic_scholar_id_lookup", exc)
         return {}
 
-    if not isinstance(payload, list):
-        return {}
-
-    for record in payload:
-        if not isinstance(record, dict):
-            continue
+    for record in records:
         external_ids = record.get("externalIds") or {}
         if not isinstance(external_ids, dict):
             continue
@@ -333,8 +498,52 @@ def lookup_ids_semantic_scholar(identifiers, *, settings, logger, api_key=None):
     return {}
 
 
+def _fetch_pubmed_id_records(id_values, *, settings, email=None, api_key=None, tool):
+    """Convert many ids with one idconv request, keyed by the requested id."""
+    params = {
+        "ids": ",".join(sorted(set(id_values))),
+        "format": "json",
+        "versions": "no",
+        "tool": tool or "neurostore",
+    }
+    if email:
+        params["email"] = email
+    if api_key:
+        params["api_key"] = api_key
+
+    response = _request_with_retry(
+        settings,
+        "GET",
+        "https://www.ncbi.nlm.nih.gov/pmc/utils/idconv/v1.0/",
+        params=params,
+        timeout=_request_timeout(settings),
+    )
+    payload = response.json()
+    records = payload.get("records") if isinstance(payload, dict) else None
+    if not isinstance(records, list):
+        return {}
+
+    requested = {_id_match_key(value): value for value in id_values}
+    found = {}
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        for field in ("requested-id", "pmid", "doi", "pmcid"):
+            id_value = requested.get(_id_match_key(record.get(field)))
+            if id_value is not None:
+                found.setdefault(id_value, record)
+    return found
+
+
 def lookup_ids_pubmed(
-    identifiers, *, settings, logger, email=None, api_key=None, tool="neurostore"
+    identifiers,
+    *,
+    settings,
+    logger,
+    email=None,
+    api_key=None,
+    tool="neurostore",
+    batcher=None,
 ):
     id_values = []
     for value in (
@@ -348,36 +557,28 @@ def lookup_ids_pubmed(
     if not id_values:
         return {}
 
-    params = {
-        "ids": ",".join(sorted(set(id_values))),
-        "format": "json",
-        "versions": "no",
-        "tool": tool or "neurostore",
-    }
-    if email:
-        params["email"] = email
-    if api_key:
-        params["api_key"] = api_key
-
     try:
-        response = _request_with_retry(
-            settings,
-            "GET",
-            "https://www.ncbi.nlm.nih.gov/pmc/utils/idconv/v1.0/",
-            params=params,
-            timeout=_request_timeout(settings),
+        found = _load_provider_records(
+            batcher,
+            ("pubmed_idconv", email, api_key, tool),
+            id_values,
+            functools.partial(
+                _fetch_pubmed_id_records,
+                settings=settings,
+                email=email,
+                api_key=api_key,
+                tool=tool,
+            ),
+            PUBMED_IDCONV_BATCH_SIZE,
+            cache=ProviderResponseCache("pubmed_idconv", settings),
         )
-        payload = response.json()
     except Exception as exc:  # noqa: BLE001
         _provider_error(logger, "pubmed_id_lookup", exc)
         return {}
 
-    records = payload.get("records") if isinstance(payload, dict) else None
-    if not isinstance(records, list):
-        return {}
-
-    for record in records:
-        if not isinstance(record, dict):
+    for id_value in id_values:
+        record = found.get(id_value)
+        if record is None:
             continue
         if record.get("status") and record.get("status") != "ok":
             continue
@@ -391,22 +592,25 @@ def lookup_ids_pubmed(
     return {}
 
 
-def lookup_ids_openalex(identifiers, *, settings, logger, email=None):
-    doi = _normalize_doi(identifiers.get("doi"))
-    pmid = _normalize_pmid(identifiers.get("pmid"))
-
-    if doi:
-        filter_value = f"doi:https://doi.org/{doi}"
-    elif pmid:
-        filter_value = f"pmid:{pmid}"
-    else:
-        return {}
+def _fetch_openalex_works(keys, *, settings, email=None):
+    """Look up ``(attribute, value)`` keys with one OR-filter request per attribute."""
+    found = {}
+    for attribute in ("doi", "pmid"):
+        values = [value for key_attribute, value in keys if key_attribute == attribute]
+        if not values:
+            continue
 
-    params = {"filter": filter_value, "per-page": 1}
-    if email:
-        params["mailto"] = email
+        if attribute == "doi":
+            filter_values = [f"https://doi.org/{value}" for value in values]
+        else:
+            filter_values = values
+        params = {
+            "filter": f"{attribute}:{'|'.join(filter_values)}",
+            "per-page": min(200, 2 * len(values)),
+        }
+        if email:
+            params["mailto"] = email
 
-    try:
         response = _request_with_retry(
             settings,
             "GET",
@@ -415,16 +619,48 @@ def lookup_ids_openalex(identifiers, *, settings, logger, email=None):
             timeout=_request_timeout(settings),
         )
         payload = response.json()
-    except Exception as exc:  # noqa: BLE001
-        _provider_error(logger, "openalex_id_lookup", exc)
+        results = payload.get("results") if isinstance(payload, dict) else None
+        if not isinstance(results, list):
+            continue
+
+        normalize = _normalize_doi if attribute == "doi" else _normalize_pmid
+        requested = {_id_match_key(value): value for value in values}
+        for result in results:
+            ids_block = result.get("ids") if isinstance(result, dict) else None
+            if not isinstance(ids_block, dict):
+                continue
+            value = requested.get(_id_match_key(normalize(ids_block.get(attribute))))
+            if value is not None:
+                found.setdefault((attribute, value), ids_block)
+    return found
+
+
+def lookup_ids_openalex(identifiers, *, settings, logger, email=None, batcher=None):
+    doi = _normalize_doi(identifiers.get("doi"))
+    pmid = _normalize_pmid(identifiers.get("pmid"))
+
+    if doi:
+        key = ("doi", doi)
+    elif pmid:
+        key = ("pmid", pmid)
+    else:
         return {}
 
-    results = payload.get("results") if isinstance(payload, dict) else None
-    if not isinstance(results, list) or not results:
+    try:
+        found = _load_provider_records(
+            batcher,
+            ("openalex", email),
+            [key],
+            functools.partial(_fetch_openalex_works, settings=settings, email=email),
+            OPENALEX_FILTER_BATCH_SIZE,
+            cache=ProviderResponseCache("openalex", settings),
+        )
+    except Exception as exc:  # noqa: BLE001
+        _provider_error(logger, "openalex_id_lookup", exc)
         return {}
 
-    ids_block = results[0].get("ids", {})
-    if not isinstance(ids_block, dict):
+    ids_block = found.get(key)
+    if ids_block is None:
         return {}
 
     openalex_doi = ids_block.get("doi")
@@ -458,21 +694,12 @@ def _int_or_none(value):
         return int(match.group(1))
 
 
-def fetch_metadata_semantic_scholar(identifiers, *, settings, logger, api_key=None):
-    request_ids = []
-    doi = _normalize_doi(identifiers.get("doi"))
-    pmid = _normalize_pmid(identifiers.get("pmid"))
-    if doi:
-        request_ids.append(f"DOI:{doi}")
-    if pmid:
-        request_ids.append(f"PMID:{pmid}")
-    if not request_ids:
+def fetch_metadata_semantic_scholar(
+    identifiers, *, settings, logger, api_key=None, batcher=None
+):
+    if not _semantic_scholar_request_ids(identifiers):
         return {}
 
-    headers = {"Content-Type": "application/json"}
-    if api_key:
-        headers["x-api-key"] = api_key
-
     fields = ",".join(
         [
             "title",
@@ -487,26 +714,18 @@ def fetch_metadata_semantic_scholar(identifiers, *, settings, logger, api_key=No
     )
 
     try:
-        response = _request_with_retry(
-            settings,
-            "POST",
-            "https://api.semanticscholar.org/graph/v1/paper/batch",
-            params={"fields": fields},
-            json={"ids": request_ids},
-            headers=headers,
-            timeout=_request_timeout(settings),
+        records = _semantic_scholar_records(
+            identifiers,
+            settings=settings,
+            fields=fields,
+            api_key=api_key,
+            batcher=batcher,
         )
-        payload = response.json()
     except Exception as exc:  # noqa: BLE001
         _provider_error(logger, "semantic_scholar_metadata", exc)
         return {}
 
-    if not isinstance(payload, list):
-        return {}
-
-    for record in payload:
-        if not isinstance(record, dict):
-            continue
+    for record in records:
         external_ids = record.get("externalIds") or {}
         journal = record.get("journal") or {}
         authors = record.get("authors") or []
@@ -547,16 +766,11 @@ def fetch_metadata_semantic_scholar(identifiers, *, settings, logger, api_key=No
     return {}
 
 
-def fetch_metadata_pubmed(
-    identifiers, *, settings, logger, email=None, api_key=None, tool="neurostore"
-):
-    pmid = _normalize_pmid(identifiers.get("pmid"))
-    if not pmid:
-        return {}
-
+def _fetch_pubmed_articles(pmids, *, settings, email=None, api_key=None, tool):
+    """``efetch`` many PMIDs at once; parsed metadata keyed by each PMID."""
     params = {
         "db": "pubmed",
-        "id": pmid,
+        "id": ",".join(pmids),
         "retmode": "xml",
         "tool": tool or "neurostore",
     }
@@ -565,23 +779,25 @@ def fetch_metadata_pubmed(
     if api_key:
         params["api_key"] = api_key
 
-    try:
-        response = _request_with_retry(
-            settings,
-            "GET",
-            "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi",
-            params=params,
-            timeout=_request_timeout(settings),
-        )
-        root = ElementTree.fromstring(response.text)
-    except Exception as exc:  # noqa: BLE001
-        _provider_error(logger, "pubmed_metadata", exc)
-        return {}
+    response = _request_with_retry(
+        settings,
+        "GET",
+        "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi",
+        params=params,
+        timeout=_request_timeout(settings),
+    )
+    root = ElementTree.fromstring(response.text)
 
-    article = root.find(".//PubmedArticle")
-    if article is None:
-        return {}
+    requested = set(pmids)
+    articles = {}
+    for article in root.findall(".//PubmedArticle"):
+        pmid = _normalize_pmid(_joined_text(article.find("./MedlineCitation/PMID")))
+        if pmid in requested and pmid not in articles:
+            articles[pmid] = _parse_pubmed_article(article, pmid)
+    return articles
 
+
+def _parse_pubmed_article(article, pmid):
     title = _joined_text(article.find(".//ArticleTitle"))
     abstract_parts = []
     for abstract_text in article.findall(".//Abstract/AbstractText"):
@@ -634,6 +850,45 @@ def fetch_metadata_pubmed(
     return metadata
 
 
+def fetch_metadata_pubmed(
+    identifiers,
+    *,
+    settings,
+    logger,
+    email=None,
+    api_key=None,
+    tool="neurostore",
+    batcher=None,
+):
+    pmid = _normalize_pmid(identifiers.get("pmid"))
+    if not pmid:
+        return {}
+
+    try:
+        articles = _load_provider_records(
+            batcher,
+            ("pubmed_efetch", email, api_key, tool),
+            [pmid],
+            functools.partial(
+                _fetch_pubmed_articles,
+                settings=settings,
+                email=email,
+                api_key=api_key,
+                tool=tool,
+            ),
+            PUBMED_EFETCH_BATCH_SIZE,
+            cache=ProviderResponseCache("pubmed_efetch", settings),
+        )
+    except Exception as exc:  # noqa: BLE001
+        _provider_error(logger, "pubmed_metadata", exc)
+        return {}
+
+    metadata = articles.get(pmid)
+    if metadata is None:
+        return {}
+    return dict(metadata)
+
+
 def _find_active_duplicates(primary, identifiers):
     filters = []
     if identifiers.get("pmid"):
@@ -732,6 +987,15 @@ def _merge_duplicate_into_primary(primary, duplicate):
         if moved_studyset_ids:
             cache_ids["studysets"] = set(moved_studyset_ids)
 
+    moved_pipeline_ids = set(
+        db.session.scalars(
+            sa.select(PipelineConfig.pipeline_id)
+            .join(
+                PipelineStudyResult, PipelineStudyResult.config_id == PipelineConfig.id
+            )
+            .where(PipelineStudyResult.base_study_id == duplicate.id)
+        )
+    )
     db.session.execute(
         sa.update(PipelineStudyResult)
         .where(PipelineStudyResult.base_study_id == duplicate.id)
@@ -742,6 +1006,19 @@ def _merge_duplicate_into_primary(primary, duplicate):
         .where(PipelineEmbedding.base_study_id == duplicate.id)
         .values(base_study_id=primary.id)
     )
+    # The bulk updates above bypass the grid-cell, projection and change-log
+    # listeners.
+    connection = db.session.connection()
+    rebuild_grid_cells(connection, (primary.id, duplicate.id))
+    refresh_latest_results(
+        connection,
+        keys=[
+            (base_study_id, pipeline_id)
+            for base_study_id in (primary.id, duplicate.id)
+            for pipeline_id in moved_pipeline_ids
+        ],
+    )
+    log_study_changes(connection, base_study_ids=(primary.id, duplicate.id))
 
     db.session.execute(
         sa.delete(BaseStudyFlagOutbox).where(
@@ -834,6 +1111,7 @@ def _propagate_base_study_metadata_to_versions(base_study):
             .returning(Study.id)
         ).all()
     )
+    log_study_changes(db.session.connection(), study_ids=changed_study_ids)
     return changed_study_ids
 
 
@@ -922,8 +1200,12 @@ class _GatheredEnrichment:
         self.metadata_candidates = metadata_candidates
 
 
-def _gather_base_study_enrichment(base_study_id, *, settings, logger):
-    """Read-only phase: fetch external identifiers/metadata. Acquires no locks."""
+def _gather_base_study_enrichment(base_study_id, *, settings, logger, batcher=None):
+    """Read-only phase: fetch external identifiers/metadata. Acquires no locks.
+
+    Gathers sharing a ``batcher`` run concurrently in their own sessions, and
+    their provider lookups are coalesced into batch requests.
+    """
     base_study_snapshot = db.session.scalar(
         sa.select(BaseStudy).where(BaseStudy.id == base_study_id)
     )
@@ -938,6 +1220,12 @@ def _gather_base_study_enrichment(base_study_id, *, settings, logger):
     pubmed_tool = settings["PUBMED_TOOL"]
 
     external_identifiers = _extract_identifiers(base_study_snapshot)
+    missing_metadata = _missing_metadata_fields(base_study_snapshot)
+    if batcher is not None:
+        # Hand the worker's connection back to the pool before waiting on
+        # the providers; the snapshot is not read again.
+        db.session.rollback()
+
     missing_ids = _missing_id_fields(external_identifiers)
     if missing_ids:
         _merge_ids_in_place(
@@ -947,6 +1235,7 @@ def _gather_base_study_enrichment(base_study_id, *, settings, logger):
                 settings=settings,
                 logger=logger,
                 api_key=semantic_scholar_api_key,
+                batcher=batcher,
             ),
         )
         missing_ids = _missing_id_fields(external_identifiers)
@@ -960,6 +1249,7 @@ def _gather_base_study_enrichment(base_study_id, *, settings, logger):
                 email=contact_email,
                 api_key=pubmed_api_key,
                 tool=pubmed_tool,
+                batcher=batcher,
             ),
         )
         missing_ids = _missing_id_fields(external_identifiers)
@@ -971,17 +1261,18 @@ def _gather_base_study_enrichment(base_study_id, *, settings, logger):
                 settings=settings,
                 logger=logger,
                 email=contact_email,
+                batcher=batcher,
             ),
         )
 
     metadata_candidates = []
-    missing_metadata = _missing_metadata_fields(base_study_snapshot)
     if missing_metadata:
         semantic_metadata = fetch_metadata_semantic_scholar(
             external_identifiers,
             settings=settings,
             logger=logger,
             api_key=semantic_scholar_api_key,
+            batcher=batcher,
         )
         if semantic_metadata:
             metadata_candidates.append(semantic_metadata)
@@ -998,6 +1289,7 @@ def _gather_base_study_enrichment(base_study_id, *, settings, logger):
             email=contact_email,
             api_key=pubmed_api_key,
             tool=pubmed_tool,
+            batcher=batcher,
         )
         if pubmed_metadata:
             metadata_candidates.append(pubmed_metadata)
@@ -1134,6 +1426,74 @@ def _enqueue_base_study_flag_updates_post_commit(
 _GATHER_FAILED = object()
 
 
+def _gather_concurrency(settings):
+    concurrency = settings.get("BASE_STUDY_METADATA_GATHER_CONCURRENCY", 1)
+    try:
+        concurrency = int(concurrency)
+    except (TypeError, ValueError):
+        concurrency = 1
+    return max(1, concurrency)
+
+
+def _batch_window_seconds(settings):
+    window = settings.get("BASE_STUDY_METADATA_BATCH_WINDOW_SECONDS", 0.05)
+    try:
+        window = float(window)
+    except (TypeError, ValueError):
+        window = 0.05
+    return max(0.0, window)
+
+
+def _gather_or_fail(base_study_id, *, settings, logger, batcher=None):
+    try:
+        return _gather_base_study_enrichment(
+            base_study_id, settings=settings, logger=logger, batcher=batcher
+        )
+    except Exception as exc:  # noqa: BLE001
+        db.session.rollback()
+        logger.warning(
+            "base-study metadata gather failed for %s: %s",
+            base_study_id,
+            exc,
+        )
+        return _GATHER_FAILED
+
+
+def _gather_in_worker(base_study_id, *, settings, logger, batcher):
+    try:
+        return _gather_or_fail(
+            base_study_id, settings=settings, logger=logger, batcher=batcher
+        )
+    finally:
+        db.session.remove()
+
+
+def _gather_claimed_enrichments(base_study_ids, *, settings, logger):
+    """Gather every claimed base study, concurrently when configured.
+
+    Concurrent gathers share a ``_ProviderBatcher``, so the lookups of each
+    stage go out as a few provider batch requests (still paced by the
+    per-provider rate limits) instead of one request per base study.
+    """
+    workers = min(len(base_study_ids), _gather_concurrency(settings))
+    if workers <= 1:
+        return {
+            base_study_id: _gather_or_fail(
+                base_study_id, settings=settings, logger=logger
+            )
+            for base_study_id in base_study_ids
+        }
+
+    batcher = _ProviderBatcher(_batch_window_seconds(settings))
+    gather = functools.partial(
+        _gather_in_worker, settings=settings, logger=logger, batcher=batcher
+    )
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="metadata-gather"
+    ) as executor:
+        return dict(zip(base_study_ids, executor.map(gather, base_study_ids)))
+
+
 def process_base_study_metadata_outbox_batch(batch_size=50, *, settings, logger):
     batch_size = max(1, int(batch_size))
 
@@ -1169,20 +1529,9 @@ def process_base_study_metadata_outbox_batch(batch_size=50, *, settings, logger)
     )
     db.session.commit()
 
-    gathered_by_id = {}
-    for base_study_id in claimed_ids:
-        try:
-            gathered_by_id[base_study_id] = _gather_base_study_enrichment(
-                base_study_id, settings=settings, logger=logger
-            )
-        except Exception as exc:  # noqa: BLE001
-            db.session.rollback()
-            logger.warning(
-                "base-study metadata gather failed for %s: %s",
-                base_study_id,
-                exc,
-            )
-            gathered_by_id[base_study_id] = _GATHER_FAILED
+    gathered_by_id = _gather_claimed_enrichments(
+        claimed_ids, settings=settings, logger=logger
+    )
 
     for base_study_id in claimed_ids:
         gathered = gathered_by_id[base_study_id]
@@ -17,6 +17,7 @@ from neurostore.models import (
     Point,
     Study,
 )
+from neurostore.models.study_change_log import log_study_changes
 from neurostore.resources.common import normalize_ids
 
 Z_MAP_SQL_VALUES = tuple(sorted(Z_MAP_CODES))
@@ -24,6 +25,9 @@ T_MAP_SQL_VALUES = tuple(sorted(T_MAP_CODES))
 BETA_MAP_SQL_VALUES = tuple(sorted(BETA_MAP_CODES))
 VARIANCE_MAP_SQL_VALUES = tuple(sorted(VARIANCE_MAP_CODES))
 
+MEDIA_FLAG_ENGINES = ("correlated", "aggregate")
+DEFAULT_MEDIA_FLAG_ENGINE = "correlated"
+
 
 def _matches_values(column, accepted_values):
     return column.in_(accepted_values)
@@ -59,11 +63,38 @@ def enqueue_base_study_flag_updates(base_study_ids, reason="api-write"):
     return len(base_study_ids)
 
 
-def recompute_media_flags(base_study_ids):
+def recompute_media_flags(base_study_ids, engine=None):
+    """Recompute analysis, study and base-study media flags for base studies.
+
+    ``engine`` (``BASE_STUDY_FLAGS_ENGINE``) picks the strategy: ``correlated``
+    issues one UPDATE per level with an EXISTS subquery per flag, while
+    ``aggregate`` derives every flag in one grouped pass per level. Both return
+    the ids whose flags changed; the changed studies and base studies are
+    logged to the study change log.
+    """
+    engine = engine or DEFAULT_MEDIA_FLAG_ENGINE
+    if engine not in MEDIA_FLAG_ENGINES:
+        raise ValueError(
+            f"Unknown media flag engine {engine!r}; "
+            f"expected one of {', '.join(MEDIA_FLAG_ENGINES)}"
+        )
+
     base_study_ids = normalize_ids(base_study_ids)
     if not base_study_ids:
         return {"base-studies": set(), "studies": set(), "analyses": set()}
+    if engine == "aggregate":
+        changed = _recompute_media_flags_aggregate(base_study_ids)
+    else:
+        changed = _recompute_media_flags_correlated(base_study_ids)
+    log_study_changes(
+        db.session.connection(),
+        study_ids=changed["studies"],
+        base_study_ids=changed["base-studies"],
+    )
+    return changed
+
 
+def _recompute_media_flags_correlated(base_study_ids):
     analysis_scope = _analysis_in_scope(base_study_ids)
     study_scope = Study.base_study_id.in_(base_study_ids)
 
@@ -282,7 +313,186 @@ def recompute_media_flags(base_study_ids):
     }
 
 
-def process_base_study_flag_outbox_batch(batch_size=200):
+# Temp tables live until the end of the transaction; each run replaces them.
+_AGGREGATE_ANALYSIS_FLAGS_SQL = """
+CREATE TEMP TABLE media_flags_analyses ON COMMIT DROP AS
+WITH scope AS (
+    SELECT a.id AS analysis_id, a.study_id
+    FROM analyses AS a
+    JOIN studies AS s ON s.id = a.study_id
+    WHERE s.base_study_id = ANY(:base_study_ids)
+),
+image_flags AS (
+    SELECT
+        i.analysis_id,
+        bool_or(i.value_type = ANY(:z_codes)) AS has_z_maps,
+        bool_or(i.value_type = ANY(:t_codes)) AS has_t_maps,
+        bool_or(i.value_type = ANY(:beta_codes)) AS has_beta_maps,
+        bool_or(i.value_type = ANY(:variance_codes)) AS has_variance_maps
+    FROM images AS i
+    JOIN scope ON scope.analysis_id = i.analysis_id
+    GROUP BY i.analysis_id
+),
+point_flags AS (
+    SELECT DISTINCT p.analysis_id
+    FROM points AS p
+    JOIN scope ON scope.analysis_id = p.analysis_id
+)
+SELECT
+    scope.analysis_id,
+    scope.study_id,
+    point_flags.analysis_id IS NOT NULL AS has_coordinates,
+    image_flags.analysis_id IS NOT NULL AS has_images,
+    coalesce(image_flags.has_z_maps, false) AS has_z_maps,
+    coalesce(image_flags.has_t_maps, false) AS has_t_maps,
+    coalesce(
+        image_flags.has_beta_maps AND image_flags.has_variance_maps, false
+    ) AS has_beta_and_variance_maps
+FROM scope
+LEFT JOIN point_flags ON point_flags.analysis_id = scope.analysis_id
+LEFT JOIN image_flags ON image_flags.analysis_id = scope.analysis_id
+"""
+
+# Study coordinate flags come from the analyses above; image flags come from
+# study-owned images, matching the correlated engine.
+_AGGREGATE_STUDY_FLAGS_SQL = """
+CREATE TEMP TABLE media_flags_studies ON COMMIT DROP AS
+WITH scope AS (
+    SELECT s.id AS study_id, s.base_study_id
+    FROM studies AS s
+    WHERE s.base_study_id = ANY(:base_study_ids)
+),
+analysis_flags AS (
+    SELECT study_id, bool_or(has_coordinates) AS has_coordinates
+    FROM media_flags_analyses
+    GROUP BY study_id
+),
+image_flags AS (
+    SELECT
+        i.study_id,
+        bool_or(i.value_type = ANY(:z_codes)) AS has_z_maps,
+        bool_or(i.value_type = ANY(:t_codes)) AS has_t_maps,
+        bool_or(i.value_type = ANY(:beta_codes)) AS has_beta_maps,
+        bool_or(i.value_type = ANY(:variance_codes)) AS has_variance_maps
+    FROM images AS i
+    JOIN scope ON scope.study_id = i.study_id
+    GROUP BY i.study_id
+)
+SELECT
+    scope.study_id,
+    scope.base_study_id,
+    coalesce(analysis_flags.has_coordinates, false) AS has_coordinates,
+    image_flags.study_id IS NOT NULL AS has_images,
+    coalesce(image_flags.has_z_maps, false) AS has_z_maps,
+    coalesce(image_flags.has_t_maps, false) AS has_t_maps,
+    coalesce(
+        image_flags.has_beta_maps AND image_flags.has_variance_maps, false
+    ) AS has_beta_and_variance_maps
+FROM scope
+LEFT JOIN analysis_flags ON analysis_flags.study_id = scope.study_id
+LEFT JOIN image_flags ON image_flags.study_id = scope.study_id
+"""
+
+_AGGREGATE_BASE_STUDY_FLAGS_SQL = """
+CREATE TEMP TABLE media_flags_base_studies ON COMMIT DROP AS
+SELECT
+    scope.base_study_id,
+    coalesce(bool_or(f.has_coordinates), false) AS has_coordinates,
+    coalesce(bool_or(f.has_images), false) AS has_images,
+    coalesce(bool_or(f.has_z_maps), false) AS has_z_maps,
+    coalesce(bool_or(f.has_t_maps), false) AS has_t_maps,
+    coalesce(
+        bool_or(f.has_beta_and_variance_maps), false
+    ) AS has_beta_and_variance_maps
+FROM unnest(CAST(:base_study_ids AS text[])) AS scope(base_study_id)
+LEFT JOIN media_flags_studies AS f ON f.base_study_id = scope.base_study_id
+GROUP BY scope.base_study_id
+"""
+
+_AGGREGATE_APPLY_SQL = """
+UPDATE {table} AS target
+SET
+    has_coordinates = f.has_coordinates,
+    has_images = f.has_images,
+    has_z_maps = f.has_z_maps,
+    has_t_maps = f.has_t_maps,
+    has_beta_and_variance_maps = f.has_beta_and_variance_maps
+FROM {flags_table} AS f
+WHERE target.id = f.{key}
+  AND (
+    target.has_coordinates IS DISTINCT FROM f.has_coordinates
+    OR target.has_images IS DISTINCT FROM f.has_images
+    OR target.has_z_maps IS DISTINCT FROM f.has_z_maps
+    OR target.has_t_maps IS DISTINCT FROM f.has_t_maps
+    OR target.has_beta_and_variance_maps
+        IS DISTINCT FROM f.has_beta_and_variance_maps
+  )
+RETURNING target.id
+"""
+
+_AGGREGATE_LEVELS = (
+    ("analyses", "media_flags_analyses", "analysis_id", _AGGREGATE_ANALYSIS_FLAGS_SQL),
+    ("studies", "media_flags_studies", "study_id", _AGGREGATE_STUDY_FLAGS_SQL),
+    (
+        "base-studies",
+        "media_flags_base_studies",
+        "base_study_id",
+        _AGGREGATE_BASE_STUDY_FLAGS_SQL,
+    ),
+)
+
+_MEDIA_FLAG_ATTRIBUTES = (
+    "has_coordinates",
+    "has_images",
+    "has_z_maps",
+    "has_t_maps",
+    "has_beta_and_variance_maps",
+)
+
+_AGGREGATE_TABLES = {
+    "analyses": "analyses",
+    "studies": "studies",
+    "base-studies": "base_studies",
+}
+
+
+def _recompute_media_flags_aggregate(base_study_ids):
+    params = {
+        "base_study_ids": list(base_study_ids),
+        "z_codes": list(Z_MAP_SQL_VALUES),
+        "t_codes": list(T_MAP_SQL_VALUES),
+        "beta_codes": list(BETA_MAP_SQL_VALUES),
+        "variance_codes": list(VARIANCE_MAP_SQL_VALUES),
+    }
+    for _level, flags_table, _key, _create_sql in _AGGREGATE_LEVELS:
+        db.session.execute(sa.text(f"DROP TABLE IF EXISTS {flags_table}"))
+
+    changed = {}
+    for level, flags_table, key, create_sql in _AGGREGATE_LEVELS:
+        db.session.execute(sa.text(create_sql), params)
+        db.session.execute(sa.text(f"ANALYZE {flags_table}"))
+        changed[level] = set(
+            db.session.scalars(
+                sa.text(
+                    _AGGREGATE_APPLY_SQL.format(
+                        table=_AGGREGATE_TABLES[level],
+                        flags_table=flags_table,
+                        key=key,
+                    )
+                )
+            ).all()
+        )
+
+    # The updates bypass the ORM, so refresh any loaded rows they changed.
+    models = {"analyses": Analysis, "studies": Study, "base-studies": BaseStudy}
+    for instance in list(db.session.identity_map.values()):
+        for level, model in models.items():
+            if isinstance(instance, model) and instance.id in changed[level]:
+                db.session.expire(instance, list(_MEDIA_FLAG_ATTRIBUTES))
+    return changed
+
+
+def process_base_study_flag_outbox_batch(batch_size=200, engine=None):
     batch_size = max(1, int(batch_size))
 
     claim_query = (
@@ -315,7 +525,7 @@ def process_base_study_flag_outbox_batch(batch_size=200):
         raise
 
     try:
-        cache_ids = recompute_media_flags(claimed_ids)
+        cache_ids = recompute_media_flags(claimed_ids, engine=engine)
         db.session.execute(
             sa.delete(BaseStudyFlagOutbox).where(
                 BaseStudyFlagOutbox.base_study_id.in_(claimed_ids)
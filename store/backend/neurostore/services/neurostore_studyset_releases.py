@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import hashlib
+import multiprocessing
 import os
 import re
 import shutil
-import tarfile
 import tempfile
 from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -30,11 +31,19 @@ from neurostore.models import (
     Point,
     PointValue,
     Study,
+    StudyChangeLog,
     Studyset,
     StudysetStudy,
 )
 from neurostore.models.data import generate_id
 from neurostore.schemas.pipeline import PipelineStudyResultSchema
+from neurostore.services.release_archives import (
+    ARCHIVE_FORMATS,
+    DEFAULT_ARCHIVE_FORMAT,
+    compression_threads,
+    parse_archive_formats,
+    write_archives,
+)
 
 STUDYSET_SOURCE_ID = "neurostore-studyset"
 ANNOTATION_SOURCE_ID = "neurostore-annotation"
@@ -240,7 +249,11 @@ def acquire_build_lock():
     return bool(locked)
 
 
-def select_coordinate_studies():
+def select_coordinate_studies(base_study_ids=None):
+    """Return the newest coordinate study of each active base study.
+
+    Only ``base_study_ids`` are ranked when given.
+    """
     freshness = sa.func.greatest(
         sa.func.coalesce(Study.updated_at, Study.created_at),
         Study.created_at,
@@ -266,8 +279,10 @@ def select_coordinate_studies():
         .where(Study.public.is_(True))
         .where(Study.has_coordinates.is_(True))
         .where(Study.level == "group")
-        .subquery()
     )
+    if base_study_ids is not None:
+        ranked = ranked.where(BaseStudy.id.in_(sorted(base_study_ids)))
+    ranked = ranked.subquery()
 
     rows = db.session.execute(
         sa.select(
@@ -292,6 +307,70 @@ def select_coordinate_studies():
     ]
 
 
+def consume_study_changes():
+    """Drain ``study_change_log``; returns ``(checkpoint, base_study_ids)``.
+
+    ``checkpoint`` is the last log id consumed, ``None`` when the log was
+    empty. The rows are deleted in the build's transaction: a failed build
+    leaves them for the next one, and changes committed while it runs stay
+    queued.
+    """
+    rows = db.session.execute(
+        sa.delete(StudyChangeLog).returning(
+            StudyChangeLog.id,
+            StudyChangeLog.study_id,
+            StudyChangeLog.base_study_id,
+        )
+    ).all()
+    base_study_ids = {row.base_study_id for row in rows if row.base_study_id}
+    unresolved_study_ids = {
+        row.study_id for row in rows if row.study_id and not row.base_study_id
+    }
+    if unresolved_study_ids:
+        base_study_ids.update(
+            db.session.scalars(
+                sa.select(Study.base_study_id).where(
+                    Study.id.in_(sorted(unresolved_study_ids))
+                )
+            )
+        )
+    base_study_ids.discard(None)
+    checkpoint = max((row.id for row in rows), default=None)
+    return checkpoint, base_study_ids
+
+
+def selection_entry(manifest_entry):
+    """Rebuild a ``select_coordinate_studies`` row from its manifest entry."""
+    return {
+        "base_study_id": manifest_entry["base_study_id"],
+        "study_id": manifest_entry["study_id"],
+        "created_at": manifest_entry["created_at"],
+        "updated_at": manifest_entry["updated_at"],
+        "freshness": manifest_entry["study_freshness"],
+    }
+
+
+def merge_selection(previous_entries, changed_base_ids, reselected):
+    """The previous selection with the changed base studies replaced."""
+    selected = [
+        selection_entry(entry)
+        for base_id, entry in previous_entries.items()
+        if base_id not in changed_base_ids
+    ]
+    selected.extend(reselected)
+    selected.sort(key=lambda entry: entry["study_id"])
+    return selected
+
+
+def note_keys_cover(note_keys, features_by_base):
+    """Whether ``note_keys`` already describe every feature of these studies."""
+    for key, spec in build_note_keys(features_by_base).items():
+        existing = (note_keys.get(key) or {}).get("type")
+        if existing is None or existing not in ("string", spec["type"]):
+            return False
+    return True
+
+
 def ensure_canonical_records(built_at):
     studyset = Studyset.query.filter_by(source_id=STUDYSET_SOURCE_ID).first()
     if studyset is None:
@@ -350,15 +429,20 @@ def ensure_canonical_records(built_at):
     return studyset, annotation
 
 
-def sync_studyset_membership(studyset, selected):
+def sync_studyset_membership(studyset, selected, study_ids=None):
+    """Make the studyset hold the ``selected`` studies.
+
+    With ``study_ids`` only the membership of those studies is compared.
+    """
     selected_ids = {entry["study_id"] for entry in selected}
-    existing_ids = set(
-        db.session.scalars(
-            sa.select(StudysetStudy.study_id).where(
-                StudysetStudy.studyset_id == studyset.id
-            )
-        )
+    existing_query = sa.select(StudysetStudy.study_id).where(
+        StudysetStudy.studyset_id == studyset.id
     )
+    if study_ids is not None:
+        existing_query = existing_query.where(
+            StudysetStudy.study_id.in_(sorted(study_ids))
+        )
+    existing_ids = set(db.session.scalars(existing_query))
     stale_ids = existing_ids - selected_ids
     missing_ids = selected_ids - existing_ids
 
@@ -514,9 +598,24 @@ def manifest_entry_changed(entry, features_by_base, previous_entries):
     return manifest_entry, state_changed
 
 
-def sync_annotation(annotation, selected, features_by_base, previous_manifest):
-    note_keys = build_note_keys(features_by_base)
-    annotation.note_keys = note_keys
+def sync_annotation(
+    annotation,
+    selected,
+    features_by_base,
+    previous_manifest,
+    *,
+    note_keys=None,
+    study_ids=None,
+):
+    """Write the annotation notes of the ``selected`` studies.
+
+    With ``study_ids`` only the notes of those studies are compared, and the
+    ``selected`` studies among them are all treated as changed.
+    """
+    if note_keys is None:
+        note_keys = build_note_keys(features_by_base)
+    if annotation.note_keys != note_keys:
+        annotation.note_keys = note_keys
 
     study_to_base = {entry["study_id"]: entry["base_study_id"] for entry in selected}
     analysis_rows_by_study = fetch_analysis_rows(study_to_base.keys())
@@ -524,14 +623,14 @@ def sync_annotation(annotation, selected, features_by_base, previous_manifest):
         row["analysis_id"] for rows in analysis_rows_by_study.values() for row in rows
     }
 
-    existing = {
-        analysis_id
-        for (analysis_id,) in db.session.execute(
-            sa.select(AnnotationAnalysis.analysis_id).where(
-                AnnotationAnalysis.annotation_id == annotation.id
-            )
+    existing_query = sa.select(AnnotationAnalysis.analysis_id).where(
+        AnnotationAnalysis.annotation_id == annotation.id
+    )
+    if study_ids is not None:
+        existing_query = existing_query.where(
+            AnnotationAnalysis.study_id.in_(sorted(study_ids))
         )
-    }
+    existing = set(db.session.scalars(existing_query))
 
     stale_existing = existing - all_analysis_ids
     if stale_existing:
@@ -551,7 +650,7 @@ def sync_annotation(annotation, selected, features_by_base, previous_manifest):
             features_by_base,
             previous_entries,
         )
-        if note_keys_changed or state_changed:
+        if note_keys_changed or state_changed or study_ids is not None:
             affected_base_ids.add(entry["base_study_id"])
 
     mappings_to_insert = []
@@ -838,6 +937,69 @@ def serialize_study_shards(study_ids, batch_size=STUDY_SHARD_BATCH_SIZE):
     return payloads
 
 
+def write_study_shard_batch(study_shard_dir, study_ids):
+    """Serialize and write one batch of study shards, returning their checksums."""
+    study_payloads = serialize_study_shards(study_ids, batch_size=len(study_ids))
+    checksums = {}
+    for study_id in study_ids:
+        study_payload = study_payloads.pop(study_id)
+        atomic_write_json(Path(study_shard_dir) / f"{study_id}.json", study_payload)
+        checksums[study_id] = checksum_payload(study_payload)
+    return checksums
+
+
+def _init_shard_worker(database_config):
+    # Spawned workers start without an engine and open their own connections.
+    db.configure(database_config)
+
+
+def _write_study_shard_batch_in_worker(study_shard_dir, study_ids):
+    try:
+        return write_study_shard_batch(study_shard_dir, study_ids)
+    finally:
+        db.session.remove()
+
+
+def write_study_shards(study_shard_dir, study_ids, *, workers=1, database_config=None):
+    """Write study shards in ``STUDY_SHARD_BATCH_SIZE`` batches.
+
+    With more than one worker the batches, which are contiguous ranges of the
+    ordered study ids, are spread over a process pool. Workers only read
+    committed rows.
+    """
+    batches = list(chunked(list(study_ids), STUDY_SHARD_BATCH_SIZE))
+    checksums = {}
+    if workers <= 1 or len(batches) <= 1 or database_config is None:
+        for batch in batches:
+            checksums.update(write_study_shard_batch(study_shard_dir, batch))
+        return checksums
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(batches)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_shard_worker,
+        initargs=(database_config,),
+    ) as pool:
+        for batch_checksums in pool.map(
+            _write_study_shard_batch_in_worker,
+            [str(study_shard_dir)] * len(batches),
+            batches,
+        ):
+            checksums.update(batch_checksums)
+    return checksums
+
+
+def shard_database_config(settings):
+    if not settings.get("SQLALCHEMY_DATABASE_URI"):
+        return None
+    return {
+        "SQLALCHEMY_DATABASE_URI": settings["SQLALCHEMY_DATABASE_URI"],
+        "SQLALCHEMY_ENGINE_OPTIONS": dict(
+            settings.get("SQLALCHEMY_ENGINE_OPTIONS") or {}
+        ),
+    }
+
+
 def build_note_shard(
     annotation_id, study_id, base_id, rows, features_by_base, note_keys
 ):
@@ -910,7 +1072,17 @@ def refresh_shards(
     note_keys,
     analysis_rows_by_study,
     previous_manifest,
+    *,
+    changed_base_ids=None,
+    workers=1,
+    database_config=None,
 ):
+    """Rewrite the shards of changed studies; returns the manifest studies.
+
+    With ``changed_base_ids`` every other study keeps its previous manifest
+    entry and shards without being looked at, and the changed ones are
+    rewritten whatever their state.
+    """
     study_shard_dir = root / "_cache" / "studies"
     note_shard_dir = root / "_cache" / "notes"
     selected_base_ids = {entry["base_study_id"] for entry in selected}
@@ -919,8 +1091,15 @@ def refresh_shards(
     previous_note_keys_checksum = previous_manifest.get("note_keys_checksum")
     note_keys_checksum = checksum_payload(note_keys)
 
-    changed_base_ids = []
-    removed_base_ids = sorted(set(previous_entries) - selected_base_ids)
+    changed = []
+    if changed_base_ids is None:
+        removed_base_ids = sorted(set(previous_entries) - selected_base_ids)
+    else:
+        removed_base_ids = sorted(
+            base_id
+            for base_id in changed_base_ids
+            if base_id in previous_entries and base_id not in selected_base_ids
+        )
 
     for stale_base_id in removed_base_ids:
         stale_entry = previous_entries.get(stale_base_id) or {}
@@ -938,12 +1117,22 @@ def refresh_shards(
     for entry in selected:
         base_id = entry["base_study_id"]
         study_id = entry["study_id"]
+        previous_entry = previous_entries.get(base_id)
+        if changed_base_ids is not None and base_id not in changed_base_ids:
+            pending_entries.append((entry, previous_entry))
+            continue
+
         manifest_entry, state_changed = manifest_entry_changed(
             entry,
             features_by_base,
             previous_entries,
         )
-        previous_entry = previous_entries.get(base_id)
+        if changed_base_ids is not None:
+            state_changed = True
+            # The base study may now be represented by another study.
+            previous_study_id = (previous_entry or {}).get("study_id")
+            if previous_study_id and previous_study_id != study_id:
+                (study_shard_dir / f"{previous_study_id}.json").unlink(missing_ok=True)
 
         study_shard_path = study_shard_dir / f"{study_id}.json"
         note_shard_path = note_shard_dir / f"{base_id}.json"
@@ -961,26 +1150,20 @@ def refresh_shards(
             note_entries_to_refresh.append(entry)
         else:
             manifest_entry["note_checksum"] = previous_entry.get("note_checksum")
+            manifest_entry["note_count"] = previous_entry.get("note_count")
+            if manifest_entry["note_count"] is None:
+                manifest_entry["note_count"] = len(read_json(note_shard_path, []))
 
         if state_changed:
-            changed_base_ids.append(base_id)
+            changed.append(base_id)
         pending_entries.append((entry, manifest_entry))
 
-    study_checksums = {}
-    if study_entries_to_refresh:
-        for batch_entries in chunked(study_entries_to_refresh, STUDY_SHARD_BATCH_SIZE):
-            study_payloads = serialize_study_shards(
-                [entry["study_id"] for entry in batch_entries],
-                batch_size=STUDY_SHARD_BATCH_SIZE,
-            )
-            for entry in batch_entries:
-                study_id = entry["study_id"]
-                study_payload = study_payloads[study_id]
-                atomic_write_json(
-                    study_shard_dir / f"{study_id}.json",
-                    study_payload,
-                )
-                study_checksums[study_id] = checksum_payload(study_payload)
+    study_checksums = write_study_shards(
+        study_shard_dir,
+        [entry["study_id"] for entry in study_entries_to_refresh],
+        workers=workers,
+        database_config=database_config,
+    )
 
     note_checksums = {}
     if note_entries_to_refresh:
@@ -995,7 +1178,10 @@ def refresh_shards(
             base_id = entry["base_study_id"]
             note_payload = note_payloads[base_id]
             atomic_write_json(note_shard_dir / f"{base_id}.json", note_payload)
-            note_checksums[base_id] = checksum_payload(note_payload)
+            note_checksums[base_id] = (
+                checksum_payload(note_payload),
+                len(note_payload),
+            )
 
     for entry, manifest_entry in pending_entries:
         base_id = entry["base_study_id"]
@@ -1003,92 +1189,143 @@ def refresh_shards(
         if manifest_entry.get("study_checksum") is None:
             manifest_entry["study_checksum"] = study_checksums[study_id]
         if manifest_entry.get("note_checksum") is None:
-            manifest_entry["note_checksum"] = note_checksums[base_id]
+            (
+                manifest_entry["note_checksum"],
+                manifest_entry["note_count"],
+            ) = note_checksums[base_id]
         manifest_studies[base_id] = manifest_entry
 
-    for path in study_shard_dir.glob("*.json"):
-        if path.stem not in selected_study_ids:
-            path.unlink(missing_ok=True)
-    for path in note_shard_dir.glob("*.json"):
-        if path.stem not in entries_by_base:
-            path.unlink(missing_ok=True)
+    if changed_base_ids is None:
+        for path in study_shard_dir.glob("*.json"):
+            if path.stem not in selected_study_ids:
+                path.unlink(missing_ok=True)
+        for path in note_shard_dir.glob("*.json"):
+            if path.stem not in entries_by_base:
+                path.unlink(missing_ok=True)
 
     return (
         manifest_studies,
-        sorted(changed_base_ids),
+        sorted(changed),
         removed_base_ids,
         note_keys_checksum,
     )
 
 
-def build_studyset_dict(root, selected, studyset):
-    studies = []
+def write_json_document(path, fields, list_key, items):
+    """Write ``fields`` plus a ``list_key`` array of pre-encoded JSON ``items``.
+
+    Items are appended one at a time, so the document never sits in memory.
+    """
+    with path.open("wb") as f:
+        f.write(b"{")
+        for key, value in fields.items():
+            f.write(orjson.dumps(key) + b":" + orjson.dumps(value) + b",")
+        f.write(orjson.dumps(list_key) + b":[")
+        for index, item in enumerate(items):
+            if index:
+                f.write(b",")
+            f.write(item)
+        f.write(b"]}")
+    return path
+
+
+def iter_study_shards(root, selected):
     for entry in selected:
         shard_path = root / "_cache" / "studies" / f"{entry['study_id']}.json"
-        studies.append(orjson.loads(shard_path.read_bytes()))
-    return {
-        "id": studyset.id,
-        "name": studyset.name,
-        "description": studyset.description,
-        "publication": studyset.publication,
-        "doi": studyset.doi,
-        "pmid": studyset.pmid,
-        "studies": studies,
-    }
+        yield shard_path.read_bytes()
 
 
-def build_annotation_dict(root, selected, annotation, note_keys):
-    notes = []
+def iter_note_shards(root, selected):
     for entry in selected:
         shard_path = root / "_cache" / "notes" / f"{entry['base_study_id']}.json"
         if shard_path.exists():
             shard = orjson.loads(shard_path.read_bytes())
             if isinstance(shard, list):
-                notes.extend(shard)
-    return {
-        "id": annotation.id,
-        "studyset": annotation.studyset_id,
-        "name": annotation.name,
-        "description": annotation.description,
-        "note_keys": note_keys,
-        "metadata": annotation.metadata_,
-        "notes": notes,
-    }
+                for note in shard:
+                    yield orjson.dumps(note)
+
+
+def write_studyset_document(path, root, selected, studyset):
+    return write_json_document(
+        path,
+        {
+            "id": studyset.id,
+            "name": studyset.name,
+            "description": studyset.description,
+            "publication": studyset.publication,
+            "doi": studyset.doi,
+            "pmid": studyset.pmid,
+        },
+        "studies",
+        iter_study_shards(root, selected),
+    )
+
+
+def write_annotation_document(path, root, selected, annotation, note_keys):
+    return write_json_document(
+        path,
+        {
+            "id": annotation.id,
+            "studyset": annotation.studyset_id,
+            "name": annotation.name,
+            "description": annotation.description,
+            "note_keys": note_keys,
+            "metadata": annotation.metadata_,
+        },
+        "notes",
+        iter_note_shards(root, selected),
+    )
+
+
+def archive_stem(version):
+    return f"neurostore-studyset-{version}"
 
 
 def write_tarball(
     release_dir,
-    archive_name,
+    stem,
     manifest,
     root,
     selected,
     studyset,
     annotation,
     note_keys,
+    *,
+    formats=(DEFAULT_ARCHIVE_FORMAT,),
+    threads=1,
 ):
+    """Write the release archive in every format; returns their manifest entries."""
     from nimare.nimads import convert_neurostore_json_to_parquet
 
     release_dir.mkdir(parents=True, exist_ok=True)
-    studyset_dict = build_studyset_dict(root, selected, studyset)
-    annotation_dict = build_annotation_dict(root, selected, annotation, note_keys)
 
     with tempfile.TemporaryDirectory(dir=release_dir) as staging:
-        folder = Path(staging) / archive_name.removesuffix(".tar.gz")
+        # Splice the shards into documents on disk rather than into dicts;
+        # the converter parses them once into its own columnar store.
+        studyset_path = write_studyset_document(
+            Path(staging) / "studyset.json", root, selected, studyset
+        )
+        annotation_path = write_annotation_document(
+            Path(staging) / "annotation.json", root, selected, annotation, note_keys
+        )
+        folder = Path(staging) / stem
         folder.mkdir()
         convert_neurostore_json_to_parquet(
-            studyset_dict,
+            studyset_path,
             folder,
-            annotation_source=annotation_dict,
+            annotation_source=annotation_path,
             manifest_source=manifest,
             overwrite=True,
         )
-        tmp_archive = release_dir / f".{archive_name}.tmp"
-        final_archive = release_dir / archive_name
-        with tarfile.open(tmp_archive, "w:gz") as tar:
-            tar.add(folder, arcname=folder.name)
-        os.replace(tmp_archive, final_archive)
-
-    return release_dir / archive_name
+        return write_archives(
+            folder,
+            {
+                archive_format: release_dir
+                / f"{stem}{ARCHIVE_FORMATS[archive_format]['suffix']}"
+                for archive_format in formats
+            },
+            threads=threads,
+        )
 
 
 def write_release_files(
@@ -1100,29 +1337,37 @@ def write_release_files(
     studyset,
     annotation,
     note_keys,
+    *,
+    formats=(DEFAULT_ARCHIVE_FORMAT,),
+    threads=1,
 ):
     release_dir = (
         root / NIGHTLY_VERSION
         if release_type == NIGHTLY_VERSION
         else root / "monthly" / version
     )
-    archive_name = f"neurostore-studyset-{version}.tar.gz"
+    stem = archive_stem(version)
     manifest = dict(manifest)
     manifest["version"] = version
     manifest["release_type"] = release_type
-    manifest["archive_name"] = archive_name
+    manifest["archive_name"] = f"{stem}{ARCHIVE_FORMATS[formats[0]]['suffix']}"
     manifest["download_path"] = f"/api/neurostore-studyset-releases/{version}/download"
-    archive_path = write_tarball(
+    archives = write_tarball(
         release_dir,
-        archive_name,
+        stem,
         manifest,
         root,
         selected,
         studyset,
         annotation,
         note_keys,
+        formats=formats,
+        threads=threads,
     )
-    manifest["archive_checksum"] = hashlib.sha256(archive_path.read_bytes()).hexdigest()
+    # ``archive_name`` and ``archive_checksum`` describe the first format, as
+    # before; ``archives`` lists every format the release was written in.
+    manifest["archive_checksum"] = archives[formats[0]]["checksum"]
+    manifest["archives"] = archives
     atomic_write_json(release_dir / "manifest.json", manifest)
     return manifest
 
@@ -1157,13 +1402,7 @@ def base_manifest(
         "feature_pipelines": list(FEATURE_PIPELINES),
         "study_count": len(manifest_studies),
         "note_count": sum(
-            len(
-                read_json(
-                    root / "_cache" / "notes" / f"{base_id}.json",
-                    [],
-                )
-            )
-            for base_id in manifest_studies
+            entry.get("note_count") or 0 for entry in manifest_studies.values()
         ),
         "changed_base_study_ids": changed,
         "removed_base_study_ids": removed,
@@ -1190,10 +1429,29 @@ def build_neurostore_studyset_release(
     force_monthly=False,
     version=None,
     clear_cache=False,
+    workers=None,
+    full=False,
 ):
+    """Build the nightly and/or monthly studyset release.
+
+    A nightly build drains ``study_change_log`` and, when the previous nightly
+    manifest recorded a checkpoint, only revisits the base studies logged
+    since. ``full`` (implied by ``clear_cache`` and by monthly releases)
+    re-ranks and compares every study instead, which also verifies the
+    incremental builds: anything they missed shows up in
+    ``changed_base_study_ids``.
+    """
     if not nightly and not monthly_if_due and not force_monthly and not version:
         nightly = True
     validate_monthly_version(version)
+    archive_options = {
+        "formats": parse_archive_formats(
+            settings.get("NEUROSTORE_STUDYSET_RELEASE_FORMATS")
+        ),
+        "threads": compression_threads(
+            settings.get("NEUROSTORE_STUDYSET_RELEASE_COMPRESSION_THREADS")
+        ),
+    }
 
     if not acquire_build_lock():
         raise RuntimeError("A neurostore studyset release build is already running.")
@@ -1204,20 +1462,79 @@ def build_neurostore_studyset_release(
         if clear_cache:
             clear_shard_cache(root)
         built_at = utcnow()
-        selected = select_coordinate_studies()
-        studyset, annotation = ensure_canonical_records(built_at)
-        sync_studyset_membership(studyset, selected)
-        db.session.flush()
-
         previous_manifest = previous_nightly_manifest(root)
-        base_ids = [entry["base_study_id"] for entry in selected]
-        features_by_base = fetch_latest_feature_payloads(base_ids)
-        note_keys, analysis_rows_by_study = sync_annotation(
-            annotation,
-            selected,
-            features_by_base,
-            previous_manifest,
+        previous_entries = previous_manifest.get("studies", {})
+
+        month_version = version or current_month_version(built_at)
+        monthly_dir = root / "monthly" / month_version
+        monthly_exists = (monthly_dir / "manifest.json").exists()
+        should_write_monthly = (
+            force_monthly
+            or bool(version and not nightly and not monthly_exists)
+            or (monthly_if_due and not monthly_exists)
         )
+
+        # Only a nightly build moves the checkpoint: the log is drained
+        # against the nightly manifest it is recorded in.
+        checkpoint = None
+        changed_base_ids = None
+        if nightly:
+            checkpoint, changed_base_ids = consume_study_changes()
+            checkpoint = checkpoint or previous_manifest.get("change_log_checkpoint")
+            if (
+                full
+                or clear_cache
+                or should_write_monthly
+                or previous_manifest.get("change_log_checkpoint") is None
+            ):
+                changed_base_ids = None
+
+        features_by_base = None
+        note_keys = None
+        if changed_base_ids is not None:
+            reselected = (
+                select_coordinate_studies(changed_base_ids) if changed_base_ids else []
+            )
+            features_by_base = fetch_latest_feature_payloads(
+                [entry["base_study_id"] for entry in reselected]
+            )
+            note_keys = previous_manifest.get("note_keys") or {}
+            # New note keys reorder every note, so rebuild everything.
+            if not note_keys_cover(note_keys, features_by_base):
+                changed_base_ids = None
+
+        studyset, annotation = ensure_canonical_records(built_at)
+        if changed_base_ids is None:
+            selected = select_coordinate_studies()
+            sync_studyset_membership(studyset, selected)
+            db.session.flush()
+
+            base_ids = [entry["base_study_id"] for entry in selected]
+            features_by_base = fetch_latest_feature_payloads(base_ids)
+            note_keys, analysis_rows_by_study = sync_annotation(
+                annotation,
+                selected,
+                features_by_base,
+                previous_manifest,
+            )
+        else:
+            selected = merge_selection(previous_entries, changed_base_ids, reselected)
+            scope_study_ids = {
+                previous_entries[base_id]["study_id"]
+                for base_id in changed_base_ids
+                if base_id in previous_entries
+            } | {entry["study_id"] for entry in reselected}
+            sync_studyset_membership(studyset, reselected, scope_study_ids)
+            db.session.flush()
+
+            note_keys, analysis_rows_by_study = sync_annotation(
+                annotation,
+                reselected,
+                features_by_base,
+                previous_manifest,
+                note_keys=note_keys,
+                study_ids=scope_study_ids,
+            )
         db.session.flush()
 
         manifest_studies, changed, removed, note_keys_checksum = refresh_shards(
@@ -1228,6 +1545,11 @@ def build_neurostore_studyset_release(
             note_keys,
             analysis_rows_by_study,
             previous_manifest,
+            changed_base_ids=changed_base_ids,
+            workers=int(
+                workers or settings.get("NEUROSTORE_STUDYSET_RELEASE_WORKERS") or 1
+            ),
+            database_config=shard_database_config(settings),
         )
         manifest = base_manifest(
             root,
@@ -1240,6 +1562,9 @@ def build_neurostore_studyset_release(
             note_keys,
             note_keys_checksum,
         )
+        manifest["build_mode"] = "full" if changed_base_ids is None else "incremental"
+        if nightly:
+            manifest["change_log_checkpoint"] = checkpoint or 0
 
         written = []
         if nightly:
@@ -1253,17 +1578,10 @@ def build_neurostore_studyset_release(
                     studyset,
                     annotation,
                     note_keys,
+                    **archive_options,
                 )
             )
 
-        month_version = version or current_month_version(built_at)
-        monthly_dir = root / "monthly" / month_version
-        monthly_exists = (monthly_dir / "manifest.json").exists()
-        should_write_monthly = (
-            force_monthly
-            or bool(version and not nightly and not monthly_exists)
-            or (monthly_if_due and not monthly_exists)
-        )
         if should_write_monthly:
             written.append(
                 write_release_files(
@@ -1275,6 +1593,7 @@ def build_neurostore_studyset_release(
                     studyset,
                     annotation,
                     note_keys,
+                    **archive_options,
                 )
             )
 
@@ -1285,12 +1604,15 @@ def build_neurostore_studyset_release(
         raise
 
 
-def resolve_release_version(version, *, settings):
+def resolve_release_version(
+    version, *, settings, archive_format=DEFAULT_ARCHIVE_FORMAT
+):
+    suffix = ARCHIVE_FORMATS[archive_format]["suffix"]
     root = release_root(settings)
     if version == NIGHTLY_VERSION:
         release_dir = root / NIGHTLY_VERSION
         manifest = release_dir / "manifest.json"
-        archive_name = f"neurostore-studyset-{NIGHTLY_VERSION}.tar.gz"
+        archive_name = f"{archive_stem(NIGHTLY_VERSION)}{suffix}"
         return release_dir, manifest, release_dir / archive_name
 
     if version == LATEST_VERSION:
@@ -1301,7 +1623,7 @@ def resolve_release_version(version, *, settings):
 
     release_dir = root / "monthly" / version
     manifest = release_dir / "manifest.json"
-    archive_name = f"neurostore-studyset-{version}.tar.gz"
+    archive_name = f"{archive_stem(version)}{suffix}"
     return release_dir, manifest, release_dir / archive_name
 
 
@@ -1326,6 +1648,7 @@ def manifest_summary(manifest):
         "note_count",
         "archive_name",
         "archive_checksum",
+        "archives",
         "download_path",
     )
     return {key: manifest.get(key) for key in keys if key in manifest}
@@ -1357,9 +1680,9 @@ def load_release_manifest(version, *, settings):
     return read_json(manifest_path)
 
 
-def release_archive_path(version, *, settings):
+def release_archive_path(version, *, settings, archive_format=DEFAULT_ARCHIVE_FORMAT):
     _release_dir, _manifest_path, archive_path = resolve_release_version(
-        version, settings=settings
+        version, settings=settings, archive_format=archive_format
     )
     if not archive_path or not archive_path.exists():
         return None
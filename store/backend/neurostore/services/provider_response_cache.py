@@ -0,0 +1,244 @@
+"""Database-backed cache of parsed metadata-provider responses.
+
+Entries are keyed by provider and normalized identifier. A record the provider
+returned is kept for ``BASE_STUDY_METADATA_CACHE_TTL_SECONDS``, and an
+identifier it had nothing for is remembered for
+``BASE_STUDY_METADATA_CACHE_NEGATIVE_TTL_SECONDS``; failed requests are never
+cached. Retried outbox rows, duplicates merged into one base study and the
+offline cleanup scripts are then answered without a provider request.
+
+Entries live in ``provider_responses``, shared by every worker, behind a
+bounded in-process LRU. The table is read and written on connections of its
+own, so the cache neither joins nor outlives the caller's transaction, and a
+database error only turns lookups into misses. Long runs such as the cleanup
+scripts open one such connection up front and share it between their caches.
+"""
+
+import datetime as dt
+import logging
+import threading
+from contextlib import contextmanager
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from neurostore.database import db
+from neurostore.extensions import LocalCache
+from neurostore.models import ProviderResponse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 30 * 24 * 60 * 60
+DEFAULT_NEGATIVE_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_LOCAL_MAX_ENTRIES = 10000
+
+# In-process stand-in for a negative entry; LocalCache returns None on a miss.
+_NOT_FOUND = object()
+
+_local_lock = threading.Lock()
+_local = None
+
+
+def _setting(settings, name, default, convert):
+    try:
+        return max(convert((settings or {}).get(name, default)), 0)
+    except (TypeError, ValueError):
+        return default
+
+
+def _local_cache(settings):
+    global _local
+    max_entries = _setting(
+        settings,
+        "BASE_STUDY_METADATA_CACHE_LOCAL_MAX_ENTRIES",
+        DEFAULT_LOCAL_MAX_ENTRIES,
+        int,
+    )
+    with _local_lock:
+        if _local is None or _local.max_entries != max_entries:
+            _local = LocalCache(max_entries)
+        return _local
+
+
+def reset_provider_response_cache():
+    """Forget the entries held in memory (used by tests)."""
+    global _local
+    with _local_lock:
+        _local = None
+
+
+def lookup_key(key):
+    """Return the stored form of a provider lookup key.
+
+    Tuple keys such as ``("doi", value)`` are joined with ``:``, and
+    identifiers compare case-insensitively.
+    """
+    if isinstance(key, tuple):
+        key = ":".join(str(part) for part in key)
+    return str(key).strip().lower()
+
+
+class ProviderResponseCache:
+    """Cached responses of one provider endpoint.
+
+    ``provider`` names the endpoint and anything else that shapes its
+    response, such as the fields requested. Reads and writes check out a
+    connection each, or run on ``connection`` when one is given; it must not
+    be the connection of the caller's session.
+    """
+
+    def __init__(self, provider, settings=None, connection=None):
+        self.provider = provider
+        self.connection = connection
+        self.ttl = _setting(
+            settings,
+            "BASE_STUDY_METADATA_CACHE_TTL_SECONDS",
+            DEFAULT_TTL_SECONDS,
+            float,
+        )
+        self.negative_ttl = _setting(
+            settings,
+            "BASE_STUDY_METADATA_CACHE_NEGATIVE_TTL_SECONDS",
+            DEFAULT_NEGATIVE_TTL_SECONDS,
+            float,
+        )
+        self.local = _local_cache(settings)
+
+    @property
+    def enabled(self):
+        return bool(self.ttl or self.negative_ttl)
+
+    @contextmanager
+    def _transaction(self):
+        if self.connection is None:
+            with db.engine.begin() as connection:
+                yield connection
+            return
+        try:
+            yield self.connection
+        except BaseException:
+            self.connection.rollback()
+            raise
+        self.connection.commit()
+
+    def _remember(self, stored_key, record, ttl):
+        if ttl > 0:
+            value = _NOT_FOUND if record is None else record
+            self.local.set((self.provider, stored_key), value, timeout=ttl, size=1)
+
+    def get_many(self, keys):
+        """Return ``{key: record}`` for the cached ``keys``.
+
+        A ``None`` record means the provider is known to have nothing for the
+        key; keys missing from the result have to be fetched.
+        """
+        if not self.enabled:
+            return {}
+
+        found = {}
+        pending = {}
+        for key in keys:
+            stored_key = lookup_key(key)
+            value = self.local.get((self.provider, stored_key))
+            if value is None:
+                pending.setdefault(stored_key, []).append(key)
+            else:
+                found[key] = None if value is _NOT_FOUND else value
+        if not pending:
+            return found
+
+        try:
+            with self._transaction() as connection:
+                rows = connection.execute(
+                    sa.select(
+                        ProviderResponse.lookup_key,
+                        ProviderResponse.response,
+                        ProviderResponse.expires_at,
+                    ).where(
+                        ProviderResponse.provider == self.provider,
+                        ProviderResponse.lookup_key.in_(list(pending)),
+                        ProviderResponse.expires_at > sa.func.now(),
+                    )
+                ).all()
+        except SQLAlchemyError as exc:
+            logger.warning("provider response cache read failed: %s", exc)
+            return found
+
+        now = dt.datetime.now(dt.timezone.utc)
+        for stored_key, response, expires_at in rows:
+            self._remember(stored_key, response, (expires_at - now).total_seconds())
+            for key in pending[stored_key]:
+                found[key] = response
+        return found
+
+    def put_many(self, keys, found):
+        """Store the ``found`` records, and every other key as not found."""
+        if not self.enabled:
+            return
+
+        now = dt.datetime.now(dt.timezone.utc)
+        rows = {}
+        for key in keys:
+            record = found.get(key)
+            ttl = self.ttl if record is not None else self.negative_ttl
+            if not ttl:
+                continue
+            stored_key = lookup_key(key)
+            self._remember(stored_key, record, ttl)
+            rows[stored_key] = {
+                "provider": self.provider,
+                "lookup_key": stored_key,
+                "response": record,
+                "expires_at": now + dt.timedelta(seconds=ttl),
+            }
+        if not rows:
+            return
+
+        stmt = pg_insert(ProviderResponse)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ProviderResponse.provider, ProviderResponse.lookup_key],
+            set_={
+                "response": stmt.excluded.response,
+                "fetched_at": sa.func.now(),
+                "expires_at": stmt.excluded.expires_at,
+            },
+        )
+        try:
+            with self._transaction() as connection:
+                connection.execute(stmt, list(rows.values()))
+        except SQLAlchemyError as exc:
+            logger.warning("provider response cache write failed: %s", exc)
+
+    def fetching(self, fetch_many):
+        """Wrap ``fetch_many(keys) -> {key: record}`` to store what it fetches."""
+
+        def fetch_and_store(keys):
+            found = fetch_many(keys)
+            self.put_many(keys, found)
+            return found
+
+        return fetch_and_store
+
+    def load_many(self, keys, fetch_many):
+        """Return ``{key: record}`` for ``keys``, fetching only the uncached."""
+        keys = list(dict.fromkeys(keys))
+        cached = self.get_many(keys)
+        found = {key: record for key, record in cached.items() if record is not None}
+        missing = [key for key in keys if key not in cached]
+        if missing:
+            found.update(self.fetching(fetch_many)(missing))
+        return found
+
+    def lookup(self, key, fetch):
+        """Return ``fetch(key)`` through the cache; a ``None`` result is cached too."""
+
+        def fetch_many(keys):
+            found = {}
+            for each in keys:
+                record = fetch(each)
+                if record is not None:
+                    found[each] = record
+            return found
+
+        return self.load_many([key], fetch_many).get(key)
@@ -0,0 +1,191 @@
+"""Multi-threaded tar archive writers for studyset releases.
+
+A release folder is walked once and the tar stream is fed to one compressor per
+requested format:
+
+- ``gz`` compresses fixed-size blocks on a thread pool and writes each block
+  as its own gzip member. Concatenated members are a valid gzip file (RFC
+  1952), so ``gunzip``, ``tar xzf`` and ``tarfile`` read it unchanged.
+- ``zst`` uses zstd's own worker threads and needs the optional
+  ``zstandard`` package.
+
+Each archive's SHA-256 and size are computed while it is written.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+import tarfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstd archives are optional
+    zstandard = None
+
+ARCHIVE_FORMATS = {
+    "gz": {"suffix": ".tar.gz", "media_type": "application/gzip"},
+    "zst": {"suffix": ".tar.zst", "media_type": "application/zstd"},
+}
+DEFAULT_ARCHIVE_FORMAT = "gz"
+GZIP_BLOCK_SIZE = 4 * 1024 * 1024
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 10
+
+
+def parse_archive_formats(value):
+    """Return the formats named in ``value`` (a list or comma-separated string)."""
+    if isinstance(value, str):
+        value = value.split(",")
+    formats = []
+    for archive_format in value or (DEFAULT_ARCHIVE_FORMAT,):
+        archive_format = archive_format.strip().lower()
+        if not archive_format:
+            continue
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ValueError(
+                f"Unknown release archive format {archive_format!r}; "
+                f"expected one of {', '.join(ARCHIVE_FORMATS)}"
+            )
+        if archive_format == "zst" and zstandard is None:
+            raise RuntimeError("zst release archives require the zstandard package.")
+        if archive_format not in formats:
+            formats.append(archive_format)
+    return formats or [DEFAULT_ARCHIVE_FORMAT]
+
+
+def compression_threads(value=None):
+    """Threads per compressor; ``0`` or ``None`` uses every CPU."""
+    value = int(value or 0)
+    return value if value > 0 else os.cpu_count() or 1
+
+
+class _HashingFile:
+    """Write-only file computing the SHA-256 and size of what passes through."""
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.fileobj.write(data)
+
+    def flush(self):
+        self.fileobj.flush()
+
+
+class ParallelGzipWriter:
+    """Gzip ``fileobj`` as independently compressed blocks, ``threads`` at once."""
+
+    def __init__(
+        self, fileobj, *, threads=1, level=GZIP_LEVEL, block_size=GZIP_BLOCK_SIZE
+    ):
+        self.fileobj = fileobj
+        self.level = level
+        self.block_size = block_size
+        self.max_pending = max(threads, 1) * 2
+        self._buffer = bytearray()
+        self._pending = deque()
+        self._pool = ThreadPoolExecutor(max_workers=max(threads, 1))
+
+    def _compress(self, block):
+        # zlib releases the GIL, so blocks compress in parallel.
+        return gzip.compress(block, compresslevel=self.level, mtime=0)
+
+    def _submit(self, block):
+        self._pending.append(self._pool.submit(self._compress, block))
+        while len(self._pending) >= self.max_pending:
+            self.fileobj.write(self._pending.popleft().result())
+
+    def write(self, data):
+        self._buffer += data
+        while len(self._buffer) >= self.block_size:
+            self._submit(bytes(self._buffer[: self.block_size]))
+            del self._buffer[: self.block_size]
+        return len(data)
+
+    def close(self):
+        try:
+            if self._buffer or not self._pending:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pending:
+                self.fileobj.write(self._pending.popleft().result())
+        finally:
+            self._pool.shutdown()
+
+    def abort(self):
+        """Drop the blocks not yet written, for an archive being discarded."""
+        for future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        self._pool.shutdown()
+
+
+class _TeeWriter:
+    def __init__(self, writers):
+        self.writers = writers
+
+    def write(self, data):
+        for writer in self.writers:
+            writer.write(data)
+        return len(data)
+
+
+def _compressor(archive_format, fileobj, threads):
+    if archive_format == "gz":
+        return ParallelGzipWriter(fileobj, threads=threads)
+    compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, threads=threads)
+    return compressor.stream_writer(fileobj, closefd=False)
+
+
+def write_archives(folder, destinations, *, threads=1):
+    """Archive ``folder`` into ``{format: path}``; returns ``{format: info}``.
+
+    ``info`` has the archive's ``name``, ``checksum`` (SHA-256), ``size`` and
+    ``media_type``. Archives are written beside their destination and moved
+    into place once complete.
+    """
+    files = {}
+    compressors = {}
+    try:
+        for archive_format, path in destinations.items():
+            tmp_path = path.with_name(f".{path.name}.tmp")
+            files[archive_format] = (tmp_path, _HashingFile(tmp_path.open("wb")))
+            compressors[archive_format] = _compressor(
+                archive_format, files[archive_format][1], threads
+            )
+        with tarfile.open(
+            fileobj=_TeeWriter(list(compressors.values())), mode="w|"
+        ) as tar:
+            tar.add(folder, arcname=folder.name)
+        for compressor in compressors.values():
+            compressor.close()
+    except BaseException:
+        for compressor in compressors.values():
+            if isinstance(compressor, ParallelGzipWriter):
+                compressor.abort()
+        for tmp_path, output in files.values():
+            output.fileobj.close()
+            tmp_path.unlink(missing_ok=True)
+        raise
+    for _tmp_path, output in files.values():
+        output.fileobj.close()
+
+    archives = {}
+    for archive_format, path in destinations.items():
+        tmp_path, output = files[archive_format]
+        os.replace(tmp_path, path)
+        archives[archive_format] = {
+            "name": path.name,
+            "checksum": output.sha256.hexdigest(),
+            "size": output.size,
+            "media_type": ARCHIVE_FORMATS[archive_format]["media_type"],
+        }
+    return archives
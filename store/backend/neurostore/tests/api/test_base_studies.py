@@ -23,7 +23,7 @@ from neurostore.models import (
     Study,
     User,
 )
-from neurostore.schemas import StudySchema
+from neurostore.schemas import BaseStudySchema, StudySchema
 from neurostore.services.base_study_metadata_enrichment import (
     enqueue_base_study_metadata_updates,
     process_base_study_metadata_outbox_batch,
@@ -31,6 +31,7 @@ from neurostore.services.base_study_metadata_enrichment import (
 from neurostore.services.has_media_flags import (
     enqueue_base_study_flag_updates,
     process_base_study_flag_outbox_batch,
+    recompute_media_flags,
 )
 
 pytestmark = pytest.mark.anyio
@@ -141,6 +142,43 @@ async def test_features_query_with_or(
     assert db_diagnoses == api_diagnoses
 
 
+async def test_feature_display_loads_page_features_together(
+    auth_client, ingest_demographic_features, session
+):
+    feature_queries = []
+
+    def capture_feature_queries(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        if "pipeline_study_results" in statement:
+            feature_queries.append(statement)
+
+    event.listen(session.bind, "before_cursor_execute", capture_feature_queries)
+    try:
+        result = await auth_client.get(
+            "/api/base-studies/?feature_display=ParticipantDemographicsExtractor"
+            "&page_size=50"
+        )
+    finally:
+        event.remove(session.bind, "before_cursor_execute", capture_feature_queries)
+
+    assert result.status_code == 200
+    results = result.json()["results"]
+    assert len(results) > 1
+    assert len(feature_queries) == 1
+
+    base_studies = {
+        base_study.id: base_study
+        for base_study in BaseStudy.query.filter(
+            BaseStudy.id.in_([record["id"] for record in results])
+        )
+    }
+    for record in results:
+        assert record["features"] == base_studies[record["id"]].display_features(
+            ["ParticipantDemographicsExtractor"]
+        )
+
+
 async def test_post_list_of_studies(auth_client, ingest_neuroquery):
     base_studies = BaseStudy.query.all()
     test_input = [
@@ -370,6 +408,52 @@ async def test_flat_base_study_search_avoids_version_hydration_queries(
     )
 
 
+async def test_listing_reads_page_and_total_in_one_statement(
+    auth_client, ingest_neurosynth, session
+):
+    statements = []
+
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        statements.append(" ".join(statement.lower().split()))
+
+    event.listen(session.bind, "before_cursor_execute", before_cursor_execute)
+    try:
+        page = await auth_client.get("/api/base-studies/?flat=true&page=2&page_size=3")
+    finally:
+        event.remove(session.bind, "before_cursor_execute", before_cursor_execute)
+    everything = await auth_client.get("/api/base-studies/?flat=true&paginate=false")
+
+    assert page.status_code == everything.status_code == 200
+    assert page.json()["metadata"]["total_count"] == len(everything.json()["results"])
+    assert [result["id"] for result in page.json()["results"]] == [
+        result["id"] for result in everything.json()["results"][3:6]
+    ]
+    assert any("count(*) over ()" in statement for statement in statements)
+    assert not any("count(*) as count_1" in statement for statement in statements)
+
+
+async def test_sql_built_listings_match_schema(auth_client, ingest_neurosynth, session):
+    def by_version_id(document):
+        if "versions" in document:
+            document["versions"] = sorted(document["versions"], key=lambda v: v["id"])
+        return document
+
+    for context in ({"flat": True}, {"info": True}):
+        (flag,) = context
+        response = await auth_client.get(f"/api/base-studies/?{flag}=true&page_size=5")
+        assert response.status_code == 200
+        results = response.json()["results"]
+
+        records = [session.get(BaseStudy, result["id"]) for result in results]
+        expected = BaseStudySchema(context=context, many=True).dump(records)
+
+        assert [by_version_id(result) for result in results] == [
+            by_version_id(document) for document in expected
+        ]
+
+
 async def test_info_base_study(auth_client, ingest_neurosynth, session):
     info_resp = await auth_client.get("/api/base-studies/?info=true")
     reg_resp = await auth_client.get("/api/base-studies/?info=false")
@@ -650,6 +734,58 @@ async def test_base_study_emits_all_media_flags(auth_client, session):
     assert payload["has_beta_and_variance_maps"] is True
 
 
+def test_media_flag_engines_agree(session, ingest_neurosynth):
+    flag_columns = (
+        "has_coordinates",
+        "has_images",
+        "has_z_maps",
+        "has_t_maps",
+        "has_beta_and_variance_maps",
+    )
+    models = {"analyses": Analysis, "studies": Study, "base-studies": BaseStudy}
+    base_study_ids = [id_ for (id_,) in session.query(BaseStudy.id).limit(50)]
+    image = Image(
+        filename="engine-z.nii.gz",
+        value_type="Z",
+        analysis=Analysis.query.join(Study)
+        .filter(Study.base_study_id == base_study_ids[0])
+        .first(),
+    )
+    session.add(image)
+    session.commit()
+
+    def scramble():
+        for model in models.values():
+            session.execute(
+                sa.update(model).values(
+                    {column: sa.not_(getattr(model, column)) for column in flag_columns}
+                )
+            )
+
+    def snapshot():
+        return {
+            level: sorted(
+                session.execute(
+                    sa.select(model.id, *(getattr(model, c) for c in flag_columns))
+                ).all()
+            )
+            for level, model in models.items()
+        }
+
+    results = {}
+    for engine in ("correlated", "aggregate"):
+        scramble()
+        changed = recompute_media_flags(base_study_ids, engine=engine)
+        results[engine] = (changed, snapshot())
+        session.rollback()
+
+    assert results["aggregate"] == results["correlated"]
+    assert results["aggregate"][0]["base-studies"] == set(base_study_ids)
+
+    with pytest.raises(ValueError):
+        recompute_media_flags(base_study_ids, engine="unknown")
+
+
 async def test_async_image_reassignment_updates_hierarchy_flags(
     auth_client, session, app
 ):
@@ -1318,6 +1454,103 @@ def test_metadata_worker_merge_reassigns_pipeline_rows(
     )
 
 
+def test_metadata_worker_merge_moves_latest_results_projection(
+    session, app, monkeypatch
+):
+    from neurostore.models import PipelineLatestResult
+    from neurostore.services import base_study_metadata_enrichment as metadata_service
+
+    primary = BaseStudy(name="Projection Primary", pmid="950101", level="group")
+    duplicate = BaseStudy(name="Projection Duplicate", pmid="950101", level="group")
+    now = dt.datetime.now(dt.timezone.utc)
+    primary.created_at = now - dt.timedelta(seconds=10)
+    duplicate.created_at = now
+    pipeline = Pipeline(name="MergeProjectionExtractor")
+    config = PipelineConfig(pipeline=pipeline, version="1.0.0", config_args={})
+    result = PipelineStudyResult(
+        base_study=duplicate,
+        config=config,
+        date_executed=now,
+        result_data={"score": 1},
+    )
+    session.add_all([primary, duplicate, pipeline, config, result])
+    session.commit()
+    latest = PipelineLatestResult.query.filter_by(base_study_id=duplicate.id).one()
+    assert latest.result_id == result.id
+
+    session.add(
+        BaseStudyMetadataOutbox(base_study_id=duplicate.id, reason="test-projection")
+    )
+    session.commit()
+
+    for name in (
+        "lookup_ids_semantic_scholar",
+        "lookup_ids_pubmed",
+        "lookup_ids_openalex",
+        "fetch_metadata_semantic_scholar",
+        "fetch_metadata_pubmed",
+    ):
+        monkeypatch.setattr(metadata_service, name, lambda *_args, **_kwargs: {})
+
+    processed = process_base_study_metadata_outbox_batch(
+        batch_size=10, settings=app.config, logger=app.logger
+    )
+    assert processed == 1
+
+    session.refresh(duplicate)
+    assert duplicate.superseded_by == primary.id
+    assert PipelineLatestResult.query.filter_by(base_study_id=duplicate.id).count() == 0
+    row = PipelineLatestResult.query.filter_by(base_study_id=primary.id).one()
+    assert row.result_id == result.id
+    assert row.pipeline_id == pipeline.id
+
+
+def test_metadata_worker_merge_moves_grid_cells(session, app, monkeypatch):
+    from neurostore.models import BaseStudyGridCell, Point
+    from neurostore.services import base_study_metadata_enrichment as metadata_service
+
+    primary = BaseStudy(name="Grid Primary", pmid="950201", level="group")
+    duplicate = BaseStudy(name="Grid Duplicate", pmid="950201", level="group")
+    now = dt.datetime.now(dt.timezone.utc)
+    primary.created_at = now - dt.timedelta(seconds=10)
+    duplicate.created_at = now
+    study = Study(name="Grid Study", base_study=duplicate)
+    analysis = Analysis(name="Grid Analysis", study=study)
+    point = Point(x=10.0, y=-6.0, z=2.0, space="MNI", analysis=analysis)
+    session.add_all([primary, duplicate, study, analysis, point])
+    session.commit()
+
+    def grid_cells(base_study_id):
+        return {
+            (cell.cell_x, cell.cell_y, cell.cell_z)
+            for cell in BaseStudyGridCell.query.filter_by(base_study_id=base_study_id)
+        }
+
+    assert grid_cells(duplicate.id) == {(2, -2, 0)}
+
+    session.add(BaseStudyMetadataOutbox(base_study_id=duplicate.id, reason="test-grid"))
+    session.commit()
+
+    for name in (
+        "lookup_ids_semantic_scholar",
+        "lookup_ids_pubmed",
+        "lookup_ids_openalex",
+        "fetch_metadata_semantic_scholar",
+        "fetch_metadata_pubmed",
+    ):
+        monkeypatch.setattr(metadata_service, name, lambda *_args, **_kwargs: {})
+
+    processed = process_base_study_metadata_outbox_batch(
+        batch_size=10, settings=app.config, logger=app.logger
+    )
+    assert processed == 1
+
+    session.refresh(duplicate)
+    assert duplicate.superseded_by == primary.id
+    assert grid_cells(duplicate.id) == set()
+    assert grid_cells(primary.id) == {(2, -2, 0)}
+
+
 def test_metadata_worker_defers_failed_rows(session, app, monkeypatch):
     from neurostore.services import base_study_metadata_enrichment as metadata_service
 
@@ -1403,7 +1636,9 @@ def test_metadata_worker_rolls_back_failed_gather_before_continuing(
             metadata_service.db.session.execute(sa.text("SELECT * FROM missing_table"))
         return metadata_service._NO_OP_ENRICHMENT
 
-    monkeypatch.setattr(metadata_service, "_gather_base_study_enrichment", _patched_gather)
+    monkeypatch.setattr(
+        metadata_service, "_gather_base_study_enrichment", _patched_gather
+    )
 
     processed = process_base_study_metadata_outbox_batch(
         batch_size=10, settings=app.config, logger=app.logger
@@ -1417,7 +1652,9 @@ def test_metadata_worker_rolls_back_failed_gather_before_continuing(
         is None
     )
     assert (
-        BaseStudyMetadataOutbox.query.filter_by(base_study_id=failed_base_study.id).one()
+        BaseStudyMetadataOutbox.query.filter_by(
+            base_study_id=failed_base_study.id
+        ).one()
         is not None
     )
 
@@ -1861,7 +2098,7 @@ def test_metadata_and_flag_workers_do_not_deadlock_on_same_base_study(
             "studies": set(),
         }
 
-    def _patched_recompute(base_study_ids):
+    def _patched_recompute(base_study_ids, engine=None):
         flag_service.db.session.execute(sa.text("SET deadlock_timeout = '100ms'"))
         flag_has_outbox_lock.set()
         assert metadata_has_base_lock.wait(
@@ -2571,6 +2808,48 @@ async def test_base_studies_spatial_query_with_mock_data(auth_client, session):
     assert base_study.id in ids
 
 
+async def test_base_studies_spatial_grid_cells_follow_points(auth_client, session):
+    """Grid cells track point writes, so radius search sees moves and deletes."""
+    from neurostore.models import Analysis, BaseStudy, BaseStudyGridCell, Point, Study
+
+    base_study = BaseStudy(
+        name="GridCellTest", has_coordinates=True, public=True, level="group"
+    )
+    study = Study(name="GridCellStudy", base_study=base_study)
+    analysis = Analysis(name="GridCellAnalysis", study=study)
+    point = Point(x=-41, y=62, z=7, analysis=analysis)
+    session.add_all([base_study, study, analysis, point])
+    session.commit()
+
+    def grid_cells():
+        return {
+            (cell.cell_x, cell.cell_y, cell.cell_z)
+            for cell in BaseStudyGridCell.query.filter_by(base_study_id=base_study.id)
+        }
+
+    async def search_ids(x, y, z, radius):
+        result = await auth_client.get(
+            f"/api/base-studies/?x={x}&y={y}&z={z}&radius={radius}"
+        )
+        assert result.status_code == 200
+        return {study["id"] for study in result.json()["results"]}
+
+    assert grid_cells() == {(-11, 15, 1)}
+    assert base_study.id in await search_ids(-40, 60, 8, 3)
+
+    point.x = 41
+    session.commit()
+    assert grid_cells() == {(10, 15, 1)}
+    # Fresh parameters each time so cached listings are not reused.
+    assert base_study.id not in await search_ids(-40, 61, 8, 3)
+    assert base_study.id in await search_ids(40, 60, 8, 3)
+
+    session.delete(point)
+    session.commit()
+    assert grid_cells() == set()
+    assert base_study.id not in await search_ids(40, 61, 8, 3)
+
+
 async def test_base_studies_semantic_search(
     auth_client, mock_get_embedding, ingest_demographic_features
 ):
@@ -2873,3 +3152,227 @@ def test_metadata_requests_throttle_pubmed_by_key_presence(app, monkeypatch):
     )
 
     assert fake_clock.sleeps == pytest.approx([0.11, (1.0 / 3.0) + 0.01])
+
+
+def test_metadata_gather_coalesces_provider_lookups(app, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from neurostore.services import base_study_metadata_enrichment as metadata_service
+
+    class FakeResponse:
+        status_code = 200
+
+        def __init__(self, payload=None, text=""):
+            self.payload = payload
+            self.text = text
+
+        def json(self):
+            return self.payload
+
+    calls = []
+    pmids = [str(pmid) for pmid in range(990101, 990111)]
+
+    def _fake_request(method, url, **kwargs):
+        calls.append((method, url, kwargs))
+        if "semanticscholar" in url:
+            return FakeResponse(
+                [
+                    {"externalIds": {"DOI": f"10.9901/{request_id[5:]}"}}
+                    for request_id in kwargs["json"]["ids"]
+                ]
+            )
+        if "idconv" in url:
+            return FakeResponse(
+                {
+                    "records": [
+                        {"requested-id": pmid, "pmid": pmid, "pmcid": f"PMC{pmid}"}
+                        for pmid in kwargs["params"]["ids"].split(",")
+                    ]
+                }
+            )
+        articles = "".join(
+            "<PubmedArticle><MedlineCitation>"
+            f"<PMID>{pmid}</PMID><Article><ArticleTitle>Title {pmid}</ArticleTitle>"
+            "</Article></MedlineCitation></PubmedArticle>"
+            for pmid in kwargs["params"]["id"].split(",")
+        )
+        return FakeResponse(text=f"<PubmedArticleSet>{articles}</PubmedArticleSet>")
+
+    metadata_service._reset_provider_rate_limits()
+    monkeypatch.setattr(metadata_service.requests, "request", _fake_request)
+    batcher = metadata_service._ProviderBatcher(window_seconds=0.2)
+
+    def _gather(pmid):
+        kwargs = {"settings": app.config, "logger": app.logger, "batcher": batcher}
+        return (
+            metadata_service.lookup_ids_semantic_scholar({"pmid": pmid}, **kwargs),
+            metadata_service.lookup_ids_pubmed({"pmid": pmid}, **kwargs),
+            metadata_service.fetch_metadata_pubmed({"pmid": pmid}, **kwargs),
+        )
+
+    with ThreadPoolExecutor(max_workers=len(pmids)) as executor:
+        results = dict(zip(pmids, executor.map(_gather, pmids)))
+
+    assert len(calls) == 3
+    for pmid, (semantic_ids, pubmed_ids, pubmed_metadata) in results.items():
+        assert semantic_ids["doi"] == f"10.9901/{pmid}"
+        assert pubmed_ids["pmcid"] == f"PMC{pmid}"
+        assert pubmed_metadata["name"] == f"Title {pmid}"
+
+
+def test_provider_batch_failure_falls_back_to_single_ids():
+    from concurrent.futures import ThreadPoolExecutor
+
+    from neurostore.services import base_study_metadata_enrichment as metadata_service
+
+    calls = []
+
+    def _fetch_many(keys):
+        calls.append(sorted(keys))
+        if "bad" in keys:
+            raise ValueError("provider rejected the batch")
+        return {key: key.upper() for key in keys}
+
+    loader = metadata_service._BatchLoader(_fetch_many, max_size=3, window_seconds=5)
+
+    def _load(key):
+        try:
+            return loader.load_many([key])
+        except ValueError:
+            return "failed"
+
+    keys = ["good", "bad", "other"]
+    with ThreadPoolExecutor(max_workers=len(keys)) as executor:
+        results = dict(zip(keys, executor.map(_load, keys)))
+
+    assert results == {
+        "good": {"good": "GOOD"},
+        "bad": "failed",
+        "other": {"other": "OTHER"},
+    }
+    assert calls[0] == ["bad", "good", "other"]
+    assert sorted(calls[1:]) == [["bad"], ["good"], ["other"]]
+
+
+def test_metadata_lookups_are_served_from_provider_response_cache(
+    session, app, monkeypatch
+):
+    from neurostore.models import ProviderResponse
+    from neurostore.services import base_study_metadata_enrichment as metadata_service
+
+    class FakeResponse:
+        status_code = 200
+
+        def __init__(self, payload):
+            self.payload = payload
+
+        def json(self):
+            return self.payload
+
+    calls = []
+
+    def _fake_request(method, url, **kwargs):
+        calls.append(kwargs["json"]["ids"])
+        return FakeResponse(
+            [
+                (
+                    {"externalIds": {"DOI": "10.9902/known"}}
+                    if request_id == "PMID:1"
+                    else None
+                )
+                for request_id in kwargs["json"]["ids"]
+            ]
+        )
+
+    metadata_service._reset_provider_rate_limits()
+    monkeypatch.setattr(metadata_service.requests, "request", _fake_request)
+
+    def _lookup(pmid):
+        return metadata_service.lookup_ids_semantic_scholar(
+            {"pmid": pmid}, settings=app.config, logger=app.logger
+        )
+
+    assert _lookup("1")["doi"] == "10.9902/known"
+    assert _lookup("2") == {}
+    assert calls == [["PMID:1"], ["PMID:2"]]
+
+    # Found records and misses are both answered without a request.
+    assert _lookup("1")["doi"] == "10.9902/known"
+    assert _lookup("2") == {}
+    assert len(calls) == 2
+
+    cached = {
+        row.lookup_key: row.response
+        for row in session.query(ProviderResponse).filter_by(
+            provider="semantic_scholar:externalIds"
+        )
+    }
+    assert cached == {
+        "pmid:1": {"externalIds": {"DOI": "10.9902/known"}},
+        "pmid:2": None,
+    }
+
+    session.query(ProviderResponse).update(
+        {"expires_at": dt.datetime.now(dt.timezone.utc) - dt.timedelta(seconds=1)}
+    )
+    session.commit()
+    assert _lookup("2") == {}
+    assert calls[-1] == ["PMID:2"]
+
+
+async def test_feature_filter_uses_latest_results_projection(auth_client, session):
+    """Feature filters only match the newest result of each pipeline version."""
+    from neurostore.models import PipelineLatestResult
+
+    base_study = BaseStudy(name="LatestResultTest", public=True, level="group")
+    pipeline = Pipeline(name="LatestResultExtractor")
+    config_v1 = PipelineConfig(pipeline=pipeline, version="1.0.0", config_args={})
+    config_v2 = PipelineConfig(pipeline=pipeline, version="2.0.0", config_args={})
+    old_v1 = PipelineStudyResult(
+        base_study=base_study,
+        config=config_v1,
+        date_executed=dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc),
+        result_data={"score": 1},
+    )
+    new_v1 = PipelineStudyResult(
+        base_study=base_study,
+        config=config_v1,
+        date_executed=dt.datetime(2024, 2, 1, tzinfo=dt.timezone.utc),
+        result_data={"score": 2},
+    )
+    session.add_all([base_study, pipeline, config_v1, config_v2, old_v1, new_v1])
+    session.commit()
+
+    def projection():
+        return {
+            (row.version, row.result_data["score"], row.is_latest)
+            for row in PipelineLatestResult.query.filter_by(base_study_id=base_study.id)
+        }
+
+    async def matches(feature_filter):
+        result = await auth_client.get(
+            f"/api/base-studies/?feature_filter={feature_filter}"
+        )
+        assert result.status_code == 200
+        return base_study.id in {study["id"] for study in result.json()["results"]}
+
+    assert projection() == {("1.0.0", 2, True)}
+    assert await matches("LatestResultExtractor:score=2")
+    assert not await matches("LatestResultExtractor:score=1")
+
+    new_v2 = PipelineStudyResult(
+        base_study=base_study,
+        config=config_v2,
+        date_executed=dt.datetime(2024, 3, 1, tzinfo=dt.timezone.utc),
+        result_data={"score": 3},
+    )
+    session.add(new_v2)
+    session.commit()
+    assert projection() == {("1.0.0", 2, False), ("2.0.0", 3, True)}
+    assert await matches("LatestResultExtractor:score=3")
+    assert not await matches("LatestResultExtractor:1.0.0:score=1")
+    assert await matches("LatestResultExtractor:1.0.0:score=2")
+
+    session.delete(new_v1)
+    session.commit()
+    assert projection() == {("1.0.0", 1, False), ("2.0.0", 3, True)}
@@ -4,7 +4,22 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from neurostore.embeddings import get_embedding
+from neurostore import embeddings
+from neurostore.embeddings import (
+    StubEmbeddingProvider,
+    get_embedding,
+    get_embeddings,
+    get_query_embedding,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_embeddings(monkeypatch):
+    # Pooled clients and cached vectors would otherwise leak between tests.
+    monkeypatch.setattr(embeddings, "_redis_client", lambda: None)
+    embeddings.reset_embedding_state()
+    yield
+    embeddings.reset_embedding_state()
 
 
 def _cassette_exists():
@@ -152,3 +167,71 @@ def test_get_embedding_passes_dimensions(monkeypatch):
         model="text-embedding-3-small", input="hello world", dimensions=512
     )
     assert result == [float(x) for x in expected_vector]
+
+
+def test_openai_client_is_reused_between_calls(monkeypatch):
+    mock_client = MagicMock()
+    mock_client.embeddings.create.return_value = _make_mock_openai_response([0.1])
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.delenv("OPENAI_API_GATEWAY", raising=False)
+
+    with patch(
+        "neurostore.embeddings.openai.OpenAI", return_value=mock_client
+    ) as mock_openai_cls:
+        get_embedding("first")
+        get_embedding("second")
+
+    mock_openai_cls.assert_called_once_with(api_key="test-key")
+    assert mock_client.embeddings.create.call_count == 2
+
+
+def test_stub_provider_is_deterministic(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "stub")
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+    first = get_embedding("working memory", dimensions=8)
+
+    assert len(first) == 8
+    assert first == get_embedding("working memory", dimensions=8)
+    assert first != get_embedding("episodic memory", dimensions=8)
+
+
+def test_query_embedding_is_cached_by_normalized_text():
+    calls = []
+
+    class CountingProvider(StubEmbeddingProvider):
+        def embed(self, texts, dimensions=None):
+            calls.append(list(texts))
+            return super().embed(texts, dimensions)
+
+    embeddings.set_embedding_provider(CountingProvider())
+
+    first = get_query_embedding("  working   memory ", dimensions=4)
+    second = get_query_embedding("working memory", dimensions=4)
+
+    assert first == second
+    assert calls == [["working memory"]]
+    assert first == pytest.approx(
+        StubEmbeddingProvider().embed(["working memory"], 4)[0], rel=1e-6
+    )
+
+
+def test_get_embeddings_batches_only_cache_misses():
+    calls = []
+
+    class CountingProvider(StubEmbeddingProvider):
+        def embed(self, texts, dimensions=None):
+            calls.append(list(texts))
+            return super().embed(texts, dimensions)
+
+    embeddings.set_embedding_provider(CountingProvider())
+    get_query_embedding("b", dimensions=4)
+    calls.clear()
+
+    vectors = get_embeddings(["a", "b", "c", "a"], dimensions=4, batch_size=1)
+
+    assert calls == [["a"], ["c"]]
+    assert len(vectors) == 4
+    assert vectors[0] == vectors[3]
+    assert vectors[1] == get_query_embedding("b", dimensions=4)
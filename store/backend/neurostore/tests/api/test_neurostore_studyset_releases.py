@@ -1,5 +1,7 @@
 import pytest
 
+import gzip
+import hashlib
 import json
 import tarfile
 from io import BytesIO
@@ -15,11 +17,17 @@ from neurostore.models import (
     PipelineConfig,
     PipelineStudyResult,
     Point,
+    PointValue,
     Study,
+    StudyChangeLog,
     Studyset,
     User,
 )
+from neurostore.resources.neurostore_studyset_releases import (
+    negotiate_archive_format,
+)
 from neurostore.services import neurostore_studyset_releases as release_service
+from neurostore.services.release_archives import ParallelGzipWriter, write_archives
 from neurostore.services.neurostore_studyset_releases import (
     ANNOTATION_SOURCE_ID,
     STUDYSET_SOURCE_ID,
@@ -236,6 +244,10 @@ def test_build_release_selects_latest_coordinate_study_and_writes_tarball(
     archive_path = tmp_path / "neurostore-studyset-releases/nightly"
     archive_path = archive_path / "neurostore-studyset-nightly.tar.gz"
     assert archive_path.exists()
+    assert manifest["archives"]["gz"]["checksum"] == manifest["archive_checksum"]
+    assert manifest["archive_checksum"] == (
+        hashlib.sha256(archive_path.read_bytes()).hexdigest()
+    )
     with tarfile.open(archive_path, mode="r:gz") as tar:
         names = {name.split("/")[-1] for name in tar.getnames()}
         assert {
@@ -314,6 +326,146 @@ def test_release_build_tracks_partial_update_manifest(app, session, tmp_path):
     )
 
 
+def test_study_change_log_records_child_writes(session):
+    base, old_study, newest_study, analysis = _seed_release_data(session)
+    session.query(StudyChangeLog).delete()
+    session.commit()
+
+    point = Point.query.filter_by(analysis_id=analysis.id).one()
+    session.add(PointValue(point=point, kind="z", value=3.1))
+    session.commit()
+    point.x = 11
+    session.commit()
+
+    logged = {(row.study_id, row.base_study_id) for row in StudyChangeLog.query.all()}
+    assert logged == {(newest_study.id, base.id)}
+
+    session.query(StudyChangeLog).delete()
+    old_study.base_study_id = None
+    session.commit()
+    logged = {(row.study_id, row.base_study_id) for row in StudyChangeLog.query.all()}
+    assert logged == {(old_study.id, base.id), (old_study.id, None)}
+
+
+def test_study_change_log_records_pipeline_config_changes(session):
+    base, _old_study, _newest_study, _analysis = _seed_release_data(session)
+    session.query(StudyChangeLog).delete()
+    session.commit()
+
+    config = PipelineConfig.query.filter_by(config_hash="demo").one()
+    config.version = "2.0.0"
+    session.commit()
+
+    logged = {(row.study_id, row.base_study_id) for row in StudyChangeLog.query.all()}
+    assert logged == {(None, base.id)}
+
+    session.query(StudyChangeLog).delete()
+    session.delete(config)
+    session.commit()
+    logged = {(row.study_id, row.base_study_id) for row in StudyChangeLog.query.all()}
+    assert logged == {(None, base.id)}
+
+
+def test_nightly_release_only_revisits_logged_studies(
+    app, session, tmp_path, monkeypatch
+):
+    app.config["FILE_DIR"] = tmp_path
+    base, _old_study, newest_study, analysis = _seed_release_data(session)
+
+    first = build_neurostore_studyset_release(settings=app.config, nightly=True)[
+        "written"
+    ][0]
+    assert first["build_mode"] == "full"
+    assert first["change_log_checkpoint"] > 0
+    assert StudyChangeLog.query.count() == 0
+
+    ranked = []
+    real_select = release_service.select_coordinate_studies
+
+    def wrapped_select(base_study_ids=None):
+        ranked.append(base_study_ids)
+        return real_select(base_study_ids)
+
+    monkeypatch.setattr(release_service, "select_coordinate_studies", wrapped_select)
+
+    # A new point leaves the study's timestamps alone.
+    session.add(Point(analysis=analysis, x=7, y=7, z=7, user=User.query.first()))
+    session.commit()
+    second = build_neurostore_studyset_release(settings=app.config, nightly=True)[
+        "written"
+    ][0]
+    assert second["build_mode"] == "incremental"
+    assert ranked == [{base.id}]
+    assert second["changed_base_study_ids"] == [base.id]
+    assert second["change_log_checkpoint"] > first["change_log_checkpoint"]
+    assert (
+        second["studies"][base.id]["study_checksum"]
+        != first["studies"][base.id]["study_checksum"]
+    )
+    assert second["note_count"] == first["note_count"]
+
+    ranked.clear()
+    third = build_neurostore_studyset_release(settings=app.config, nightly=True)[
+        "written"
+    ][0]
+    assert third["build_mode"] == "incremental"
+    assert ranked == []
+    assert third["changed_base_study_ids"] == []
+    assert third["change_log_checkpoint"] == second["change_log_checkpoint"]
+
+    verified = build_neurostore_studyset_release(
+        settings=app.config, nightly=True, full=True
+    )["written"][0]
+    assert verified["build_mode"] == "full"
+    assert verified["changed_base_study_ids"] == []
+    assert verified["studies"] == third["studies"]
+    assert [
+        study.id
+        for study in Studyset.query.filter_by(source_id=STUDYSET_SOURCE_ID)
+        .one()
+        .studies
+    ] == [newest_study.id]
+
+
+def test_merge_selection_replaces_changed_base_studies():
+    def manifest_entry(base_id, study_id):
+        return {
+            "base_study_id": base_id,
+            "study_id": study_id,
+            "created_at": "2024-01-01T00:00:00+00:00",
+            "updated_at": None,
+            "study_freshness": "2024-01-01T00:00:00+00:00",
+        }
+
+    previous = {
+        "b1": manifest_entry("b1", "s3"),
+        "b2": manifest_entry("b2", "s1"),
+        "b3": manifest_entry("b3", "s2"),
+    }
+    reselected = [release_service.selection_entry(manifest_entry("b2", "s0"))]
+
+    selected = release_service.merge_selection(previous, {"b2", "b3"}, reselected)
+
+    assert [entry["study_id"] for entry in selected] == ["s0", "s3"]
+    assert selected[0]["freshness"] == "2024-01-01T00:00:00+00:00"
+
+
+def test_note_keys_cover_detects_new_keys():
+    def features(value):
+        return {
+            "b1": {
+                "TaskExtractor": {"features": {"TaskExtractor.Modality": value}},
+            }
+        }
+
+    note_keys = {"TaskExtractor.Modality": {"type": "string", "order": 0}}
+    assert release_service.note_keys_cover(note_keys, features("fMRI"))
+    assert release_service.note_keys_cover(note_keys, features(3))
+    assert not release_service.note_keys_cover({}, features("fMRI"))
+    numeric = {"TaskExtractor.Modality": {"type": "number", "order": 0}}
+    assert not release_service.note_keys_cover(numeric, features("fMRI"))
+
+
 def test_release_build_serializes_changed_studies_in_batches(
     app, session, tmp_path, monkeypatch
 ):
@@ -364,6 +516,152 @@ def test_release_build_serializes_changed_studies_in_batches(
     assert calls == []
 
 
+def test_study_shards_fan_out_over_worker_pool(tmp_path, monkeypatch):
+    submitted = []
+
+    class InlinePool:
+        def __init__(self, max_workers, mp_context, initializer, initargs):
+            self.max_workers = max_workers
+            initializer(*initargs)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            return False
+
+        def map(self, function, *iterables):
+            submitted.extend(iterables[1])
+            return map(function, *iterables)
+
+    configured = []
+    monkeypatch.setattr(release_service, "ProcessPoolExecutor", InlinePool)
+    monkeypatch.setattr(release_service.db, "configure", configured.append)
+    monkeypatch.setattr(release_service, "STUDY_SHARD_BATCH_SIZE", 2)
+    monkeypatch.setattr(
+        release_service,
+        "serialize_study_shards",
+        lambda study_ids, batch_size: {
+            study_id: {"id": study_id} for study_id in study_ids
+        },
+    )
+
+    database_config = {"SQLALCHEMY_DATABASE_URI": "postgresql://example/db"}
+    checksums = release_service.write_study_shards(
+        tmp_path,
+        ["s1", "s2", "s3", "s4", "s5"],
+        workers=4,
+        database_config=database_config,
+    )
+
+    assert configured == [database_config]
+    assert submitted == [["s1", "s2"], ["s3", "s4"], ["s5"]]
+    assert sorted(checksums) == ["s1", "s2", "s3", "s4", "s5"]
+    assert json.loads((tmp_path / "s3.json").read_bytes()) == {"id": "s3"}
+    assert checksums["s3"] == release_service.checksum_payload({"id": "s3"})
+
+
+def test_studyset_document_is_spliced_from_shards(tmp_path):
+    from types import SimpleNamespace
+
+    selected = [
+        {"study_id": "study-a", "base_study_id": "base-a"},
+        {"study_id": "study-b", "base_study_id": "base-b"},
+    ]
+    studies = {
+        "study-a": {"id": "study-a", "analyses": []},
+        "study-b": {"id": "study-b", "name": "B", "analyses": [{"id": "an-b"}]},
+    }
+    for study_id, payload in studies.items():
+        release_service.atomic_write_json(
+            tmp_path / "_cache" / "studies" / f"{study_id}.json", payload
+        )
+    release_service.atomic_write_json(
+        tmp_path / "_cache" / "notes" / "base-b.json",
+        [{"id": "note-b", "analysis": "an-b", "note": {"k": 1}}],
+    )
+    studyset = SimpleNamespace(
+        id="ss", name="S", description=None, publication=None, doi=None, pmid=None
+    )
+    annotation = SimpleNamespace(
+        id="an", studyset_id="ss", name="A", description=None, metadata_={}
+    )
+
+    studyset_path = release_service.write_studyset_document(
+        tmp_path / "studyset.json", tmp_path, selected, studyset
+    )
+    annotation_path = release_service.write_annotation_document(
+        tmp_path / "annotation.json",
+        tmp_path,
+        selected,
+        annotation,
+        {"k": {"type": "number", "order": 0}},
+    )
+
+    assert json.loads(studyset_path.read_bytes()) == {
+        "id": "ss",
+        "name": "S",
+        "description": None,
+        "publication": None,
+        "doi": None,
+        "pmid": None,
+        "studies": [studies["study-a"], studies["study-b"]],
+    }
+    annotation_doc = json.loads(annotation_path.read_bytes())
+    assert annotation_doc["studyset"] == "ss"
+    assert annotation_doc["notes"] == [
+        {"id": "note-b", "analysis": "an-b", "note": {"k": 1}}
+    ]
+
+
+def test_parallel_gzip_blocks_decompress_as_one_stream():
+    payload = b"".join(b"row %d\n" % index for index in range(20000))
+    output = BytesIO()
+    writer = ParallelGzipWriter(output, threads=4, block_size=4096)
+    chunks = BytesIO(payload)
+    while chunk := chunks.read(1000):
+        writer.write(chunk)
+    writer.close()
+
+    compressed = output.getvalue()
+    assert compressed.count(b"\x1f\x8b\x08") > 1
+    assert gzip.decompress(compressed) == payload
+
+
+def test_release_archives_report_checksums(tmp_path):
+    folder = tmp_path / "neurostore-studyset-nightly"
+    folder.mkdir()
+    (folder / "studyset.json").write_text('{"id": "ss"}')
+
+    archives = write_archives(folder, {"gz": tmp_path / "release.tar.gz"}, threads=2)
+
+    archive_path = tmp_path / "release.tar.gz"
+    assert archives["gz"] == {
+        "name": "release.tar.gz",
+        "checksum": hashlib.sha256(archive_path.read_bytes()).hexdigest(),
+        "size": archive_path.stat().st_size,
+        "media_type": "application/gzip",
+    }
+    with tarfile.open(archive_path, mode="r:gz") as tar:
+        member = tar.extractfile("neurostore-studyset-nightly/studyset.json")
+        assert json.loads(member.read()) == {"id": "ss"}
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "neurostore-studyset-nightly",
+        "release.tar.gz",
+    ]
+
+
+def test_download_format_negotiation():
+    both = {"archives": {"gz": {}, "zst": {}}}
+
+    assert negotiate_archive_format(both) == "gz"
+    assert negotiate_archive_format(both, accept="application/zstd") == "zst"
+    assert negotiate_archive_format(both, accept="application/zstd;q=0, */*") == "gz"
+    assert negotiate_archive_format(both, requested="zst") == "zst"
+    assert negotiate_archive_format({}, accept="application/zstd") == "gz"
+    assert negotiate_archive_format({"archives": {"gz": {}}}, requested="zst") is None
+
+
 async def test_release_api_resolves_nightly_latest_and_monthly(
     app, auth_client, session, tmp_path
 ):
@@ -1,6 +1,7 @@
 import pytest
 
 from neurostore.models import Analysis, Point, Study, User
+from neurostore.models.point_count_listeners import point_count_stats
 from neurostore.schemas import PointSchema
 
 pytestmark = pytest.mark.anyio
@@ -180,6 +181,33 @@ async def test_analysis_point_count_updates_on_point_writes(auth_client, session
     assert analysis_a.point_count == 1
 
 
+def test_point_counts_recount_once_per_flush(session):
+    analyses = [Analysis(name=f"analysis-{index}") for index in range(3)]
+    for analysis in analyses:
+        analysis.points = [
+            Point(x=order, y=0, z=0, space="MNI", order=order) for order in range(50)
+        ]
+    study = Study(name="batched point count study", analyses=analyses)
+
+    before = point_count_stats()
+    session.add(study)
+    session.commit()
+    after = point_count_stats()
+
+    assert after["statements"] - before["statements"] == 1
+    assert after["analyses"] - before["analyses"] == 3
+    for analysis in analyses:
+        session.refresh(analysis)
+        assert analysis.point_count == 50
+
+    session.delete(analyses[0].points[0])
+    analyses[1].points[0].analysis = analyses[2]
+    session.commit()
+
+    assert point_count_stats()["statements"] - after["statements"] == 1
+    assert [analysis.point_count for analysis in analyses] == [49, 49, 51]
+
+
 async def test_post_point_without_order(auth_client, ingest_neurosynth, session):
     # Get an existing analysis from the database
     point_db = Point.query.first()
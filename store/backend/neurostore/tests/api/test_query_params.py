@@ -175,6 +175,56 @@ async def test_page_size(auth_client, ingest_neurosynth, session):
     assert len(set(results)) == num_studies
 
 
+@pytest.mark.parametrize("sort", [None, "name", "created_at"])
+async def test_cursor_pagination_matches_offset_pages(
+    auth_client, ingest_neurosynth, session, sort
+):
+    params = {"page_size": 2, "count": "none"}
+    if sort is not None:
+        params["sort"] = sort
+    full = await auth_client.get(
+        f"/api/base-studies/?{urlencode({**params, 'page_size': 1000})}"
+    )
+    expected_ids = [row["id"] for row in full.json()["results"]]
+
+    cursor = ""
+    walked_ids = []
+    while cursor is not None:
+        resp = await auth_client.get(
+            f"/api/base-studies/?{urlencode({**params, 'cursor': cursor})}"
+        )
+        assert resp.status_code == 200
+        metadata = resp.json()["metadata"]
+        assert metadata["total_count"] is None
+        walked_ids.extend(row["id"] for row in resp.json()["results"])
+        cursor = metadata["next_cursor"]
+
+    assert walked_ids == expected_ids
+
+
+async def test_cursor_rejects_foreign_or_invalid_tokens(
+    auth_client, ingest_neurosynth, session
+):
+    first = await auth_client.get("/api/base-studies/?page_size=1&cursor=")
+    cursor = first.json()["metadata"]["next_cursor"]
+
+    resorted = await auth_client.get(
+        f"/api/base-studies/?page_size=1&sort=name&cursor={cursor}"
+    )
+    invalid = await auth_client.get("/api/base-studies/?page_size=1&cursor=nope")
+
+    assert resorted.status_code == invalid.status_code == 400
+
+
+async def test_estimated_total_count(auth_client, ingest_neurosynth, session):
+    resp = await auth_client.get("/api/studies/?count=estimate")
+
+    assert resp.status_code == 200
+    metadata = resp.json()["metadata"]
+    assert isinstance(metadata["total_count"], int)
+    assert metadata["total_count_estimated"] is True
+
+
 async def test_common_queries(auth_client, ingest_neurosynth, session):
     study = BaseStudy.query.filter(BaseStudy.pmid.isnot(None)).first()
 
@@ -1,5 +1,6 @@
 import pytest
 
+import json
 import random
 import re
 import string
@@ -164,6 +165,35 @@ async def test_get_nested_studyset_includes_analysis_points(auth_client, session
     ]
 
 
+async def test_stream_nested_studyset_matches_nested_payload(
+    auth_client, ingest_neurosynth, session
+):
+    studyset_id = Studyset.query.first().id
+    nested = await auth_client.get(f"/api/studysets/{studyset_id}?nested=true")
+    streamed = await auth_client.get(
+        f"/api/studysets/{studyset_id}?nested=true&stream=true"
+    )
+    negotiated = await auth_client.get(
+        f"/api/studysets/{studyset_id}?nested=true",
+        headers={"Accept": "application/x-ndjson"},
+    )
+
+    assert streamed.status_code == negotiated.status_code == 200
+    assert streamed.headers["content-type"].startswith("application/x-ndjson")
+    assert streamed.data == negotiated.data
+
+    header, *studies = [json.loads(line) for line in streamed.data.splitlines()]
+    expected = nested.json()
+    assert studies == expected.pop("studies")
+    assert header == expected
+
+
+async def test_stream_nested_studyset_not_found(auth_client, session):
+    resp = await auth_client.get("/api/studysets/missing?nested=true&stream=true")
+
+    assert resp.status_code == 404
+
+
 async def test_get_summary_studyset(auth_client, ingest_neurosynth, session):
     studyset_id = Studyset.query.first().id
     summary = await auth_client.get(f"/api/studysets/{studyset_id}?summary=true")
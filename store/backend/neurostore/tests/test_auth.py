@@ -1,4 +1,10 @@
+import json
+import time
+
 import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
 
 from neurostore.tests.conftest import auth_test
 from neurostore.tests.request_utils import AsyncClient
@@ -79,3 +85,77 @@ async def test_studysets_bad_token_returns_cors_headers(app):
     assert response.headers.get("Access-Control-Allow-Origin") == origin
     assert response.headers.get("Access-Control-Allow-Credentials") == "true"
     assert response.headers.get("Vary") == "Origin"
+
+
+@pytest.fixture
+def local_jwks(tmp_path):
+    """Settings verifying RS256 tokens against a key set written to disk."""
+    from neurostore.resources import auth
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_jwk = jwk.construct(
+        private_key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        ),
+        "RS256",
+    ).to_dict()
+    public_jwk.update({"kid": "local-key", "use": "sig"})
+    jwks_path = tmp_path / "jwks.json"
+    jwks_path.write_text(json.dumps({"keys": [public_jwk]}))
+
+    settings = {
+        "AUTH0_BASE_URL": "https://auth.example",
+        "AUTH0_API_AUDIENCE": "https://neurostore.example/api/",
+        "AUTH0_JWKS_URL": jwks_path.as_uri(),
+    }
+
+    def sign(sub, kid="local-key"):
+        claims = {
+            "sub": sub,
+            "aud": settings["AUTH0_API_AUDIENCE"],
+            "iss": settings["AUTH0_BASE_URL"] + "/",
+            "exp": int(time.time()) + 3600,
+        }
+        return jwt.encode(claims, pem, algorithm="RS256", headers={"kid": kid})
+
+    auth.reset_auth_state()
+    yield settings, sign
+    auth.reset_auth_state()
+
+
+def test_decode_token_caches_keys_and_verified_tokens(local_jwks, monkeypatch):
+    from connexion.exceptions import OAuthProblem
+
+    from neurostore.resources import auth
+
+    settings, sign = local_jwks
+    jwks_cache = auth.get_jwks_cache(settings)
+
+    assert auth._decode_token(sign("user-a"), settings)["sub"] == "user-a"
+    assert auth._decode_token(sign("user-b"), settings)["sub"] == "user-b"
+    assert jwks_cache.fetch_count == 1
+
+    token = sign("user-c")
+    auth._decode_token(token, settings)
+
+    def fail_decode(*args, **kwargs):
+        raise AssertionError("cached tokens must not be verified again")
+
+    monkeypatch.setattr(auth.jwt, "decode", fail_decode)
+    assert auth._decode_token(token, settings)["sub"] == "user-c"
+
+    # Unknown key ids refetch the key set at most once per interval.
+    with pytest.raises(OAuthProblem):
+        auth._decode_token(sign("user-d", kid="rotated-key"), settings)
+    assert jwks_cache.fetch_count == 1
+
+    monkeypatch.setattr(auth, "JWKS_MIN_REFETCH_SECONDS", 0)
+    with pytest.raises(OAuthProblem):
+        auth._decode_token(sign("user-e", kid="rotated-key"), settings)
+    assert jwks_cache.fetch_count == 2
@@ -1,7 +1,8 @@
 import pytest
 
-from neurostore.cache_versioning import bump_cache_versions
-from neurostore.extensions import cache
+from neurostore import extensions
+from neurostore.cache_versioning import bump_cache_versions, get_cache_version
+from neurostore.extensions import Cache, LocalCache, cache
 from neurostore.models import Study
 from neurostore.resources import base as base_resource
 
@@ -112,3 +113,83 @@ def test_cache_key_creator_preserves_extra_args(monkeypatch):
         key == "/api/studies/_(('a', '1'), ('b', '1'), ('b', '2'), "
         "('b', '3'), ('z', 'last'))_user-1_v=0"
     )
+
+
+def test_local_cache_evicts_least_recently_used_entries():
+    local = LocalCache(max_entries=2, max_bytes=10)
+    local.set("a", b"1234")
+    local.set("b", b"5678")
+    assert local.get("a") == b"1234"
+
+    local.set("c", b"90")
+
+    assert local.get("b") is None
+    assert local.get("a") == b"1234"
+    assert local.get("c") == b"90"
+
+    local.set("d", b"123456")
+
+    assert local.get("a") is None
+    assert local.get("d") == b"123456"
+    local.set("too-big", b"x" * 11)
+    assert local.get("too-big") is None
+
+
+def test_local_cache_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(extensions.time, "monotonic", lambda: now[0])
+    local = LocalCache(max_entries=4)
+    local.set("a", b"value", timeout=10)
+
+    assert local.get("a") == b"value"
+    now[0] += 11
+    assert local.get("a") is None
+    assert len(local) == 0
+
+
+def test_cached_serves_local_tier_without_backend():
+    class DummyBackend:
+        def __init__(self):
+            self.store = {}
+            self.gets = 0
+
+        def get(self, key):
+            self.gets += 1
+            return self.store.get(key)
+
+        def set(self, key, value, timeout=None):
+            self.store[key] = value
+
+    two_tier = Cache()
+    two_tier.cache = DummyBackend()
+    two_tier.local = LocalCache(max_entries=8)
+    calls = []
+
+    @two_tier.cached(60, key_prefix="payload")
+    def endpoint():
+        calls.append(1)
+        return {"results": [1, 2, 3]}, 200
+
+    first = endpoint()
+    second = endpoint()
+
+    assert first == second == ({"results": [1, 2, 3]}, 200)
+    assert second is not first
+    assert len(calls) == 1
+    assert two_tier.cache.gets == 1
+
+
+def test_bump_cache_versions_forgets_remembered_versions(monkeypatch, app):
+    monkeypatch.setattr(cache, "versions", LocalCache(max_entries=8))
+    monkeypatch.setattr(cache, "version_ttl", 60.0)
+    monkeypatch.setattr(cache, "_ensure_version_listener", lambda: True)
+    cache.clear()
+
+    assert get_cache_version("studies", "study-1") == "0"
+    assert cache.versions.get("cache-version:studies:id:study-1") == "0"
+
+    bump_cache_versions({"studies": ["study-1"]})
+
+    assert cache.versions.get("cache-version:studies:id:study-1") is None
+    assert get_cache_version("studies", "study-1") == "1"
+    cache.clear()
@@ -1,5 +1,11 @@
-from neurostore.database import NeurostoreQuery
+import sqlalchemy as sa
+
+from neurostore.database import Explain, NeurostoreQuery
 from neurostore.models import BaseStudy
+from neurostore.resources.data_views.base_studies_search import (
+    BaseStudySearchService,
+    PipelineFilterGroup,
+)
 
 
 def test_model_query_provides_flask_sqlalchemy_compatible_pagination(db):
@@ -10,3 +16,67 @@ def test_model_query_provides_flask_sqlalchemy_compatible_pagination(db):
     assert page.pages >= 0
     assert page.has_prev is False
     assert page.has_next is (page.total > page.per_page)
+
+
+def test_explain_shares_the_cache_key_of_its_statement():
+    first = Explain(sa.select(BaseStudy.id).where(BaseStudy.name == "a"))
+    second = Explain(sa.select(BaseStudy.id).where(BaseStudy.name == "b"))
+    other_shape = Explain(sa.select(BaseStudy.id).where(BaseStudy.pmid == "a"))
+
+    assert first._generate_cache_key() == second._generate_cache_key()
+    assert first._generate_cache_key() != other_shape._generate_cache_key()
+
+
+def test_pipeline_filters_compile_to_one_shape_for_any_values():
+    service = BaseStudySearchService(apply_map_type_filter=lambda query, *_: query)
+
+    def cache_key(filters):
+        subqueries = service._build_pipeline_subqueries(filters)
+        statement = sa.select(*(sq.c.base_study_id for sq in subqueries))
+        return statement._generate_cache_key()
+
+    first = cache_key(
+        {
+            "TaskExtractor": PipelineFilterGroup(
+                result_filters=[
+                    ("Modality", "=", "fMRI"),
+                    ("StudyObjective", "=", "x"),
+                ],
+                config_filters=[("model", "=", "gpt-4")],
+            )
+        }
+    )
+    second = cache_key(
+        {
+            "TaskExtractor": PipelineFilterGroup(
+                result_filters=[("Modality", "=", "EEG"), ("StudyObjective", "=", "y")],
+                config_filters=[("model", "=", "llama")],
+            )
+        }
+    )
+    other_pipeline = cache_key(
+        {
+            "ParticipantDemographics": PipelineFilterGroup(
+                result_filters=[("age", ">", "30"), ("StudyObjective", "=", "y")],
+                config_filters=[("model", "=", "llama")],
+            )
+        }
+    )
+    other_values = cache_key(
+        {
+            "TaskExtractor": PipelineFilterGroup(
+                result_filters=[("sex", "=", "f"), ("StudyObjective", "=", "z")],
+                config_filters=[("seed", "=", "1")],
+            )
+        }
+    )
+
+    assert first is not None
+    assert first == second
+    assert other_pipeline == other_values
+    assert [bind.value for bind in second.bindparams] == [
+        "TaskExtractor",
+        {"Modality": ["EEG"]},
+        '$.StudyObjective ? (@ == "y")',
+        '$.model ? (@ == "llama")',
+    ]
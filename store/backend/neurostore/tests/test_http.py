@@ -78,3 +78,87 @@ async def test_app_serves_a_cached_resource_through_the_native_request_path(app,
     assert first.json()["metadata"]["total_count"] == 0
     assert second.status_code == 200
     assert second.json() == first.json()
+
+
+def test_fingerprint_groups_statements_by_shape():
+    from neurostore.query_stats import fingerprint
+
+    assert fingerprint(
+        "SELECT a.id FROM analyses AS a\n  WHERE a.id IN (%(id_1_1)s, %(id_1_2)s) "
+        "AND a.name = 'x' LIMIT 20"
+    ) == fingerprint(
+        "SELECT a.id FROM analyses AS a WHERE a.id IN (%(id_1_1)s) "
+        "AND a.name = 'y' LIMIT 5"
+    )
+    assert fingerprint("SELECT x::text FROM t") == "SELECT x::text FROM t"
+
+
+def test_repeated_statements_are_flagged_in_server_timing():
+    from neurostore.query_stats import RequestQueryStats
+
+    stats = RequestQueryStats()
+    for index in range(10):
+        stats.record(f"SELECT * FROM points WHERE analysis_id = '{index}'", 0.001, 3)
+    stats.record("SELECT 1", 0.001, 1)
+
+    assert stats.repeated(10) == [("SELECT * FROM points WHERE analysis_id = ?", 10)]
+    timing = stats.server_timing(10)
+    assert 'desc="11 statements"' in timing
+    assert 'db-rows;desc="31"' in timing
+    assert 'db-repeated;desc="10x ' in timing
+
+
+def test_failed_statement_does_not_skew_later_timings():
+    import sqlalchemy as sa
+
+    from neurostore.query_stats import finish_request, start_request
+
+    engine = sa.create_engine("sqlite://")
+    stats, token = start_request()
+    try:
+        with engine.connect() as connection:
+            with pytest.raises(sa.exc.OperationalError):
+                connection.execute(sa.text("SELECT * FROM missing_table"))
+            connection.execute(sa.text("SELECT 1"))
+    finally:
+        finish_request(token)
+        engine.dispose()
+
+    assert stats.statements == 1
+    assert stats.fingerprints == {"SELECT ?": 1}
+
+
+async def test_metrics_are_only_served_when_enabled():
+    from neurostore.settings import load_settings
+
+    settings = {**load_settings(), "SQL_METRICS_ENABLED": False}
+    async with _client(create_asgi_app(settings)) as client:
+        response = await client.get("/metrics")
+
+    assert "neurostore_sql_statements_total" not in response.text
+
+
+async def test_app_reports_request_sql_statements(app, db):
+    from neurostore.query_stats import reset_query_stats_state
+
+    reset_query_stats_state()
+    async with _client(app.asgi_app) as client:
+        response = await client.get("/api/studies/?page=1&page_size=10")
+        metrics = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert 'statements"' in response.headers["server-timing"]
+    assert not response.headers["server-timing"].startswith('db;dur=0.0;desc="0 ')
+    assert metrics.status_code == 200
+    assert "# TYPE neurostore_sql_statements_total counter" in metrics.text
+    assert "StudiesView" in metrics.text
+
+
+async def test_statement_budget_is_enforced_in_tests(app, db, monkeypatch):
+    monkeypatch.setitem(app.config, "SQL_STATEMENT_BUDGET", 0)
+    async with _client(app.asgi_app) as client:
+        response = await client.get("/api/studies/?page=1&page_size=10")
+
+    assert response.status_code == 500
+    assert "SQL statements; its budget is 0" in response.text
+    assert "server-timing" not in response.headers
@@ -1,8 +1,30 @@
 """Test Ingestion Functions"""
 
+from pathlib import Path
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+
 from neurostore import ingest
+from neurostore.database import db
+from neurostore.ingest import synthetic
+from neurostore.ingest.bulk import BulkLoader
 from neurostore.ingest.extracted_features import ingest_feature
-from neurostore.models import Analysis, Image, Study
+from neurostore.models import (
+    Analysis,
+    Annotation,
+    AnnotationAnalysis,
+    BaseStudy,
+    BaseStudyGridCell,
+    Image,
+    PipelineEmbedding,
+    PipelineLatestResult,
+    Point,
+    Study,
+    Studyset,
+)
 
 
 def test_ingest_ace(ingest_neurosynth, ingest_ace, session):
@@ -111,6 +133,144 @@ def test_ingest_neuroquery(ingest_neuroquery, session):
     pass
 
 
+def test_ingest_neurosynth_bulk(session):
+    ingest.ingest_neurosynth(5, bulk=True)
+
+    data_dir = Path(ingest.__file__).parent.parent / "data"
+    metadata = pd.read_table(
+        data_dir / "data-neurosynth_version-7_metadata.tsv.gz", dtype={"id": str}
+    ).iloc[:5]
+    coordinates = pd.read_table(
+        data_dir / "data-neurosynth_version-7_coordinates.tsv.gz", dtype={"id": str}
+    )
+    coordinates = coordinates[coordinates["id"].isin(metadata["id"])]
+
+    studies = Study.query.filter_by(source="neurosynth").all()
+    assert sorted(study.source_id for study in studies) == sorted(metadata["id"])
+    studyset = Studyset.query.filter_by(name="neurosynth").one()
+    assert {study.id for study in studyset.studies} == {study.id for study in studies}
+
+    analyses = [analysis for study in studies for analysis in study.analyses]
+    assert len(analyses) == len(coordinates.groupby(["id", "table_id"]))
+    assert Point.query.count() == len(coordinates)
+    for analysis in analyses:
+        assert analysis.point_count == len(analysis.points) > 0
+        assert all(len(point.entities) == 1 for point in analysis.points)
+
+    annotation = Annotation.query.filter_by(name="neurosynth").one()
+    assert annotation.note_keys
+    assert AnnotationAnalysis.query.filter_by(
+        annotation_id=annotation.id
+    ).count() == len(analyses)
+
+    base_study_ids = {study.base_study_id for study in studies}
+    assert all(study.base_study.has_coordinates for study in studies)
+    grid_cell_base_study_ids = db.session.scalars(
+        sa.select(BaseStudyGridCell.base_study_id).distinct()
+    )
+    assert set(grid_cell_base_study_ids) == base_study_ids
+
+
+def test_ingest_neurosynth_bulk_includes_existing_studies(session):
+    ingest.ingest_neurosynth(3, bulk=True)
+    first_studyset_ids = set(db.session.scalars(sa.select(Studyset.id)))
+    existing = {study.source_id: study.id for study in Study.query.all()}
+
+    ingest.ingest_neurosynth(5, bulk=True)
+
+    studies = Study.query.filter_by(source="neurosynth").all()
+    assert len(studies) == 5
+    assert {study.source_id: study.id for study in studies}.items() >= existing.items()
+    studyset = Studyset.query.filter(
+        Studyset.name == "neurosynth", Studyset.id.not_in(first_studyset_ids)
+    ).one()
+    assert {study.id for study in studyset.studies} == {study.id for study in studies}
+
+    annotation = Annotation.query.filter_by(studyset_id=studyset.id).one()
+    annotated = AnnotationAnalysis.query.filter_by(annotation_id=annotation.id).all()
+    analyses = [analysis for study in studies for analysis in study.analyses]
+    assert {row.analysis_id for row in annotated} == {a.id for a in analyses}
+    assert all(row.note for row in annotated)
+
+
+def test_ingest_neuroquery_bulk_includes_existing_studies(session):
+    ingest.ingest_neuroquery(3, bulk=True)
+    first_studyset_ids = set(db.session.scalars(sa.select(Studyset.id)))
+    existing_ids = set(db.session.scalars(sa.select(Study.id)))
+
+    ingest.ingest_neuroquery(5, bulk=True)
+
+    studies = Study.query.filter_by(source="neuroquery").all()
+    assert existing_ids < {study.id for study in studies}
+    studyset = Studyset.query.filter(
+        Studyset.name == "neuroquery", Studyset.id.not_in(first_studyset_ids)
+    ).one()
+    assert {study.id for study in studyset.studies} == {study.id for study in studies}
+    assert all(study.analyses for study in studies)
+
+
+def _synthetic_rows(seed):
+    generator = synthetic._Generator(seed, embedding_dimensions=4)
+    config_ids = {
+        (name, version): f"{name}-{version}"
+        for name, version, _, _ in synthetic.PIPELINE_CONFIGS
+    }
+    loader = BulkLoader()
+    for number in range(1, 6):
+        synthetic._queue_base_study(
+            loader,
+            generator,
+            number,
+            config_ids,
+            SimpleNamespace(id="studyset"),
+            SimpleNamespace(id="annotation"),
+        )
+    return {table.name: rows for table, rows in loader._rows.items()}
+
+
+def test_synthetic_corpus_rows_are_seeded():
+    rows = _synthetic_rows(seed=3)
+    assert rows == _synthetic_rows(seed=3)
+    assert rows != _synthetic_rows(seed=4)
+    assert len(rows["base_studies"]) == 5
+    assert {analysis["point_count"] for analysis in rows["analyses"]} >= {1}
+    assert sum(analysis["point_count"] for analysis in rows["analyses"]) == len(
+        rows["points"]
+    )
+
+
+def test_generate_synthetic_corpus(session, monkeypatch):
+    monkeypatch.setattr(synthetic, "BASE_STUDIES_PER_SCALE", 20)
+    counts = synthetic.generate_synthetic_corpus(
+        scale=2, seed=1, embedding_dimensions=8, batch_size=15
+    )
+
+    assert counts["base_studies"] == BaseStudy.query.count() == 40
+    assert counts["points"] == Point.query.count()
+    assert counts["pipeline_embeddings"] == PipelineEmbedding.query.count()
+    for analysis in Analysis.query.all():
+        assert analysis.point_count == len(analysis.points)
+
+    studyset = Studyset.query.filter_by(name=synthetic.STUDYSET_NAME).one()
+    assert len(studyset.studies) == 40
+    annotation = Annotation.query.filter_by(studyset_id=studyset.id).one()
+    assert AnnotationAnalysis.query.filter_by(
+        annotation_id=annotation.id
+    ).count() == sum(len(study.analyses) for study in studyset.studies)
+
+    assert all(base_study.has_coordinates for base_study in BaseStudy.query)
+    assert (
+        db.session.scalar(
+            sa.select(sa.func.count(sa.distinct(BaseStudyGridCell.base_study_id)))
+        )
+        == 40
+    )
+    assert PipelineLatestResult.query.count() > 0
+
+    with pytest.raises(ValueError):
+        synthetic.generate_synthetic_corpus(scale=1, seed=1)
+
+
 def test_ingest_features(create_pipeline_results, session):
     # Test ingesting each pipeline's features
     for pipeline_dir in create_pipeline_results.iterdir():
@@ -55,3 +55,26 @@ def test_PipelineConfig():
 
 def test_PipelineStudyResult():
     PipelineStudyResult()
+
+
+def test_cells_within_radius_cover_sphere():
+    import itertools
+    import math
+
+    from neurostore.models.spatial_index import cell_index, cells_within_radius
+
+    center = (10.0, -21.5, 33.0)
+    radius = 9.0
+    cells = set(cells_within_radius(*center, radius))
+
+    # Every point inside the sphere lies in one of the returned cells...
+    for dx, dy, dz in itertools.product(range(-9, 10), repeat=3):
+        if dx * dx + dy * dy + dz * dz > radius * radius:
+            continue
+        point = (center[0] + dx, center[1] + dy, center[2] + dz)
+        assert tuple(cell_index(value) for value in point) in cells
+
+    # ...and the corners of the bounding box are pruned.
+    assert len(cells) < (math.ceil(2 * radius / 4) + 1) ** 3
+    assert cells_within_radius(*center, -1) == []
+    assert cells_within_radius(*center, 500.0) is None
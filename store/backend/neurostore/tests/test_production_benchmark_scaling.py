@@ -6,6 +6,7 @@ import pytest
 from neurostore.database import db
 from neurostore.models import Study, Studyset
 from neurostore.production_benchmark import (
+    LOAD_MIX,
     _canonical_case_name,
     _case_workload_info,
     _extract_profile_functions,
@@ -13,6 +14,8 @@ from neurostore.production_benchmark import (
     _parse_scales,
     _project_line,
     _run_async,
+    _run_load_level,
+    _saturation_concurrency,
     _ThreadAwareProfiler,
 )
 
@@ -32,6 +35,53 @@ def test_parse_scales_defaults_and_parses_csv():
     assert _parse_scales("10, 25, 100", label="scales") == [10, 25, 100]
 
 
+def test_saturation_concurrency_is_the_last_level_that_paid_off():
+    levels = [
+        {"concurrency": 1, "throughput_rps": 10.0},
+        {"concurrency": 4, "throughput_rps": 35.0},
+        {"concurrency": 16, "throughput_rps": 37.0},
+        {"concurrency": 64, "throughput_rps": 30.0},
+    ]
+
+    assert _saturation_concurrency(levels) == 4
+    assert _saturation_concurrency(levels[:2]) is None
+
+
+async def test_load_level_runs_virtual_users_concurrently():
+    import anyio
+
+    running = []
+    peak = []
+
+    async def _case(_client):
+        running.append(1)
+        peak.append(len(running))
+        await anyio.sleep(0.01)
+        running.pop()
+
+    async def _failing_case(_client):
+        raise RuntimeError("GET /api/base-studies/ failed with 500")
+
+    case_functions = {name: _case for name, _weight in LOAD_MIX}
+    case_functions["get_annotation_large"] = _failing_case
+
+    level = await _run_load_level(
+        None, case_functions, concurrency=8, duration=0.2, seed=1
+    )
+
+    assert max(peak) == 8
+    assert level["concurrency"] == 8
+    assert level["requests"] == sum(
+        case["requests"] for case in level["cases"].values()
+    )
+    assert level["errors"] == level["cases"]["get_annotation_large"]["errors"] > 0
+    assert level["throughput_rps"] > 0
+    assert level["median_seconds"] <= level["p95_seconds"] <= level["p99_seconds"]
+    assert level["sample_errors"] == [
+        "RuntimeError: GET /api/base-studies/ failed with 500"
+    ]
+
+
 def test_canonical_case_name_strips_scale_suffix_from_scaled_cases():
     case = {
         "name": "get_nested_studyset_seed_64",
@@ -1,13 +1,33 @@
-import pytest
+import datetime as dt
+import itertools
 
-from neurostore.models import Study, Studyset
+import orjson
+import pytest
+from sqlalchemy.engine import Row
+from sqlalchemy.engine.result import SimpleResultMetaData
+
+from neurostore.models import (
+    Analysis,
+    AnalysisConditions,
+    BaseStudy,
+    Condition,
+    Image,
+    Point,
+    PointValue,
+    Study,
+    Studyset,
+    Table,
+    User,
+)
 from neurostore.schemas import (
     AnalysisSchema,
+    BaseStudySchema,
     PointSchema,
     StudySchema,
     StudysetSchema,
     StudysetSnapshot,
 )
+from neurostore.schemas.compiler import dump as compiled_dump
 from neurostore.schemas.pipeline import (
     PipelineConfigSchema,
     PipelineSchema,
@@ -284,3 +304,94 @@ def test_nested_object_cloning_with_conditions(ingest_neurosynth):
         # But conditions should have IDs preserved
         for condition_data in analysis_data.get("conditions", []):
             assert "id" in condition_data
+
+
+CONTEXTS = [
+    dict(zip(("nested", "flat", "info", "clone"), flags))
+    for flags in itertools.product((False, True), repeat=4)
+]
+
+
+def _transient_base_study():
+    created_at = dt.datetime(2024, 1, 2, 3, 4, 5, 678, tzinfo=dt.timezone.utc)
+    user = User(id="user-1", name="Ann", external_id="ext-1")
+    study = Study(
+        id="study-1",
+        name="Study",
+        user=user,
+        user_id="ext-1",
+        created_at=created_at,
+        year=2020,
+        metadata_={"sample_size": 12.5},
+        source="neurostore",
+    )
+    analysis = Analysis(
+        id="analysis-1", name="A", study=study, order=2, user=user, user_id="ext-1"
+    )
+    Analysis(id="analysis-0", name="B", study=study, order=None)
+    point = Point(id="point-1", analysis=analysis, x=1.0, y=2.0, z=3.0, space="MNI")
+    point.values = [PointValue(id="value-1", kind="z", value=2.3)]
+    Image(id="image-1", analysis=analysis, value_type="Z", created_at=created_at)
+    analysis.analysis_conditions = [
+        AnalysisConditions(condition=Condition(id="condition-1", name="c"), weight=1.0)
+    ]
+    study.tables = [Table(id="table-1", t_id="T1")]
+    return BaseStudy(
+        id="base-1",
+        name="Base",
+        versions=[study],
+        user=user,
+        user_id="ext-1",
+        created_at=created_at,
+    )
+
+
+@pytest.mark.parametrize("context", CONTEXTS)
+def test_compiled_dump_matches_marshmallow(context):
+    base_study = _transient_base_study()
+    study = base_study.versions[0]
+    cases = [
+        (BaseStudySchema, base_study),
+        (StudySchema, study),
+        (AnalysisSchema, study.analyses[0]),
+        (PointSchema, study.analyses[0].points[0]),
+    ]
+
+    for schema, obj in cases:
+        expected = orjson.dumps(schema(context=dict(context)).dump(obj))
+        assert orjson.dumps(compiled_dump(schema, obj, context=dict(context))) == (
+            expected
+        )
+
+
+def test_compiled_dump_reads_rows():
+    metadata = SimpleResultMetaData(["id", "name", "user_id", "year"])
+    rows = [
+        Row(
+            metadata,
+            metadata._effective_processors,
+            metadata._key_to_index,
+            (f"base-{year}", "Base", None, year),
+        )
+        for year in (2019, 2020)
+    ]
+    context = {"flat": True}
+
+    assert compiled_dump(BaseStudySchema, rows, context=context, many=True) == (
+        BaseStudySchema(context=context, many=True).dump(rows)
+    )
+
+
+def test_compiled_dump_matches_marshmallow_for_ingested_studies(ingest_neurosynth):
+    studies = Study.query.limit(10).all()
+
+    for context in CONTEXTS:
+        expected = orjson.dumps(
+            StudySchema(context=dict(context), many=True).dump(studies)
+        )
+        assert (
+            orjson.dumps(
+                compiled_dump(StudySchema, studies, context=dict(context), many=True)
+            )
+            == expected
+        )
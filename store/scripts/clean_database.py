@@ -3,6 +3,7 @@ from Bio.Entrez.Parser import ValidationError
 from sqlalchemy import and_, or_, func
 from neurostore.models.data import BaseStudy, Study
 from neurostore.database import db
+from neurostore.services.provider_response_cache import ProviderResponseCache
 from sqlalchemy.orm import joinedload
 import re
 import time
@@ -72,7 +73,87 @@ def clean_string(s):
     return re.sub(r"[^\w\s]", "", s).lower().strip()
 
 
-def find_study(pmid=None, doi=None, query=None):
+def fetch_pubmed_study(pmid):
+    """Fetch PubMed metadata for ``pmid``, following corrections; ``None`` if absent"""
+    result = {}
+    # Check for corrections first
+    handle = Entrez.elink(dbfrom="pubmed", db="pubmed", id=pmid, cmd="neighbor_history")
+    record = Entrez.read(handle)
+    handle.close()
+
+    # Look for PubMed corrections
+    if record[0].get("LinkSetDb"):
+        for linkset in record[0]["LinkSetDb"]:
+            if linkset.get("LinkName") == "pubmed_pubmed_cites":
+                # Found a correction, use the new PMID
+                pmid = linkset["Link"][0]["Id"]
+                print(f"Found correction, using PMID: {pmid}")
+
+    # Fetch article details
+    handle = Entrez.efetch(db="pubmed", id=pmid, rettype="medline", retmode="xml")
+    articles = Entrez.read(handle)["PubmedArticle"]
+    handle.close()
+
+    if articles:
+        article = articles[0]
+        article_data = article["MedlineCitation"]["Article"]
+
+        # Extract basic metadata
+        result["title"] = article_data.get("ArticleTitle", "")
+        result["journal"] = article_data.get("Journal", {}).get("Title", "")
+        result["year"] = int(
+            article_data.get("Journal", {})
+            .get("JournalIssue", {})
+            .get("PubDate", {})
+            .get("Year", 0)
+        )
+
+        # Get abstract
+        if "Abstract" in article_data:
+            result["description"] = article_data["Abstract"].get("AbstractText", [""])[
+                0
+            ]
+
+        # Get authors
+        if "AuthorList" in article_data:
+            authors = []
+            for author in article_data["AuthorList"]:
+                if "LastName" in author and "ForeName" in author:
+                    authors.append(f"{author['LastName']}, {author['ForeName']}")
+            result["authors"] = ";".join(authors)
+
+        # Get identifiers
+        result["pmid"] = pmid
+        for id_obj in article["PubmedData"].get("ArticleIdList", []):
+            if id_obj.attributes.get("IdType") == "doi":
+                result["doi"] = str(id_obj)
+            elif id_obj.attributes.get("IdType") == "pmc":
+                result["pmcid"] = str(id_obj)
+
+    return result if result else None
+
+
+def fetch_json(url):
+    """GET ``url`` with backoff and return its JSON; raise if every attempt failed"""
+    response = exponential_backoff_request(url)
+    if not response:
+        raise RuntimeError(f"Request failed: {url}")
+    return response.json()
+
+
+def provider_caches(connection):
+    """One provider response cache per lookup, all on ``connection``"""
+    return {
+        provider: ProviderResponseCache(provider, connection=connection)
+        for provider in (
+            "pubmed_study",
+            "semantic_scholar_paper",
+            "semantic_scholar_search",
+        )
+    }
+
+
+def find_study(pmid=None, doi=None, query=None, *, caches):
     """
     Search for a study using available identifiers or query string.
     Returns standardized metadata dict with found information.
@@ -83,65 +164,9 @@ def find_study(pmid=None, doi=None, query=None):
     if pmid or query:
         try:
             if pmid:
-                # Check for corrections first
-                handle = Entrez.elink(
-                    dbfrom="pubmed", db="pubmed", id=pmid, cmd="neighbor_history"
+                result = dict(
+                    caches["pubmed_study"].lookup(str(pmid), fetch_pubmed_study) or {}
                 )
-                record = Entrez.read(handle)
-                handle.close()
-
-                # Look for PubMed corrections
-                if record[0].get("LinkSetDb"):
-                    for linkset in record[0]["LinkSetDb"]:
-                        if linkset.get("LinkName") == "pubmed_pubmed_cites":
-                            # Found a correction, use the new PMID
-                            pmid = linkset["Link"][0]["Id"]
-                            print(f"Found correction, using PMID: {pmid}")
-
-                # Fetch article details
-                handle = Entrez.efetch(
-                    db="pubmed", id=pmid, rettype="medline", retmode="xml"
-                )
-                articles = Entrez.read(handle)["PubmedArticle"]
-                handle.close()
-
-                if articles:
-                    article = articles[0]
-                    article_data = article["MedlineCitation"]["Article"]
-
-                    # Extract basic metadata
-                    result["title"] = article_data.get("ArticleTitle", "")
-                    result["journal"] = article_data.get("Journal", {}).get("Title", "")
-                    result["year"] = int(
-                        article_data.get("Journal", {})
-                        .get("JournalIssue", {})
-                        .get("PubDate", {})
-                        .get("Year", 0)
-                    )
-
-                    # Get abstract
-                    if "Abstract" in article_data:
-                        result["description"] = article_data["Abstract"].get(
-                            "AbstractText", [""]
-                        )[0]
-
-                    # Get authors
-                    if "AuthorList" in article_data:
-                        authors = []
-                        for author in article_data["AuthorList"]:
-                            if "LastName" in author and "ForeName" in author:
-                                authors.append(
-                                    f"{author['LastName']}, {author['ForeName']}"
-                                )
-                        result["authors"] = ";".join(authors)
-
-                    # Get identifiers
-                    result["pmid"] = pmid
-                    for id_obj in article["PubmedData"].get("ArticleIdList", []):
-                        if id_obj.attributes.get("IdType") == "doi":
-                            result["doi"] = str(id_obj)
-                        elif id_obj.attributes.get("IdType") == "pmc":
-                            result["pmcid"] = str(id_obj)
 
             elif query:
                 # Search PubMed by query
@@ -151,7 +176,7 @@ def find_study(pmid=None, doi=None, query=None):
 
                 if record["IdList"]:
                     # Recursively call with found PMID
-                    return find_study(pmid=record["IdList"][0])
+                    return find_study(pmid=record["IdList"][0], caches=caches)
 
         except Exception as e:
             print(f"Error searching PubMed: {str(e)}")
@@ -164,12 +189,11 @@ def find_study(pmid=None, doi=None, query=None):
             else:
                 url = f"https://api.semanticscholar.org/graph/v1/paper/search?query={quote(query)}&fields=title,abstract,venue,year,authors,externalIds"
 
-            response = exponential_backoff_request(url)
-            if not response:
+            provider = "semantic_scholar_paper" if doi else "semantic_scholar_search"
+            data = caches[provider].lookup(doi or query, lambda _key: fetch_json(url))
+            if data is None:
                 return None
 
-            data = response.json()
-
             # Handle search vs direct lookup
             papers = [data] if doi else data.get("data", [])
 
@@ -610,7 +634,7 @@ def check_duplicates(bs, doi=None, pmid=None, pmcid=None):
     return best_target, others
 
 
-def clean_base_studies_without_identifiers(dry_run=True):
+def clean_base_studies_without_identifiers(dry_run=True, *, caches):
     """
     Find and update studies missing identifiers
 
@@ -652,7 +676,7 @@ def clean_base_studies_without_identifiers(dry_run=True):
         print(f"\nProcessing: {bs.name}")
 
         # Search for study
-        metadata = find_study(query=bs.name)
+        metadata = find_study(query=bs.name, caches=caches)
         if not metadata:
             print("No matching study found")
             skipped += 1
@@ -753,7 +777,7 @@ def clean_base_studies_without_identifiers(dry_run=True):
         return changes
 
 
-def clean_studies_with_bad_metadata(dry_run=True):
+def clean_studies_with_bad_metadata(dry_run=True, *, caches):
     """
     Clean up studies with identifiers but missing other metadata.
     Carefully tracks which studies and versions actually need updates.
@@ -816,9 +840,9 @@ def clean_studies_with_bad_metadata(dry_run=True):
         # Try to find complete metadata
         metadata = None
         if bs.pmid:
-            metadata = find_study(pmid=bs.pmid)
+            metadata = find_study(pmid=bs.pmid, caches=caches)
         if not metadata and bs.doi:
-            metadata = find_study(doi=bs.doi)
+            metadata = find_study(doi=bs.doi, caches=caches)
 
         if not metadata:
             print("Could not find metadata")
@@ -930,17 +954,23 @@ def main():
         # Record all changes
         changes = {"to_delete": [], "to_commit": []}
 
-        # Step 1: Find and add missing identifiers
-        result = clean_base_studies_without_identifiers(dry_run=dry_run)
-        if result:
-            changes["to_delete"].extend(result["to_delete"])
-            changes["to_commit"].extend(result["to_commit"])
-
-        # Step 2: Clean up metadata for studies with identifiers
-        result = clean_studies_with_bad_metadata(dry_run=dry_run)
-        if result:
-            changes["to_delete"].extend(result["to_delete"])
-            changes["to_commit"].extend(result["to_commit"])
+        # Provider lookups are cached on one connection for the whole run
+        with db.engine.connect() as cache_connection:
+            caches = provider_caches(cache_connection)
+
+            # Step 1: Find and add missing identifiers
+            result = clean_base_studies_without_identifiers(
+                dry_run=dry_run, caches=caches
+            )
+            if result:
+                changes["to_delete"].extend(result["to_delete"])
+                changes["to_commit"].extend(result["to_commit"])
+
+            # Step 2: Clean up metadata for studies with identifiers
+            result = clean_studies_with_bad_metadata(dry_run=dry_run, caches=caches)
+            if result:
+                changes["to_delete"].extend(result["to_delete"])
+                changes["to_commit"].extend(result["to_commit"])
 
         # Print summary of changes
         print("\nChanges to make:")
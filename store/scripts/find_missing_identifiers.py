@@ -2,6 +2,7 @@ from Bio import Entrez
 from sqlalchemy import and_, or_
 from neurostore.models.data import BaseStudy, Study
 from neurostore.database import db
+from neurostore.services.provider_response_cache import ProviderResponseCache
 import re
 import time
 import requests
@@ -78,76 +79,95 @@ def titles_match(title1, title2, threshold=0.9):
     return (overlap / total) >= threshold
 
 
-def search_semantic_scholar(title):
+def provider_caches(connection):
+    """One provider response cache per lookup, all on ``connection``"""
+    return {
+        provider: ProviderResponseCache(provider, connection=connection)
+        for provider in ("semantic_scholar_title_search", "pubmed_article_details")
+    }
+
+
+def search_semantic_scholar(title, *, caches):
     """Search Semantic Scholar API for a paper using title."""
     try:
-        url = f"https://api.semanticscholar.org/graph/v1/paper/search?query={quote(title)}&fields=abstract,externalIds"
-        response = exponential_backoff_request(url)
+        return caches["semantic_scholar_title_search"].lookup(
+            clean_string(title),
+            lambda _key: _search_semantic_scholar(title),
+        )
 
-        if not response:
-            return None
+    except Exception as e:
+        print(f"Error searching Semantic Scholar: {str(e)}")
+        return None
 
-        data = response.json()
-        if not data.get("data"):
-            return None
 
-        # Check each result for title match
-        for paper in data["data"]:
-            if titles_match(title, paper.get("title", "")):
-                result = {}
-                if "externalIds" in paper:
-                    ids = paper["externalIds"]
-                    if "DOI" in ids:
-                        result["doi"] = ids["DOI"]
-                    if "PubMed" in ids:
-                        result["pmid"] = ids["PubMed"]
-                    if "PubMedCentral" in ids:
-                        result["pmcid"] = ids["PubMedCentral"]
-                if paper.get("abstract"):
-                    result["abstract"] = paper["abstract"]
-                return result if result else None
+def _search_semantic_scholar(title):
+    url = f"https://api.semanticscholar.org/graph/v1/paper/search?query={quote(title)}&fields=abstract,externalIds"
+    response = exponential_backoff_request(url)
 
-        return None
+    if not response:
+        raise RuntimeError(f"Request failed: {url}")
 
-    except Exception as e:
-        print(f"Error searching Semantic Scholar: {str(e)}")
+    data = response.json()
+    if not data.get("data"):
         return None
 
+    # Check each result for title match
+    for paper in data["data"]:
+        if titles_match(title, paper.get("title", "")):
+            result = {}
+            if "externalIds" in paper:
+                ids = paper["externalIds"]
+                if "DOI" in ids:
+                    result["doi"] = ids["DOI"]
+                if "PubMed" in ids:
+                    result["pmid"] = ids["PubMed"]
+                if "PubMedCentral" in ids:
+                    result["pmcid"] = ids["PubMedCentral"]
+            if paper.get("abstract"):
+                result["abstract"] = paper["abstract"]
+            return result if result else None
+
+    return None
+
 
-def get_article_details(pmid):
+def get_article_details(pmid, *, caches):
     """Get full article details from PubMed by PMID"""
     try:
-        handle = Entrez.efetch(db="pubmed", id=pmid, rettype="medline", retmode="xml")
-        articles = Entrez.read(handle)["PubmedArticle"]
-        handle.close()
+        return caches["pubmed_article_details"].lookup(str(pmid), _get_article_details)
 
-        if not articles:
-            return None
+    except Exception as e:
+        print(f"Error fetching article details: {str(e)}")
+        return None
 
-        article = articles[0]
 
-        # Extract article details
-        result = {"pmid": pmid}
+def _get_article_details(pmid):
+    handle = Entrez.efetch(db="pubmed", id=pmid, rettype="medline", retmode="xml")
+    articles = Entrez.read(handle)["PubmedArticle"]
+    handle.close()
 
-        # Get title
-        article_data = article["MedlineCitation"]["Article"]
-        result["title"] = article_data.get("ArticleTitle", "")
+    if not articles:
+        return None
 
-        # Get DOI and PMCID
-        for id_obj in article["PubmedData"].get("ArticleIdList", []):
-            if id_obj.attributes.get("IdType") == "doi":
-                result["doi"] = str(id_obj)
-            elif id_obj.attributes.get("IdType") == "pmc":
-                result["pmcid"] = str(id_obj)
+    article = articles[0]
 
-        return result
+    # Extract article details
+    result = {"pmid": pmid}
 
-    except Exception as e:
-        print(f"Error fetching article details: {str(e)}")
-        return None
+    # Get title
+    article_data = article["MedlineCitation"]["Article"]
+    result["title"] = article_data.get("ArticleTitle", "")
+
+    # Get DOI and PMCID
+    for id_obj in article["PubmedData"].get("ArticleIdList", []):
+        if id_obj.attributes.get("IdType") == "doi":
+            result["doi"] = str(id_obj)
+        elif id_obj.attributes.get("IdType") == "pmc":
+            result["pmcid"] = str(id_obj)
+
+    return result
 
 
-def search_pubmed(title, authors=None):
+def search_pubmed(title, authors=None, *, caches):
     """
     Search PubMed for a paper using title and optionally authors
     Returns a dict with pmid, doi, and pmcid if found
@@ -170,7 +190,7 @@ def search_pubmed(title, authors=None):
 
         # Check each result for title match
         for pmid in record["IdList"]:
-            article = get_article_details(pmid)
+            article = get_article_details(pmid, caches=caches)
             if not article:
                 continue
 
@@ -303,7 +323,7 @@ def merge_base_studies(source_study, target_study, identifiers):
         return False, []
 
 
-def find_missing_identifiers():
+def find_missing_identifiers(caches):
     """Find and update studies missing identifiers"""
 
     print("Starting identifier search...")
@@ -339,12 +359,12 @@ def find_missing_identifiers():
         print(f"\nSearching for: {bs.name}")
 
         # Try PubMed first
-        result = search_pubmed(bs.name)
+        result = search_pubmed(bs.name, caches=caches)
 
         # If not found in PubMed, try Semantic Scholar
         if not result:
             print("Not found in PubMed, trying Semantic Scholar...")
-            result = search_semantic_scholar(bs.name)
+            result = search_semantic_scholar(bs.name, caches=caches)
 
         if result:
             # Check if study already exists with these identifiers
@@ -410,8 +430,9 @@ if __name__ == "__main__":
         # Start transaction
         db.session.begin()
 
-        # Find studies to update
-        to_commit = find_missing_identifiers()
+        # Find studies to update, caching provider lookups on one connection
+        with db.engine.connect() as cache_connection:
+            to_commit = find_missing_identifiers(provider_caches(cache_connection))
 
         # Return list of studies to update
         if to_commit: